@@ -23,6 +23,8 @@ from api.agent.callbacks import (
     get_context_injector,
     log_tool_invocation,
     refund_failed_sql_budget,
+    serve_cached_sql,
+    store_sql_result,
 )
 from api.agent.debug_io import make_debug_io_callbacks
 from api.agent.tools.registry import AgentMode, compose_tools
@@ -212,12 +214,15 @@ def create_agent(
         enforce_collection_access,
         gate_expensive_tools,
         cap_total_tool_calls,
+        serve_cached_sql,
     ]
     # `refund_failed_sql_budget` runs first so a BigQuery error on
     # `execute_sql` releases the budget slot before downstream observers see
     # the response. Pairs with the `before_tool` increment in `dedup_sql_calls`.
+    # `store_sql_result` fills the shared cache `serve_cached_sql` reads.
     after_tool_chain = [
         refund_failed_sql_budget,
+        store_sql_result,
         collection_state_tracker,
         log_tool_invocation,
     ]
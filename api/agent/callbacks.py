@@ -246,11 +246,23 @@ def dedup_sql_calls(
       2. A hard per-session call count cap (`_MAX_SQL_CALLS_PER_SESSION`)
          to terminate variant-loop pathologies.
 
-    Either condition returning duplicate stops the call.
+    Either condition returning duplicate stops the call. A duplicate whose
+    rows are still in the shared result cache gets those rows back instead
+    of a refusal (see `serve_cached_sql`).
     """
     if tool.name != "execute_sql":
         return None
 
+    refusal = _dedup_sql_calls_locked(args, tool_context)
+    if refusal is not None and refusal.get("status") == "duplicate":
+        # Outside the budget lock - the lookup may read Firestore.
+        cached = _cached_sql_response(args, tool_context)
+        if cached is not None:
+            return cached
+    return refusal
+
+
+def _dedup_sql_calls_locked(args: dict[str, Any], tool_context: ToolContext) -> Optional[dict]:
     from api.agent.tools._idempotency import action_key, check_or_register
 
     state = tool_context.state
@@ -299,6 +311,108 @@ def dedup_sql_calls(
     return None
 
 
+def _sql_cache_key(args: dict[str, Any], tool_context: ToolContext) -> tuple | None:
+    """Shared-cache key for an `execute_sql` call, or None when it shouldn't
+    be cached (cache off, no active agent, dry run, non-deterministic SQL)."""
+    from config.settings import get_settings
+
+    if not get_settings().agent_sql_cache_enabled or args.get("dry_run"):
+        return None
+    state = tool_context.state
+    agent_id = state.get("active_agent_id")
+    collection_ids = state.get("agent_selected_sources") or []
+    raw_query = args.get("query") or args.get("sql") or ""
+    if not agent_id or not collection_ids or not raw_query:
+        return None
+
+    from api.deps import get_fs
+    from api.services import sql_result_cache
+
+    try:
+        stamp = sql_result_cache.freshness_stamp(collection_ids, get_fs().get_collection_status)
+    except Exception:
+        logger.warning("execute_sql cache: freshness stamp unavailable", exc_info=True)
+        return None
+    return sql_result_cache.cache_key(agent_id, collection_ids, stamp, raw_query)
+
+
+def _sql_cost_attribution(tool_context: ToolContext) -> dict[str, Any]:
+    state = tool_context.state
+    return {
+        "user_id": state.get("user_id") or getattr(tool_context, "user_id", None) or "",
+        "org_id": state.get("org_id"),
+        "session_id": state.get("session_id"),
+        "collection_id": state.get("active_collection_id"),
+        "agent_id": state.get("active_agent_id"),
+    }
+
+
+def _cached_sql_response(args: dict[str, Any], tool_context: ToolContext) -> Optional[dict]:
+    from api.services import sql_result_cache
+
+    key = _sql_cache_key(args, tool_context)
+    if key is None:
+        return None
+    entry = sql_result_cache.get_cache().get(key)
+    if entry is None:
+        return None
+    sql_result_cache.report(entry, hit=True, **_sql_cost_attribution(tool_context))
+    return dict(entry.response)
+
+
+def serve_cached_sql(
+    tool: BaseTool,
+    args: dict[str, Any],
+    tool_context: ToolContext,
+) -> Optional[dict]:
+    """Answer `execute_sql` from the cross-session result cache.
+
+    Keyed by canonical SQL + active agent + its selected sources + their
+    freshness stamp (api/services/sql_result_cache.py), so chats, Concierge turns and
+    autonomous continuations share each other's probes until the data
+    changes. The rows come back exactly as BigQuery returned them. Runs last
+    in the before-tool chain so a served call has still passed every gate
+    and counted against the session budget.
+    """
+    if tool.name != "execute_sql":
+        return None
+    try:
+        return _cached_sql_response(args, tool_context)
+    except Exception:
+        logger.warning("execute_sql cache lookup failed", exc_info=True)
+        return None
+
+
+def store_sql_result(
+    tool: BaseTool,
+    args: dict[str, Any],
+    tool_context: ToolContext,
+    tool_response: dict,
+) -> Optional[dict]:
+    """Put a successful `execute_sql` result into the shared cache. A
+    response that was itself served from the cache is already there, so
+    `put` ignores it."""
+    if tool.name != "execute_sql":
+        return None
+    if not isinstance(tool_response, dict) or tool_response.get("status") != "SUCCESS":
+        return None
+    if "rows" not in tool_response:
+        return None
+    try:
+        from api.services import sql_result_cache
+
+        key = _sql_cache_key(args, tool_context)
+        if key is None:
+            return None
+        entry = sql_result_cache.get_cache().put(key, tool_response)
+        if entry is not None:
+            sql = args.get("query") or args.get("sql") or ""
+            sql_result_cache.report(entry, hit=False, sql=sql, **_sql_cost_attribution(tool_context))
+    except Exception:
+        logger.warning("execute_sql cache store failed", exc_info=True)
+    return None
+
+
 def refund_failed_sql_budget(
     tool: BaseTool,
     args: dict[str, Any],
@@ -505,9 +619,9 @@ def cap_total_tool_calls(
          "same call, slightly different framing" loops on any tool, not just
          execute_sql.
 
-    Wired LAST in the before_tool_callback chain so dedup_sql_calls and the
-    access-control checks run first (and therefore aren't counted twice
-    against the ceiling when they short-circuit).
+    Wired after dedup_sql_calls and the access-control checks so they run
+    first (and therefore aren't counted twice against the ceiling when they
+    short-circuit). Only `serve_cached_sql` follows it.
     """
     from api.agent.tools._idempotency import action_key
 
@@ -112,7 +112,14 @@ def stub_before_tool_callback(
     if name == "compose_email":
         return {"status": "success", "email_id": f"stub-mail-{uuid4().hex[:6]}", "stubbed": True}
     if name == "export_data":
-        return {"status": "success", "export_url": "https://stub/export.csv", "stubbed": True}
+        return {
+            "status": "success",
+            "export_id": f"stub-dx-{uuid4().hex[:6]}",
+            "export_status": "ready",
+            "rows": [],
+            "row_count": 0,
+            "stubbed": True,
+        }
 
     # ── Briefing & agent management ──────────────────────────────────────
     if name == "generate_briefing":
@@ -1,8 +1,7 @@
-import json
 import logging
-from datetime import datetime, timezone
 
-from api.deps import get_bq
+from api.services import data_export
+from config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -10,22 +9,31 @@ logger = logging.getLogger(__name__)
 def export_data(
     collection_ids: list[str] = None,
     collection_id: str = "",
+    file_format: str = "csv",
+    tool_context=None,
 ) -> dict:
-    """Export all posts and enrichment data for one or more collections as structured rows.
+    """Export all posts and enrichment data for one or more collections as a downloadable file.
 
     Call this tool when the user wants to export or download their collected data
-    as a CSV or spreadsheet. Returns all posts with engagement metrics and
-    enrichment data (sentiment, themes, entities, AI summary).
+    as a CSV or spreadsheet. The file holds all posts with engagement metrics and
+    enrichment data (sentiment, themes, entities, AI summary); you get a preview
+    of the first rows and the export card offers the full download.
 
     Supports multi-collection exports - the output includes a `collection_id`
     column for attribution when exporting across multiple collections.
 
+    Large exports keep building in the background after this returns
+    (export_status "running"); the card shows progress and enables the
+    download when the file is ready. Don't call the tool again for the same data.
+
     Args:
         collection_ids: List of collection IDs to export. Preferred parameter.
         collection_id: Single collection ID (deprecated - use collection_ids).
+        file_format: "csv" (default), "xlsx" or "parquet".
 
     Returns:
-        A dictionary with status, rows (list of dicts), row_count, and column_names.
+        A dictionary with status, export_id, export_status, rows (a preview),
+        row_count (rows written so far), and column_names.
     """
     # Normalize to list
     ids = collection_ids or ([collection_id] if collection_id else [])
@@ -37,16 +45,20 @@ def export_data(
             "row_count": 0,
         }
 
-    bq = get_bq()
-    params = {
-        "collection_ids": ids,
-        "created_at": datetime.now(timezone.utc).isoformat(),
-    }
-
+    state = tool_context.state if tool_context is not None else {}
     try:
-        rows = bq.query_from_file("export_queries/underlying_data.sql", params)
+        job = data_export.start_export(
+            ids,
+            file_format,
+            user_id=state.get("user_id") or getattr(tool_context, "user_id", None) or "",
+            org_id=state.get("org_id"),
+            session_id=state.get("session_id"),
+            agent_id=state.get("active_agent_id"),
+        )
+    except data_export.ExportFormatError as e:
+        return {"status": "error", "message": str(e), "rows": [], "row_count": 0}
     except Exception as e:
-        logger.exception("Export query failed for collections %s", ids)
+        logger.exception("Export failed to start for collections %s", ids)
         return {
             "status": "error",
             "message": f"Failed to export data: {e}",
@@ -54,30 +66,38 @@ def export_data(
             "row_count": 0,
         }
 
-    if not rows:
+    job.wait(get_settings().data_export_wait_sec)
+
+    if job.status == data_export.FAILED:
         return {
-            "status": "success",
-            "message": "No data found for these collection(s). They may still be in progress.",
+            "status": "error",
+            "message": f"Failed to export data: {job.error}",
             "rows": [],
             "row_count": 0,
         }
 
-    # Flatten array fields to semicolon-separated strings for CSV compatibility
-    for row in rows:
-        if isinstance(row.get("themes"), list):
-            row["themes"] = "; ".join(row["themes"])
-        if isinstance(row.get("entities"), list):
-            row["entities"] = "; ".join(row["entities"])
-        if isinstance(row.get("media_refs"), list):
-            row["media_refs"] = json.dumps(row["media_refs"])
-
-    column_names = list(rows[0].keys()) if rows else []
-
-    return {
+    result = {
         "status": "success",
-        "message": f"Data export ready with {len(rows)} posts. The export card is displayed below.",
-        "rows": rows,
-        "row_count": len(rows),
-        "column_names": column_names,
+        "export_id": job.export_id,
+        "export_status": job.status,
+        "format": job.format,
+        "rows": job.preview,
+        "row_count": job.rows_written,
+        "column_names": job.column_names,
         "collection_ids": ids,
+        "truncated": job.truncated,
     }
+    if job.status == data_export.READY and not job.rows_written:
+        result["message"] = "No data found for these collection(s). They may still be in progress."
+    elif job.status == data_export.READY:
+        result["message"] = (
+            f"Data export ready with {job.rows_written} posts. The export card is displayed below."
+        )
+        if job.truncated:
+            result["message"] += f" The {job.format} file stops at the format's row limit."
+    else:
+        result["message"] = (
+            f"Data export is still being written ({job.rows_written} posts so far). "
+            "The export card is displayed below and enables the download when it's ready."
+        )
+    return result
@@ -1,12 +1,36 @@
-"""Firestore-backed session service for persistent ADK agent sessions."""
+"""Firestore-backed session service for persistent ADK agent sessions.
+
+Layout::
+
+    sessions/{session_id}               metadata, state, event_count
+    sessions/{session_id}/events/{seq}  one serialized Event per doc; seq is
+                                        zero-padded so doc ids sort in order
+
+A write appends only the events the store hasn't seen yet and updates only
+the state keys that changed, so a flush costs O(new events) however long the
+session is, and no document grows with the conversation. (Sessions used to
+keep every event in one ``events_json`` array that was re-serialized and
+rewritten on every flush - linear per turn, and capped by Firestore's 1 MiB
+document limit. Such sessions are still read, and are moved into the
+subcollection on their next write.)
+
+A plain ``get_session`` loads only the tail the LLM window can use - the last
+``session_load_user_turns`` user turns - so load time doesn't grow with the
+session either. Passing a ``GetSessionConfig`` reads the full log (then
+applies its filters), which is what restoring a conversation in the UI needs.
+"""
 
 import asyncio
+import copy
 import json
 import logging
+import threading
 import time
-from typing import Any, Optional
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
 from uuid import uuid4
 
+from cachetools import LRUCache
 from google.adk.events import Event
 from google.adk.sessions.base_session_service import (
     BaseSessionService,
@@ -15,6 +39,7 @@ from google.adk.sessions.base_session_service import (
 )
 from google.adk.sessions.session import Session
 from google.cloud import firestore
+from google.cloud.firestore_v1.field_path import FieldPath
 from typing_extensions import override
 
 from config.settings import get_settings
@@ -22,11 +47,60 @@ from config.settings import get_settings
 logger = logging.getLogger(__name__)
 
 SESSIONS_COLLECTION = "sessions"
+EVENTS_SUBCOLLECTION = "events"
+
+# Event doc ids are the zero-padded sequence number.
+_SEQ_WIDTH = 8
+# Firestore caps a write batch at 500 operations.
+_BATCH_OPS = 400
 
 # Sentinel returned by _strip_non_serializable to signal "drop this value"
 _SENTINEL = object()
 
 
+def _event_doc_id(seq: int) -> str:
+    return f"{seq:0{_SEQ_WIDTH}d}"
+
+
+def _is_user_turn(event: dict) -> bool:
+    """A user message that starts a turn (not a function_response hand-back).
+
+    Same rule as ``chat_session.window_events_for_llm``, on the serialized form.
+    """
+    content = event.get("content") or {}
+    if content.get("role") != "user":
+        return False
+    return not any(p.get("function_response") for p in content.get("parts") or [])
+
+
+def _take_window(newest_first: Iterable[dict], max_events: int, user_turns: int) -> list[dict]:
+    """Collect event records back to the ``user_turns``-th user turn, oldest first."""
+    out: list[dict] = []
+    turns = 0
+    for rec in newest_first:
+        out.append(rec)
+        if rec.get("user_turn"):
+            turns += 1
+            if turns >= user_turns:
+                break
+        if len(out) >= max_events:
+            break
+    out.reverse()
+    return out
+
+
+@dataclass
+class _EventLog:
+    """What the store holds for one live Session object, as of its last
+    load or write."""
+
+    count: int  # events persisted - the next event's seq
+    ids: set[str] = field(default_factory=set)  # persisted events' ids
+    state: dict = field(default_factory=dict)  # sanitized state as persisted
+    legacy: list[dict] | None = None  # events_json still to move to the log
+    new_doc: bool = False  # session doc not written yet
+
+
 class FirestoreSessionService(BaseSessionService):
     """Persists ADK sessions in Firestore."""
 
@@ -34,11 +108,21 @@ class FirestoreSessionService(BaseSessionService):
         settings = get_settings()
         self._db = db or firestore.Client(project=settings.gcp_project_id)
         self._dirty_sessions: set[str] = set()
+        self._load_user_turns = settings.session_load_user_turns
+        self._load_max_events = settings.session_load_max_events
         # In-memory cache keyed by session_id.  Ensures the chat endpoint
         # and the ADK Runner share the *same* Python Session object within
         # a single request so events appended by the Runner are visible
         # when flush() is called with the endpoint's session reference.
-        self._session_cache: dict[str, Session] = {}
+        self._session_cache: LRUCache = LRUCache(maxsize=settings.session_cache_size)
+        # What has been persisted for each live Session object - outlives the
+        # session cache entry (flush drops that) until the next load.
+        self._event_logs: LRUCache = LRUCache(maxsize=settings.session_cache_size)
+        # Naming writes from a background task while the turn may be flushing.
+        self._write_lock = threading.Lock()
+
+    def _doc(self, session_id: str):
+        return self._db.collection(SESSIONS_COLLECTION).document(session_id)
 
     # ------------------------------------------------------------------
     # Abstract method implementations
@@ -65,6 +149,7 @@ class FirestoreSessionService(BaseSessionService):
         )
 
         self._session_cache[session_id] = session
+        self._event_logs[session_id] = _EventLog(count=0, new_doc=True)
         self._write_session(session)
         return session
 
@@ -89,40 +174,22 @@ class FirestoreSessionService(BaseSessionService):
                     return None
                 return cached
 
-        doc = await asyncio.to_thread(
-            self._db.collection(SESSIONS_COLLECTION).document(session_id).get
-        )
-        if not doc.exists:
-            return None
-
-        data = doc.to_dict()
-
-        # Security: verify user_id matches
-        if data.get("user_id") != user_id:
-            logger.warning(
-                "Session %s belongs to %s but requested by %s",
-                session_id,
-                data.get("user_id"),
-                user_id,
-            )
+        loaded = await asyncio.to_thread(self._load, session_id, user_id, config)
+        if loaded is None:
             return None
+        session, log = loaded
 
-        session = self._deserialize(data)
-
-        # Apply config filters
-        if config and session.events:
-            if config.num_recent_events is not None:
-                session.events = session.events[-config.num_recent_events :]
-            if config.after_timestamp is not None:
-                session.events = [
-                    e
-                    for e in session.events
-                    if e.timestamp and e.timestamp > config.after_timestamp
-                ]
+        if config and config.after_timestamp is not None:
+            session.events = [
+                e
+                for e in session.events
+                if e.timestamp and e.timestamp > config.after_timestamp
+            ]
 
         # Only cache unfiltered sessions
         if config is None:
             self._session_cache[session_id] = session
+            self._event_logs[session_id] = log
 
         return session
 
@@ -169,7 +236,19 @@ class FirestoreSessionService(BaseSessionService):
         session_id: str,
     ) -> None:
         self._session_cache.pop(session_id, None)
-        self._db.collection(SESSIONS_COLLECTION).document(session_id).delete()
+        self._event_logs.pop(session_id, None)
+        await asyncio.to_thread(self._delete, session_id)
+
+    def _delete(self, session_id: str) -> None:
+        # Event log first, then the session doc itself.
+        events = self._doc(session_id).collection(EVENTS_SUBCOLLECTION)
+        doc_ids = [d.id for d in events.stream()]
+        for start in range(0, len(doc_ids), _BATCH_OPS):
+            batch = self._db.batch()
+            for doc_id in doc_ids[start:start + _BATCH_OPS]:
+                batch.delete(events.document(doc_id))
+            batch.commit()
+        self._doc(session_id).delete()
 
     # ------------------------------------------------------------------
     # Event handling - persist after base class processes state deltas
@@ -193,6 +272,108 @@ class FirestoreSessionService(BaseSessionService):
         # fresh data from Firestore.
         self._session_cache.pop(session.id, None)
 
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(
+        self, session_id: str, user_id: str, config: Optional[GetSessionConfig]
+    ) -> tuple[Session, _EventLog] | None:
+        t0 = time.perf_counter()
+        doc_ref = self._doc(session_id)
+        doc = doc_ref.get()
+        if not doc.exists:
+            return None
+
+        data = doc.to_dict()
+
+        # Security: verify user_id matches
+        if data.get("user_id") != user_id:
+            logger.warning(
+                "Session %s belongs to %s but requested by %s",
+                session_id,
+                data.get("user_id"),
+                user_id,
+            )
+            return None
+
+        legacy = data.get("events_json")
+        if legacy is not None:
+            records = self._select_events(
+                ({"event": e, "user_turn": _is_user_turn(e)} for e in reversed(legacy)),
+                config,
+            )
+            log = _EventLog(count=len(legacy), legacy=legacy)
+        else:
+            count = data.get("event_count", 0)
+            records = self._read_events(doc_ref, count, config)
+            log = _EventLog(count=count)
+
+        t1 = time.perf_counter()
+        session = self._deserialize(data, records)
+        log.ids = {e.id for e in session.events}
+        log.state = copy.deepcopy(session.state)
+        logger.info(
+            "PERF _load_session read=%.3fs deserialize=%.3fs events=%d of %d",
+            t1 - t0, time.perf_counter() - t1, len(session.events), log.count,
+        )
+        return session, log
+
+    def _read_events(
+        self, doc_ref, count: int, config: Optional[GetSessionConfig]
+    ) -> list[dict]:
+        """Read event records (oldest first) from the subcollection.
+
+        Bounded by ``count`` so docs past the committed end - a batch that
+        failed half-way, or a session re-created over an old id - are never
+        read back.
+        """
+        if not count:
+            return []
+        query = doc_ref.collection(EVENTS_SUBCOLLECTION).where("seq", "<", count)
+        if config is not None and config.num_recent_events is None:
+            return [d.to_dict() for d in query.order_by("seq").stream()]
+        limit = self._load_max_events if config is None else config.num_recent_events
+        query = query.order_by("seq", direction=firestore.Query.DESCENDING).limit(limit)
+        return self._select_events((d.to_dict() for d in query.stream()), config)
+
+
+    def _select_events(
+        self, newest_first: Iterable[dict], config: Optional[GetSessionConfig]
+    ) -> list[dict]:
+        """Pick the records a load wants from a newest-first stream, oldest first."""
+        if config is None:
+            return _take_window(newest_first, self._load_max_events, self._load_user_turns)
+        records = list(newest_first)
+        if config.num_recent_events is not None:
+            records = records[: config.num_recent_events]
+        records.reverse()
+        return records
+
+    def _recover_log(self, session: Session) -> _EventLog:
+        """Rebuild the event log of a session that wasn't loaded through this
+        service (or whose entry was evicted): read what the store holds."""
+        logger.warning("Session %s written without a loaded event log - re-reading it", session.id)
+        doc_ref = self._doc(session.id)
+        doc = doc_ref.get()
+        if not doc.exists:
+            return _EventLog(count=0, new_doc=True)
+        data = doc.to_dict()
+        legacy = data.get("events_json")
+        if legacy is not None:
+            return _EventLog(
+                count=len(legacy),
+                ids={e.get("id") for e in legacy},
+                state=data.get("state", {}),
+                legacy=legacy,
+            )
+        count = data.get("event_count", 0)
+        ids = set()
+        if count:
+            query = doc_ref.collection(EVENTS_SUBCOLLECTION).where("seq", "<", count)
+            ids = {(d.to_dict().get("event") or {}).get("id") for d in query.stream()}
+        return _EventLog(count=count, ids=ids, state=data.get("state", {}))
+
     # ------------------------------------------------------------------
     # Serialization helpers
     # ------------------------------------------------------------------
@@ -227,24 +408,46 @@ class FirestoreSessionService(BaseSessionService):
             return _SENTINEL  # signal: drop this value
 
     def _write_session(self, session: Session) -> None:
-        """Serialize and persist a session to Firestore."""
-        t0 = time.perf_counter()
+        """Persist a session's new events and changed state to Firestore."""
+        with self._write_lock:
+            self._write_session_locked(session)
 
-        # Serialize events: exclude grounding_metadata (GroundingMetadata is a
-        # non-Pydantic protobuf that model_dump leaves as a Python object and
-        # cannot survive a JSON round-trip without corruption).
-        events_safe = []
+    def _write_session_locked(self, session: Session) -> None:
+        t0 = time.perf_counter()
+        log = self._event_logs.get(session.id)
+        if log is None:
+            log = self._recover_log(session)
+            self._event_logs[session.id] = log
+
+        # Serialize only events the store hasn't seen: exclude
+        # grounding_metadata (GroundingMetadata is a non-Pydantic protobuf that
+        # model_dump leaves as a Python object and cannot survive a JSON
+        # round-trip without corruption).
+        fresh: list[dict] = []
+        seen: list[str] = []
         for idx, e in enumerate(session.events):
+            if e.id in log.ids:
+                continue
+            seen.append(e.id)
             try:
                 dumped = e.model_dump(mode="json", exclude_none=True)
                 dumped.pop("grounding_metadata", None)
-                events_safe.append(json.loads(json.dumps(dumped)))
+                fresh.append(json.loads(json.dumps(dumped)))
             except Exception as exc:
                 logger.warning(
                     "Failed to serialize event %d (author=%s) in session %s: %s - skipping",
                     idx, getattr(e, "author", "?"), session.id, exc,
                 )
 
+        # A legacy session moves its whole events_json into the log first.
+        backlog = log.legacy if log.legacy is not None else []
+        start = log.count - len(backlog)
+        records = [
+            {"seq": start + i, "event": e, "user_turn": _is_user_turn(e)}
+            for i, e in enumerate(backlog + fresh)
+        ]
+        count = start + len(records)
+
         t1 = time.perf_counter()
         session.last_update_time = time.time()
 
@@ -254,30 +457,65 @@ class FirestoreSessionService(BaseSessionService):
         # next turn.
         state_safe = self._strip_non_serializable(session.state)
 
-        data = {
-            "session_id": session.id,
-            "app_name": session.app_name,
-            "user_id": session.user_id,
-            "state": state_safe,
-            "last_update_time": session.last_update_time,
-            "events_json": events_safe,
-        }
+        doc_ref = self._doc(session.id)
+        if log.new_doc:
+            meta: dict[str, Any] = {
+                "session_id": session.id,
+                "app_name": session.app_name,
+                "user_id": session.user_id,
+                "state": state_safe,
+                "last_update_time": session.last_update_time,
+                "event_count": count,
+            }
+        else:
+            # State delta: only the top-level keys that changed.
+            meta = {
+                FieldPath("state", k).to_api_repr(): v
+                for k, v in state_safe.items()
+                if k not in log.state or log.state[k] != v
+            }
+            for k in log.state.keys() - state_safe.keys():
+                meta[FieldPath("state", k).to_api_repr()] = firestore.DELETE_FIELD
+            meta["last_update_time"] = session.last_update_time
+            meta["event_count"] = count
+            if log.legacy is not None:
+                meta["events_json"] = firestore.DELETE_FIELD
+
+        events_ref = doc_ref.collection(EVENTS_SUBCOLLECTION)
+        chunks = [records[i:i + _BATCH_OPS] for i in range(0, len(records), _BATCH_OPS)] or [[]]
         try:
-            self._db.collection(SESSIONS_COLLECTION).document(session.id).set(data)
+            # event_count moves in the last batch, so a failure part-way leaves
+            # it pointing at the old end: the next write re-sends the same seqs.
+            for n, chunk in enumerate(chunks):
+                batch = self._db.batch()
+                for rec in chunk:
+                    batch.set(events_ref.document(_event_doc_id(rec["seq"])), rec)
+                if n == len(chunks) - 1:
+                    if log.new_doc:
+                        batch.set(doc_ref, meta)
+                    else:
+                        batch.update(doc_ref, meta)
+                batch.commit()
         except Exception as exc:
             logger.error("Failed to write session %s to Firestore: %s", session.id, exc)
+        else:
+            log.count = count
+            log.ids.update(seen)
+            log.state = copy.deepcopy(state_safe)
+            log.legacy = None
+            log.new_doc = False
         t2 = time.perf_counter()
         logger.info(
-            "PERF _write_session serialize=%.3fs write=%.3fs events=%d",
-            t1 - t0, t2 - t1, len(session.events),
+            "PERF _write_session serialize=%.3fs write=%.3fs appended=%d events=%d",
+            t1 - t0, t2 - t1, len(records), count,
         )
 
-    def _deserialize(self, data: dict) -> Session:
-        """Reconstruct a Session from a Firestore document."""
+    def _deserialize(self, data: dict, records: list[dict]) -> Session:
+        """Reconstruct a Session from its Firestore document and event records."""
         events = []
-        for event_data in data.get("events_json", []):
+        for rec in records:
             try:
-                events.append(Event.model_validate(event_data))
+                events.append(Event.model_validate(rec["event"]))
             except Exception:
                 logger.warning("Failed to deserialize event, skipping")
 
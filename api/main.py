@@ -48,6 +48,7 @@ from api.routers import dashboard as dashboard_router
 from api.routers import dashboard_layouts as dashboard_layouts_router
 from api.routers import dashboard_shares as dashboard_shares_router
 from api.routers import explorer_layouts as explorer_layouts_router
+from api.routers import exports as exports_router
 from api.routers import feed as feed_router
 from api.routers import feed_links as feed_links_router
 from api.routers import health as health_router
@@ -103,6 +104,11 @@ async def lifespan(app_: FastAPI):
         scheduler.start()
     yield
 
+    # Drain queued usage_events rows before the instance goes away.
+    from api.services import telemetry_sink
+
+    await asyncio.to_thread(telemetry_sink.shutdown)
+
 
 # orjson encodes JSON several× faster than the stdlib encoder used by the
 # default JSONResponse - a meaningful win on the large dashboard/share payloads
@@ -158,6 +164,7 @@ app.include_router(dashboard_shares_router.router)
 app.include_router(dashboard_layouts_router.router, dependencies=_gated)
 app.include_router(explorer_layouts_router.router, dependencies=_gated)
 app.include_router(artifacts_router.router, dependencies=_gated)
+app.include_router(exports_router.router, dependencies=_gated)
 app.include_router(artifact_shares_router.router)
 app.include_router(topics_router.router, dependencies=_gated)
 app.include_router(briefing_router.router, dependencies=_gated)
@@ -46,6 +46,15 @@ async def admin_check(user: CurrentUser = Depends(_admin_user)):
     return {"is_admin": True}
 
 
+@router.get("/telemetry")
+async def admin_telemetry(user: CurrentUser = Depends(_admin_user)):
+    """usage_events sink counters (queue depth, dropped rows, ...) for the
+    instance that serves this request."""
+    from api.services import telemetry_sink
+
+    return telemetry_sink.stats()
+
+
 # ---------------------------------------------------------------------------
 # Overview - platform-wide KPIs
 # ---------------------------------------------------------------------------
@@ -14,26 +14,18 @@ from api.auth.dependencies import CurrentUser, get_current_user
 from api.deps import get_bq, get_fs
 from api.schemas.requests import DashboardAggregateRequest, DashboardDataRequest, PostDetailsRequest
 from api.schemas.responses import DashboardDataResponse, DashboardKpis
-from api.services.dashboard_aggregate import (
-    build_feed_data_map,
-    build_table_data_map,
-    build_widget_data_map,
-)
-from api.services.dashboard_cache import (
-    get_studio_agg,
-    make_freshness_stamp,
-    perf_logger,
-    set_studio_agg,
-)
-from api.services.dashboard_scope import apply_filters, intersect_with_scope
+from api.services.dashboard_cache import make_freshness_stamp, perf_logger
+from api.services.dashboard_scope import intersect_with_scope
 from api.services.dashboard_response import data_cache_key, gzipped_json_response
+from api.services.dashboard_columns import post_dicts, wire_columns
 from api.services.dashboard_service import (
     COLLECTION_NAMES_SQL,
+    DETAIL_FIELDS,
     build_post_details,
     derive_agent_id_for_collections,
     get_or_build_core,
-    strip_detail_fields,
 )
+from api.services.dashboard_studio_agg import aggregate_layout
 from api.services.report_transform import transform_posts, validate_report_config
 from config.settings import get_settings
 
@@ -137,29 +129,35 @@ async def get_dashboard_data(
             raise HTTPException(status_code=422, detail="; ".join(errors))
         posts = transform_posts(posts, config)
 
-    # Slim mode drops the heavy display-only fields; the client lazy-fetches them
-    # per visible post via /dashboard/post-details (served from the same cache).
-    if request.slim:
-        posts = strip_detail_fields(posts)
-
     # Comments are an optional parallel source (dataSource: comments/both). Apply
     # the SAME report-level transform (canonicalization of e.g. hotel names lives
     # in the explorer report layer, per design) and slim treatment as posts.
     comments = core.get("comments", [])
-    if comments:
-        if config is not None:
-            comments = transform_posts(comments, config)
-        if request.slim:
-            comments = strip_detail_fields(comments)
-
-    # Return the cached/assembled core directly (already matches
-    # DashboardDataResponse) via orjson, skipping a second per-row validation.
+    if comments and config is not None:
+        comments = transform_posts(comments, config)
+
+    # Slim mode drops the heavy display-only fields; the client lazy-fetches them
+    # per visible post via /dashboard/post-details (served from the same cache).
+    # Columnar clients get the rows as dictionary-encoded columns instead of
+    # one JSON object per post (see dashboard_columns.PostColumns.to_wire).
+    exclude = DETAIL_FIELDS if request.slim else ()
+    if request.columnar:
+        body = {
+            **core,
+            "posts": [],
+            "comments": [],
+            "posts_columnar": wire_columns(posts, exclude),
+            "comments_columnar": wire_columns(comments, exclude),
+        }
+    else:
+        body = {**core, "posts": post_dicts(posts, exclude), "comments": post_dicts(comments, exclude)}
+
     # Gzip-capable clients are served the compressed body from the
-    # response-bytes cache (keyed by data freshness + config + slim), so a warm
-    # hit skips both orjson and gzip - the bulk of warm CPU on a large payload.
-    body = {**core, "posts": posts, "comments": comments}
+    # response-bytes cache (keyed by data freshness + config + slim +
+    # encoding), so a warm hit skips both orjson and gzip - the bulk of warm
+    # CPU on a large payload.
     cache_key = data_cache_key(
-        agent_id, request.collection_ids, stamp, config, request.slim
+        agent_id, request.collection_ids, stamp, config, request.slim, request.columnar
     )
     return gzipped_json_response(
         body, cache_key, http_request.headers.get("accept-encoding", "")
@@ -219,14 +217,12 @@ async def get_dashboard_aggregate(
     Widgets the engine can't reproduce are absent from the response and keep
     client-side aggregation, so the response is always a strict superset.
 
-    Results are cached per (agent, collections, freshness stamp, agg signature)
-    where the signature is a hash of the effective filters + layout widget
-    configs. Cache misses are fast: the post set lives in the dashboard core
+    Results are memoized per widget (see `dashboard_studio_agg`): the filtered
+    post set per (freshness stamp, filters + report config), and each widget's
+    result per (filtered set, widget config), so an edit to one widget
+    recomputes only that widget. The post set lives in the dashboard core
     cache (no BQ round-trip on a warm dashboard).
     """
-    import hashlib
-    import json
-
     if not request.collection_ids:
         raise HTTPException(status_code=400, detail="collection_ids is required")
 
@@ -259,64 +255,15 @@ async def get_dashboard_aggregate(
         if errors:
             raise HTTPException(status_code=422, detail="; ".join(errors))
 
-    # Build the agg signature so repeated filter combos are served from cache.
-    # Include filter state, per-widget configs (not layout positions), and
-    # report_config. Exclude x/y/w/h/layout-only fields to avoid cache busting
-    # on mere drag-resizes with no data change.
-    _LAYOUT_ONLY = frozenset({"x", "y", "w", "h", "minW", "maxW", "minH", "maxH", "moved", "static", "isDraggable", "isResizable"})
-    slim_layout = [
-        {k: v for k, v in w.items() if k not in _LAYOUT_ONLY}
-        for w in request.layout
-    ]
-    sig_payload = {
-        "f": request.filters,
-        "lw": slim_layout,
-        "rc": config or {},
-    }
-    agg_sig = hashlib.md5(
-        json.dumps(sig_payload, sort_keys=True, default=str).encode()
-    ).hexdigest()
-
-    cached = await asyncio.to_thread(
-        get_studio_agg, agent_id, request.collection_ids, stamp, agg_sig
+    result, stats = await aggregate_layout(
+        core, request.layout, request.filters, config,
+        agent_id=agent_id, collection_ids=request.collection_ids, stamp=stamp,
     )
-    if cached is not None:
-        perf_logger.info(
-            "dashboard.aggregate agent=%s cache=HIT gather_ms=%.0f",
-            agent_id, gather_ms,
-        )
-        return ORJSONResponse(cached)
-
-    # Apply report-level transform (canonicalization + computed fields).
-    posts = core["posts"]
-    if config:
-        posts = transform_posts(posts, config)
-
-    # Apply the effective filters (viewer selection already intersected with
-    # reportScope on the FE) to reproduce `filteredPosts` on the server.
-    # `filtered_posts` is also the percent baseline (`basePosts` in the FE),
-    # matching `basePosts={filteredPosts}` in SocialDashboardGrid.
-    filtered_posts = await asyncio.to_thread(apply_filters, posts, request.filters or None)
-
-    # Build per-widget aggregates over the filtered set.
-    def _build():
-        wd = build_widget_data_map(filtered_posts, request.layout)
-        td = build_table_data_map(filtered_posts, request.layout)
-        fd_full = build_feed_data_map(filtered_posts, request.layout)
-        # Return post-id lists (not full post dicts) for feed widgets, matching
-        # the share path's `feedData` shape.
-        fd = {wid: [p["post_id"] for p in plist] for wid, plist in fd_full.items()}
-        return {"widgetData": wd, "tableData": td, "feedData": fd}
-
-    result = await asyncio.to_thread(_build)
-
     perf_logger.info(
-        "dashboard.aggregate agent=%s cache=MISS core_hit=%s posts=%d filtered=%d gather_ms=%.0f widgets=%d",
-        agent_id, cache_hit, len(posts), len(filtered_posts), gather_ms, len(request.layout),
-    )
-
-    await asyncio.to_thread(
-        set_studio_agg, agent_id, request.collection_ids, stamp, agg_sig, result
+        "dashboard.aggregate agent=%s core_hit=%s set_hit=%s posts=%d filtered=%d "
+        "gather_ms=%.0f widgets=%d widget_hits=%d",
+        agent_id, cache_hit, stats["set_hit"], len(core["posts"]), stats["filtered"],
+        gather_ms, stats["widgets"], stats["widget_hits"],
     )
     return ORJSONResponse(result)
 
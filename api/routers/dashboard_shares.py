@@ -39,13 +39,14 @@ from api.services.dashboard_response import (
     share_cache_key,
     store_encoded_l2,
 )
+from api.services.dashboard_columns import post_dicts, wire_columns
 from api.services.dashboard_scope import apply_report_scope
 from api.services.dashboard_service import (
     COLLECTION_NAMES_SQL,
+    DETAIL_FIELDS,
     build_post_details,
     derive_agent_id_for_collections,
     get_or_build_core,
-    strip_detail_fields,
 )
 from api.services.report_transform import transform_posts, validate_report_config
 from config.settings import get_settings
@@ -320,13 +321,16 @@ async def get_shared_dashboard(
     token: str,
     slim: bool = False,
     agg: str | None = None,
+    columnar: bool = False,
 ):
     """Public endpoint - serves shared dashboard data without authentication.
 
     With `?slim=1` the heavy display-only fields are omitted from each post and
     the read-only client lazy-fetches them per visible post via
     `/dashboard/shares/public/{token}/post-details`. Default keeps the full
-    payload so existing/cached clients are unaffected.
+    payload so existing/cached clients are unaffected. With `?columnar=1` the
+    posts/comments ship as `posts_columnar`/`comments_columnar` (the
+    JSON-columnar encoding, see dashboard_columns) and the row arrays are empty.
 
     Server-side aggregation (P2) computes the `WidgetData`/`tableData`/`feedData`
     for every server-aggregatable widget in the layout and, when the whole layout
@@ -470,6 +474,7 @@ async def get_shared_dashboard(
             "reportConfig": report_config,
         },
         server_agg_enabled,
+        columnar,
     )
     accept_encoding = request.headers.get("accept-encoding", "")
 
@@ -550,8 +555,13 @@ async def get_shared_dashboard(
     # lazy-fetches them per visible post via the share post-details endpoint
     # (same cached core). The share's filter bar is hidden, so the displayed set
     # is static and the fetch happens once per visible widget.
-    share_posts = strip_detail_fields(body_posts) if slim else body_posts
-    share_comments = strip_detail_fields(canon_comments) if slim else canon_comments
+    exclude = DETAIL_FIELDS if slim else ()
+    if columnar:
+        share_posts: list = []
+        share_comments: list = []
+    else:
+        share_posts = post_dicts(body_posts, exclude)
+        share_comments = post_dicts(canon_comments, exclude)
 
     # Wrap the cached core (posts/topics/collection_names/truncated) with this
     # share's per-request metadata; kpis in the core are unused here. Shape
@@ -573,6 +583,9 @@ async def get_shared_dashboard(
         # into `share_posts` above).
         "reportConfig": report_config,
     }
+    if columnar:
+        body["posts_columnar"] = wire_columns(body_posts, exclude)
+        body["comments_columnar"] = wire_columns(canon_comments, exclude)
     # Only present when opted in, so an unflagged response is byte-identical to
     # the pre-P2 body (and shares no cache entry with the flagged one).
     if server_agg_enabled:
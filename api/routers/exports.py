@@ -0,0 +1,106 @@
+"""File-backed data exports - status polling and download.
+
+Exports are written in the background by the agent's ``export_data`` tool
+(see api/services/data_export.py); the export card polls the status until
+the file is ready, then downloads it via the signed URL or the stream below.
+"""
+
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from api.auth.dependencies import CurrentUser, get_current_user
+from api.deps import get_fs, get_gcs
+from api.errors import safe_error_detail
+from api.middleware.request_id import get_request_id
+from api.services import data_export
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+_CHUNK_BYTES = 256 * 1024
+
+
+def _load_export(export_id: str, user: CurrentUser) -> dict:
+    export = get_fs().get_data_export(export_id)
+    if not export:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if export.get("user_id") != user.uid:
+        if not (user.org_id and export.get("org_id") == user.org_id):
+            raise HTTPException(status_code=403, detail="Access denied")
+    return export
+
+
+@router.get("/{export_id}")
+async def get_export_status(
+    export_id: str,
+    user: CurrentUser = Depends(get_current_user),
+):
+    """Progress of an export; a signed download URL once it's ready."""
+    export = await asyncio.to_thread(_load_export, export_id, user)
+    status = export.get("status", data_export.RUNNING)
+    download_url = None
+    if status == data_export.READY:
+        download_url = await asyncio.to_thread(data_export.signed_url, export)
+    return {
+        "export_id": export_id,
+        "status": status,
+        "format": export.get("format", "csv"),
+        "rows_written": export.get("rows_written", 0),
+        "bytes_written": export.get("bytes_written", 0),
+        "truncated": export.get("truncated", False),
+        "error": export.get("error"),
+        "created_at": export.get("created_at"),
+        "completed_at": export.get("completed_at"),
+        "download_url": download_url,
+    }
+
+
+@router.get("/{export_id}/download")
+async def download_export(
+    export_id: str,
+    request: Request,
+    user: CurrentUser = Depends(get_current_user),
+):
+    """Stream a ready export file from GCS."""
+    export = await asyncio.to_thread(_load_export, export_id, user)
+    status = export.get("status")
+    if status == data_export.FAILED:
+        raise HTTPException(status_code=410, detail="Export failed")
+    if status != data_export.READY:
+        raise HTTPException(status_code=409, detail="Export is still being written")
+
+    _, content_type = data_export.FORMATS.get(export.get("format") or "csv", data_export.FORMATS["csv"])
+    try:
+        bucket = get_gcs().bucket(get_settings().gcs_exports_bucket)
+        blob = bucket.blob(export["gcs_path"])
+        if not await asyncio.to_thread(blob.exists):
+            raise HTTPException(status_code=404, detail="Export file not found in storage")
+
+        async def stream():
+            # One chunk read per worker-thread hop. A client that goes away
+            # stops the reads and closes the GCS reader right there, rather
+            # than leaving it open until the response is garbage collected.
+            with blob.open("rb") as f:
+                while not await request.is_disconnected():
+                    chunk = await asyncio.to_thread(f.read, _CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        return StreamingResponse(
+            stream(),
+            media_type=content_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="{data_export.export_filename(export)}"',
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error downloading export %s", export_id)
+        raise HTTPException(status_code=500, detail=safe_error_detail(get_request_id()))
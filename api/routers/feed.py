@@ -15,6 +15,7 @@ from api.schemas.responses import (
     FeedResponse,
     TopicBreakdownEntry,
 )
+from api.services import feed_cursor
 from api.services.collection_service import can_access_collection
 from api.services.dashboard_cache import (
     get_feed_kpis,
@@ -32,7 +33,12 @@ async def get_multi_collection_feed(
     request: MultiFeedRequest,
     user: CurrentUser = Depends(get_current_user),
 ):
-    """Unified feed across multiple collections, sorted by views desc."""
+    """Unified feed across multiple collections, sorted by views desc.
+
+    Pages by keyset when the request carries the previous page's
+    `next_cursor` (see api/services/feed_cursor.py); `offset` paging still
+    works for callers that don't.
+    """
     if not request.collection_ids:
         return FeedResponse(posts=[], total=0, offset=request.offset, limit=request.limit)
 
@@ -51,10 +57,27 @@ async def get_multi_collection_feed(
 
     bq = get_bq()
 
+    sort_keys = _SORT_KEYS_TVF if request.agent_id else _SORT_KEYS_LEGACY
+    sort = request.sort if request.sort in sort_keys else "views"
+    stamp = make_freshness_stamp(statuses)
+    cursor_filters = feed_cursor.filter_hash(_cursor_filter_signature(request))
+    cursor = None
+    if request.cursor:
+        try:
+            cursor = feed_cursor.decode(request.cursor, sort_keys)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid feed cursor")
+        if not cursor.matches(sort, stamp, cursor_filters):
+            # Data or filters moved since the cursor was cut: its key tuple
+            # may no longer mark the same place. Serve this page by OFFSET at
+            # the cursor's position and hand out a fresh cursor.
+            request = request.model_copy(update={"offset": cursor.position, "cursor": None})
+            cursor = None
+
     if request.agent_id:
-        multi_sql, params = _build_tvf_sql(request)
+        multi_sql, params = _build_tvf_sql(request, cursor)
     else:
-        multi_sql, params = _build_legacy_sql(request)
+        multi_sql, params = _build_legacy_sql(request, cursor)
 
     # KPI strip aggregates are computed over the full filtered window (no row
     # cap) so they stay correct when the caller only downloads the top-N posts
@@ -65,10 +88,8 @@ async def get_multi_collection_feed(
     # so it adds no wall-clock; on a hit we skip the extra BigQuery scan entirely.
     want_kpis = request.include_kpis and bool(request.agent_id)
     cached_kpis: dict | None = None
-    stamp = ""
     filter_sig = ""
     if want_kpis:
-        stamp = make_freshness_stamp(statuses)
         filter_sig = _kpis_filter_signature(request)
         cached_kpis = get_feed_kpis(
             request.agent_id, request.collection_ids, stamp, filter_sig
@@ -83,9 +104,29 @@ async def get_multi_collection_feed(
         )
     else:
         rows = await asyncio.to_thread(bq.query, multi_sql, params)
-    total = rows[0]["_total"] if rows else 0
-    total_views = rows[0]["_total_views"] if rows else 0
-    total_sources = rows[0]["_total_sources"] if rows else 0
+    if cursor is not None:
+        # Keyset pages skip the window aggregates; the first page's totals
+        # still hold while the freshness stamp does.
+        position = cursor.position
+        total, total_views, total_sources = cursor.total, cursor.total_views, cursor.total_sources
+    else:
+        position = request.offset
+        total = rows[0]["_total"] if rows else 0
+        total_views = rows[0]["_total_views"] if rows else 0
+        total_sources = rows[0]["_total_sources"] if rows else 0
+
+    next_cursor = None
+    if rows and len(rows) >= request.limit and position + len(rows) < int(total):
+        next_cursor = feed_cursor.encode(feed_cursor.FeedCursor(
+            sort=sort,
+            values=feed_cursor.row_values(sort_keys[sort], rows[-1]),
+            stamp=stamp,
+            filter_hash=cursor_filters,
+            position=position + len(rows),
+            total=int(total),
+            total_views=int(total_views or 0),
+            total_sources=int(total_sources or 0),
+        ))
 
     posts = []
     for row in rows:
@@ -168,25 +209,63 @@ async def get_multi_collection_feed(
         total=int(total),
         total_views=int(total_views or 0),
         total_sources=int(total_sources or 0),
-        offset=request.offset,
+        offset=position,
         limit=request.limit,
         kpis=kpis,
+        next_cursor=next_cursor,
     )
 
 
-_SORT_MAP_TVF = {
-    "engagement": "COALESCE(likes, 0) + COALESCE(comments_count, 0) + COALESCE(views, 0) DESC",
-    "recent": "posted_at DESC",
-    "sentiment": "sentiment ASC, posted_at DESC",
-    "views": "COALESCE(views, 0) DESC, posted_at DESC",
-}
+def _sort_keys(post: str, engagement: str, enrichment: str) -> dict[str, tuple[feed_cursor.SortKey, ...]]:
+    """Sort orders as keyset-comparable key tuples. NULLs are coalesced to the
+    end BigQuery already sorted them to (NULLS FIRST ascending, LAST
+    descending) so `=`/`<` comparisons work; `post_id` breaks ties."""
+    SortKey, INT, STR, TS = feed_cursor.SortKey, feed_cursor.INT, feed_cursor.STR, feed_cursor.TS
+    posted_at = SortKey(f"COALESCE({post}posted_at, TIMESTAMP '1970-01-01')", True, TS)
+    post_id = SortKey(f"{post}post_id", True, STR)
+    return {
+        "engagement": (
+            SortKey(
+                f"COALESCE({engagement}likes, 0) + COALESCE({engagement}comments_count, 0)"
+                f" + COALESCE({engagement}views, 0)",
+                True, INT,
+            ),
+            post_id,
+        ),
+        "recent": (posted_at, post_id),
+        "sentiment": (SortKey(f"COALESCE({enrichment}sentiment, '')", False, STR), posted_at, post_id),
+        "views": (SortKey(f"COALESCE({engagement}views, 0)", True, INT), posted_at, post_id),
+    }
+
+
+_SORT_KEYS_TVF = _sort_keys("base.", "base.", "base.")
+_SORT_KEYS_LEGACY = _sort_keys("p.", "pe.", "ep.")
 
-_SORT_MAP_LEGACY = {
-    "engagement": "COALESCE(pe.likes, 0) + COALESCE(pe.comments_count, 0) + COALESCE(pe.views, 0) DESC",
-    "recent": "p.posted_at DESC",
-    "sentiment": "ep.sentiment ASC, p.posted_at DESC",
-    "views": "COALESCE(pe.views, 0) DESC, p.posted_at DESC",
-}
+
+def _cursor_filter_signature(request: MultiFeedRequest) -> str:
+    """Everything besides the sort that decides which rows a page holds - a
+    cursor cut under one combination is void under another."""
+    return "|".join([
+        _kpis_filter_signature(request),
+        request.agent_id or "",
+        request.source,
+        ",".join(sorted(request.collection_ids)),
+    ])
+
+
+def _paging_sql(
+    keys: tuple[feed_cursor.SortKey, ...],
+    cursor: feed_cursor.FeedCursor | None,
+    request: MultiFeedRequest,
+    params: dict,
+) -> tuple[str, str]:
+    """(extra WHERE conjunct, LIMIT clause) for one page: keyset after the
+    cursor, or OFFSET for cursor-less requests."""
+    params["limit"] = request.limit
+    if cursor is None:
+        params["offset"] = request.offset
+        return "", "LIMIT @limit OFFSET @offset"
+    return f"AND {feed_cursor.after_sql(keys, cursor, params)}", "LIMIT @limit"
 
 
 def _build_tvf_filters(request: MultiFeedRequest) -> tuple[str, str, dict]:
@@ -286,12 +365,21 @@ def _feed_base_cte(source: str) -> str:
     return posts
 
 
-def _build_tvf_sql(request: MultiFeedRequest) -> tuple[str, dict]:
-    """Build the agent-aware feed query that delegates scoping to scope_posts TVF."""
+def _build_tvf_sql(
+    request: MultiFeedRequest, cursor: feed_cursor.FeedCursor | None = None,
+) -> tuple[str, dict]:
+    """Build the agent-aware feed query that delegates scoping to scope_posts TVF.
+
+    With a `cursor` the page is the next `limit` rows after it and the
+    `_total*` window aggregates are left out (the cursor carries them).
+    """
     topic_join_sql, where_sql, params = _build_tvf_filters(request)
-    params["limit"] = request.limit
-    params["offset"] = request.offset
-    order_sql = _SORT_MAP_TVF.get(request.sort, _SORT_MAP_TVF["views"])
+    keys = _SORT_KEYS_TVF.get(request.sort, _SORT_KEYS_TVF["views"])
+    after_sql, limit_sql = _paging_sql(keys, cursor, request, params)
+    totals_sql = "" if cursor is not None else """,
+        COUNT(*) OVER() AS _total,
+        SUM(COALESCE(base.views, 0)) OVER() AS _total_views,
+        COUNT(DISTINCT base.platform) OVER() AS _total_sources"""
 
     sql = f"""
     WITH base AS (
@@ -311,14 +399,12 @@ def _build_tvf_sql(request: MultiFeedRequest) -> tuple[str, dict]:
         base.content_type, base.language, base.custom_fields,
         base.context, base.detected_brands, base.channel_type,
         base.is_retweet, base.is_quote,
-        COUNT(*) OVER() AS _total,
-        SUM(COALESCE(base.views, 0)) OVER() AS _total_views,
-        COUNT(DISTINCT base.platform) OVER() AS _total_sources
+        {feed_cursor.select_sql(keys)}{totals_sql}
     FROM base
     {topic_join_sql}
-    {where_sql}
-    ORDER BY {order_sql}
-    LIMIT @limit OFFSET @offset
+    {where_sql} {after_sql}
+    ORDER BY {feed_cursor.order_by_sql(keys)}
+    {limit_sql}
     """
     return sql, params
 
@@ -432,7 +518,9 @@ def _build_feed_kpis(rows: list[dict]) -> FeedKpis:
     )
 
 
-def _build_legacy_sql(request: MultiFeedRequest) -> tuple[str, dict]:
+def _build_legacy_sql(
+    request: MultiFeedRequest, cursor: feed_cursor.FeedCursor | None = None,
+) -> tuple[str, dict]:
     """Build the non-agent-scoped feed query (back-compat for callers without agent_id).
 
     Picks the latest enrichment per post by enriched_at, regardless of agent_id -
@@ -500,10 +588,12 @@ def _build_legacy_sql(request: MultiFeedRequest) -> tuple[str, dict]:
         params["topic_cluster_id"] = request.topic_cluster_id
 
     where_sql = " AND ".join(where_clauses)
-    order_sql = _SORT_MAP_LEGACY.get(request.sort, _SORT_MAP_LEGACY["views"])
-
-    params["limit"] = request.limit
-    params["offset"] = request.offset
+    keys = _SORT_KEYS_LEGACY.get(request.sort, _SORT_KEYS_LEGACY["views"])
+    after_sql, limit_sql = _paging_sql(keys, cursor, request, params)
+    totals_sql = "" if cursor is not None else """,
+        COUNT(*) OVER() as _total,
+        SUM(COALESCE(pe.views, 0)) OVER() as _total_views,
+        COUNT(DISTINCT p.platform) OVER() as _total_sources"""
 
     sql = f"""
     SELECT
@@ -520,9 +610,7 @@ def _build_legacy_sql(request: MultiFeedRequest) -> tuple[str, dict]:
         ep.context, ep.detected_brands, ep.channel_type,
         SAFE_CAST(JSON_VALUE(p.platform_metadata, '$.is_retweet') AS BOOL) as is_retweet,
         SAFE_CAST(JSON_VALUE(p.platform_metadata, '$.is_quote_status') AS BOOL) as is_quote,
-        COUNT(*) OVER() as _total,
-        SUM(COALESCE(pe.views, 0)) OVER() as _total_views,
-        COUNT(DISTINCT p.platform) OVER() as _total_sources
+        {feed_cursor.select_sql(keys)}{totals_sql}
     FROM {posts_subquery} p
     LEFT JOIN (
         SELECT *,
@@ -538,8 +626,8 @@ def _build_legacy_sql(request: MultiFeedRequest) -> tuple[str, dict]:
         FROM social_listening.post_engagements
     ) pe ON p.post_id = pe.post_id AND pe.rn = 1
     {topic_join_sql}
-    WHERE {where_sql}
-    ORDER BY {order_sql}
-    LIMIT @limit OFFSET @offset
+    WHERE {where_sql} {after_sql}
+    ORDER BY {feed_cursor.order_by_sql(keys)}
+    {limit_sql}
     """
     return sql, params
@@ -1,9 +1,11 @@
-"""Internal/unauthenticated endpoints: scheduler tick and agent continuation.
+"""Internal/unauthenticated endpoints: scheduler tick, latest-table refresh,
+batch enrichment collection and agent continuation.
 
 Invoked by Cloud Scheduler and Cloud Tasks in production; no user-facing
 auth. Access control is enforced at the GCP/IAM layer, not here.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 
@@ -48,6 +50,37 @@ async def scheduler_tick():
     return {"status": "ok"}
 
 
+@router.post("/internal/latest-tables/refresh")
+async def latest_tables_refresh():
+    """Fold new posts / enrichment / engagement rows into the *_latest tables
+    behind the scope TVFs.
+
+    Called by Cloud Scheduler in production (every 15 minutes). Each table's
+    MERGE is independent; failures are logged and retried on the next call.
+    """
+    if not get_settings().latest_tables_refresh_enabled:
+        return {"status": "disabled"}
+
+    from workers.shared.latest_tables import refresh_latest_tables
+    refreshed = await asyncio.to_thread(refresh_latest_tables)
+    return {"status": "ok", "refreshed": refreshed}
+
+
+@router.post("/internal/enrichment-batches/collect")
+async def enrichment_batches_collect():
+    """Write the results of finished Gemini batch enrichment jobs.
+
+    Called by Cloud Scheduler in production (every 10 minutes). Jobs still
+    running, or whose state couldn't be read, are checked again next call.
+    """
+    if not get_settings().enrichment_batch_collect_enabled:
+        return {"status": "disabled"}
+
+    from workers.enrichment.worker import collect_enrichment_batches
+    outcomes = await asyncio.to_thread(collect_enrichment_batches)
+    return {"status": "ok", "jobs": outcomes}
+
+
 @router.post("/internal/agent/continue")
 async def agent_continue(request: dict):
     """Continue an agent after all collections complete.
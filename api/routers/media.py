@@ -3,6 +3,9 @@
 import asyncio
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from uuid import uuid4
 
@@ -15,6 +18,7 @@ from api.deps import get_fs, get_gcs
 from api.errors import safe_error_detail
 from api.middleware.request_id import get_request_id
 from config.settings import get_settings
+from workers.shared import media_renditions
 
 logger = logging.getLogger(__name__)
 
@@ -53,8 +57,72 @@ def _media_content_type(path: str, blob_content_type: str | None) -> str:
     return blob_content_type or "application/octet-stream"
 
 
+class _MetaCache:
+    """Small TTL + LRU cache for GCS blob lookups made by `serve_media`.
+    A feed of 50 cards would otherwise pay two metadata round trips per card."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+
+    def get(self, key: str) -> tuple[bool, object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def put(self, key: str, value: object) -> None:
+        settings = get_settings()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + settings.media_meta_cache_ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.media_meta_cache_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_META_CACHE = _MetaCache()
+
+
+def _load_blob_meta(bucket, path: str) -> tuple[int, str | None] | None:
+    blob = bucket.blob(path)
+    if not blob.exists():
+        return None
+    blob.reload()  # populate blob.size (exists() alone doesn't fetch metadata)
+    return blob.size or 0, blob.content_type
+
+
+async def _blob_meta(bucket, path: str) -> tuple[int, str | None] | None:
+    """(size, content_type) of `path`, or None if it doesn't exist. Only hits
+    are cached - a missing object may be written any moment."""
+    hit, meta = _META_CACHE.get(f"meta:{path}")
+    if hit:
+        return meta  # type: ignore[return-value]
+    meta = await asyncio.to_thread(_load_blob_meta, bucket, path)
+    if meta is not None:
+        _META_CACHE.put(f"meta:{path}", meta)
+    return meta
+
+
+async def _rendition(bucket, path: str, variant: str) -> str | None:
+    """Blob path of the rendition, generating it on first request. Failures
+    (no ffmpeg for a poster, undecodable image) are cached too, so they
+    aren't retried on every request."""
+    key = f"rendition:{variant}:{path}"
+    hit, target = _META_CACHE.get(key)
+    if not hit:
+        target = await asyncio.to_thread(media_renditions.ensure_rendition, bucket, path, variant)
+        _META_CACHE.put(key, target)
+    return target  # type: ignore[return-value]
+
+
 @router.get("/media/{path:path}")
-async def serve_media(path: str, request: Request):
+async def serve_media(path: str, request: Request, variant: str | None = Query(None)):
     """Proxy media files from GCS to avoid CORS issues with original platform URLs.
 
     Honours HTTP `Range` requests with a real `206 Partial Content` response.
@@ -62,23 +130,44 @@ async def serve_media(path: str, request: Request):
     with a full-body `200` (it treats that as "no range support"), so serving
     the whole blob unconditionally - even while advertising `Accept-Ranges` -
     breaks video playback on iPhone/iPad while working fine on desktop.
+
+    `variant` (thumb / card / poster) serves a sized WebP rendition instead of
+    the original (see workers/shared/media_renditions.py), generated on first
+    request when the worker didn't already. An image whose rendition can't be
+    made falls back to the original; a video without one is a 404, since the
+    caller wants a still, not the clip. Variants are only made of stored
+    media - asking for one of a rendition, or anything else outside the media
+    prefixes, is a 400. All GCS I/O runs off the event loop.
     """
     settings = get_settings()
     bucket_name = settings.gcs_media_bucket
+    if variant is not None and variant not in media_renditions.VARIANTS:
+        allowed = ", ".join(sorted(media_renditions.VARIANTS))
+        raise HTTPException(status_code=400, detail=f"Unknown variant. Allowed: {allowed}")
+    if variant is not None and not media_renditions.is_source_path(path):
+        raise HTTPException(status_code=400, detail="Variants are only available for stored media")
 
     try:
         client = get_gcs()
         bucket = client.bucket(bucket_name)
-        blob = bucket.blob(path)
 
-        if not blob.exists():
+        cache_control = "public, max-age=86400"
+        if variant is not None:
+            rendered = await _rendition(bucket, path, variant)
+            if rendered is not None:
+                path = rendered
+                cache_control = "public, max-age=604800, immutable"
+            elif variant not in media_renditions.IMAGE_VARIANTS or media_renditions.is_video(path, None):
+                raise HTTPException(status_code=404, detail="Media not found")
+
+        meta = await _blob_meta(bucket, path)
+        if meta is None:
             raise HTTPException(status_code=404, detail="Media not found")
-
-        blob.reload()  # populate blob.size (exists() alone doesn't fetch metadata)
-        size = blob.size or 0
-        content_type = _media_content_type(path, blob.content_type)
+        blob = bucket.blob(path)
+        size, blob_content_type = meta
+        content_type = _media_content_type(path, blob_content_type)
         base_headers = {
-            "Cache-Control": "public, max-age=86400",
+            "Cache-Control": cache_control,
             "Accept-Ranges": "bytes",
         }
 
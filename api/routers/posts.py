@@ -13,6 +13,7 @@ supersedes it.
 import asyncio
 import json
 import logging
+import uuid
 
 from fastapi import APIRouter, Depends, HTTPException
 from google import genai
@@ -148,6 +149,7 @@ async def override_post_enrichment(
         agent_id=body.agent_id,
         agent_version=current.get("agent_version"),
         source="user_override",
+        write_id=f"override-{uuid.uuid4().hex}",
     )
 
     return _to_response(post_id, merged, source="user_override")
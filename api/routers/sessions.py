@@ -6,6 +6,7 @@ import logging
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException
+from google.adk.sessions.base_session_service import GetSessionConfig
 
 from api.agent.agent import APP_NAME
 from api.auth.dependencies import CurrentUser, get_current_user
@@ -204,8 +205,11 @@ async def list_sessions(
 async def get_session(session_id: str, user: CurrentUser = Depends(get_current_user)):
     """Retrieve a full session with events for restoration."""
     svc = _get_session_service()
+    # An explicit (empty) config reads the whole event log - the default load
+    # is only the tail the agent's LLM window needs.
     session = await svc.get_session(
-        app_name=APP_NAME, user_id=user.uid, session_id=session_id
+        app_name=APP_NAME, user_id=user.uid, session_id=session_id,
+        config=GetSessionConfig(),
     )
     if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -602,8 +602,10 @@ async def regenerate_agent_topics(
         from workers.clustering.worker import run_clustering
 
         collection_ids = agent.get("collection_ids") or []
+        # An explicit regenerate is a full rebuild; pipeline runs update
+        # the previous clusters incrementally.
         result = await asyncio.to_thread(
-            run_clustering, agent_id, collection_ids,
+            run_clustering, agent_id, collection_ids, incremental=False,
         )
         result["algorithm_version"] = "brothers_v1"
     else:
@@ -29,6 +29,10 @@ class OngoingScheduler:
         fs = FirestoreClient(settings)
         ticks_since_stale_check = 0
         ticks_since_agent_check = 0
+        ticks_since_latest_refresh = 0
+        latest_refresh_ticks = max(1, settings.latest_tables_refresh_minutes * 4)
+        ticks_since_batch_collect = 0
+        batch_collect_ticks = max(1, settings.enrichment_batch_collect_minutes * 4)
 
         while True:
             time.sleep(15)
@@ -65,6 +69,34 @@ class OngoingScheduler:
                     except Exception:
                         logger.exception("Scheduler: stuck agent recovery failed")
 
+                # Fold new rows into the scope_posts current-state tables
+                # (every latest_tables_refresh_minutes).
+                ticks_since_latest_refresh += 1
+                if (
+                    settings.latest_tables_refresh_enabled
+                    and ticks_since_latest_refresh >= latest_refresh_ticks
+                ):
+                    ticks_since_latest_refresh = 0
+                    try:
+                        from workers.shared.latest_tables import refresh_latest_tables
+                        refresh_latest_tables()
+                    except Exception:
+                        logger.exception("Scheduler: latest-table refresh failed")
+
+                # Write results of finished batch enrichment jobs
+                # (every enrichment_batch_collect_minutes).
+                ticks_since_batch_collect += 1
+                if (
+                    settings.enrichment_batch_collect_enabled
+                    and ticks_since_batch_collect >= batch_collect_ticks
+                ):
+                    ticks_since_batch_collect = 0
+                    try:
+                        from workers.enrichment.worker import collect_enrichment_batches
+                        collect_enrichment_batches()
+                    except Exception:
+                        logger.exception("Scheduler: batch enrichment collection failed")
+
                 # Check due recurring agents (every ~60 seconds = 4 ticks)
                 ticks_since_agent_check += 1
                 if ticks_since_agent_check >= 4:
@@ -102,6 +102,9 @@ class MultiFeedRequest(BaseModel):
     # totals + breakdowns aggregated over the WHOLE filtered window, so callers
     # that download only the top-N posts still render an accurate KPI strip.
     include_kpis: bool = False
+    # Opaque `next_cursor` from the previous page. When set, the page is
+    # fetched by keyset after it and `offset` is ignored.
+    cursor: str | None = None
 
 
 class DashboardDataRequest(BaseModel):
@@ -116,6 +119,11 @@ class DashboardDataRequest(BaseModel):
     # per visible post via /dashboard/post-details. Defaults False so existing
     # clients keep the full payload. See dashboard_service.DETAIL_FIELDS.
     slim: bool = False
+    # When true, `posts`/`comments` come back empty and the rows are sent as
+    # `posts_columnar`/`comments_columnar` - the JSON-columnar encoding from
+    # dashboard_columns.PostColumns.to_wire (dictionary-encoded categoricals,
+    # flat numeric arrays). Defaults False so existing clients keep row JSON.
+    columnar: bool = False
 
 
 class DashboardAggregateRequest(BaseModel):
@@ -84,6 +84,8 @@ class FeedResponse(BaseModel):
     limit: int
     # Present only when the request set `include_kpis` (agent-scoped path).
     kpis: FeedKpis | None = None
+    # Pass back as `cursor` for the next page; None on the last page.
+    next_cursor: str | None = None
 
 
 class DashboardPostResponse(BaseModel):
@@ -184,6 +186,10 @@ class DashboardDataResponse(BaseModel):
     # Optional parallel source for dataSource: comments/both widgets. Post-shaped
     # (comment_id aliased to post_id). Empty when the agent has no enriched comments.
     comments: list[DashboardPostResponse] = []
+    # Set (and posts/comments left empty) when the request asked for
+    # `columnar` - see dashboard_columns.PostColumns.to_wire for the layout.
+    posts_columnar: dict | None = None
+    comments_columnar: dict | None = None
     collection_names: dict[str, str]
     truncated: bool = False
     kpis: DashboardKpis | None = None
@@ -56,12 +56,18 @@ def persist_tool_result_artifact(
         artifact_id = f"export-{uuid4().hex[:8]}"
         title = result.get("title", "Data Export")
         rows = result.get("rows", [])
+        row_count = result.get("row_count", len(rows))
         payload = {
             "rows": rows[:ARTIFACT_ROW_CAP],
-            "row_count": result.get("row_count", len(rows)),
+            "row_count": row_count,
             "column_names": result.get("column_names", []),
-            "truncated": len(rows) > ARTIFACT_ROW_CAP,
+            "truncated": row_count > min(len(rows), ARTIFACT_ROW_CAP),
         }
+        # File-backed export (api/services/data_export.py): rows are a
+        # preview, the file is fetched through /exports/{export_id}.
+        if result.get("export_id"):
+            payload["export_id"] = result["export_id"]
+            payload["format"] = result.get("format", "csv")
         collection_ids = result.get("collection_ids") or []
     elif tool_name == "generate_presentation" and result.get("presentation_id"):
         artifact_type = "presentation"
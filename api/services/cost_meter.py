@@ -7,7 +7,8 @@ Use :func:`log_cost` from every site that hits a metered third-party API
      explicit ``provider_reported_cost_usd`` for providers (Apify) that
      return the exact cost themselves.
   2. Builds a row matching the extended ``usage_events`` schema.
-  3. Streams it to BigQuery on a daemon thread - failures are logged but
+  3. Queues it for the batched ``usage_events`` writer
+     (:mod:`api.services.telemetry_sink`) - failures are logged but
      **never** propagate to the caller.
 
 Pairing with the originating user request: the current ``X-Request-ID``
@@ -226,9 +227,10 @@ def log_cost(
 ) -> None:
     """Fire-and-forget logging of one paid external call.
 
-    The call returns immediately; the BQ insert happens on a daemon thread.
-    Any exception raised inside the insert is swallowed and logged so we
-    never break a user request because telemetry hiccupped.
+    The call returns immediately; the row is inserted in a batch by the
+    process-wide telemetry sink. Any exception raised inside the insert is
+    swallowed and logged so we never break a user request because telemetry
+    hiccupped.
 
     When ``cost_micros_override`` is provided it bypasses the rate-table
     lookup. Use this for providers whose cost is computed by a
@@ -378,32 +380,24 @@ def log_cost(
         "cost_source": cost_source,
     }
 
-    def _insert() -> None:
-        try:
-            from api.deps import get_bq
-
-            get_bq().insert_rows("usage_events", [row])
-        except Exception:
-            logger.warning(
-                "cost_meter: BQ insert failed for provider=%s feature=%s",
-                provider, feature, exc_info=True,
-            )
-        # §E: deduct the BILLED amount (cost × margin) from the user's prepaid
-        # wallet (best-effort). BigQuery above stays the source of truth for
-        # analytics/reconcile; the wallet counter is the fast balance the gate
-        # reads. `free`-tier users are simply not enforced on balance, so
-        # deducting them is harmless.
-        if billed_micros and user_id:
-            try:
-                from api.deps import get_fs
-
-                get_fs().apply_spend_micros(user_id, int(billed_micros))
-            except Exception:
-                logger.warning(
-                    "cost_meter: wallet deduction failed for user=%s", user_id, exc_info=True,
-                )
+    # §E: the sink deducts the BILLED amount (cost × margin) from the user's
+    # prepaid wallet after the batch insert (best-effort). BigQuery stays the
+    # source of truth for analytics/reconcile; the wallet counter is the fast
+    # balance the gate reads. `free`-tier users are simply not enforced on
+    # balance, so deducting them is harmless.
+    try:
+        from api.services import telemetry_sink
 
-    threading.Thread(target=_insert, daemon=True).start()
+        telemetry_sink.submit(
+            row,
+            user_id=user_id,
+            charge_micros=int(billed_micros) if billed_micros and user_id else 0,
+        )
+    except Exception:
+        logger.warning(
+            "cost_meter: could not queue usage row for provider=%s feature=%s",
+            provider, feature, exc_info=True,
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -452,6 +446,13 @@ def log_gemini_response(
             model or getattr(response, "model_version", None) or ""
         )
 
+        # Split prompt tokens into fresh vs cached-prefix so context-cache
+        # savings are visible per row (input_tokens includes both).
+        token_split = (
+            {"fresh_input_tokens": prompt_tokens - cached_tokens, "cached_input_tokens": cached_tokens}
+            if cached_tokens else None
+        )
+
         ctx = get_collection_context()
         log_cost(
             provider="gemini",
@@ -467,6 +468,7 @@ def log_gemini_response(
             collection_id=collection_id or ctx.get("collection_id"),
             agent_id=agent_id or ctx.get("agent_id"),
             platform=platform,
+            raw_provider_payload=token_split,
         )
     except Exception:
         logger.warning(
@@ -36,6 +36,11 @@ from datetime import datetime, timedelta, timezone
 from functools import cmp_to_key
 from typing import Any
 
+import numpy as np
+
+from api.services import dashboard_groupby as groupby
+from api.services.dashboard_columns import PostColumns
+
 # Mirror DEFAULT_TOP_N / DEFAULT_BREAKDOWN_LIMIT in dashboard-aggregations.ts.
 _DEFAULT_TOP_N = 50
 _DEFAULT_BREAKDOWN_LIMIT = 10
@@ -175,26 +180,129 @@ def get_dimension_keys(post: dict, dim: str, time_bucket: str | None = None) ->
     if dim in _LOCAL_TZ_DIMS:
         raise NotAggregatable(f"cyclical dimension {dim!r} is viewer-local, not server-reproducible")
     if isinstance(dim, str) and dim.startswith(_CUSTOM_PREFIX):
-        name = dim[len(_CUSTOM_PREFIX):]
-        raw = (post.get("custom_fields") or {}).get(name)
-        if raw is None:
-            return []
-        if isinstance(raw, list):
-            # FE: keep non-null, non-object elements (typeof v !== 'object').
-            return [
-                _js_string(v)
-                for v in raw
-                if v is not None and not isinstance(v, (dict, list))
-            ]
-        if isinstance(raw, dict):
-            return []
-        return [_js_string(raw)]
+        return _custom_dimension_keys(post.get("custom_fields"), dim[len(_CUSTOM_PREFIX):])
     # Built-in scalar field: null/missing → 'unknown' (FE `?? 'unknown'`); an
     # empty string is a real value and is kept as ''.
     v = post.get(dim)
     return ["unknown" if v is None else _js_string(v)]
 
 
+def _custom_dimension_keys(custom_fields: dict | None, name: str) -> list[str]:
+    """Keys of the `custom:<name>` dimension for one post's `custom_fields`."""
+    raw = (custom_fields or {}).get(name)
+    if raw is None:
+        return []
+    if isinstance(raw, list):
+        # FE: keep non-null, non-object elements (typeof v !== 'object').
+        return [
+            _js_string(v)
+            for v in raw
+            if v is not None and not isinstance(v, (dict, list))
+        ]
+    if isinstance(raw, dict):
+        return []
+    return [_js_string(raw)]
+
+
+def _scalar_key(v: Any) -> str:
+    """Dimension key of a built-in scalar value (see `get_dimension_keys`)."""
+    return "unknown" if v is None else _js_string(v)
+
+
+# ─── Columnar backend (PostColumns input; see dashboard_groupby) ────────────────
+
+
+def _factor(posts: PostColumns, dim: str, time_bucket: str = "day") -> groupby.Factor:
+    """`get_dimension_keys(p, dim, time_bucket)` for every row of `posts`, as a
+    factor in walk order. Memoized on the column store, so the widgets sharing
+    one filtered set factorize each dimension once."""
+    bucket = (time_bucket or "day") if dim == "posted_at" else None
+    return posts.memo(("factor", dim, bucket), lambda: _build_factor(posts, dim, bucket))
+
+
+def _dimension_source(dim: str) -> str:
+    """The post column a dimension's keys are read from."""
+    if isinstance(dim, str) and dim.startswith(_CUSTOM_PREFIX):
+        return "custom_fields"
+    if isinstance(dim, str) and dim.startswith(_COMPUTED_PREFIX):
+        return "computed"
+    return _MULTIVALUED.get(dim, dim)
+
+
+def _build_factor(posts: PostColumns, dim: str, bucket: str | None) -> groupby.Factor:
+    origin = posts.origin()
+    if origin is not None and _dimension_source(dim) not in origin[2]:
+        # A filtered / value-pruned subset: restrict the (memoized) factor of
+        # the store it was taken from. If that one can't be built (a row
+        # outside the subset raises), build the subset's own below.
+        root, rows, _ = origin
+        try:
+            return groupby.restrict(_factor(root, dim, bucket), rows, len(root))
+        except (NotAggregatable, ValueError):
+            pass
+    coded = posts.dimension_codes(dim)
+    if coded is not None:
+        values, rows, codes, is_scalar = coded
+        return groupby.from_codes(values, rows, codes, _scalar_key if is_scalar else None)
+    if dim == "posted_at" and bucket in ("day", "week", "month"):
+        # The bucket only depends on the calendar day: bucket each distinct day once.
+        memo: dict[str, str] = {}
+
+        def key(v: str | None) -> str:
+            day = (v or "")[:10]
+            out = memo.get(day)
+            if out is None:
+                out = memo[day] = bucket_date(day, bucket)
+            return out
+
+        return groupby.from_row_values(map(key, posts.plain["posted_at"]))
+    if isinstance(dim, str) and dim.startswith(_CUSTOM_PREFIX):
+        name = dim[len(_CUSTOM_PREFIX):]
+        return groupby.from_row_keys(
+            _custom_dimension_keys(cf, name) for cf in posts.plain["custom_fields"]
+        )
+    # computed: and anything else: the row-by-row key function, once.
+    return groupby.from_row_keys(get_dimension_keys(p, dim, bucket) for p in posts)
+
+
+def _columnar_metric(posts, metric: str):
+    """The metric's per-row array when `posts` is a `PostColumns` and the
+    metric is built-in, else None (walk the rows)."""
+    if isinstance(posts, PostColumns):
+        return posts.metric_array(metric)
+    return None
+
+
+def _stats_list(codes, size: int, values) -> list[dict]:
+    """`_add_to_stats` results per code ``0..size-1`` for element `values`."""
+    sums, counts, mins, maxs = groupby.group_stats(codes, size, values)
+    return [
+        {"sum": s, "count": c, "min": lo, "max": hi}
+        for s, c, lo, hi in zip(sums, counts, mins, maxs)
+    ]
+
+
+def _metric_total(posts, metric: str) -> float | int:
+    arr = _columnar_metric(posts, metric)
+    if arr is not None:
+        return int(arr.sum())
+    return sum(get_metric_value(p, metric) for p in posts)
+
+
+def _card_value(arr, metric_agg: str) -> float | int:
+    """Number-card value of a columnar metric (the row branch's semantics)."""
+    n = len(arr)
+    if metric_agg == "avg":
+        return _js_round(int(arr.sum()) / n) if n else 0
+    if metric_agg == "min":
+        return arr.min().item() if n else 0
+    if metric_agg == "max":
+        return arr.max().item() if n else 0
+    if metric_agg == "median":
+        return groupby.median(arr)
+    return int(arr.sum())
+
+
 # ─── Stats accumulation (mirrors addToStats / resolveAgg / mergeStats) ──────────
 
 
@@ -279,7 +387,11 @@ def compute_custom(
         if metric_agg in ("distinct", "mode"):
             field = config.get("categoricalField")
             counts: dict[str, int] = {}
-            if field:
+            if field and isinstance(posts, PostColumns):
+                f = _factor(posts, field)
+                per_key = np.bincount(f.codes, minlength=len(f.keys)).tolist()
+                counts = {k: c for k, c in zip(f.keys, per_key) if k != "unknown"}
+            elif field:
                 for p in posts:
                     for key in get_dimension_keys(p, field):
                         if key == "unknown":
@@ -300,12 +412,16 @@ def compute_custom(
                 "values": [top_count],
             }
 
-        vals = [get_metric_value(p, metric) for p in posts]
         if metric_agg == "percent":
-            num = sum(vals)
-            den = sum(get_metric_value(p, metric) for p in base_posts)
+            num = _metric_total(posts, metric)
+            den = _metric_total(base_posts, metric)
             pct = _js_round((num / den) * 1000) / 10 if den > 0 else 0
             return {"value": pct, "format": "percent", "labels": [metric], "values": [pct]}
+        arr = _columnar_metric(posts, metric)
+        if arr is not None:
+            value = _card_value(arr, metric_agg)
+            return {"value": value, "labels": [metric], "values": [value]}
+        vals = [get_metric_value(p, metric) for p in posts]
         if metric_agg == "avg":
             value: float | int = _js_round(sum(vals) / len(vals)) if vals else 0
         elif metric_agg == "min":
@@ -333,11 +449,16 @@ def compute_custom(
         raise NotAggregatable("2D categorical pivot is not in this slice")
 
     # ── Single categorical dimension ────────────────────────────────────────
-    acc: dict[str, dict] = {}
-    for p in posts:
-        val = get_metric_value(p, metric)
-        for key in get_dimension_keys(p, dimension):
-            _add_to_stats(acc, key, val)
+    arr = _columnar_metric(posts, metric)
+    if arr is not None:
+        f = _factor(posts, dimension)
+        acc = dict(zip(f.keys, _stats_list(f.codes, len(f.keys), arr[f.rows])))
+    else:
+        acc = {}
+        for p in posts:
+            val = get_metric_value(p, metric)
+            for key in get_dimension_keys(p, dimension):
+                _add_to_stats(acc, key, val)
 
     ranked = [
         {"label": label, "stats": s, "value": _resolve_agg(s, metric_agg)}
@@ -367,11 +488,16 @@ def compute_custom(
 def _single_time_series(
     posts: list[dict], metric: str, metric_agg: str, time_bucket: str, cumulative: bool
 ) -> dict:
-    acc: dict[str, dict] = {}
-    for p in posts:
-        val = get_metric_value(p, metric)
-        for key in get_dimension_keys(p, "posted_at", time_bucket):
-            _add_to_stats(acc, key, val)
+    arr = _columnar_metric(posts, metric)
+    if arr is not None:
+        f = _factor(posts, "posted_at", time_bucket)
+        acc = dict(zip(f.keys, _stats_list(f.codes, len(f.keys), arr[f.rows])))
+    else:
+        acc = {}
+        for p in posts:
+            val = get_metric_value(p, metric)
+            for key in get_dimension_keys(p, "posted_at", time_bucket):
+                _add_to_stats(acc, key, val)
     # Chronological by label (ASCII ISO buckets sort lexicographically).
     resolved = sorted(
         ((label, _resolve_agg(s, metric_agg)) for label, s in acc.items()),
@@ -394,15 +520,19 @@ def _grouped_time_series(
     posts: list[dict], breakdown: str, metric: str, metric_agg: str,
     time_bucket: str, top_n: int | None, include_others: bool, cumulative: bool,
 ) -> dict:
-    acc: dict[str, dict[str, dict]] = {}   # date → breakdownKey → Stats
-    breakdown_totals: dict[str, float] = {}
-    for p in posts:
-        val = get_metric_value(p, metric)
-        date_key = bucket_date(p.get("posted_at") or "", time_bucket)
-        inner = acc.setdefault(date_key, {})
-        for bk in get_dimension_keys(p, breakdown, time_bucket):
-            _add_to_stats(inner, bk, val)
-            breakdown_totals[bk] = breakdown_totals.get(bk, 0) + val
+    arr = _columnar_metric(posts, metric)
+    if arr is not None:
+        acc, breakdown_totals = _columnar_date_breakdown(posts, breakdown, arr, time_bucket)
+    else:
+        acc = {}   # date → breakdownKey → Stats
+        breakdown_totals = {}
+        for p in posts:
+            val = get_metric_value(p, metric)
+            date_key = bucket_date(p.get("posted_at") or "", time_bucket)
+            inner = acc.setdefault(date_key, {})
+            for bk in get_dimension_keys(p, breakdown, time_bucket):
+                _add_to_stats(inner, bk, val)
+                breakdown_totals[bk] = breakdown_totals.get(bk, 0) + val
 
     all_dates = sorted(acc.keys())
     limit = top_n if top_n is not None else _DEFAULT_BREAKDOWN_LIMIT
@@ -444,6 +574,23 @@ def _grouped_time_series(
     return {"value": grand, "groupedTimeSeries": grouped}
 
 
+def _columnar_date_breakdown(
+    posts: PostColumns, breakdown: str, arr, time_bucket: str,
+) -> tuple[dict[str, dict[str, dict]], dict[str, float]]:
+    """The grouped series' `(acc, breakdown_totals)`, off the columns. Every
+    row's date bucket is in `acc` (as in the row walk), even with no breakdown
+    values."""
+    dates = _factor(posts, "posted_at", time_bucket)   # exactly one key per row
+    bd = _factor(posts, breakdown, time_bucket)
+    vals = arr[bd.rows]
+    pair_date, pair_bk, codes = groupby.combine(dates.codes[bd.rows], bd.codes, len(bd.keys))
+    acc: dict[str, dict[str, dict]] = {d: {} for d in dates.keys}
+    for d, bk, st in zip(pair_date.tolist(), pair_bk.tolist(), _stats_list(codes, len(pair_date), vals)):
+        acc[dates.keys[d]][bd.keys[bk]] = st
+    totals = dict(zip(bd.keys, groupby.group_sums(bd.codes, len(bd.keys), vals)))
+    return acc, totals
+
+
 # ─── Heatmap (2D pivot grid) — mirrors aggregateHeatmap, categorical axes only ──
 
 _DEFAULT_HEATMAP_AXIS_LIMIT = 24
@@ -487,20 +634,24 @@ def compute_heatmap(posts: list[dict], config: dict) -> dict:
         raise NotAggregatable("viewer-local hour bucket is not server-reproducible")
 
     single_row = ""
-    acc: dict[str, dict[str, dict]] = {}      # xKey → yKey → Stats
-    x_totals: dict[str, float] = {}
-    y_totals: dict[str, float] = {}
-    for p in posts:
-        val = get_metric_value(p, metric)
-        x_keys = get_dimension_keys(p, x_dim, time_bucket) if x_dim else [single_row]
-        y_keys = get_dimension_keys(p, y_dim, time_bucket) if y_dim else [single_row]
-        for xk in x_keys:
-            inner = acc.setdefault(xk, {})
-            for yk in y_keys:
-                _add_to_stats(inner, yk, val)
-                # FE increments BOTH totals once per (x,y) pair (inside the y loop).
-                x_totals[xk] = x_totals.get(xk, 0) + val
-                y_totals[yk] = y_totals.get(yk, 0) + val
+    arr = _columnar_metric(posts, metric)
+    if arr is not None:
+        acc, x_totals, y_totals = _columnar_heatmap(posts, x_dim, y_dim, arr, time_bucket, single_row)
+    else:
+        acc = {}        # xKey → yKey → Stats
+        x_totals = {}
+        y_totals = {}
+        for p in posts:
+            val = get_metric_value(p, metric)
+            x_keys = get_dimension_keys(p, x_dim, time_bucket) if x_dim else [single_row]
+            y_keys = get_dimension_keys(p, y_dim, time_bucket) if y_dim else [single_row]
+            for xk in x_keys:
+                inner = acc.setdefault(xk, {})
+                for yk in y_keys:
+                    _add_to_stats(inner, yk, val)
+                    # FE increments BOTH totals once per (x,y) pair (inside the y loop).
+                    x_totals[xk] = x_totals.get(xk, 0) + val
+                    y_totals[yk] = y_totals.get(yk, 0) + val
 
     x_labels = _resolve_heatmap_axis(x_totals, top_n if top_n is not None else _DEFAULT_HEATMAP_AXIS_LIMIT)
     y_labels = (
@@ -519,6 +670,31 @@ def compute_heatmap(posts: list[dict], config: dict) -> dict:
     return {"value": value, "groupedCategorical": {"labels": x_labels, "datasets": datasets}}
 
 
+def _columnar_heatmap(
+    posts: PostColumns, x_dim: str | None, y_dim: str | None, arr, time_bucket: str, single_row: str,
+) -> tuple[dict[str, dict[str, dict]], dict[str, float], dict[str, float]]:
+    """`compute_heatmap`'s `(acc, x_totals, y_totals)` off the columns: one
+    element per (row, x key, y key) in the row walk's nested-loop order, so
+    both totals keep its first-seen order."""
+    n = len(posts)
+    xf = _factor(posts, x_dim, time_bucket) if x_dim else groupby.constant(n, single_row)
+    yf = _factor(posts, y_dim, time_bucket) if y_dim else groupby.constant(n, single_row)
+    ix, iy = groupby.cross(xf, yf, n)
+    x_codes, y_codes = xf.codes[ix], yf.codes[iy]
+    vals = arr[xf.rows[ix]]
+    pair_x, pair_y, codes = groupby.combine(x_codes, y_codes, len(yf.keys))
+    acc: dict[str, dict[str, dict]] = {}
+    for xc, yc, st in zip(pair_x.tolist(), pair_y.tolist(), _stats_list(codes, len(pair_x), vals)):
+        acc.setdefault(xf.keys[xc], {})[yf.keys[yc]] = st
+
+    def totals(f: groupby.Factor, pair_codes) -> dict[str, float]:
+        order, _ = groupby.first_encounter(pair_codes, len(f.keys))
+        sums = groupby.group_sums(pair_codes, len(f.keys), vals)
+        return {f.keys[c]: sums[c] for c in order.tolist()}
+
+    return acc, totals(xf, x_codes), totals(yf, y_codes)
+
+
 def is_server_heatmap(widget: dict) -> bool:
     """True for heatmap widgets with CATEGORICAL axes (the aggregateHeatmap path).
     Refuses time/cyclical axes (viewer-local or order-by-date), object-leaf/object/
@@ -713,6 +889,71 @@ def _table_sort(rows: list[dict], sort_key: str | None, sort_dir: str) -> None:
     rows.sort(key=cmp_to_key(cmp))
 
 
+def _columnar_compound_keys(
+    posts: PostColumns, dim_cols: list[dict],
+) -> tuple[list[str], list[list[str]], np.ndarray, np.ndarray]:
+    """`_compound_dimension_keys` over every row: ``(keys, values, rows,
+    codes)`` - the compound keys in first-seen order, each key's dimension
+    values, and one element per (row, combo) in walk order."""
+    n = len(posts)
+    if not dim_cols:
+        f = groupby.constant(n, "__all__")
+        return f.keys, [[] for _ in f.keys], f.rows, f.codes
+    combos: list[tuple] = [()] if n else []
+    rows = np.arange(n, dtype=np.int64)
+    codes = np.zeros(n, dtype=np.int64)
+    for col in dim_cols:
+        dim = col.get("dimension")
+        if not dim:
+            continue
+        f = _factor(posts, dim, "day")
+        ia, ib = groupby.cross(groupby.Factor(combos, rows, codes), f, n)
+        pair_a, pair_b, codes = groupby.combine(codes[ia], f.codes[ib], len(f.keys))
+        combos = [combos[a] + (f.keys[b],) for a, b in zip(pair_a.tolist(), pair_b.tolist())]
+        rows = rows[ia]
+    # Distinct value combos can join to one key string; the first one seen
+    # names it, as in the row walk.
+    index: dict[str, int] = {}
+    values: list[list[str]] = []
+    remap: list[int] = []
+    for combo in combos:
+        key = ""
+        for v in combo:
+            key = v if key == "" else key + _COMPOUND_SEP + v
+        code = index.get(key)
+        if code is None:
+            code = index[key] = len(values)
+            values.append(list(combo))
+        remap.append(code)
+    return list(index), values, rows, np.asarray(remap, dtype=np.int64)[codes]
+
+
+def _columnar_table(
+    posts: PostColumns, columns: list[dict], dim_cols: list[dict], with_platform: bool,
+) -> tuple[dict[str, dict[str, dict]], dict[str, list[str]], dict[str, str]]:
+    """`compute_table`'s `(metric_acc, dim_values_of, platform_of)` off the
+    columns."""
+    keys, values, rows, codes = _columnar_compound_keys(posts, dim_cols)
+    metric_acc: dict[str, dict[str, dict]] = {k: {} for k in keys}
+    for col in columns:
+        if _is_dim_col(col) or not col.get("metric"):
+            continue
+        stats = _stats_list(codes, len(keys), posts.metric_array(col["metric"])[rows])
+        for per, st in zip(metric_acc.values(), stats):
+            cur = per.get(col["id"])
+            per[col["id"]] = st if cur is None else _merge_stats(cur, st)
+    platform_of: dict[str, str] = {}
+    if with_platform:
+        # First element (walk order) per key whose post has a platform.
+        platforms, platform_codes = posts.categorical["platform"]
+        has = np.fromiter((bool(v) for v in platforms), dtype=bool, count=len(platforms))
+        hit = np.flatnonzero(has[platform_codes[rows]])
+        seen, first = np.unique(codes[hit], return_index=True)
+        for code, i in zip(seen.tolist(), hit[first].tolist()):
+            platform_of[keys[code]] = platforms[platform_codes[rows[i]]]
+    return metric_acc, dict(zip(keys, values)), platform_of
+
+
 def compute_table(posts: list[dict], raw_config: dict) -> list[dict]:
     """Group-mode table rows (mirrors aggregateTable). Raises NotAggregatable for
     post-mode (a bounded feed) and object-list tables (the object slice)."""
@@ -736,22 +977,25 @@ def compute_table(posts: list[dict], raw_config: dict) -> list[dict]:
     metric_acc: dict[str, dict[str, dict]] = {}
     dim_values_of: dict[str, list[str]] = {}
     platform_of: dict[str, str] = {}
-    for p in posts:
-        for combo in _compound_dimension_keys(p, dim_cols):
-            key = combo["key"]
-            per = metric_acc.get(key)
-            if per is None:
-                per = {}
-                metric_acc[key] = per
-                dim_values_of[key] = combo["values"]
-            for col in columns:
-                if _is_dim_col(col):
-                    continue
-                m = col.get("metric")
-                if m:
-                    _add_to_stats(per, col["id"], get_metric_value(p, m))
-            if channel_dim and p.get("platform") and key not in platform_of:
-                platform_of[key] = p["platform"]
+    if isinstance(posts, PostColumns):
+        metric_acc, dim_values_of, platform_of = _columnar_table(posts, columns, dim_cols, bool(channel_dim))
+    else:
+        for p in posts:
+            for combo in _compound_dimension_keys(p, dim_cols):
+                key = combo["key"]
+                per = metric_acc.get(key)
+                if per is None:
+                    per = {}
+                    metric_acc[key] = per
+                    dim_values_of[key] = combo["values"]
+                for col in columns:
+                    if _is_dim_col(col):
+                        continue
+                    m = col.get("metric")
+                    if m:
+                        _add_to_stats(per, col["id"], get_metric_value(p, m))
+                if channel_dim and p.get("platform") and key not in platform_of:
+                    platform_of[key] = p["platform"]
 
     rows: list[dict] = []
     for key, per in metric_acc.items():
@@ -784,6 +1028,20 @@ def build_widget_data_map(posts: list[dict], layout: list | None) -> dict[str, d
     scope filtering is ported — scope-narrowed). The caller skips this entirely
     when a reportScope is set, so `posts` is the full canonical set today.
     """
+    out: dict[str, dict] = {}
+    for w in layout or []:
+        wid = w.get("i") if isinstance(w, dict) else None
+        if not wid:
+            continue
+        data = widget_chart_data(posts, w)
+        if data is not None:
+            out[wid] = data
+    return out
+
+
+def widget_chart_data(posts: list[dict], w: dict) -> dict | None:
+    """One widget's `WidgetData` (see `build_widget_data_map`), or None when
+    the widget isn't a server-aggregatable chart."""
     # Local imports avoid circular dependencies (both modules import this one).
     from api.services.dashboard_object_aggregate import (
         compute_object_list,
@@ -795,29 +1053,24 @@ def build_widget_data_map(posts: list[dict], layout: list | None) -> dict[str, d
         apply_widget_value_filters,
     )
 
-    out: dict[str, dict] = {}
-    for w in layout or []:
-        wid = w.get("i") if isinstance(w, dict) else None
-        if not wid:
-            continue
-        cfg = w.get("customConfig")
-        filters = w.get("filters")
-        try:
-            if is_server_aggregatable(w):
-                per_widget = apply_widget_filters(posts, filters)
-                agg_posts = apply_widget_value_filters(per_widget, filters, cfg.get("dimension"))
-                out[wid] = compute_custom(agg_posts, dict(cfg), posts)
-            elif is_server_heatmap(w):
-                per_widget = apply_widget_filters(posts, filters)
-                agg_posts = apply_widget_value_filters(per_widget, filters, cfg.get("dimension"))
-                out[wid] = compute_heatmap(agg_posts, dict(cfg))
-            elif is_server_object_chart(w):
-                per_widget = apply_widget_filters(posts, filters)
-                agg_posts = apply_widget_value_filters(per_widget, filters, cfg.get("dimension"))
-                out[wid] = compute_object_list(agg_posts, object_field_of(cfg), dict(cfg))
-        except NotAggregatable:
-            continue
-    return out
+    cfg = w.get("customConfig")
+    filters = w.get("filters")
+    try:
+        if is_server_aggregatable(w):
+            per_widget = apply_widget_filters(posts, filters)
+            agg_posts = apply_widget_value_filters(per_widget, filters, cfg.get("dimension"))
+            return compute_custom(agg_posts, dict(cfg), posts)
+        if is_server_heatmap(w):
+            per_widget = apply_widget_filters(posts, filters)
+            agg_posts = apply_widget_value_filters(per_widget, filters, cfg.get("dimension"))
+            return compute_heatmap(agg_posts, dict(cfg))
+        if is_server_object_chart(w):
+            per_widget = apply_widget_filters(posts, filters)
+            agg_posts = apply_widget_value_filters(per_widget, filters, cfg.get("dimension"))
+            return compute_object_list(agg_posts, object_field_of(cfg), dict(cfg))
+    except NotAggregatable:
+        pass
+    return None
 
 
 def is_server_table(widget: dict) -> bool:
@@ -862,6 +1115,19 @@ def is_server_table(widget: dict) -> bool:
 def build_table_data_map(posts: list[dict], layout: list | None) -> dict[str, list[dict]]:
     """Map widget id (`i`) → server-computed table rows for every eligible
     group-table widget. Same per-widget pipeline as charts (row + value filter)."""
+    out: dict[str, list[dict]] = {}
+    for w in layout or []:
+        wid = w.get("i") if isinstance(w, dict) else None
+        if not wid:
+            continue
+        rows = widget_table_rows(posts, w)
+        if rows is not None:
+            out[wid] = rows
+    return out
+
+
+def widget_table_rows(posts: list[dict], w: dict) -> list[dict] | None:
+    """One widget's table rows (see `build_table_data_map`), or None."""
     from api.services.dashboard_object_aggregate import (
         compute_object_table,
         is_server_object_table,
@@ -872,30 +1138,25 @@ def build_table_data_map(posts: list[dict], layout: list | None) -> dict[str, li
         apply_widget_value_filters,
     )
 
-    out: dict[str, list[dict]] = {}
-    for w in layout or []:
-        wid = w.get("i") if isinstance(w, dict) else None
-        if not wid:
-            continue
-        tc = w.get("tableConfig")
-        filters = w.get("filters")
-        try:
-            if is_server_table(w):
-                per_widget = apply_widget_filters(posts, filters)
-                agg_posts = apply_widget_value_filters(
-                    per_widget, filters, table_primary_dimension(normalize_table_config(tc))
-                )
-                out[wid] = compute_table(agg_posts, tc)
-            elif is_server_object_table(w):
-                norm = normalize_table_config(tc)
-                per_widget = apply_widget_filters(posts, filters)
-                agg_posts = apply_widget_value_filters(
-                    per_widget, filters, table_primary_dimension(norm)
-                )
-                out[wid] = compute_object_table(agg_posts, object_field_of_table(norm), tc)
-        except NotAggregatable:
-            continue
-    return out
+    tc = w.get("tableConfig")
+    filters = w.get("filters")
+    try:
+        if is_server_table(w):
+            per_widget = apply_widget_filters(posts, filters)
+            agg_posts = apply_widget_value_filters(
+                per_widget, filters, table_primary_dimension(normalize_table_config(tc))
+            )
+            return compute_table(agg_posts, tc)
+        if is_server_object_table(w):
+            norm = normalize_table_config(tc)
+            per_widget = apply_widget_filters(posts, filters)
+            agg_posts = apply_widget_value_filters(
+                per_widget, filters, table_primary_dimension(norm)
+            )
+            return compute_object_table(agg_posts, object_field_of_table(norm), tc)
+    except NotAggregatable:
+        pass
+    return None
 
 
 # ─── Bounded post feed + whole-layout coverage gate (slice 7) ───────────────────
@@ -1039,11 +1300,6 @@ def is_static_widget(widget: dict) -> bool:
 def build_feed_data_map(posts: list[dict], layout: list | None) -> dict[str, list[dict]]:
     """Map widget id → the bounded ordered posts a feed (embeds) widget displays.
     Applies the same row/value filter pipeline as other widgets."""
-    from api.services.dashboard_widget_filters import (
-        apply_widget_filters,
-        apply_widget_value_filters,
-    )
-
     out: dict[str, list[dict]] = {}
     for w in layout or []:
         if not isinstance(w, dict):
@@ -1051,23 +1307,36 @@ def build_feed_data_map(posts: list[dict], layout: list | None) -> dict[str, lis
         wid = w.get("i")
         if not wid:
             continue
-        filters = w.get("filters")
-        try:
-            if _is_feed_widget(w):
-                per_widget = apply_widget_filters(posts, filters)
-                agg_posts = apply_widget_value_filters(per_widget, filters, None)
-                out[wid] = compute_embed_posts(agg_posts, w.get("embedConfig"))
-            elif is_server_post_table_feed(w):
-                # Post-mode table: render one row per post over the row-filtered
-                # set (no value filter — post mode shows raw posts), bounded to
-                # rowLimit by the numeric sort. The FE re-renders rows from these.
-                per_widget = apply_widget_filters(posts, filters)
-                out[wid] = compute_post_table_feed(per_widget, w.get("tableConfig"))
-        except NotAggregatable:
-            continue
+        feed = widget_feed_posts(posts, w)
+        if feed is not None:
+            out[wid] = feed
     return out
 
 
+def widget_feed_posts(posts: list[dict], w: dict) -> list[dict] | None:
+    """One widget's bounded feed posts (see `build_feed_data_map`), or None."""
+    from api.services.dashboard_widget_filters import (
+        apply_widget_filters,
+        apply_widget_value_filters,
+    )
+
+    filters = w.get("filters")
+    try:
+        if _is_feed_widget(w):
+            per_widget = apply_widget_filters(posts, filters)
+            agg_posts = apply_widget_value_filters(per_widget, filters, None)
+            return compute_embed_posts(agg_posts, w.get("embedConfig"))
+        if is_server_post_table_feed(w):
+            # Post-mode table: render one row per post over the row-filtered
+            # set (no value filter — post mode shows raw posts), bounded to
+            # rowLimit by the numeric sort. The FE re-renders rows from these.
+            per_widget = apply_widget_filters(posts, filters)
+            return compute_post_table_feed(per_widget, w.get("tableConfig"))
+    except NotAggregatable:
+        pass
+    return None
+
+
 def layout_fully_covered(
     layout: list | None,
     widget_data: dict,
@@ -71,7 +71,8 @@ class DashboardCache:
     """Thread-safe TTL cache of assembled dashboard cores.
 
     Read/written from ``asyncio.to_thread`` workers, so access is guarded by a
-    lock. Values are opaque to the cache - callers store a jsonable dict.
+    lock. Values are opaque to the cache - callers store a dict (the dashboard
+    core holds its posts as ``dashboard_columns.PostColumns``).
     """
 
     def __init__(
@@ -139,20 +140,39 @@ def set_feed_kpis(
     _feed_kpis.set(agent_id, collection_ids, f"{stamp}|{filter_sig}", core)
 
 
-# Cache for studio (interactive) server-side widget aggregation results.
-# Keyed by (agent_id, collection_ids, stamp|agg_sig) where agg_sig is a hash
-# of the effective filter state + widget layout configs. Larger maxsize because
-# each entry is compact (KB/widget, not MB) and there are many filter combos.
-_studio_agg = DashboardCache(maxsize=512)
+# Studio (interactive) server-side widget aggregation, cached at two levels so
+# editing or adding one widget recomputes only that widget:
+#
+# - the filtered post set, keyed by (agent_id, collection_ids, stamp|filter_sig)
+#   where filter_sig hashes the effective filters + report config. Entries hold
+#   post sets (column slices of the core), so the cache is small;
+# - each widget's result, keyed by (agent_id, collection_ids,
+#   stamp|filter_sig|widget_sig) where widget_sig hashes the widget's data
+#   config. Entries are compact (KB/widget) and there are many widgets per
+#   filter combo, hence the larger maxsize.
+_studio_filtered = DashboardCache(maxsize=32)
+_studio_widgets = DashboardCache(maxsize=8192)
 
 
-def get_studio_agg(
-    agent_id: str, collection_ids: list[str], stamp: str, agg_sig: str
+def get_studio_filtered(
+    agent_id: str, collection_ids: list[str], stamp: str, filter_sig: str
+):
+    return _studio_filtered.get(agent_id, collection_ids, f"{stamp}|{filter_sig}")
+
+
+def set_studio_filtered(
+    agent_id: str, collection_ids: list[str], stamp: str, filter_sig: str, posts
+) -> None:
+    _studio_filtered.set(agent_id, collection_ids, f"{stamp}|{filter_sig}", posts)
+
+
+def get_studio_widget(
+    agent_id: str, collection_ids: list[str], stamp: str, filter_sig: str, widget_sig: str
 ) -> dict | None:
-    return _studio_agg.get(agent_id, collection_ids, f"{stamp}|{agg_sig}")
+    return _studio_widgets.get(agent_id, collection_ids, f"{stamp}|{filter_sig}|{widget_sig}")
 
 
-def set_studio_agg(
-    agent_id: str, collection_ids: list[str], stamp: str, agg_sig: str, data: dict
+def set_studio_widget(
+    agent_id: str, collection_ids: list[str], stamp: str, filter_sig: str, widget_sig: str, data: dict
 ) -> None:
-    _studio_agg.set(agent_id, collection_ids, f"{stamp}|{agg_sig}", data)
+    _studio_widgets.set(agent_id, collection_ids, f"{stamp}|{filter_sig}|{widget_sig}", data)
@@ -0,0 +1,517 @@
+"""Columnar storage for the dashboard core's post (and comment) rows.
+
+The core used to hold one ``DashboardPostResponse.model_dump()`` dict per post -
+~25 keys each, a Pydantic validation per row on every cold build, and the reason
+the core capped at 50k rows. :class:`PostColumns` stores the same data by column:
+
+- **categorical** fields (platform, sentiment, collection_id, ...) are
+  dictionary-encoded: a list of distinct values plus an ``int32`` code per row;
+- **multi-valued** fields (themes, entities, detected_brands, topic_ids) share a
+  per-column dictionary and store their elements CSR-style (``offsets`` into a
+  flat ``codes`` array);
+- **numeric** engagement counts are ``int64`` arrays;
+- everything else (ids, text, ``custom_fields``) stays a plain list.
+
+Existing dict-based code keeps working unchanged: ``PostColumns`` is a sequence
+of read-only :class:`PostRow` mappings that decode one field at a time, so
+filters, transforms and aggregators can iterate it exactly like the old list of
+dicts. Hot paths can instead work on the columns directly - see
+:meth:`PostColumns.dimension_codes` (factorized by ``dashboard_groupby`` for the
+aggregators in ``dashboard_aggregate``) and :meth:`PostColumns.to_wire`, the compact JSON-columnar encoding the data and
+share endpoints serve to clients that ask for it.
+
+The row shape is exactly ``build_post_response(row).model_dump()``; the parity
+is pinned by ``api/tests/test_dashboard_columns.py``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import ChainMap
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+# Field order matches DashboardPostResponse, so a materialized row serializes
+# byte-identically to the old model_dump() dicts.
+FIELDS = (
+    "post_id", "collection_id", "platform", "channel_handle", "posted_at",
+    "title", "content", "post_url", "sentiment", "emotion", "themes", "entities",
+    "language", "content_type", "custom_fields", "ai_summary", "context",
+    "detected_brands", "channel_type", "media_refs", "topic_ids",
+    "like_count", "view_count", "comment_count", "share_count",
+)
+CATEGORICAL = (
+    "collection_id", "platform", "channel_handle", "sentiment", "emotion",
+    "language", "content_type", "channel_type",
+)
+MULTIVALUED = ("themes", "entities", "detected_brands", "topic_ids")
+NUMERIC = ("like_count", "view_count", "comment_count", "share_count")
+_FIELD_SET = frozenset(FIELDS)
+_CATEGORICAL_SET = frozenset(CATEGORICAL)
+_MULTIVALUED_SET = frozenset(MULTIVALUED)
+_NUMERIC_SET = frozenset(NUMERIC)
+
+# The multi-valued dashboard dimensions and the column each reads (mirrors
+# `_MULTIVALUED` in dashboard_aggregate). Any other dimension naming a
+# multi-valued column is a scalar dimension there, so it is not columnar here.
+_MULTIVALUED_DIMS = {"themes": "themes", "entities": "entities", "brands": "detected_brands"}
+
+
+class _Dictionary:
+    """Append-only value -> code map for one encoded column."""
+
+    __slots__ = ("values", "_index")
+
+    def __init__(self) -> None:
+        self.values: list = []
+        self._index: dict = {}
+
+    def code(self, value) -> int:
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(value)
+        return code
+
+
+class PostColumnsBuilder:
+    """Accumulates rows column by column; ``build()`` freezes them into numpy.
+
+    ``append_post`` takes a post-shaped dict (``dashboard_service.normalize_post_row``
+    output, or a post after ``report_transform``); keys outside :data:`FIELDS`
+    (such as ``computed``) are kept as extra plain columns.
+    """
+
+    def __init__(self) -> None:
+        self._n = 0
+        self._dicts = {name: _Dictionary() for name in (*CATEGORICAL, *MULTIVALUED)}
+        self._codes = {name: array("i") for name in CATEGORICAL}
+        self._multi_codes = {name: array("i") for name in MULTIVALUED}
+        self._offsets = {name: array("q", [0]) for name in MULTIVALUED}
+        self._numeric = {name: array("q") for name in NUMERIC}
+        self._plain: dict[str, list] = {
+            name: [] for name in FIELDS
+            if name not in _CATEGORICAL_SET and name not in _MULTIVALUED_SET and name not in _NUMERIC_SET
+        }
+        self._extra: dict[str, list] = {}
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append_post(self, post: Mapping) -> None:
+        for name in CATEGORICAL:
+            self._codes[name].append(self._dicts[name].code(post.get(name)))
+        for name in MULTIVALUED:
+            codes = self._multi_codes[name]
+            d = self._dicts[name]
+            for v in post.get(name) or ():
+                codes.append(d.code(v))
+            self._offsets[name].append(len(codes))
+        for name in NUMERIC:
+            self._numeric[name].append(int(post.get(name) or 0))
+        for name, values in self._plain.items():
+            values.append(post.get(name))
+        for key in post.keys():
+            if key in _FIELD_SET:
+                continue
+            col = self._extra.get(key)
+            if col is None:
+                col = self._extra[key] = [None] * self._n
+            col.append(post[key])
+        self._n += 1
+        for col in self._extra.values():
+            if len(col) < self._n:
+                col.append(None)
+
+    def build(self) -> PostColumns:
+        return PostColumns(
+            length=self._n,
+            categorical={
+                name: (self._dicts[name].values, np.frombuffer(self._codes[name], dtype=np.int32).copy())
+                for name in CATEGORICAL
+            },
+            multivalued={
+                name: (
+                    self._dicts[name].values,
+                    np.frombuffer(self._offsets[name], dtype=np.int64).copy(),
+                    np.frombuffer(self._multi_codes[name], dtype=np.int32).copy(),
+                )
+                for name in MULTIVALUED
+            },
+            numeric={
+                name: np.frombuffer(self._numeric[name], dtype=np.int64).copy()
+                for name in NUMERIC
+            },
+            plain={**self._plain, **self._extra},
+        )
+
+
+class _GatheredColumns(Mapping):
+    """Plain columns of a row subset, each gathered from the source columns on
+    first access - a ``take`` only pays for the columns its readers touch."""
+
+    __slots__ = ("_source", "_idx", "_cols")
+
+    def __init__(self, source: Mapping[str, list], idx: list[int]):
+        self._source = source
+        self._idx = idx
+        self._cols: dict[str, list] = {}
+
+    def __getitem__(self, name: str) -> list:
+        col = self._cols.get(name)
+        if col is None:
+            src = self._source[name]
+            col = self._cols[name] = [src[i] for i in self._idx]
+        return col
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._source
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._source)
+
+    def __len__(self) -> int:
+        return len(self._source)
+
+
+class PostRow(Mapping):
+    """Read-only mapping view of one row of a :class:`PostColumns`.
+
+    Behaves like the old post dict for every reader (``get``, ``[]``, ``in``,
+    ``dict(row)``, ``{**row}``); values are decoded on access. Multi-valued
+    fields come back as fresh lists, so callers may mutate what they read.
+    """
+
+    __slots__ = ("_cols", "_i")
+
+    def __init__(self, cols: PostColumns, i: int):
+        self._cols = cols
+        self._i = i
+
+    def __getitem__(self, key: str):
+        getter = self._cols._getter(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self._i)
+
+    def get(self, key: str, default=None):
+        getter = self._cols._getter(key)
+        return default if getter is None else getter(self._i)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._cols._getter(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._cols.keys)
+
+    def __len__(self) -> int:
+        return len(self._cols.keys)
+
+    def __repr__(self) -> str:
+        return f"PostRow({dict(self)!r})"
+
+    @property
+    def index(self) -> int:
+        """Row position in the parent columns."""
+        return self._i
+
+
+class PostColumns(Sequence):
+    """Immutable column store of dashboard post rows (see module docstring)."""
+
+    def __init__(
+        self,
+        *,
+        length: int,
+        categorical: dict[str, tuple[list, np.ndarray]],
+        multivalued: dict[str, tuple[list, np.ndarray, np.ndarray]],
+        numeric: dict[str, np.ndarray],
+        plain: Mapping[str, list],
+        origin: tuple[PostColumns, np.ndarray, frozenset[str]] | None = None,
+    ):
+        self._n = length
+        self.categorical = categorical
+        self.multivalued = multivalued
+        self.numeric = numeric
+        self.plain = plain
+        self.keys: tuple[str, ...] = FIELDS + tuple(k for k in plain if k not in _FIELD_SET)
+        self._origin = origin
+        self._getters: dict[str, Callable[[int], Any]] = {}
+        self._memo: dict[Hashable, Any] = {}
+
+    # ─── Construction ───────────────────────────────────────────────────
+
+    @classmethod
+    def from_posts(cls, posts: Iterable[Mapping]) -> PostColumns:
+        """Build from post-shaped dicts (or rows of another ``PostColumns``)."""
+        if isinstance(posts, PostColumns):
+            return posts
+        posts = list(posts)
+        # Rows picked out of one column store (a filtered or ranked list of
+        # views) are gathered column-wise instead of re-encoded.
+        parent = posts[0]._cols if posts and isinstance(posts[0], PostRow) else None
+        if parent is not None and all(isinstance(p, PostRow) and p._cols is parent for p in posts):
+            return parent.take([p._i for p in posts])
+        builder = PostColumnsBuilder()
+        for post in posts:
+            builder.append_post(post)
+        return builder.build()
+
+    @classmethod
+    def empty(cls) -> PostColumns:
+        return PostColumnsBuilder().build()
+
+    # ─── Sequence protocol ──────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(np.arange(self._n)[i])
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return PostRow(self, i)
+
+    def __iter__(self) -> Iterator[PostRow]:
+        for i in range(self._n):
+            yield PostRow(self, i)
+
+    def _getter(self, key: str) -> Callable[[int], Any] | None:
+        getter = self._getters.get(key)
+        if getter is None and key in self.keys:
+            getter = self._getters[key] = self._make_getter(key)
+        return getter
+
+    def _make_getter(self, key: str) -> Callable[[int], Any]:
+        # Row access goes through Python lists (``tolist`` once per column):
+        # indexing a numpy array per field would box a numpy scalar each time.
+        if key in self.categorical:
+            values, codes = self.categorical[key]
+            code_list = codes.tolist()
+            return lambda i: values[code_list[i]]
+        if key in self.multivalued:
+            values, offsets, codes = self.multivalued[key]
+            off = offsets.tolist()
+            code_list = codes.tolist()
+            return lambda i: [values[c] for c in code_list[off[i]:off[i + 1]]]
+        if key in self.numeric:
+            return self.numeric[key].tolist().__getitem__
+        return self.plain[key].__getitem__
+
+    def memo(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """A structure derived from these (immutable) columns, built on first
+        use and kept for the store's lifetime - e.g. the filter index."""
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo.setdefault(key, build())
+        return value
+
+    # ─── Column operations ──────────────────────────────────────────────
+
+    def take(self, indices) -> PostColumns:
+        """New ``PostColumns`` holding the given rows, in the given order.
+        Dictionaries are shared, not compacted."""
+        idx = np.asarray(indices, dtype=np.int64)
+        multivalued = {}
+        for name, (values, offsets, codes) in self.multivalued.items():
+            starts, ends = offsets[idx], offsets[idx + 1]
+            lengths = ends - starts
+            new_offsets = np.zeros(len(idx) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=new_offsets[1:])
+            # Element positions: each row's start repeated over its run, plus
+            # the position within the run.
+            within = np.arange(new_offsets[-1], dtype=np.int64) - np.repeat(new_offsets[:-1], lengths)
+            multivalued[name] = (values, new_offsets, codes[np.repeat(starts, lengths) + within])
+        return PostColumns(
+            length=len(idx),
+            categorical={name: (values, codes[idx]) for name, (values, codes) in self.categorical.items()},
+            multivalued=multivalued,
+            numeric={name: arr[idx] for name, arr in self.numeric.items()},
+            plain=_GatheredColumns(self.plain, idx.tolist()),
+            origin=self._origin_of(idx),
+        )
+
+    def with_values(self, attr: str, keep: Callable[[Any], bool]) -> PostColumns:
+        """Copy whose multi-valued ``attr`` lists hold only the elements for
+        which ``keep(value)`` is true, in order. Other columns are shared."""
+        values, offsets, codes = self.multivalued[attr]
+        kept_codes = np.fromiter((bool(keep(v)) for v in values), dtype=bool, count=len(values))
+        mask = kept_codes[codes]
+        rows = np.repeat(np.arange(self._n, dtype=np.int64), np.diff(offsets))
+        new_offsets = np.zeros(self._n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[mask], minlength=self._n), out=new_offsets[1:])
+        return self._replace(attr, multivalued={**self.multivalued, attr: (values, new_offsets, codes[mask])})
+
+    def with_plain(self, name: str, values: list) -> PostColumns:
+        """Copy with plain column ``name`` replaced by ``values`` (one per row)."""
+        return self._replace(name, plain=ChainMap({name: values}, self.plain))
+
+    def _replace(self, changed: str, **parts) -> PostColumns:
+        fields = {
+            "categorical": self.categorical, "multivalued": self.multivalued,
+            "numeric": self.numeric, "plain": self.plain,
+        }
+        root, rows, was_changed = self._origin_of(np.arange(self._n, dtype=np.int64))
+        return PostColumns(length=self._n, **{**fields, **parts}, origin=(root, rows, was_changed | {changed}))
+
+    def _origin_of(self, idx: np.ndarray) -> tuple[PostColumns, np.ndarray, frozenset[str]]:
+        if self._origin is None:
+            return self, idx, frozenset()
+        root, rows, changed = self._origin
+        return root, rows[idx], changed
+
+    def origin(self) -> tuple[PostColumns, np.ndarray, frozenset[str]] | None:
+        """``(root, rows, changed)`` when these rows were derived from another
+        store (``take``, ``with_values``, ``with_plain``): row ``i`` here is
+        ``root`` row ``rows[i]``, identical in every column but ``changed``.
+        Lets structures memoized on ``root`` be restricted instead of rebuilt."""
+        return self._origin
+
+    def where(self, keep: Callable[[PostRow], bool]) -> PostColumns:
+        """Rows for which ``keep(row)`` is true, as a new ``PostColumns``."""
+        return self.take([i for i in range(self._n) if keep(PostRow(self, i))])
+
+    def metric_array(self, metric: str) -> np.ndarray | None:
+        """Per-row values of a built-in metric (``get_metric_value`` semantics),
+        or None when the metric must be evaluated per row (``computed:``)."""
+        if metric in self.numeric:
+            return self.numeric[metric]
+        if metric == "post_count":
+            return np.ones(self._n, dtype=np.int64)
+        if metric == "engagement_total":
+            return self.numeric["like_count"] + self.numeric["comment_count"] + self.numeric["share_count"]
+        if isinstance(metric, str) and metric.startswith("computed:"):
+            return None
+        return np.zeros(self._n, dtype=np.int64)
+
+    def dimension_codes(self, dim: str) -> tuple[list, np.ndarray, np.ndarray, bool] | None:
+        """``(dictionary, row_of_element, element_codes, is_scalar)`` for a
+        categorical or multi-valued dimension, or None when the dimension isn't
+        a column here.
+
+        A scalar column yields one element per row; a multi-valued column one
+        per stored value, in row order - the same order a row-by-row walk over
+        ``get_dimension_keys`` would visit them.
+        """
+        if dim in self.categorical:
+            values, codes = self.categorical[dim]
+            return values, np.arange(self._n, dtype=np.int64), codes, True
+        attr = _MULTIVALUED_DIMS.get(dim)
+        if attr is not None:
+            values, offsets, codes = self.multivalued[attr]
+            rows = np.repeat(np.arange(self._n, dtype=np.int64), np.diff(offsets))
+            return values, rows, codes, False
+        return None
+
+    def group_stats(
+        self, dim: str, metric: str, key_of: Callable[[Any], str],
+    ) -> dict[str, dict] | None:
+        """``{key: {sum, count, min, max}}`` for ``metric`` grouped by ``dim``,
+        keyed and ordered exactly like the row-by-row ``_add_to_stats`` loop
+        (first-encounter order). ``key_of`` maps a scalar dictionary value to its
+        dimension key (``None`` -> ``"unknown"``, JS ``String()``); multi-valued
+        elements are keys as-is. Returns None when ``dim`` or ``metric`` isn't
+        columnar, so the caller walks the rows instead.
+        """
+        coded = self.dimension_codes(dim)
+        metric_values = self.metric_array(metric)
+        if coded is None or metric_values is None:
+            return None
+        values, rows, codes, is_scalar = coded
+        if not len(codes):
+            return {}
+        elem = metric_values[rows]
+        size = len(values)
+        counts = np.bincount(codes, minlength=size)
+        sums = np.zeros(size, dtype=np.int64)
+        np.add.at(sums, codes, elem)
+        mins = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(mins, codes, elem)
+        maxs = np.full(size, np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(maxs, codes, elem)
+        present, first = np.unique(codes, return_index=True)
+        order = present[np.argsort(first, kind="stable")]
+
+        out: dict[str, dict] = {}
+        for code in order.tolist():
+            key = key_of(values[code]) if is_scalar else values[code]
+            s = {
+                "sum": int(sums[code]),
+                "count": int(counts[code]),
+                "min": int(mins[code]),
+                "max": int(maxs[code]),
+            }
+            cur = out.get(key)
+            if cur is None:
+                out[key] = s
+            else:  # two dictionary values with one key (None and "unknown")
+                cur["sum"] += s["sum"]
+                cur["count"] += s["count"]
+                cur["min"] = min(cur["min"], s["min"])
+                cur["max"] = max(cur["max"], s["max"])
+        return out
+
+    # ─── Output ─────────────────────────────────────────────────────────
+
+    def to_rows(self, exclude: Iterable[str] = ()) -> list[dict]:
+        """Materialize plain post dicts (for row-JSON responses)."""
+        skip = set(exclude)
+        getters = [(k, self._getter(k)) for k in self.keys if k not in skip]
+        return [{k: g(i) for k, g in getters} for i in range(self._n)]
+
+    def to_wire(self, exclude: Iterable[str] = ()) -> dict:
+        """Compact JSON-columnar encoding for clients that decode it.
+
+        ``{"length": n, "columns": {name: col}}`` where ``col`` is
+        ``{"values": [...]}`` for plain/numeric columns, ``{"dict": [...],
+        "codes": [...]}`` for categorical ones and ``{"dict": [...], "offsets":
+        [...], "codes": [...]}`` for multi-valued ones. Decoding every column
+        at row ``i`` gives back exactly the row JSON.
+        """
+        skip = set(exclude)
+        columns: dict[str, dict] = {}
+        for name in self.keys:
+            if name in skip:
+                continue
+            if name in self.categorical:
+                values, codes = self.categorical[name]
+                columns[name] = {"dict": values, "codes": codes.tolist()}
+            elif name in self.multivalued:
+                values, offsets, codes = self.multivalued[name]
+                columns[name] = {"dict": values, "offsets": offsets.tolist(), "codes": codes.tolist()}
+            elif name in self.numeric:
+                columns[name] = {"values": self.numeric[name].tolist()}
+            else:
+                columns[name] = {"values": self.plain[name]}
+        return {"length": self._n, "columns": columns}
+
+
+def select(posts: Sequence[Mapping], keep: Callable[[Mapping], bool]) -> Sequence[Mapping]:
+    """Filter helper that preserves the column store: a ``PostColumns`` input
+    yields a ``PostColumns``, anything else a list."""
+    if isinstance(posts, PostColumns):
+        return posts.where(keep)
+    return [p for p in posts if keep(p)]
+
+
+def post_dicts(posts: Iterable[Mapping], exclude: Iterable[str] = ()) -> list[dict]:
+    """Plain dicts for a JSON body, whatever the input: ``PostColumns``, a list
+    of :class:`PostRow` views, or dicts (passed through when nothing is
+    excluded)."""
+    if isinstance(posts, PostColumns):
+        return posts.to_rows(exclude)
+    skip = set(exclude)
+    if not skip:
+        return [p if isinstance(p, dict) else dict(p) for p in posts]
+    return [{k: v for k, v in p.items() if k not in skip} for p in posts]
+
+
+def wire_columns(posts: Iterable[Mapping], exclude: Iterable[str] = ()) -> dict:
+    """JSON-columnar body for any post sequence (see :meth:`PostColumns.to_wire`)."""
+    return PostColumns.from_posts(posts).to_wire(exclude)
@@ -0,0 +1,185 @@
+"""Posting-list filter index over a :class:`~api.services.dashboard_columns.PostColumns`.
+
+``apply_filters`` / ``apply_widget_filters`` used to walk every post row in
+Python for every filter combination and every widget-level filter. On a
+column store the same predicates become set operations over row ids:
+
+- each categorical or multi-valued column gets a posting list per value - the
+  sorted row ids holding it - derived from one stable ``argsort`` of its codes,
+  so all of a column's lists together are a single permutation array;
+- custom-field literals (``custom_fields[name]`` or an object array's leaf)
+  get postings keyed by their JS-string form, built on first use per field;
+- ``posted_at`` days (``posted_at[:10]``, the UTC string slice both sides
+  filter on) are kept sorted, so a date range is two bisections.
+
+A filter is the AND of per-dimension masks, each the OR of the selected
+values' posting lists. Everything is built lazily per column and memoized on
+the (immutable) column store, so a cached core or a cached filtered set pays
+for each column once. Callers keep their row-by-row predicate for plain lists
+and for the per-row advanced conditions; parity with those predicates is
+pinned by ``api/tests/test_dashboard_filter_index.py``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+import numpy as np
+
+from api.services.dashboard_columns import PostColumns
+
+
+def _hashable(values: Iterable) -> list:
+    # A selection may carry anything JSON allows; unhashable values can't
+    # equal a stored scalar, so they never match.
+    out = []
+    for v in values:
+        try:
+            hash(v)
+        except TypeError:
+            continue
+        out.append(v)
+    return out
+
+
+class FilterIndex:
+    """Lazily built posting lists for one ``PostColumns`` (see module docstring)."""
+
+    def __init__(self, cols: PostColumns):
+        self._cols = cols
+        self._n = len(cols)
+        self._postings: dict[Any, dict[Any, np.ndarray]] = {}
+        self._days: tuple[list[str], np.ndarray] | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._n
+
+    # ─── Posting lists ──────────────────────────────────────────────────
+
+    def _memo(self, key, build: Callable[[], dict[Any, np.ndarray]]) -> dict[Any, np.ndarray]:
+        postings = self._postings.get(key)
+        if postings is None:
+            postings = build()
+            with self._lock:
+                postings = self._postings.setdefault(key, postings)
+        return postings
+
+    @staticmethod
+    def _group(values: list, rows: np.ndarray, codes: np.ndarray, key_of: Callable[[Any], Any]) -> dict:
+        """Posting list per ``key_of(value)``: split one stable sort of the
+        codes into per-code runs, merging codes that share a key."""
+        order = np.argsort(codes, kind="stable")
+        bounds = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(values)), out=bounds[1:])
+        sorted_rows = rows[order]
+        out: dict[Any, np.ndarray] = {}
+        for code, value in enumerate(values):
+            run = sorted_rows[bounds[code]:bounds[code + 1]]
+            if not len(run):
+                continue
+            key = key_of(value)
+            prev = out.get(key)
+            out[key] = run if prev is None else np.union1d(prev, run)
+        return out
+
+    def _categorical(self, attr: str) -> dict:
+        def build():
+            values, codes = self._cols.categorical[attr]
+            # FE `p.attr || ''`: null and '' are one key.
+            return self._group(values, np.arange(self._n, dtype=np.int64), codes, lambda v: v or "")
+        return self._memo(("scalar", attr), build)
+
+    def _multivalued(self, attr: str) -> dict:
+        def build():
+            values, offsets, codes = self._cols.multivalued[attr]
+            rows = np.repeat(np.arange(self._n, dtype=np.int64), np.diff(offsets))
+            # A value repeated within one row leaves a duplicate id; harmless
+            # for masks.
+            return self._group(values, rows, codes, lambda v: v)
+        return self._memo(("array", attr), build)
+
+    def _derived(self, source: str, key: str, values_of: Callable[[Any], Iterable | None]) -> dict:
+        """Postings over a plain column: ``values_of(cell)`` lists the keys a
+        row matches on (None/empty: no key)."""
+        def build():
+            buckets: dict[Any, list[int]] = {}
+            for i, cell in enumerate(self._cols.plain.get(source) or [None] * self._n):
+                for v in set(values_of(cell) or ()):
+                    buckets.setdefault(v, []).append(i)
+            return {v: np.asarray(ids, dtype=np.int64) for v, ids in buckets.items()}
+        return self._memo(("derived", source, key), build)
+
+    def _any_of(self, postings: dict, selected: Iterable) -> np.ndarray:
+        mask = np.zeros(self._n, dtype=bool)
+        for s in _hashable(selected):
+            rows = postings.get(s)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    # ─── Masks ──────────────────────────────────────────────────────────
+
+    def scalar_mask(self, attr: str, selected: Iterable) -> np.ndarray:
+        """Rows whose ``attr || ''`` is one of ``selected``."""
+        return self._any_of(self._categorical(attr), selected)
+
+    def array_mask(self, attr: str, selected: Iterable) -> np.ndarray:
+        """Rows whose ``attr`` list contains any of ``selected``."""
+        return self._any_of(self._multivalued(attr), selected)
+
+    def derived_mask(
+        self, source: str, key: str, values_of: Callable[[Any], Iterable | None], selected: Iterable,
+    ) -> np.ndarray:
+        """Rows for which ``values_of(row[source])`` contains any of ``selected``;
+        ``key`` names the derivation for memoization."""
+        return self._any_of(self._derived(source, key, values_of), selected)
+
+    def date_mask(self, date_from: str | None, date_to: str | None) -> np.ndarray:
+        """Rows with ``date_from <= posted_at[:10] <= date_to`` (either bound
+        optional), by string comparison."""
+        if self._days is None:
+            days = [(v or "")[:10] for v in self._cols.plain["posted_at"]]
+            order = np.asarray(sorted(range(self._n), key=days.__getitem__), dtype=np.int64)
+            self._days = ([days[i] for i in order.tolist()], order)
+        days_sorted, order = self._days
+        lo = bisect.bisect_left(days_sorted, date_from) if date_from else 0
+        hi = bisect.bisect_right(days_sorted, date_to) if date_to else self._n
+        mask = np.zeros(self._n, dtype=bool)
+        mask[order[lo:hi]] = True
+        return mask
+
+    def dimension_mask(
+        self, filters: Mapping, scalar: Mapping[str, str], array: Mapping[str, str],
+    ) -> np.ndarray:
+        """AND of the scalar (``key -> column``), array and ``date_range``
+        constraints in ``filters`` - the shared part of the dashboard and
+        widget row filters."""
+        mask = np.ones(self._n, dtype=bool)
+        for key, attr in scalar.items():
+            sel = filters.get(key)
+            if sel:
+                mask &= self.scalar_mask(attr, sel)
+        for key, attr in array.items():
+            sel = filters.get(key)
+            if sel:
+                mask &= self.array_mask(attr, sel)
+        dr = filters.get("date_range")
+        if dr and (dr.get("from") or dr.get("to")):
+            mask &= self.date_mask(dr.get("from"), dr.get("to"))
+        return mask
+
+
+def indexable(filters: Mapping, scalar_keys: Iterable[str]) -> bool:
+    """False when a scalar selection is a bare string: the row predicates'
+    ``value in sel`` is then a substring test, which postings don't model, so
+    that (never-sent-by-the-FE) shape keeps the row walk."""
+    return not any(isinstance(filters.get(k), str) for k in scalar_keys)
+
+
+def filter_index(cols: PostColumns) -> FilterIndex:
+    """The index for ``cols``, built on first use and kept with the store."""
+    return cols.memo("filter_index", lambda: FilterIndex(cols))
@@ -0,0 +1,195 @@
+"""Vectorized group-by primitives for the columnar aggregation backend.
+
+The row-by-row aggregators in ``dashboard_aggregate`` visit every post, call
+``get_dimension_keys`` / ``get_metric_value`` and fold each value into a
+per-key stats dict. On a :class:`~api.services.dashboard_columns.PostColumns`
+the same work splits into two steps:
+
+1. **factorize** a dimension once: a :class:`Factor` lists the dimension's
+   distinct keys and, for every (row, key) visit the row walk would make, the
+   row and the key's code - in exactly the walk's order;
+2. **reduce** a metric over the codes with unbuffered ``ufunc.at`` group
+   reductions (integer sums stay exact ``int64``; no float ``bincount``
+   weights).
+
+Key codes are numbered by first encounter, so iterating the keys in code order
+reproduces the insertion order of the dicts the row walk builds - which is
+what the stable, first-seen tie-break of every ranking relies on. Two
+dimensions combine through :func:`cross`, which enumerates each row's key pairs
+in nested-loop order (heatmap cells, compound table keys, date x breakdown).
+
+This module knows nothing about posts or dimension semantics; the callers in
+``dashboard_aggregate`` own that and keep parity with the golden harness.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+@dataclass(frozen=True)
+class Factor:
+    """Dimension keys of a post set, one element per (row, key) visit.
+
+    ``keys`` are the distinct keys in first-encounter order; ``rows`` and
+    ``codes`` (``int64``, same length) give each visit's row and key code, in
+    walk order: rows ascending, and within a row the order its keys are listed.
+    """
+
+    keys: list
+    rows: np.ndarray
+    codes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+def first_encounter(codes: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """``(order, remap)``: the codes present in ``codes`` in order of first
+    appearance, and a ``size``-long array mapping each to its rank there."""
+    n = len(codes)
+    first = np.full(size, n, dtype=np.int64)
+    np.minimum.at(first, codes, np.arange(n, dtype=np.int64))
+    present = np.flatnonzero(first < n)
+    order = present[np.argsort(first[present], kind="stable")]
+    remap = np.full(size, -1, dtype=np.int64)
+    remap[order] = np.arange(len(order), dtype=np.int64)
+    return order, remap
+
+
+def from_codes(values: list, rows: np.ndarray, codes: np.ndarray, key_of=None) -> Factor:
+    """Factor over dictionary-encoded elements. ``key_of`` maps a dictionary
+    value to its key (values sharing a key merge); None keeps values as keys."""
+    codes = np.asarray(codes, dtype=np.int64)
+    if key_of is not None:
+        index: dict = {}
+        to_key = np.fromiter(
+            (index.setdefault(key_of(v), len(index)) for v in values), dtype=np.int64, count=len(values),
+        )
+        values = list(index)
+        codes = to_key[codes]
+    order, remap = first_encounter(codes, len(values))
+    return Factor([values[c] for c in order.tolist()], np.asarray(rows, dtype=np.int64), remap[codes])
+
+
+def from_row_keys(per_row: Iterable[Iterable]) -> Factor:
+    """Factor from each row's key list (the generic, row-by-row path)."""
+    index: dict = {}
+    rows: list[int] = []
+    codes: list[int] = []
+    for i, keys in enumerate(per_row):
+        for k in keys:
+            rows.append(i)
+            codes.append(index.setdefault(k, len(index)))
+    return Factor(list(index), np.asarray(rows, dtype=np.int64), np.asarray(codes, dtype=np.int64))
+
+
+def from_row_values(values: Iterable) -> Factor:
+    """Factor with exactly one key per row."""
+    index: dict = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64)
+    return Factor(list(index), np.arange(len(codes), dtype=np.int64), codes)
+
+
+def constant(n: int, key: Any) -> Factor:
+    """Every row has the single key ``key``."""
+    return Factor([key] if n else [], np.arange(n, dtype=np.int64), np.zeros(n, dtype=np.int64))
+
+
+def cross(a: Factor, b: Factor, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Element indices ``(ia, ib)`` of every same-row pair of ``a`` and ``b``
+    elements, ordered like ``for x in a_keys(row): for y in b_keys(row)`` over
+    rows ``0..n-1``. Rows missing from either side produce no pairs."""
+    per_row_b = np.bincount(b.rows, minlength=n)
+    b_start = np.zeros(n, dtype=np.int64)
+    np.cumsum(per_row_b[:-1], out=b_start[1:])
+    lengths = per_row_b[a.rows]
+    total = int(lengths.sum())
+    ia = np.repeat(np.arange(len(a), dtype=np.int64), lengths)
+    pair_start = np.zeros(len(a), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=pair_start[1:])
+    within = np.arange(total, dtype=np.int64) - np.repeat(pair_start, lengths)
+    ib = np.repeat(b_start[a.rows], lengths) + within
+    return ia, ib
+
+
+def restrict(f: Factor, rows: np.ndarray, n: int) -> Factor:
+    """``f`` (over ``n`` rows) restricted to ``rows``, which become rows
+    ``0..len(rows)-1`` in that order; keys renumbered by first encounter."""
+    per_row = np.bincount(f.rows, minlength=n)
+    starts = np.cumsum(per_row) - per_row
+    lengths = per_row[rows]
+    new_rows = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+    run_start = np.cumsum(lengths) - lengths
+    within = np.arange(len(new_rows), dtype=np.int64) - np.repeat(run_start, lengths)
+    codes = f.codes[np.repeat(starts[rows], lengths) + within]
+    order, remap = first_encounter(codes, len(f.keys))
+    return Factor([f.keys[c] for c in order.tolist()], new_rows, remap[codes])
+
+
+# Above this many possible (a, b) pairs, `combine` sorts instead of indexing a
+# dense table.
+_DENSE_PAIRS = 1 << 22
+
+
+def combine(a_codes: np.ndarray, b_codes: np.ndarray, b_size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Factorize code pairs: ``(pair_a, pair_b, codes)`` where pair ``k``
+    (first-encounter order) is ``(pair_a[k], pair_b[k])``."""
+    if not len(a_codes):
+        return _EMPTY, _EMPTY, _EMPTY
+    width = max(b_size, 1)
+    joint = a_codes * width + b_codes
+    size = int(joint.max()) + 1
+    if size <= _DENSE_PAIRS:
+        pairs, remap = first_encounter(joint, size)
+        codes = remap[joint]
+    else:
+        uniq, first, inverse = np.unique(joint, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="stable")
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order), dtype=np.int64)
+        pairs, codes = uniq[order], rank[inverse.reshape(-1)]
+    return pairs // width, pairs % width, codes
+
+
+def group_stats(codes: np.ndarray, size: int, values: np.ndarray) -> tuple[list, list, list, list]:
+    """Per-code ``(sums, counts, mins, maxs)`` of ``values`` as Python lists
+    (the ``_add_to_stats`` fields); codes absent from ``codes`` get zeros."""
+    counts = np.bincount(codes, minlength=size)
+    sums = np.zeros(size, dtype=values.dtype)
+    np.add.at(sums, codes, values)
+    mins = np.zeros(size, dtype=values.dtype)
+    maxs = np.zeros(size, dtype=values.dtype)
+    if len(codes):
+        # Seed each present group with one of its own values.
+        mins[codes] = values
+        maxs[codes] = values
+        np.minimum.at(mins, codes, values)
+        np.maximum.at(maxs, codes, values)
+    return sums.tolist(), counts.tolist(), mins.tolist(), maxs.tolist()
+
+
+def group_sums(codes: np.ndarray, size: int, values: np.ndarray) -> list:
+    """Per-code sums of ``values`` (exact for integer dtypes)."""
+    sums = np.zeros(size, dtype=values.dtype)
+    np.add.at(sums, codes, values)
+    return sums.tolist()
+
+
+def median(values: np.ndarray) -> float | int:
+    """``_median`` over an array: the middle value, or the mean of the two
+    middle values (a float, as in JS) for an even count; 0 when empty."""
+    n = len(values)
+    if not n:
+        return 0
+    mid = n // 2
+    if n % 2:
+        return np.partition(values, mid)[mid].item()
+    part = np.partition(values, (mid - 1, mid))
+    return (part[mid - 1].item() + part[mid].item()) / 2
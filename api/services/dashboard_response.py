@@ -116,17 +116,18 @@ def data_cache_key(
     stamp: str,
     report_config: dict | None,
     slim: bool,
+    columnar: bool = False,
 ) -> str:
     """Key for ``POST /dashboard/data``.
 
     The body is ``{**core, "posts": transform(core.posts, report_config)[slim]}``.
     Everything but ``posts`` comes from the core (already keyed by
     ``agent_id + collections + stamp``); ``posts`` additionally depends on the
-    report config and the slim flag. Collection order is normalized so two
-    requests for the same set share an entry.
+    report config, the slim flag and the row-vs-columnar encoding. Collection
+    order is normalized so two requests for the same set share an entry.
     """
     return "data|" + stable_hash(
-        agent_id, sorted(collection_ids), stamp, report_config, bool(slim)
+        agent_id, sorted(collection_ids), stamp, report_config, bool(slim), bool(columnar)
     )
 
 
@@ -136,6 +137,7 @@ def share_cache_key(
     slim: bool,
     metadata: dict,
     agg_enabled: bool = False,
+    columnar: bool = False,
 ) -> str:
     """Key for ``GET /dashboard/shares/public/{token}``.
 
@@ -149,8 +151,9 @@ def share_cache_key(
     body, so a flagged and an unflagged request must never share a cache entry.
     The server series themselves are deterministic from data (``stamp``) +
     layout/reportConfig (in ``metadata``), so the flag is the only extra input.
+    ``columnar`` switches the posts encoding (rows vs JSON-columnar).
     """
-    return "share|" + stable_hash(token, stamp, bool(slim), metadata, bool(agg_enabled))
+    return "share|" + stable_hash(token, stamp, bool(slim), metadata, bool(agg_enabled), bool(columnar))
 
 
 def _gzip_response(body: bytes) -> Response:
@@ -18,6 +18,11 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
+
+from api.services.dashboard_columns import PostColumns, select
+from api.services.dashboard_filter_index import filter_index, indexable
+
 # Mirrors INITIAL_FILTERS / the DashboardFilters shape (the subset of dimensions
 # a reportScope can constrain). No `brands`/`custom_fields`/`conditions` — those
 # are widget-level only.
@@ -127,10 +132,14 @@ def _keep(p: dict, filters: dict) -> bool:
 
 def apply_filters(posts: list[dict], filters: dict | None) -> list[dict]:
     """Keep a post only if it passes every constrained dimension. Mirrors the FE
-    `applyFilters`."""
+    `applyFilters`. A `PostColumns` input is filtered through its posting-list
+    index (`dashboard_filter_index`) and comes back as `PostColumns`."""
     if not filters:
         return posts
-    return [p for p in posts if _keep(p, filters)]
+    if isinstance(posts, PostColumns) and indexable(filters, _SCALAR_MATCH):
+        mask = filter_index(posts).dimension_mask(filters, _SCALAR_MATCH, _ARRAY_MATCH)
+        return posts.take(np.flatnonzero(mask))
+    return select(posts, lambda p: _keep(p, filters))
 
 
 def apply_report_scope(posts: list[dict], scope: dict | None) -> list[dict]:
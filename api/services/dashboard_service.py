@@ -17,7 +17,7 @@ import asyncio
 import json
 import logging
 import time
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping, Sequence
 
 from api.schemas.responses import (
     DashboardPostResponse,
@@ -26,9 +26,13 @@ from api.schemas.responses import (
     TopicPlatformEntry,
 )
 from api.services.dashboard_cache import get_core, set_core
+from api.services.dashboard_columns import PostColumns, PostColumnsBuilder, post_dicts
+from config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Row cap for the feed-link export. The dashboard core is bounded by the
+# `dashboard_max_rows` setting instead (see get_or_build_core).
 MAX_ROWS = 50000
 
 # Display-only post fields read ONLY for the bounded set of posts actually on
@@ -46,19 +50,16 @@ DETAIL_FIELDS = ("ai_summary", "context", "media_refs")
 _DETAIL_FIELD_SET = frozenset(DETAIL_FIELDS)
 
 
-def strip_detail_fields(posts: list[dict]) -> list[dict]:
+def strip_detail_fields(posts: Iterable[Mapping]) -> list[dict]:
     """Return new post dicts with the lazy-loaded DETAIL_FIELDS removed.
 
     Never mutates the input: the cached core keeps the full posts so the
     post-details endpoint can serve the stripped fields from the same cache.
     """
-    return [
-        {k: v for k, v in post.items() if k not in _DETAIL_FIELD_SET}
-        for post in posts
-    ]
+    return post_dicts(posts, exclude=_DETAIL_FIELD_SET)
 
 
-def build_post_details(posts: list[dict], post_ids: Iterable[str]) -> dict[str, dict]:
+def build_post_details(posts: Sequence[Mapping], post_ids: Iterable[str]) -> dict[str, dict]:
     """Map requested post_ids to just their DETAIL_FIELDS, pulled from the core.
 
     Ids absent from the core are omitted, so a caller can never read posts
@@ -67,6 +68,13 @@ def build_post_details(posts: list[dict], post_ids: Iterable[str]) -> dict[str,
     """
     wanted = set(post_ids)
     out: dict[str, dict] = {}
+    if isinstance(posts, PostColumns):
+        # Scan the id column instead of decoding a view per row.
+        for i, pid in enumerate(posts.plain["post_id"]):
+            if pid in wanted:
+                post = posts[i]
+                out[pid] = {f: post.get(f) for f in DETAIL_FIELDS}
+        return out
     for post in posts:
         pid = post.get("post_id")
         if pid in wanted:
@@ -84,21 +92,26 @@ async def get_or_build_core(
     public-share paths - so all four hit the SAME cache entry (the details
     endpoint serves exactly the fat fields the data endpoint stripped). On a
     cache hit no BigQuery runs; on a miss it fires the four parallel queries,
-    assembles the jsonable core, caches it, and reports the timing splits the
-    routers log.
+    assembles the core, caches it, and reports the timing splits the routers
+    log.
+
+    Post and comment rows are streamed page by page straight into
+    :class:`PostColumns` (no per-row model, no full result list in memory), up
+    to the ``dashboard_max_rows`` setting; ``truncated`` reports a cut.
     """
     t0 = time.perf_counter()
     core = get_core(agent_id, collection_ids, stamp)
     if core is not None:
         return core, True, 0.0, 0.0
 
-    posts_sql, posts_params = build_dashboard_sql(collection_ids, agent_id, MAX_ROWS + 1)
+    max_rows = get_settings().dashboard_max_rows
+    posts_sql, posts_params = build_dashboard_sql(collection_ids, agent_id, max_rows + 1)
     kpis_sql, kpis_params = build_dashboard_kpis_sql(collection_ids, agent_id)
     topics_sql, topics_params = build_topics_sql(agent_id)
-    comments_sql, comments_params = build_comments_sql(collection_ids, agent_id, MAX_ROWS + 1)
+    comments_sql, comments_params = build_comments_sql(collection_ids, agent_id, max_rows + 1)
 
-    rows, kpi_rows, topic_rows, name_rows, comment_rows = await asyncio.gather(
-        asyncio.to_thread(bq.query, posts_sql, posts_params),
+    (posts, truncated), kpi_rows, topic_rows, name_rows, (comments, _) = await asyncio.gather(
+        asyncio.to_thread(read_post_columns, bq, posts_sql, posts_params, max_rows),
         asyncio.to_thread(bq.query, kpis_sql, kpis_params),
         asyncio.to_thread(bq.query, topics_sql, topics_params),
         asyncio.to_thread(
@@ -107,18 +120,13 @@ async def get_or_build_core(
         # Comments are an optional parallel source (dataSource: comments/both).
         # Fetched alongside posts/topics like topic_metrics; empty when the agent
         # has no enriched_comments. scope_comments() tolerates the missing table
-        # at deploy time only after the migration runs - falls back to [] on error.
-        _query_or_empty(bq, comments_sql, comments_params),
+        # at deploy time only after the migration runs - falls back to empty on error.
+        _columns_or_empty(bq, comments_sql, comments_params, max_rows),
     )
     gather_ms = (time.perf_counter() - t0) * 1000
 
-    truncated = len(rows) > MAX_ROWS
-    if truncated:
-        rows = rows[:MAX_ROWS]
-    comment_rows = comment_rows[:MAX_ROWS]
-
     ts = time.perf_counter()
-    core = assemble_dashboard_core(rows, topic_rows, kpi_rows, name_rows, truncated, comment_rows)
+    core = assemble_dashboard_core(posts, topic_rows, kpi_rows, name_rows, truncated, comments)
     serialize_ms = (time.perf_counter() - ts) * 1000
     set_core(agent_id, collection_ids, stamp, core)
     return core, False, gather_ms, serialize_ms
@@ -164,17 +172,41 @@ WHERE collection_id IN UNNEST(@collection_ids)
 """
 
 
-async def _query_or_empty(bq, sql: str | None, params: dict | None) -> list[dict]:
-    """Run a query in a thread, returning [] on None sql or any error. Used for
-    the optional comments source so a missing scope_comments TVF (pre-migration)
-    or an agent with no comments never breaks the dashboard."""
+def read_post_columns(
+    bq, sql: str, params: dict | None, max_rows: int
+) -> tuple[PostColumns, bool]:
+    """Stream a dashboard rows query into ``(columns, truncated)``.
+
+    Pages are normalized and appended as they arrive, so only one page of wide
+    BigQuery rows is held at a time. Stops reading once ``max_rows`` rows are in
+    (the SQL asks for one more, to detect the cut).
+    """
+    builder = PostColumnsBuilder()
+    truncated = False
+    for page in bq.iter_query(sql, params):
+        for row in page:
+            if len(builder) >= max_rows:
+                truncated = True
+                break
+            builder.append_post(normalize_post_row(row))
+        if truncated:
+            break
+    return builder.build(), truncated
+
+
+async def _columns_or_empty(
+    bq, sql: str | None, params: dict | None, max_rows: int
+) -> tuple[PostColumns, bool]:
+    """``read_post_columns`` in a thread, empty on None sql or any error. Used
+    for the optional comments source so a missing scope_comments TVF
+    (pre-migration) or an agent with no comments never breaks the dashboard."""
     if not sql:
-        return []
+        return PostColumns.empty(), False
     try:
-        return await asyncio.to_thread(bq.query, sql, params)
+        return await asyncio.to_thread(read_post_columns, bq, sql, params, max_rows)
     except Exception:
         logger.exception("comments source query failed; returning empty")
-        return []
+        return PostColumns.empty(), False
 
 
 # ─── TVF-backed SQL builders ────────────────────────────────────────
@@ -531,35 +563,79 @@ def _kpis_dict(kpi_rows: list[dict]) -> dict:
     }
 
 
+def _as_columns(rows: PostColumns | Iterable[dict] | None) -> PostColumns:
+    if isinstance(rows, PostColumns):
+        return rows
+    builder = PostColumnsBuilder()
+    for row in rows or ():
+        builder.append_post(normalize_post_row(row))
+    return builder.build()
+
+
 def assemble_dashboard_core(
-    rows: list[dict],
+    rows: PostColumns | list[dict],
     topic_rows: list[dict],
     kpi_rows: list[dict],
     name_rows: list[dict],
     truncated: bool,
-    comment_rows: list[dict] | None = None,
+    comment_rows: PostColumns | list[dict] | None = None,
 ) -> dict:
-    """Assemble the cacheable, jsonable dashboard core shared by both endpoints.
-
-    Returns plain dicts (not Pydantic models) so the value can be cached and
-    re-encoded with orjson on every hit without re-running per-row model
-    validation. The shape is a superset of both responses: the authed endpoint
-    returns it as-is (it matches ``DashboardDataResponse``); the public share
-    endpoint takes ``posts``/``topics``/``collection_names``/``truncated`` and
-    drops ``kpis``, wrapping the rest with its own per-share metadata.
+    """Assemble the cacheable dashboard core shared by both endpoints.
+
+    ``posts``/``comments`` are :class:`PostColumns` (raw BigQuery rows are
+    encoded on the way in); everything else is plain dicts (not Pydantic
+    models) so the value can be cached without re-running per-row model
+    validation. Responses turn the columns into row dicts (``post_dicts``) or
+    the JSON-columnar wire form (``PostColumns.to_wire``). The shape is a
+    superset of both responses: the authed endpoint matches
+    ``DashboardDataResponse``; the public share endpoint takes
+    ``posts``/``topics``/``collection_names``/``truncated`` and drops ``kpis``,
+    wrapping the rest with its own per-share metadata.
     """
     return {
-        "posts": [build_post_response(r).model_dump() for r in rows],
+        "posts": _as_columns(rows),
         "topics": [build_topic_response(r).model_dump() for r in topic_rows],
         # Comment rows are post-shaped (comment_id aliased to post_id) so they
-        # reuse build_post_response and the frontend post aggregation path.
-        "comments": [build_post_response(r).model_dump() for r in (comment_rows or [])],
+        # share the post columns and the frontend post aggregation path.
+        "comments": _as_columns(comment_rows),
         "kpis": _kpis_dict(kpi_rows),
         "collection_names": _collection_names_map(name_rows),
         "truncated": truncated,
     }
 
 
+def normalize_post_row(row: dict) -> dict:
+    """The post dict ``build_post_response(row).model_dump()`` returns, built
+    without the Pydantic model - the per-row hot path of the core build."""
+    return {
+        "post_id": row["post_id"],
+        "collection_id": row["collection_id"],
+        "platform": row["platform"],
+        "channel_handle": row.get("channel_handle") or "",
+        "posted_at": str(row.get("posted_at") or ""),
+        "title": row.get("title"),
+        "content": row.get("content"),
+        "post_url": row.get("post_url") or "",
+        "sentiment": row.get("sentiment"),
+        "emotion": row.get("emotion"),
+        "themes": parse_json_field(row.get("themes")),
+        "entities": parse_json_field(row.get("entities")),
+        "language": row.get("language"),
+        "content_type": row.get("content_type"),
+        "custom_fields": _parse_custom_fields(row.get("custom_fields")),
+        "ai_summary": row.get("ai_summary"),
+        "context": row.get("context"),
+        "detected_brands": parse_json_field(row.get("detected_brands")),
+        "channel_type": row.get("channel_type"),
+        "media_refs": _serialize_media_refs(row.get("media_refs")),
+        "topic_ids": [str(t) for t in (row.get("topic_ids") or [])],
+        "like_count": int(row.get("like_count") or 0),
+        "view_count": int(row.get("view_count") or 0),
+        "comment_count": int(row.get("comment_count") or 0),
+        "share_count": int(row.get("share_count") or 0),
+    }
+
+
 def build_post_response(row: dict) -> DashboardPostResponse:
     return DashboardPostResponse(
         post_id=row["post_id"],
@@ -0,0 +1,167 @@
+"""Memoized per-widget aggregation for the studio path (POST /dashboard/aggregate).
+
+The studio re-posts the whole layout on every edit. Hashing filters + every
+widget into one signature meant that changing, adding or removing a single
+widget missed the cache and re-aggregated the entire layout. Work is now
+cached at two levels (see ``dashboard_cache``):
+
+1. the filtered post set per ``(stamp, filter_sig)`` - report transform plus
+   the effective filters, shared by every widget;
+2. each widget's result per ``(stamp, filter_sig, widget_sig)``, where
+   ``widget_sig`` hashes only the widget's data config (no id, no grid
+   position), so an edit recomputes exactly the widgets whose config changed.
+
+Widgets missing from the cache are aggregated in parallel on a small thread
+pool, with one perf line per computed widget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.services.dashboard_aggregate import (
+    widget_chart_data,
+    widget_feed_posts,
+    widget_table_rows,
+)
+from api.services.dashboard_cache import (
+    get_studio_filtered,
+    get_studio_widget,
+    perf_logger,
+    set_studio_filtered,
+    set_studio_widget,
+)
+from api.services.dashboard_response import stable_hash
+from api.services.dashboard_scope import apply_filters
+from api.services.report_transform import transform_posts
+from config.settings import get_settings
+
+# Grid placement only - dragging or resizing a widget never changes its data.
+_LAYOUT_ONLY = frozenset({
+    "i", "x", "y", "w", "h", "minW", "maxW", "minH", "maxH",
+    "moved", "static", "isDraggable", "isResizable",
+})
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=max(1, get_settings().dashboard_agg_workers),
+                    thread_name_prefix="dashboard-agg",
+                )
+    return _pool
+
+
+def filter_signature(filters: dict | None, report_config: dict | None) -> str:
+    return stable_hash(filters or {}, report_config or {})
+
+
+def widget_signature(widget: dict) -> str:
+    return stable_hash({k: v for k, v in widget.items() if k not in _LAYOUT_ONLY})
+
+
+def compute_widget(posts, widget: dict) -> dict:
+    """Every server-side section one widget contributes to the response:
+    ``{"widgetData": ..., "tableData": ..., "feedData": [post ids]}``, each key
+    present only when the engine covers the widget that way."""
+    out: dict = {}
+    data = widget_chart_data(posts, widget)
+    if data is not None:
+        out["widgetData"] = data
+    rows = widget_table_rows(posts, widget)
+    if rows is not None:
+        out["tableData"] = rows
+    feed = widget_feed_posts(posts, widget)
+    if feed is not None:
+        # Post-id lists (not full post dicts), matching the share path's
+        # `feedData` shape.
+        out["feedData"] = [p["post_id"] for p in feed]
+    return out
+
+
+def filtered_posts_for(core: dict, filters: dict | None, report_config: dict | None):
+    """Report transform, then the effective filters (viewer selection already
+    intersected with reportScope on the FE) - the FE's `filteredPosts`, which
+    is also every widget's percent baseline (`basePosts`)."""
+    posts = core["posts"]
+    if report_config:
+        posts = transform_posts(posts, report_config)
+    return apply_filters(posts, filters or None)
+
+
+async def aggregate_layout(
+    core: dict,
+    layout: list,
+    filters: dict | None,
+    report_config: dict | None,
+    *,
+    agent_id: str,
+    collection_ids: list[str],
+    stamp: str,
+) -> tuple[dict, dict]:
+    """Build ``{"widgetData", "tableData", "feedData"}`` for ``layout``.
+
+    Returns ``(result, stats)``; ``stats`` counts filtered-set and widget
+    cache hits for the request's perf line.
+    """
+    filter_sig = filter_signature(filters, report_config)
+    posts = await asyncio.to_thread(get_studio_filtered, agent_id, collection_ids, stamp, filter_sig)
+    set_hit = posts is not None
+    if posts is None:
+        posts = await asyncio.to_thread(filtered_posts_for, core, filters, report_config)
+        await asyncio.to_thread(set_studio_filtered, agent_id, collection_ids, stamp, filter_sig, posts)
+
+    widgets = [w for w in layout or [] if isinstance(w, dict) and w.get("i")]
+    sections: dict[str, dict] = {}
+    todo: dict[str, list[dict]] = {}  # widget_sig -> widgets sharing that config
+    for w in widgets:
+        sig = widget_signature(w)
+        cached = get_studio_widget(agent_id, collection_ids, stamp, filter_sig, sig)
+        if cached is not None:
+            sections[w["i"]] = cached
+        else:
+            todo.setdefault(sig, []).append(w)
+
+    def _timed(widget: dict) -> tuple[dict, float]:
+        t0 = time.perf_counter()
+        out = compute_widget(posts, widget)
+        return out, (time.perf_counter() - t0) * 1000
+
+    if todo:
+        loop = asyncio.get_running_loop()
+        pool = _get_pool()
+        sigs = list(todo)
+        computed = await asyncio.gather(
+            *(loop.run_in_executor(pool, _timed, todo[sig][0]) for sig in sigs)
+        )
+        for sig, (out, ms) in zip(sigs, computed):
+            set_studio_widget(agent_id, collection_ids, stamp, filter_sig, sig, out)
+            for w in todo[sig]:
+                sections[w["i"]] = out
+            first = todo[sig][0]
+            perf_logger.info(
+                "dashboard.aggregate.widget agent=%s widget=%s chart=%s sections=%s filtered=%d ms=%.1f",
+                agent_id, first["i"], first.get("chartType") or first.get("aggregation"),
+                ",".join(out) or "-", len(posts), ms,
+            )
+
+    result: dict = {"widgetData": {}, "tableData": {}, "feedData": {}}
+    for w in widgets:
+        for section, value in sections[w["i"]].items():
+            result[section][w["i"]] = value
+    stats = {
+        "set_hit": set_hit,
+        "filtered": len(posts),
+        "widgets": len(widgets),
+        "widget_hits": len(widgets) - sum(len(ws) for ws in todo.values()),
+    }
+    return result, stats
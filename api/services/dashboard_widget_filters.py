@@ -16,13 +16,18 @@ mirrored: `Number(null)===0`/`Number('')===0`/`Number('5px')===NaN`, and
 from __future__ import annotations
 
 import math
+from functools import partial
 from typing import Any
 
+import numpy as np
+
 from api.services.dashboard_aggregate import (
     _CUSTOM_PREFIX,
     _js_string,
     get_dimension_keys,
 )
+from api.services.dashboard_columns import PostColumns, select
+from api.services.dashboard_filter_index import filter_index, indexable
 
 _DATE_CONDITION_FIELDS = {"posted_at"}
 # Row-filter scalar dimensions → post-dict attribute (FE `p.field || ''`).
@@ -172,16 +177,52 @@ def matches_condition(post: dict, cond: dict) -> bool:
 
 def apply_widget_filters(posts: list[dict], filters: dict | None) -> list[dict]:
     """ROW filter: drop a post unless it passes every configured constraint
-    (scalar/array dimensions, custom fields, date range, advanced conditions)."""
+    (scalar/array dimensions, custom fields, date range, advanced conditions).
+    A `PostColumns` input is filtered through its posting-list index
+    (`dashboard_filter_index`) and comes back as `PostColumns`."""
     if not filters:
         return posts
-
-    out: list[dict] = []
-    for p in posts:
-        if not _row_keep(p, filters):
-            continue
-        out.append(p)
-    return out
+    if isinstance(posts, PostColumns) and indexable(filters, _SCALAR_FILTERS):
+        return posts.take(_indexed_rows(posts, filters))
+    return select(posts, lambda p: _row_keep(p, filters))
+
+
+def _custom_literals(name: str, cf: dict | None) -> list[str] | None:
+    """The JS-string values `_row_keep` matches a custom-field selection
+    against, or None when the post can't match it at all."""
+    cf = cf or {}
+    dot = name.find(".")
+    if dot >= 0:
+        field, leaf = name[:dot], name[dot + 1:]
+        raw = cf.get(field)
+        if not isinstance(raw, list):
+            return None
+        return [_js_str_prop(el, leaf) for el in raw if isinstance(el, dict)]
+    raw = cf.get(name)
+    if raw is None:
+        return None
+    return [_js_string(v) for v in raw] if isinstance(raw, list) else [_js_string(raw)]
+
+
+def _indexed_rows(posts: PostColumns, filters: dict) -> np.ndarray | list[int]:
+    """`_row_keep` over a column store: dimension, custom-field and date
+    constraints as posting-list masks, then advanced conditions row by row on
+    the survivors only."""
+    index = filter_index(posts)
+    mask = index.dimension_mask(filters, _SCALAR_FILTERS, _ARRAY_FILTERS)
+    for name, selected in (filters.get("custom_fields") or {}).items():
+        if selected:
+            mask &= index.derived_mask(
+                "custom_fields", name, partial(_custom_literals, name), selected
+            )
+    rows = np.flatnonzero(mask)
+    conditions = filters.get("conditions") or []
+    if conditions:
+        return [
+            i for i in rows.tolist()
+            if all(matches_condition(posts[i], cond) for cond in conditions)
+        ]
+    return rows
 
 
 def _row_keep(p: dict, filters: dict) -> bool:
@@ -343,6 +384,18 @@ def apply_widget_value_filters(
     if not (themes or entities or brands or array_custom or object_custom):
         return working
 
+    if isinstance(working, PostColumns):
+        # Column-wise: prune the multi-valued codes, rewrite custom_fields.
+        for attr, sel in (("themes", themes), ("entities", entities), ("detected_brands", brands)):
+            if sel is not None:
+                working = working.with_values(attr, sel.__contains__)
+        if array_custom or object_custom:
+            working = working.with_plain("custom_fields", [
+                _prune_custom_fields(cf, array_custom, object_custom) if cf else cf
+                for cf in working.plain["custom_fields"]
+            ])
+        return working
+
     result: list[dict] = []
     for p in working:
         new_p = dict(p)
@@ -354,28 +407,35 @@ def apply_widget_value_filters(
             new_p["detected_brands"] = [v for v in (p.get("detected_brands") or []) if v in brands]
 
         if (array_custom or object_custom) and p.get("custom_fields"):
-            src = p["custom_fields"]
-            cf = dict(src)
-            for name, sel in array_custom.items():
-                raw = src.get(name)
-                if not isinstance(raw, list):
-                    continue
-                if any(isinstance(e, dict) for e in raw):
-                    continue  # object arrays handled below
-                cf[name] = [v for v in raw if v is not None and _js_string(v) in sel]
-            for field, leaf_map in object_custom.items():
-                raw = src.get(field)
-                if not isinstance(raw, list):
-                    continue
-                cf[field] = [
-                    el for el in raw
-                    if isinstance(el, dict)
-                    and all(
-                        el.get(leaf) is not None and _js_string(el.get(leaf)) in sel
-                        for leaf, sel in leaf_map.items()
-                    )
-                ]
-            new_p["custom_fields"] = cf
+            new_p["custom_fields"] = _prune_custom_fields(p["custom_fields"], array_custom, object_custom)
 
         result.append(new_p)
     return result
+
+
+def _prune_custom_fields(
+    src: dict, array_custom: dict[str, set[str]], object_custom: dict[str, dict[str, set[str]]]
+) -> dict:
+    """Copy of one post's `custom_fields` with the selected array fields and
+    object-array leaves pruned to the selected values."""
+    cf = dict(src)
+    for name, sel in array_custom.items():
+        raw = src.get(name)
+        if not isinstance(raw, list):
+            continue
+        if any(isinstance(e, dict) for e in raw):
+            continue  # object arrays handled below
+        cf[name] = [v for v in raw if v is not None and _js_string(v) in sel]
+    for field, leaf_map in object_custom.items():
+        raw = src.get(field)
+        if not isinstance(raw, list):
+            continue
+        cf[field] = [
+            el for el in raw
+            if isinstance(el, dict)
+            and all(
+                el.get(leaf) is not None and _js_string(el.get(leaf)) in sel
+                for leaf, sel in leaf_map.items()
+            )
+        ]
+    return cf
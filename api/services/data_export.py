@@ -0,0 +1,364 @@
+"""File-backed exports for the agent's ``export_data`` tool.
+
+``export_data`` used to run the underlying-data query, hold every row in
+memory and return all of them in the tool result - into the model's context,
+the SSE stream and the persisted session. Large collections blew up all three.
+
+An export now streams: the query's result pages (``BQClient.iter_query`` -
+Arrow record batches over the Storage Read API, REST pages otherwise) are
+flattened and written one at a time into a GCS object, so memory is bounded
+by a page however many rows the export has. The tool only gets a small
+preview and a handle:
+
+- ``data_exports/{export_id}`` in Firestore tracks progress (``running`` →
+  ``ready`` / ``failed``, rows and bytes written) for ``GET /exports/{id}``.
+- The file lives at ``exports/<export_id>.<ext>`` in ``gcs_exports_bucket``.
+  ``GET /exports/{id}/download`` streams it to its owner; once ready, the
+  status endpoint also hands out a short-lived signed URL when the service
+  credentials can sign one.
+
+CSV is always available. XLSX (openpyxl, write-only mode) and Parquet
+(pyarrow) are optional dependencies - asking for one that isn't installed is
+an ``ExportFormatError`` the agent recovers from by exporting CSV.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from api.deps import get_bq, get_fs, get_gcs
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+EXPORT_SQL = "export_queries/underlying_data.sql"
+EXPORT_PREFIX = "exports"
+
+# format → (extension, content type)
+FORMATS: dict[str, tuple[str, str]] = {
+    "csv": ("csv", "text/csv"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+XLSX_MAX_ROWS = 1_048_575  # sheet row limit, minus the header
+_PROGRESS_EVERY_SEC = 2.0
+
+
+class ExportFormatError(ValueError):
+    """Unknown export format, or its optional dependency isn't installed."""
+
+
+def flatten_row(row: dict) -> dict:
+    """Flat scalar columns for every format: themes / entities become
+    ``"; "``-joined strings, any other list or dict (media_refs) JSON."""
+    for key, value in row.items():
+        if key in ("themes", "entities") and isinstance(value, list):
+            row[key] = "; ".join(str(v) for v in value)
+        elif isinstance(value, (list, dict)):
+            row[key] = json.dumps(value, default=str)
+    return row
+
+
+# ─── Writers ────────────────────────────────────────────────────────────────
+# Each takes the binary GCS file object, gets `start(fields)` once with the
+# query's result schema (before any rows, also for an empty result), then
+# `write(rows)` per page and one `close()`; none of them keeps more than the
+# current page.
+
+
+class _CsvWriter:
+    max_rows: int | None = None
+
+    def __init__(self, f):
+        self._text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        self._writer: csv.DictWriter | None = None
+
+    def start(self, fields) -> None:
+        self._writer = csv.DictWriter(
+            self._text, fieldnames=[fld.name for fld in fields], extrasaction="ignore",
+        )
+        self._writer.writeheader()
+
+    def write(self, rows: list[dict]) -> None:
+        self._writer.writerows(rows)
+        self._text.flush()
+
+    def close(self) -> None:
+        self._text.flush()
+        self._text.detach()  # the caller closes the underlying file
+
+
+class _XlsxWriter:
+    max_rows = XLSX_MAX_ROWS
+
+    def __init__(self, f):
+        from openpyxl import Workbook
+
+        self._f = f
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("Export")
+        self._columns: list[str] = []
+
+    def start(self, fields) -> None:
+        self._columns = [fld.name for fld in fields]
+        self._ws.append(self._columns)
+
+    def write(self, rows: list[dict]) -> None:
+        for row in rows:
+            self._ws.append([row.get(c) for c in self._columns])
+
+    def close(self) -> None:
+        self._wb.save(self._f)
+
+
+class _ParquetWriter:
+    max_rows: int | None = None
+
+    def __init__(self, f):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa, self._pq = pa, pq
+        self._f = f
+        self._schema = None
+        self._text_columns: list[str] = []
+        self._writer = None
+
+    def _arrow_type(self, fld):
+        """Arrow type of a result column as `flatten_row` leaves it: arrays,
+        records and JSON are strings, and so are timestamps and dates, which
+        the BQ client hands back isoformatted."""
+        pa = self._pa
+        if fld.mode == "REPEATED":
+            return pa.string()
+        return {
+            "INTEGER": pa.int64(),
+            "INT64": pa.int64(),
+            "FLOAT": pa.float64(),
+            "FLOAT64": pa.float64(),
+            "BOOLEAN": pa.bool_(),
+            "BOOL": pa.bool_(),
+            "NUMERIC": pa.decimal128(38, 9),
+            "BIGNUMERIC": pa.decimal256(76, 38),
+            "BYTES": pa.binary(),
+        }.get(fld.field_type, pa.string())
+
+    def start(self, fields) -> None:
+        pa = self._pa
+        self._schema = pa.schema([pa.field(fld.name, self._arrow_type(fld)) for fld in fields])
+        # A JSON column can hold a bare number or bool.
+        self._text_columns = [fld.name for fld in self._schema if pa.types.is_string(fld.type)]
+        self._writer = self._pq.ParquetWriter(self._f, self._schema)
+
+    def write(self, rows: list[dict]) -> None:
+        for row in rows:
+            for key in self._text_columns:
+                value = row.get(key)
+                if value is not None and not isinstance(value, str):
+                    row[key] = str(value)
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _writer_class(fmt: str):
+    if fmt == "csv":
+        return _CsvWriter
+    if fmt == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError as e:
+            raise ExportFormatError("XLSX export isn't available here (openpyxl missing) - use csv.") from e
+        return _XlsxWriter
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ExportFormatError("Parquet export isn't available here (pyarrow missing) - use csv.") from e
+        return _ParquetWriter
+    raise ExportFormatError(f"Unknown export format {fmt!r} - use one of: {', '.join(FORMATS)}.")
+
+
+# ─── Export jobs ────────────────────────────────────────────────────────────
+
+
+@dataclass
+class ExportJob:
+    export_id: str
+    format: str
+    gcs_path: str
+    status: str = RUNNING
+    preview: list[dict] = field(default_factory=list)
+    column_names: list[str] = field(default_factory=list)
+    rows_written: int = 0
+    bytes_written: int = 0
+    truncated: bool = False  # hit the format's row limit
+    error: str | None = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def wait(self, timeout: float) -> bool:
+        """True once the export has finished (ready or failed)."""
+        return self.done.wait(timeout)
+
+
+def start_export(
+    collection_ids: list[str],
+    fmt: str = "csv",
+    *,
+    user_id: str,
+    org_id: str | None = None,
+    session_id: str | None = None,
+    agent_id: str | None = None,
+) -> ExportJob:
+    """Record the export and start streaming it on a background thread.
+
+    Raises ExportFormatError for a format that can't be written here."""
+    fmt = (fmt or "csv").lower()
+    writer_cls = _writer_class(fmt)
+    ext, content_type = FORMATS[fmt]
+    export_id = f"dx-{uuid4().hex[:12]}"
+    job = ExportJob(export_id=export_id, format=fmt, gcs_path=f"{EXPORT_PREFIX}/{export_id}.{ext}")
+
+    now = datetime.now(timezone.utc)
+    get_fs().create_data_export(export_id, {
+        "user_id": user_id,
+        "org_id": org_id,
+        "session_id": session_id,
+        "agent_id": agent_id,
+        "collection_ids": list(collection_ids),
+        "format": fmt,
+        "gcs_path": job.gcs_path,
+        "status": RUNNING,
+        "rows_written": 0,
+        "bytes_written": 0,
+        "truncated": False,
+        "created_at": now,
+        "updated_at": now,
+    })
+
+    from api.services.cost_meter import start_thread_with_cost_context
+
+    params = {"collection_ids": list(collection_ids), "created_at": now.isoformat()}
+    start_thread_with_cost_context(
+        _run_export, args=(job, params, writer_cls, content_type), name=f"data-export-{export_id}",
+    ).start()
+    return job
+
+
+def _progress_fields(job: ExportJob) -> dict:
+    return {
+        "status": job.status,
+        "rows_written": job.rows_written,
+        "bytes_written": job.bytes_written,
+        "truncated": job.truncated,
+    }
+
+
+def _run_export(job: ExportJob, params: dict, writer_cls, content_type: str) -> None:
+    settings = get_settings()
+    fs = get_fs()
+    blob = get_gcs().bucket(settings.gcs_exports_bucket).blob(job.gcs_path)
+    last_progress = time.monotonic()
+    try:
+        with blob.open("wb", content_type=content_type) as f:
+            writer = writer_cls(f)
+
+            def on_schema(fields) -> None:
+                job.column_names = [fld.name for fld in fields]
+                writer.start(fields)
+
+            pages = get_bq().iter_query_from_file(
+                EXPORT_SQL, params, settings.data_export_page_rows, on_schema,
+            )
+            for page in pages:
+                rows = [flatten_row(r) for r in page]
+                if not rows:
+                    continue
+                room = settings.data_export_preview_rows - len(job.preview)
+                if room > 0:
+                    job.preview.extend(rows[:room])
+                if writer.max_rows is not None and job.rows_written + len(rows) > writer.max_rows:
+                    rows = rows[:writer.max_rows - job.rows_written]
+                    job.truncated = True
+                if rows:
+                    writer.write(rows)
+                    job.rows_written += len(rows)
+                    job.bytes_written = f.tell()
+                if job.truncated:
+                    break
+                if time.monotonic() - last_progress >= _PROGRESS_EVERY_SEC:
+                    last_progress = time.monotonic()
+                    fs.update_data_export(job.export_id, _progress_fields(job))
+            writer.close()
+            job.bytes_written = f.tell()
+        job.status = READY
+    except Exception as e:
+        logger.exception("Data export %s failed", job.export_id)
+        job.status = FAILED
+        job.error = str(e)[:500]
+
+    final = {**_progress_fields(job), "completed_at": datetime.now(timezone.utc)}
+    if job.error:
+        final["error"] = job.error
+    try:
+        fs.update_data_export(job.export_id, final)
+    except Exception:
+        logger.warning("Data export %s: final status write failed", job.export_id, exc_info=True)
+    finally:
+        job.done.set()
+
+
+# ─── Download handles ───────────────────────────────────────────────────────
+
+
+def export_filename(export: dict) -> str:
+    ext, _ = FORMATS.get(export.get("format") or "csv", FORMATS["csv"])
+    stamp = str(export.get("created_at") or "")[:10].replace("-", "")
+    return f"data_export_{stamp or export['export_id']}.{ext}"
+
+
+def signed_url(export: dict) -> str | None:
+    """Short-lived V4 signed GET URL for a ready export, or None when the
+    credentials can't sign (the download endpoint still works)."""
+    settings = get_settings()
+    blob = get_gcs().bucket(settings.gcs_exports_bucket).blob(export["gcs_path"])
+    kwargs = {
+        "version": "v4",
+        "method": "GET",
+        "expiration": timedelta(minutes=settings.data_export_url_ttl_min),
+        "response_disposition": f'attachment; filename="{export_filename(export)}"',
+    }
+    try:
+        return blob.generate_signed_url(**kwargs)
+    except Exception:
+        pass
+    # Token-only credentials (Cloud Run) sign through the IAM signBlob API.
+    try:
+        import google.auth
+        from google.auth.transport.requests import Request
+
+        credentials, _ = google.auth.default()
+        credentials.refresh(Request())
+        return blob.generate_signed_url(
+            service_account_email=credentials.service_account_email,
+            access_token=credentials.token,
+            **kwargs,
+        )
+    except Exception:
+        logger.debug("Signed URL unavailable for export %s", export.get("export_id"), exc_info=True)
+        return None
@@ -0,0 +1,151 @@
+"""Keyset cursors for POST /feed.
+
+The feed used to page with ``LIMIT @limit OFFSET @offset``: every deeper page
+re-ran the scope/dedup, sorted ``offset + limit`` rows, threw the first
+``offset`` away and recomputed the ``COUNT(*) OVER()`` totals - so scrolling a
+50k-post feed got slower and more expensive page after page.
+
+A cursor instead carries the sort-key tuple of the last row served. The next
+page asks for rows strictly after it in the sort order (a top-``limit`` sort,
+no skipped rows) and takes the totals from the cursor instead of recomputing
+the window aggregates. Every sort ends in ``post_id`` so the order is total and
+the "strictly after" predicate never drops or repeats a tied row.
+
+A cursor is only valid for the data it was cut from: it embeds the freshness
+stamp (see ``dashboard_cache.make_freshness_stamp``) and a hash of the filters.
+When either no longer matches, the caller falls back to an OFFSET page at the
+cursor's position and issues a fresh cursor - the old behaviour, for one page.
+
+The cursor is opaque to clients (url-safe base64 JSON). Its key values only
+ever reach BigQuery as query parameters.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+_VERSION = 1
+
+# Key kinds - how a value is carried in the cursor and bound in SQL.
+INT = "int"
+STR = "str"
+TS = "ts"  # ISO-8601 string in the cursor, TIMESTAMP(@param) in SQL
+
+
+@dataclass(frozen=True)
+class SortKey:
+    expr: str
+    descending: bool
+    kind: str
+
+
+@dataclass
+class FeedCursor:
+    sort: str
+    values: list
+    stamp: str
+    filter_hash: str
+    position: int
+    total: int
+    total_views: int = 0
+    total_sources: int = 0
+
+    def matches(self, sort: str, stamp: str, filter_hash: str) -> bool:
+        return self.sort == sort and self.stamp == stamp and self.filter_hash == filter_hash
+
+
+def filter_hash(signature: str) -> str:
+    return hashlib.sha1(signature.encode()).hexdigest()[:16]
+
+
+def encode(cursor: FeedCursor) -> str:
+    payload = {
+        "v": _VERSION,
+        "s": cursor.sort,
+        "k": cursor.values,
+        "f": cursor.stamp,
+        "h": cursor.filter_hash,
+        "p": cursor.position,
+        "t": [cursor.total, cursor.total_views, cursor.total_sources],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode(token: str, keys: dict[str, tuple[SortKey, ...]]) -> FeedCursor:
+    """Parse a cursor. Raises ValueError for anything malformed - including
+    key values whose count or types don't fit the cursor's sort."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if payload.get("v") != _VERSION:
+            raise ValueError("unsupported cursor version")
+        sort = payload["s"]
+        values = payload["k"]
+        total, total_views, total_sources = (int(x) for x in payload["t"])
+        cursor = FeedCursor(
+            sort=str(sort), values=list(values), stamp=str(payload["f"]),
+            filter_hash=str(payload["h"]), position=int(payload["p"]),
+            total=total, total_views=total_views, total_sources=total_sources,
+        )
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise ValueError(f"invalid cursor: {e}") from e
+
+    sort_keys = keys.get(cursor.sort)
+    if sort_keys is None or len(cursor.values) != len(sort_keys) or cursor.position < 0:
+        raise ValueError("invalid cursor: sort keys don't match")
+    for key, value in zip(sort_keys, cursor.values):
+        expected = int if key.kind == INT else str
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError("invalid cursor: bad key value")
+        if key.kind == TS:
+            try:
+                datetime.fromisoformat(value)
+            except ValueError as e:
+                raise ValueError("invalid cursor: bad timestamp") from e
+    return cursor
+
+
+def key_value(key: SortKey, value):
+    """A row's sort-key value in its cursor form."""
+    if key.kind == TS:
+        return value.isoformat() if hasattr(value, "isoformat") else str(value)
+    if key.kind == INT:
+        return int(value or 0)
+    return "" if value is None else str(value)
+
+
+def order_by_sql(keys: tuple[SortKey, ...]) -> str:
+    return ", ".join(f"{k.expr} {'DESC' if k.descending else 'ASC'}" for k in keys)
+
+
+def select_sql(keys: tuple[SortKey, ...]) -> str:
+    """Projection of the sort keys (``_sort_k0``, ...) so the next cursor is
+    built from exactly the values the ORDER BY compared."""
+    return ",\n        ".join(f"{k.expr} AS _sort_k{i}" for i, k in enumerate(keys))
+
+
+def row_values(keys: tuple[SortKey, ...], row: dict) -> list:
+    return [key_value(k, row.get(f"_sort_k{i}")) for i, k in enumerate(keys)]
+
+
+def after_sql(keys: tuple[SortKey, ...], cursor: FeedCursor, params: dict) -> str:
+    """``(k0 < @c0) OR (k0 = @c0 AND k1 < @c1) OR ...`` - rows strictly after
+    the cursor in sort order (``>`` for ascending keys). Binds ``cursor_k{i}``
+    into ``params``."""
+    refs: list[str] = []
+    for i, (key, value) in enumerate(zip(keys, cursor.values)):
+        params[f"cursor_k{i}"] = value
+        refs.append(f"TIMESTAMP(@cursor_k{i})" if key.kind == TS else f"@cursor_k{i}")
+
+    terms: list[str] = []
+    for i, key in enumerate(keys):
+        op = "<" if key.descending else ">"
+        parts = [f"{keys[j].expr} = {refs[j]}" for j in range(i)]
+        parts.append(f"{key.expr} {op} {refs[i]}")
+        terms.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(terms) + ")"
@@ -0,0 +1,237 @@
+"""Shared result cache for the agent's `execute_sql` tool.
+
+The same orientation probes (in-scope post count, platform split, posted-at
+range, `window_metrics` roll-ups) are re-run in BigQuery by every chat, every
+WhatsApp Concierge turn and every autonomous continuation against the same
+agent. Within a session `dedup_sql_calls` only refused repeats; across
+sessions nothing was shared. This cache returns the earlier rows instead, so
+only genuinely new questions reach BigQuery.
+
+Key: ``(agent_id, selected sources, freshness stamp, sha256(canonical SQL))``.
+
+- The selected sources are the session's ``agent_selected_sources``, sorted:
+  the agent's SQL scope follows them, so two sessions on the same agent with
+  different collections selected never share rows - even when both sets
+  happen to carry the same freshness stamp.
+
+- Canonical SQL drops comments and collapses whitespace / case *outside*
+  string literals - ``'Nike'`` and ``'nike'`` are different questions.
+- The freshness stamp is the dashboard cache's (max ``updated_at`` across the
+  agent's collections, see ``dashboard_cache.make_freshness_stamp``): the
+  pipeline bumps it whenever post state changes, so new data is a new key.
+  Stamps are memoised for a few seconds so a fan-out of parallel probes
+  doesn't re-read Firestore per query.
+- Only plain ``SELECT`` / ``WITH`` reads without time- or randomness-dependent
+  functions are cached.
+
+Entries live in a per-process LRU bounded by total result bytes (the JSON size
+of the tool response); one oversized result is never allowed to flush the
+rest. The TTL is a safety net for data the stamp doesn't track.
+
+Every hit and every stored miss is reported to ``cost_meter`` (provider
+``sql_result_cache``) with the bytes a run bills - a free dry run, taken off
+the request path when the result is stored. The rows carry zero cost: agent
+SQL isn't billed to wallets, they are telemetry only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from cachetools import TTLCache
+
+from api.services.dashboard_cache import make_freshness_stamp
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# A string literal / quoted identifier (kept verbatim) or a comment (dropped).
+_TOKEN_RE = re.compile(
+    r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)|(--[^\n]*|/\*.*?\*/)""",
+    re.DOTALL,
+)
+_NONDETERMINISTIC_RE = re.compile(
+    r"\b(current_(?:timestamp|date|datetime|time)|rand\s*\(|generate_uuid|session_user)",
+)
+
+
+def canonicalize_sql(sql: str) -> str:
+    pieces: list[str] = []
+
+    def _code(text: str) -> None:
+        pieces.extend(text.lower().split())
+
+    pos = 0
+    for m in _TOKEN_RE.finditer(sql):
+        _code(sql[pos:m.start()])
+        if m.group(1):
+            pieces.append(m.group(1))
+        pos = m.end()
+    _code(sql[pos:])
+    return " ".join(pieces).rstrip(";").rstrip()
+
+
+def is_cacheable(canonical: str) -> bool:
+    if not canonical.startswith(("select ", "with ", "(")):
+        return False
+    code_only = _TOKEN_RE.sub(" ", canonical)
+    return not _NONDETERMINISTIC_RE.search(code_only)
+
+
+def cache_key(agent_id: str, collection_ids: Iterable[str], stamp: str, sql: str) -> tuple | None:
+    """None when the query shouldn't be cached."""
+    canonical = canonicalize_sql(sql)
+    if not canonical or not is_cacheable(canonical):
+        return None
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return (agent_id, tuple(sorted(set(collection_ids))), stamp, digest)
+
+
+@dataclass
+class CachedResult:
+    response: dict
+    size_bytes: int
+    expires_at: float
+    billed_bytes: int | None = None  # filled in by the dry run
+
+
+class SqlResultCache:
+    """Thread-safe LRU of execute_sql responses, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int, ttl: float, timer=time.monotonic):
+        self._max_bytes = max_bytes
+        self._max_entry_bytes = max_entry_bytes
+        self._ttl = ttl
+        self._timer = timer
+        self._entries: OrderedDict[tuple, CachedResult] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> CachedResult | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._timer():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, response: dict) -> CachedResult | None:
+        """Store a response. None when it was already cached (e.g. this very
+        response was served from the cache) or is too large to keep."""
+        try:
+            size = len(json.dumps(response, default=str))
+        except (TypeError, ValueError):
+            return None
+        if size > self._max_entry_bytes:
+            return None
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None and existing.expires_at > self._timer():
+                return None
+            if existing is not None:
+                self._drop(key)
+            entry = CachedResult(response=response, size_bytes=size, expires_at=self._timer() + self._ttl)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self._max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+            return entry
+
+    def _drop(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+
+_default: SqlResultCache | None = None
+_stamps: TTLCache | None = None
+_init_lock = threading.Lock()
+
+
+def get_cache() -> SqlResultCache:
+    global _default, _stamps
+    if _default is None:
+        with _init_lock:
+            if _default is None:
+                settings = get_settings()
+                _stamps = TTLCache(maxsize=1024, ttl=settings.agent_sql_cache_stamp_ttl_sec)
+                _default = SqlResultCache(
+                    max_bytes=settings.agent_sql_cache_max_mb * 1024 * 1024,
+                    max_entry_bytes=settings.agent_sql_cache_max_entry_mb * 1024 * 1024,
+                    ttl=settings.agent_sql_cache_ttl_sec,
+                )
+    return _default
+
+
+def freshness_stamp(
+    collection_ids: Iterable[str], load_status: Callable[[str], dict | None],
+) -> str:
+    """Freshness stamp of a collection set, memoised briefly."""
+    get_cache()
+    key = tuple(sorted(collection_ids))
+    with _init_lock:
+        stamp = _stamps.get(key)
+    if stamp is None:
+        stamp = make_freshness_stamp(load_status(cid) for cid in key)
+        with _init_lock:
+            _stamps[key] = stamp
+    return stamp
+
+
+def report(entry: CachedResult, *, hit: bool, sql: str | None = None, **attribution) -> None:
+    """One cost_meter row per hit (bytes a re-run would have billed) or
+    stored miss (bytes billed). The miss dry-runs `sql` first - off the
+    request path."""
+    from api.services.cost_meter import log_cost, start_thread_with_cost_context
+
+    def _log() -> None:
+        if not hit and sql and entry.billed_bytes is None:
+            from api.deps import get_bq
+
+            entry.billed_bytes = get_bq().dry_run_bytes(sql)
+        log_cost(
+            provider="sql_result_cache",
+            feature="agent_sql",
+            sub_kind="hit" if hit else "miss",
+            units=entry.billed_bytes or 0,
+            unit_kind="bytes_cached" if hit else "bytes_billed",
+            cost_micros_override=0,
+            raw_provider_payload={"result_bytes": entry.size_bytes},
+            **attribution,
+        )
+
+    try:
+        if hit:
+            _log()
+        else:
+            start_thread_with_cost_context(_log, name="sql-cache-dry-run").start()
+    except Exception:
+        logger.warning("sql_result_cache: cost report failed", exc_info=True)
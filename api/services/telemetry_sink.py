@@ -0,0 +1,367 @@
+"""Process-wide batched writer for ``usage_events`` rows.
+
+``cost_meter.log_cost`` (and the legacy ``usage_service`` events) used to
+start one thread per row, each doing a single-row streaming insert - under
+streaming enrichment, hundreds of short-lived threads and insert calls per
+minute per worker, competing with the pipeline's own BigQuery traffic.
+
+Rows now go on one bounded in-process queue drained by a single daemon
+writer thread:
+
+- A batch is flushed when it reaches ``usage_events_batch_rows`` rows or
+  ``usage_events_flush_sec`` after its first row, whichever comes first.
+  While an insert is in flight the queue keeps filling, so under load the
+  batches grow on their own.
+- Wallet deductions ride along: after a batch is inserted, each user's
+  billed micros are summed and applied with one Firestore increment.
+- ``submit`` never blocks. When the queue is full, rows spill to an NDJSON
+  file under ``usage_events_spill_dir`` and are re-queued once the writer is
+  idle again; past ``usage_events_spill_max_mb`` (or with spilling disabled)
+  they are dropped and counted. A dropped row's wallet charge is still
+  applied, inline - only the telemetry row is lost, never billing.
+- ``shutdown`` (registered with ``atexit``, and called from the API
+  lifespan) drains whatever is queued before the process exits.
+
+Counters (``stats()``) cover queue depth, rows written / failed / spilled /
+dropped and batch count. The writer logs them as a structured
+``usage_events_sink`` line every ``usage_events_stats_log_sec`` (for
+log-based metrics); ``GET /admin/telemetry`` returns them for this process.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_SPILL_FILE = "usage_events.spill.ndjson"
+
+
+@dataclass
+class _Pending:
+    row: dict
+    user_id: str = ""
+    charge_micros: int = 0
+
+
+class _Flush:
+    """Queue marker: write what's batched so far, then signal."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+def _insert_rows(rows: list[dict]) -> int:
+    from api.deps import get_bq
+
+    return get_bq().insert_rows("usage_events", rows)
+
+
+def _apply_charge(user_id: str, micros: int) -> None:
+    from api.deps import get_fs
+
+    get_fs().apply_spend_micros(user_id, micros)
+
+
+class UsageEventSink:
+    def __init__(
+        self,
+        *,
+        max_queue: int,
+        batch_rows: int,
+        flush_sec: float,
+        spill_dir: str = "",
+        spill_max_bytes: int = 0,
+        stats_log_sec: float = 60.0,
+        insert: Callable[[list[dict]], int] = _insert_rows,
+        charge: Callable[[str, int], None] = _apply_charge,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._batch_rows = max(1, batch_rows)
+        self._flush_sec = flush_sec
+        self._spill_path = os.path.join(spill_dir, _SPILL_FILE) if spill_dir else ""
+        self._spill_max_bytes = spill_max_bytes
+        self._stats_log_sec = stats_log_sec
+        self._insert = insert
+        self._charge = charge
+        self._timer = timer
+        self._spill_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("submitted", "written", "failed", "batches", "spilled", "respooled", "dropped"), 0,
+        )
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_stats_log = timer()
+        self._logged_counters: dict[str, int] = {}
+
+    # ─── Producer side ──────────────────────────────────────────────────
+
+    def submit(self, row: dict, *, user_id: str = "", charge_micros: int = 0) -> None:
+        """Queue one row (and its wallet charge). Never blocks, never raises."""
+        self._count("submitted")
+        item = _Pending(row=row, user_id=user_id, charge_micros=int(charge_micros or 0))
+        if self._stopping.is_set():
+            self._write([item])  # after shutdown (atexit): nobody left to drain
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if not self._spill([item]):
+                self._count("dropped")
+                logger.warning(
+                    "usage_events sink full - dropped row provider=%s feature=%s",
+                    row.get("provider"), row.get("feature"),
+                )
+                self._apply_charges([item])
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="usage-events-sink", daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything queued before this call is written."""
+        if self._thread is None or not self._thread.is_alive():
+            self._drain_inline()
+            return True
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Flush and stop the writer; later rows are written inline."""
+        self.flush(timeout)
+        self._stopping.set()
+        if self._thread is not None:
+            try:
+                self._queue.put_nowait(_Flush())  # wake the writer's idle wait
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        self._drain_inline()
+        while self._spill_size() and self._respool():
+            self._drain_inline()
+
+    def stats(self) -> dict[str, int]:
+        with self._stats_lock:
+            out = dict(self._counters)
+        out["queue_depth"] = self._queue.qsize()
+        out["spill_bytes"] = self._spill_size()
+        return out
+
+    # ─── Writer side ────────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._respool()
+                self._maybe_log_stats()
+                continue
+            batch: list[_Pending] = []
+            marker = first if isinstance(first, _Flush) else None
+            if marker is None:
+                batch.append(first)
+                deadline = self._timer() + self._flush_sec
+                while len(batch) < self._batch_rows:
+                    remaining = deadline - self._timer()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _Flush):
+                        marker = item
+                        break
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            if marker is not None:
+                marker.done.set()
+            self._maybe_log_stats()
+
+    def _drain_inline(self) -> None:
+        """Write everything still queued on the calling thread."""
+        batch: list[_Pending] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Flush):
+                item.done.set()
+                continue
+            batch.append(item)
+            if len(batch) >= self._batch_rows:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: list[_Pending]) -> None:
+        rows = [item.row for item in batch]
+        try:
+            failed = int(self._insert(rows) or 0)
+        except Exception:
+            failed = len(rows)
+            logger.warning("usage_events sink: insert of %d rows failed", len(rows), exc_info=True)
+        self._count("batches")
+        self._count("written", len(rows) - failed)
+        self._count("failed", failed)
+
+        # §E wallet deductions. Applied even when the insert failed: BigQuery
+        # is analytics, the wallet is billing.
+        self._apply_charges(batch)
+
+    def _apply_charges(self, items: list[_Pending]) -> None:
+        """One wallet increment per user for `items`."""
+        charges: dict[str, int] = defaultdict(int)
+        for item in items:
+            if item.charge_micros and item.user_id:
+                charges[item.user_id] += item.charge_micros
+        for user_id, micros in charges.items():
+            try:
+                self._charge(user_id, micros)
+            except Exception:
+                logger.warning("usage_events sink: wallet deduction failed for user=%s", user_id, exc_info=True)
+
+    # ─── Spill file ─────────────────────────────────────────────────────
+
+    def _spill_size(self) -> int:
+        try:
+            return os.path.getsize(self._spill_path) if self._spill_path else 0
+        except OSError:
+            return 0
+
+    def _spill(self, items: list[_Pending]) -> bool:
+        if not self._spill_path:
+            return False
+        lines = "".join(
+            json.dumps({"row": i.row, "user_id": i.user_id, "charge_micros": i.charge_micros}, default=str) + "\n"
+            for i in items
+        )
+        with self._spill_lock:
+            if self._spill_size() + len(lines) > self._spill_max_bytes:
+                return False
+            try:
+                os.makedirs(os.path.dirname(self._spill_path), exist_ok=True)
+                with open(self._spill_path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+            except OSError:
+                logger.warning("usage_events sink: spill write failed", exc_info=True)
+                return False
+        self._count("spilled", len(items))
+        return True
+
+    def _respool(self) -> int:
+        """Move spilled rows back onto the queue while it has room. Rows
+        that don't fit stay in the file for the next idle tick. Returns the
+        number of rows re-queued."""
+        if not self._spill_path or not self._spill_size():
+            return 0
+        with self._spill_lock:
+            try:
+                with open(self._spill_path, encoding="utf-8") as f:
+                    lines = f.readlines()
+            except OSError:
+                return 0
+            room = self._queue.maxsize - self._queue.qsize()
+            take, keep = lines[:room], lines[room:]
+            try:
+                with open(self._spill_path, "w", encoding="utf-8") as f:
+                    f.writelines(keep)
+            except OSError:
+                logger.warning("usage_events sink: spill rewrite failed", exc_info=True)
+                return 0
+        requeued = 0
+        for line in take:
+            try:
+                data = json.loads(line)
+                item = _Pending(row=data["row"], user_id=data.get("user_id", ""),
+                                charge_micros=data.get("charge_micros", 0))
+                self._queue.put_nowait(item)
+            except (ValueError, KeyError, TypeError):
+                self._count("dropped")
+                continue
+            except queue.Full:
+                if not self._spill([item]):
+                    self._count("dropped")
+                    self._apply_charges([item])
+                continue
+            requeued += 1
+        self._count("respooled", requeued)
+        return requeued
+
+    # ─── Stats ──────────────────────────────────────────────────────────
+
+    def _count(self, key: str, n: int = 1) -> None:
+        if n:
+            with self._stats_lock:
+                self._counters[key] += n
+
+    def _maybe_log_stats(self) -> None:
+        if self._timer() - self._last_stats_log < self._stats_log_sec:
+            return
+        self._last_stats_log = self._timer()
+        stats = self.stats()
+        counters = {k: v for k, v in stats.items() if k not in ("queue_depth", "spill_bytes")}
+        if counters == self._logged_counters and not stats["queue_depth"]:
+            return
+        self._logged_counters = counters
+        logger.info("usage_events_sink", extra={"json_fields": {"event": "usage_events_sink", **stats}})
+
+
+_default: UsageEventSink | None = None
+_init_lock = threading.Lock()
+
+
+def get_sink() -> UsageEventSink:
+    global _default
+    if _default is None:
+        with _init_lock:
+            if _default is None:
+                settings = get_settings()
+                sink = UsageEventSink(
+                    max_queue=settings.usage_events_queue_size,
+                    batch_rows=settings.usage_events_batch_rows,
+                    flush_sec=settings.usage_events_flush_sec,
+                    spill_dir=settings.usage_events_spill_dir,
+                    spill_max_bytes=settings.usage_events_spill_max_mb * 1024 * 1024,
+                    stats_log_sec=settings.usage_events_stats_log_sec,
+                )
+                sink.start()
+                atexit.register(sink.shutdown)
+                _default = sink
+    return _default
+
+
+def submit(row: dict, *, user_id: str = "", charge_micros: int = 0) -> None:
+    get_sink().submit(row, user_id=user_id, charge_micros=charge_micros)
+
+
+def shutdown(timeout: float = 10.0) -> None:
+    """Drain the process-wide sink, if one was started."""
+    if _default is not None:
+        _default.shutdown(timeout)
+
+
+def stats() -> dict[str, int]:
+    return get_sink().stats()
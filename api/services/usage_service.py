@@ -2,7 +2,6 @@
 
 import json
 import logging
-import threading
 from datetime import datetime, timezone
 from uuid import uuid4
 
@@ -149,8 +148,8 @@ def _log_event(
     worker call sites that already use ``collection_context_scope`` get
     correct attribution without threading the id through every helper.
     """
-    # Capture request_id at call site, before we hop to a daemon thread -
-    # ContextVar does not propagate across thread boundaries.
+    # Capture request_id at call site - the row is written later by the
+    # telemetry sink's writer thread, and ContextVars don't cross threads.
     request_id: str | None
     try:
         from api.middleware.request_id import get_request_id
@@ -184,35 +183,27 @@ def _log_event(
     # explicitly, but no current caller does.
     cost_source: str | None = None
 
-    def _insert() -> None:
-        try:
-            from api.deps import get_bq
-
-            bq = get_bq()
-            bq.insert_rows(
-                "usage_events",
-                [
-                    {
-                        "event_id": str(uuid4()),
-                        "event_type": event_type,
-                        "user_id": user_id,
-                        "org_id": org_id,
-                        "session_id": session_id,
-                        "collection_id": collection_id,
-                        "metadata": json.dumps(metadata) if metadata else None,
-                        "provider": provider,
-                        "feature": feature,
-                        "units": units,
-                        "unit_kind": unit_kind,
-                        "cost_micros": cost_micros,
-                        "agent_id": agent_id,
-                        "request_id": request_id,
-                        "platform": platform,
-                        "cost_source": cost_source,
-                    }
-                ],
-            )
-        except Exception:
-            logger.warning("Failed to log usage event %s", event_type, exc_info=True)
+    row = {
+        "event_id": str(uuid4()),
+        "event_type": event_type,
+        "user_id": user_id,
+        "org_id": org_id,
+        "session_id": session_id,
+        "collection_id": collection_id,
+        "metadata": json.dumps(metadata) if metadata else None,
+        "provider": provider,
+        "feature": feature,
+        "units": units,
+        "unit_kind": unit_kind,
+        "cost_micros": cost_micros,
+        "agent_id": agent_id,
+        "request_id": request_id,
+        "platform": platform,
+        "cost_source": cost_source,
+    }
+    try:
+        from api.services import telemetry_sink
 
-    threading.Thread(target=_insert, daemon=True).start()
+        telemetry_sink.submit(row)
+    except Exception:
+        logger.warning("Failed to log usage event %s", event_type, exc_info=True)
@@ -577,3 +577,119 @@ def test_evaluator_skips_collection_without_agent(captured_emails):
     summary = evaluate_alerts_for_collection("orphan", bq=FakeBQ([]), fs=fake)
     assert summary["alerts_evaluated"] == 0
     assert captured_emails == []
+
+
+# ── streaming evaluator: compiled index + batched emails ────────────────────
+
+
+def _stream_settings(batch_size=25, max_delay=600.0):
+    return type("S", (), {
+        "alerts_stream_batch_size": batch_size,
+        "alerts_stream_max_delay_sec": max_delay,
+        "alerts_stream_refresh_sec": 300.0,
+    })()
+
+
+def test_alert_index_matches_like_widget_filters():
+    from api.services.dashboard_widget_filters import apply_widget_filters
+    from workers.alerts.stream import AlertIndex
+
+    alerts = [
+        {"alert_id": "neg", "filters": {"sentiment": ["negative"]}},
+        {"alert_id": "nike-x", "filters": {"brands": ["Nike"], "platform": ["twitter"]}},
+        {"alert_id": "themes", "filters": {"themes": ["price", "quality"], "sentiment": ["negative", "neutral", "positive"]}},
+        {"alert_id": "text", "filters": {"conditions": [{"field": "text", "operator": "contains", "value": "refund"}]}},
+        {"alert_id": "all", "filters": {}},
+    ]
+    posts = [
+        _post("p1", "negative", themes=["price"]),
+        _post("p2", "positive", content="want a refund", platform="tiktok"),
+        _post("p3", "neutral", detected_brands=[], themes=["quality", "price"]),
+    ]
+    index = AlertIndex(alerts)
+    for post in posts:
+        expected = [a["alert_id"] for a in alerts if apply_widget_filters([post], a["filters"])]
+        assert [a["alert_id"] for a in index.match(post)] == expected
+
+
+def test_alert_index_defers_engagement_and_topic_alerts():
+    from workers.alerts.stream import AlertIndex
+
+    index = AlertIndex([
+        {"alert_id": "viral", "filters": {"conditions": [
+            {"field": "like_count", "operator": "greaterThan", "value": 1000},
+        ]}},
+        {"alert_id": "topic", "filters": {"topics": ["t1"]}},
+        {"alert_id": "neg", "filters": {"sentiment": ["negative"]}},
+    ])
+    assert index.deferred == ["viral", "topic"]
+    assert [a["alert_id"] for a in index.match(_post("p1", "negative"))] == ["neg"]
+
+
+def test_stream_batches_matches_into_one_email(captured_emails):
+    from workers.alerts.stream import StreamingAlertEvaluator
+
+    fake = _eval_fs()
+    stream = StreamingAlertEvaluator("agent1", fake, _stream_settings(batch_size=3))
+
+    assert stream.observe([_post("p1", "negative"), _post("p2", "positive")]) == 1
+    assert stream.observe([_post("p3", "negative")]) == 1
+    assert captured_emails == []  # 2 buffered < batch size 3
+
+    stream.observe([_post("p4", "negative")])
+    assert len(captured_emails) == 1
+    assert "3 new" in captured_emails[0]["subject"]
+    assert fake.seen["al1"] == {"p1", "p3", "p4"}
+
+
+def test_stream_final_flush_and_sweep_dedup(captured_emails):
+    from workers.alerts.evaluator import evaluate_alerts_for_agent_run
+    from workers.alerts.stream import StreamingAlertEvaluator
+
+    fake = _eval_fs()
+    stream = StreamingAlertEvaluator("agent1", fake, _stream_settings())
+    stream.observe([_post("p1", "negative")])
+    assert stream.flush(force=True) == 1
+    assert len(captured_emails) == 1
+
+    # The run-completion sweep only emails what the stream didn't.
+    bq = FakeBQ([_post("p1", "negative"), _post("p2", "negative")])
+    evaluate_alerts_for_agent_run("agent1", ["c1"], bq=bq, fs=fake)
+    assert len(captured_emails) == 2
+    assert "1 new" in captured_emails[1]["subject"]
+    assert fake.alerts["al1"]["trigger_count"] == 2
+
+
+def test_enrich_flush_feeds_alert_stream(monkeypatch):
+    from unittest.mock import MagicMock
+
+    import workers.enrichment.worker as enrichment_worker
+    from workers.enrichment.schema import EnrichmentResult
+    from workers.pipeline.steps import StepContext, enrich_flush
+
+    monkeypatch.setattr(enrichment_worker, "_write_results_to_bq", lambda *a, **k: None)
+
+    def _result(related):
+        return EnrichmentResult(
+            context="c", ai_summary="s", language="en", sentiment="negative",
+            emotion="anger", entities=[], themes=["price"], content_type="post",
+            is_related_to_task=related,
+        )
+
+    stream = MagicMock()
+    ctx = StepContext(
+        collection_id="c1", bq=None, gcs=None, state_manager=None,
+        custom_fields=None, enrichment_context=None, settings=None,
+        alert_stream=stream,
+    )
+    enrich_flush([
+        ("p1", "ok", {"enrichment_result": _result(True), "post_row": {"platform": "twitter"}}),
+        ("p2", "ok", {"enrichment_result": _result(False)}),
+        ("p3", "fail", None),
+    ], ctx)
+
+    (posts,), _ = stream.observe.call_args
+    assert [p["post_id"] for p in posts] == ["p1"]
+    assert posts[0]["platform"] == "twitter"
+    assert posts[0]["themes"] == ["price"]
+    assert posts[0]["collection_id"] == "c1"
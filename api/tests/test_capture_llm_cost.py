@@ -16,6 +16,9 @@ import pytest
 from api.agent.callbacks import capture_llm_cost
 
 
+pytestmark = pytest.mark.usefixtures("usage_events_sink")
+
+
 class _FakeBQ:
     def __init__(self) -> None:
         self.rows: list[dict[str, Any]] = []
@@ -30,6 +33,10 @@ class _FakeBQ:
 def fake_bq(monkeypatch):
     fake = _FakeBQ()
     monkeypatch.setattr("api.deps.get_bq", lambda: fake)
+    # Wallet deductions aren't under test here - don't reach a real Firestore.
+    monkeypatch.setattr(
+        "api.deps.get_fs", lambda: SimpleNamespace(apply_spend_micros=lambda uid, micros: None),
+    )
     return fake
 
 
@@ -4,17 +4,21 @@ The dashboard freshness stamp previously fired one Firestore read per collection
 (36+ on a large share, all before the response-cache check). The batched variant
 collapses them into a single `get_all` round-trip; these tests pin its contract:
 one entry per requested id, missing docs -> None, identical normalization to the
-single-read path, and dedupe of repeated ids.
+single-read path, dedupe of repeated ids, and counter shards folded in
+whatever the status - cancelled and failed runs can end without the recount
+that clears them.
 """
 
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 from workers.shared.firestore_client import FirestoreClient
 
 
 class _FakeSnap:
-    def __init__(self, doc_id, data):
-        self.id = doc_id
+    def __init__(self, ref, data):
+        self.id = ref.id
+        self.reference = ref
         self._data = data
         self.exists = data is not None
 
@@ -23,32 +27,72 @@ class _FakeSnap:
 
 
 class _FakeRef:
-    def __init__(self, doc_id):
+    def __init__(self, doc_id, parent=None):
         self.id = doc_id
+        self.parent = parent
+
+    @property
+    def path(self):
+        return f"{self.parent.path}/{self.id}" if self.parent else self.id
+
+    def collection(self, name):
+        coll = _FakeColl(name, parent=self)
+        coll._db = self._db
+        return coll
+
+    def get(self):
+        return self._db.snap(self)
 
 
 class _FakeColl:
+    def __init__(self, name="collection_status", parent=None):
+        self.id = name
+        self.parent = parent
+
+    @property
+    def path(self):
+        return f"{self.parent.path}/{self.id}" if self.parent else self.id
+
     def document(self, doc_id):
-        return _FakeRef(doc_id)
+        ref = _FakeRef(doc_id, parent=self)
+        ref._db = self._db
+        return ref
+
+    def stream(self):
+        owner = self.parent.id
+        for key in sorted(self._db._shards):
+            if key.startswith(f"{owner}/"):
+                yield self.document(key.split("/", 1)[1]).get()
 
 
 class _FakeDB:
-    def __init__(self, docs):
+    def __init__(self, docs, shards=None):
         self._docs = docs
+        # {"<collection_id>/<shard>": shard data}
+        self._shards = shards or {}
 
     def collection(self, name):
         assert name == "collection_status"
-        return _FakeColl()
+        coll = _FakeColl()
+        coll._db = self
+        return coll
+
+    def snap(self, ref):
+        if ref.parent.parent is None:
+            return _FakeSnap(ref, self._docs.get(ref.id))
+        owner = ref.parent.parent.id
+        return _FakeSnap(ref, self._shards.get(f"{owner}/{ref.id}"))
 
     def get_all(self, refs):
         # Firestore returns a snapshot per ref; missing docs come back exists=False.
         for ref in refs:
-            yield _FakeSnap(ref.id, self._docs.get(ref.id))
+            yield self.snap(ref)
 
 
-def _client(docs):
+def _client(docs, shards=None):
     fc = FirestoreClient.__new__(FirestoreClient)  # skip GCP client init
-    fc._db = _FakeDB(docs)
+    fc._db = _FakeDB(docs, shards)
+    fc._settings = SimpleNamespace(pipeline_counter_shards=4)
     return fc
 
 
@@ -76,4 +120,86 @@ def test_empty_input_returns_empty_dict():
 def test_dedupes_repeated_ids():
     fc = _client({"a": {"status": "running"}})
     out = fc.get_collection_statuses(["a", "a"])
-    assert out == {"a": {"status": "running"}}
+    assert list(out) == ["a"]
+    assert out["a"]["status"] == "running"
+
+
+def test_running_collections_fold_counter_shards():
+    parent_ts = datetime(2026, 1, 2, 3, 0, 0, tzinfo=timezone.utc)
+    shard_ts = datetime(2026, 1, 2, 3, 5, 0, tzinfo=timezone.utc)
+    fc = _client(
+        {
+            "a": {"status": "running", "updated_at": parent_ts,
+                  "counts": {"done": 2}, "total_posts_in_dag": 5},
+            # Recounted onto the parent doc, shards cleared.
+            "b": {"status": "success", "updated_at": parent_ts, "counts": {"done": 9}},
+        },
+        shards={
+            "a/0": {"counts": {"done": 1, "enriching": 2}, "total_posts_in_dag": 3},
+            "a/3": {"counts": {"done": 4}, "updated_at": shard_ts},
+        },
+    )
+    out = fc.get_collection_statuses(["a", "b"])
+
+    assert out["a"]["counts"] == {"done": 7, "enriching": 2}
+    assert out["a"]["total_posts_in_dag"] == 8
+    # The freshness stamp moves with shard writes.
+    assert out["a"]["updated_at"] == shard_ts.isoformat()
+    assert out["b"]["counts"] == {"done": 9}
+
+
+def _ended_without_recount(status: str):
+    """A run that went terminal while its counters were still in shards."""
+    return _client(
+        {"a": {"status": status, "counts": {"done": 2}, "total_posts_in_dag": 5}},
+        shards={
+            "a/0": {"counts": {"done": 3, "enriching": 1}, "total_posts_in_dag": 4},
+            "a/2": {"counts": {"enriching": -1, "failed": 1}},
+        },
+    )
+
+
+def test_cancelled_collection_folds_leftover_shards():
+    # Cancelling flips status to "failed" (legacy "cancelled" docs map to it)
+    # and the pipeline exits without a recount.
+    for status in ("failed", "cancelled"):
+        fc = _ended_without_recount(status)
+
+        batched = fc.get_collection_statuses(["a"])["a"]
+        single = fc.get_collection_status("a")
+
+        for out in (batched, single):
+            assert out["status"] == "failed"
+            assert out["counts"] == {"done": 5, "enriching": 0, "failed": 1}
+            assert out["total_posts_in_dag"] == 9
+
+
+def test_failed_collection_folds_leftover_shards():
+    fc = _ended_without_recount("failed")
+
+    assert fc.get_collection_statuses(["a"])["a"]["counts"]["done"] == 5
+    assert fc.get_collection_status("a")["total_posts_in_dag"] == 9
+
+
+def test_single_read_can_skip_shards():
+    fc = _ended_without_recount("running")
+    out = fc.get_collection_status("a", include_counter_shards=False)
+    assert out["counts"] == {"done": 2}
+
+
+def test_shards_outside_the_configured_range_are_folded():
+    # Shard "7" was written under a larger pipeline_counter_shards setting
+    # than the current 4; both reads must still count it.
+    fc = _client(
+        {"a": {"status": "running", "counts": {"done": 2}, "total_posts_in_dag": 5}},
+        shards={
+            "a/1": {"counts": {"done": 1}, "total_posts_in_dag": 1},
+            "a/7": {"counts": {"done": 4}, "total_posts_in_dag": 6},
+        },
+    )
+
+    batched = fc.get_collection_statuses(["a"])["a"]
+    single = fc.get_collection_status("a")
+
+    assert batched["counts"] == single["counts"] == {"done": 7}
+    assert batched["total_posts_in_dag"] == single["total_posts_in_dag"] == 12
@@ -6,6 +6,7 @@ can capture the row that *would* be inserted, then assert on its shape.
 
 from __future__ import annotations
 
+import json
 import time
 from typing import Any
 
@@ -14,6 +15,9 @@ import pytest
 from api.services import cost_meter
 
 
+pytestmark = pytest.mark.usefixtures("usage_events_sink")
+
+
 class _FakeBQ:
     def __init__(self) -> None:
         self.rows: list[dict[str, Any]] = []
@@ -512,6 +516,21 @@ def test_log_gemini_response_writes_llm_row(fake_bq: _FakeBQ):
     assert row["cost_micros"] == 3_500_000
 
 
+def test_log_gemini_response_splits_fresh_and_cached_tokens(fake_bq: _FakeBQ):
+    cost_meter.log_gemini_response(
+        _fake_gemini_response(prompt=1_000, cached=800),
+        feature="enrich",
+        user_id="u1",
+    )
+    _wait_for_rows(fake_bq)
+    row = fake_bq.rows[0]
+    assert row["input_tokens"] == 1_000
+    assert row["cached_tokens"] == 800
+    assert json.loads(json.loads(row["metadata"])["raw"]) == {
+        "fresh_input_tokens": 200, "cached_input_tokens": 800,
+    }
+
+
 def test_log_gemini_response_inherits_collection_context(fake_bq: _FakeBQ):
     with cost_meter.collection_context_scope(
         user_id="u-ctx", org_id="o-ctx",
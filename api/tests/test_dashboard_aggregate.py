@@ -23,6 +23,7 @@ from api.services.dashboard_aggregate import (
     normalize_table_config,
     table_primary_dimension,
 )
+from api.services.dashboard_columns import PostColumns
 from api.services.dashboard_widget_filters import (
     apply_widget_filters,
     apply_widget_value_filters,
@@ -39,6 +40,15 @@ def _load_golden() -> dict:
         return json.load(f)
 
 
+def _as_store(posts: list[dict], columnar: bool):
+    """The golden posts as row dicts, or as the column store the cached core
+    holds - every parity case must pass on both."""
+    return PostColumns.from_posts(posts) if columnar else posts
+
+
+_STORES = pytest.mark.parametrize("columnar", [False, True], ids=["rows", "columns"])
+
+
 def _golden_cases():
     g = _load_golden()
     return g["posts"], g["cases"]
@@ -56,8 +66,10 @@ def _golden_table_cases():
 
 @pytest.mark.skipif(not _GOLDEN.exists(), reason="parity golden not generated")
 @pytest.mark.parametrize("case", _golden_cases()[1], ids=lambda c: c["name"])
-def test_parity_with_frontend_golden(case):
+@_STORES
+def test_parity_with_frontend_golden(case, columnar):
     posts, _ = _golden_cases()
+    posts = _as_store(posts, columnar)
     result = compute_custom(posts, case["config"], posts)
     assert result == case["expected"], (
         f"case {case['name']}: engine {result} != golden {case['expected']}"
@@ -66,10 +78,12 @@ def test_parity_with_frontend_golden(case):
 
 @pytest.mark.skipif(not _GOLDEN.exists(), reason="parity golden not generated")
 @pytest.mark.parametrize("case", _golden_widget_cases()[1], ids=lambda c: c["name"])
-def test_parity_widget_pipeline(case):
+@_STORES
+def test_parity_widget_pipeline(case, columnar):
     """Full per-widget pipeline (row-filter → value-filter → aggregate) must match
     the FE-recorded golden — the filter port is the riskiest parity surface."""
     posts, _ = _golden_widget_cases()
+    posts = _as_store(posts, columnar)
     w = case["widget"]
     cfg = w["customConfig"]
     per_widget = apply_widget_filters(posts, w.get("filters"))
@@ -82,9 +96,11 @@ def test_parity_widget_pipeline(case):
 
 @pytest.mark.skipif(not _GOLDEN.exists(), reason="parity golden not generated")
 @pytest.mark.parametrize("case", _golden_table_cases()[1], ids=lambda c: c["name"])
-def test_parity_table_pipeline(case):
+@_STORES
+def test_parity_table_pipeline(case, columnar):
     """Group-table pipeline (row-filter → value-filter → aggregateTable) parity."""
     posts, _ = _golden_table_cases()
+    posts = _as_store(posts, columnar)
     w = case["widget"]
     tc = w["tableConfig"]
     per_widget = apply_widget_filters(posts, w.get("filters"))
@@ -104,12 +120,14 @@ def _golden_heatmap_cases():
 
 @pytest.mark.skipif(not _GOLDEN.exists(), reason="parity golden not generated")
 @pytest.mark.parametrize("case", _golden_heatmap_cases()[1], ids=lambda c: c["name"])
-def test_parity_heatmap_pipeline(case):
+@_STORES
+def test_parity_heatmap_pipeline(case, columnar):
     """Heatmap (2D categorical pivot) parity: row-filter → value-filter →
     compute_heatmap must match aggregateHeatmap's groupedCategorical output."""
     from api.services.dashboard_aggregate import compute_heatmap
 
     posts, _ = _golden_heatmap_cases()
+    posts = _as_store(posts, columnar)
     w = case["widget"]
     cfg = w["customConfig"]
     per_widget = apply_widget_filters(posts, w.get("filters"))
@@ -0,0 +1,201 @@
+"""Tests for the columnar dashboard core (api/services/dashboard_columns.py).
+
+The column store replaced the cached list of ``build_post_response`` dicts, so
+the contract is: every way of reading it back (row views, materialized rows,
+the wire encoding) yields exactly the dicts the old core held.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+from types import SimpleNamespace
+
+import orjson
+
+from api.services import dashboard_service
+from api.services.dashboard_aggregate import compute_custom
+from api.services.dashboard_cache import _default as core_cache
+from api.services.dashboard_columns import PostColumns, post_dicts, wire_columns
+from api.services.dashboard_scope import apply_filters
+from api.services.dashboard_service import (
+    DETAIL_FIELDS,
+    build_post_response,
+    normalize_post_row,
+    read_post_columns,
+)
+
+
+def _row(i: int, **extra) -> dict:
+    row = {
+        "post_id": f"p{i}",
+        "collection_id": f"c{i % 2}",
+        "platform": ["tiktok", "instagram", "youtube"][i % 3],
+        "channel_handle": None if i == 3 else f"h{i % 4}",
+        "posted_at": dt.datetime(2026, 1, 1 + i, 12, tzinfo=dt.timezone.utc),
+        "title": None,
+        "content": f"body {i}",
+        "post_url": None,
+        "sentiment": [None, "positive", "negative", "unknown"][i % 4],
+        "emotion": "joy",
+        "themes": '["ai", "ml"]' if i % 2 else ["ai"],
+        "entities": [],
+        "language": "en",
+        "content_type": "video",
+        "custom_fields": '{"region": "north"}' if i % 2 else None,
+        "ai_summary": f"summary {i}",
+        "context": None,
+        "detected_brands": ["acme"] if i % 3 else [],
+        "channel_type": "ugc",
+        "media_refs": [{"id": i}] if i % 2 else None,
+        "topic_ids": [i % 2, 7],
+        "like_count": i,
+        "view_count": 10 * i,
+        "comment_count": 2,
+        "share_count": 1,
+    }
+    row.update(extra)
+    return row
+
+
+def _rows(n: int = 12) -> list[dict]:
+    return [_row(i) for i in range(n)]
+
+
+def _columns(rows: list[dict]) -> PostColumns:
+    return PostColumns.from_posts(normalize_post_row(r) for r in rows)
+
+
+def test_normalize_matches_the_pydantic_row():
+    for row in _rows():
+        assert normalize_post_row(row) == build_post_response(row).model_dump()
+
+
+def test_rows_round_trip_byte_identical():
+    rows = _rows()
+    expected = [build_post_response(r).model_dump() for r in rows]
+    cols = _columns(rows)
+
+    assert len(cols) == len(rows)
+    assert orjson.dumps(cols.to_rows()) == orjson.dumps(expected)
+    assert [dict(p) for p in cols] == expected
+    assert cols[3] == expected[3] and cols[-1]["post_id"] == "p11"
+
+
+def test_row_view_reads_like_a_dict():
+    post = _columns(_rows())[1]
+    assert post["themes"] == ["ai", "ml"]
+    post["themes"].append("mutated")  # fresh list per read
+    assert post["themes"] == ["ai", "ml"]
+    assert post.get("missing", "d") == "d"
+    assert "computed" not in post
+    assert {**post}["platform"] == "instagram"
+
+
+def test_take_and_slice_keep_multivalued_runs_aligned():
+    rows = _rows()
+    cols = _columns(rows)
+    expected = [build_post_response(r).model_dump() for r in rows]
+
+    picked = cols.take([5, 0, 5, 11])
+    assert picked.to_rows() == [expected[5], expected[0], expected[5], expected[11]]
+    assert cols[2:6].to_rows() == expected[2:6]
+    assert cols.take([]).to_rows() == []
+
+
+def test_filters_preserve_the_column_store():
+    cols = _columns(_rows())
+    out = apply_filters(cols, {"platform": ["tiktok"], "themes": ["ml"]})
+
+    assert isinstance(out, PostColumns)
+    assert [p["post_id"] for p in out] == ["p3", "p9"]
+
+
+def test_wire_encoding_decodes_to_the_rows():
+    cols = _columns(_rows())
+    wire = cols.to_wire(exclude=DETAIL_FIELDS)
+
+    decoded = []
+    for i in range(wire["length"]):
+        post = {}
+        for name, col in wire["columns"].items():
+            if "offsets" in col:
+                lo, hi = col["offsets"][i], col["offsets"][i + 1]
+                post[name] = [col["dict"][c] for c in col["codes"][lo:hi]]
+            elif "codes" in col:
+                post[name] = col["dict"][col["codes"][i]]
+            else:
+                post[name] = col["values"][i]
+        decoded.append(post)
+
+    assert decoded == cols.to_rows(exclude=DETAIL_FIELDS)
+    assert not set(DETAIL_FIELDS) & set(wire["columns"])
+    assert wire["columns"]["platform"]["dict"] == ["tiktok", "instagram", "youtube"]
+
+
+def test_transformed_posts_keep_extra_columns():
+    posts = [{**normalize_post_row(r), "computed": {"tier": i}} for i, r in enumerate(_rows(3))]
+    wire = wire_columns(posts)
+    assert wire["columns"]["computed"] == {"values": [{"tier": 0}, {"tier": 1}, {"tier": 2}]}
+    assert post_dicts(PostColumns.from_posts(posts)) == posts
+
+
+def test_views_from_one_store_are_gathered_not_reencoded():
+    cols = _columns(_rows())
+    views = [cols[4], cols[1]]
+    gathered = PostColumns.from_posts(views)
+    assert gathered.categorical["platform"][0] is cols.categorical["platform"][0]
+    assert gathered.to_rows() == [dict(cols[4]), dict(cols[1])]
+
+
+def test_group_stats_merges_null_with_literal_unknown():
+    cols = _columns(_rows())
+    rows = cols.to_rows()
+    cfg = {"dimension": "sentiment", "metric": "like_count", "metricAgg": "max", "topN": 2, "includeOthers": True}
+    assert compute_custom(cols, cfg) == compute_custom(rows, cfg)
+    stats = cols.group_stats("sentiment", "post_count", lambda v: "unknown" if v is None else str(v))
+    assert list(stats) == ["unknown", "positive", "negative"]
+    assert stats["unknown"]["count"] == 6
+
+
+class _PagedBQ:
+    def __init__(self, rows, page=5):
+        self.rows, self.page = rows, page
+        self.pages_read = 0
+
+    def iter_query(self, sql, params=None, page_rows=10_000):
+        for i in range(0, len(self.rows), self.page):
+            self.pages_read += 1
+            yield self.rows[i:i + self.page]
+
+
+def test_read_post_columns_streams_and_truncates():
+    bq = _PagedBQ(_rows(12))
+    cols, truncated = read_post_columns(bq, "sql", {}, max_rows=7)
+    assert truncated and len(cols) == 7 and bq.pages_read == 2
+
+    cols, truncated = read_post_columns(_PagedBQ(_rows(12)), "sql", {}, max_rows=12)
+    assert not truncated and len(cols) == 12
+
+
+def test_get_or_build_core_caps_at_the_setting(monkeypatch):
+    class _BQ(_PagedBQ):
+        def query(self, sql, params=None):
+            if "total_posts" in sql:
+                return [{"total_posts": 12}]
+            if "collection_id, original_question" in sql:
+                return [{"collection_id": "c0", "original_question": "Q"}]
+            return []
+
+    core_cache.clear()
+    monkeypatch.setattr(dashboard_service, "get_settings", lambda: SimpleNamespace(dashboard_max_rows=10))
+    core, hit, _, _ = asyncio.run(
+        dashboard_service.get_or_build_core(_BQ(_rows(12)), "agent", ["c0"], "stamp-cols")
+    )
+    core_cache.clear()
+
+    assert not hit
+    assert isinstance(core["posts"], PostColumns) and len(core["posts"]) == 10
+    assert core["truncated"] is True
+    assert core["kpis"]["total_posts"] == 12
+    assert core["collection_names"] == {"c0": "Q"}
@@ -0,0 +1,150 @@
+"""Parity tests for the posting-list filter index (dashboard_filter_index.py).
+
+On a ``PostColumns`` input, ``apply_filters`` / ``apply_widget_filters`` go
+through the index; on a list of dicts they walk ``_keep`` / ``_row_keep``. Both
+must keep exactly the same rows, in the same order, for any filter state.
+"""
+
+from __future__ import annotations
+
+import random
+
+from api.services.dashboard_columns import PostColumns
+from api.services.dashboard_filter_index import filter_index
+from api.services.dashboard_scope import _keep, apply_filters
+from api.services.dashboard_widget_filters import _row_keep, apply_widget_filters
+
+_PLATFORMS = ["tiktok", "instagram", "youtube", "twitter"]
+_SENTIMENTS = ["positive", "negative", "neutral", "", None]
+_THEMES = ["ai", "ml", "data", "cloud", "edge"]
+_REGIONS = ["north", "south", "east"]
+
+
+def _post(rng: random.Random, i: int) -> dict:
+    custom = rng.choice([
+        None,
+        {},
+        {"region": rng.choice(_REGIONS)},
+        {"region": [rng.choice(_REGIONS), rng.choice(_REGIONS)], "score": rng.choice([1, 2.5, True, None])},
+        {"people": [{"role": rng.choice(["ceo", "cto"]), "age": rng.choice([30, None])}, "junk"]},
+        {"people": {"role": "ceo"}},
+    ])
+    return {
+        "post_id": f"p{i}",
+        "collection_id": rng.choice(["c1", "c2"]),
+        "platform": rng.choice(_PLATFORMS),
+        "channel_handle": rng.choice(["h1", "h2", None, ""]),
+        "posted_at": rng.choice([None, "", f"2026-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00+00:00"]),
+        "title": None,
+        "content": f"post {i}",
+        "post_url": None,
+        "sentiment": rng.choice(_SENTIMENTS),
+        "emotion": rng.choice(["joy", "anger", None]),
+        "themes": rng.sample(_THEMES, rng.randint(0, 3)),
+        "entities": rng.sample(["acme", "globex", "initech"], rng.randint(0, 2)),
+        "language": rng.choice(["en", "es", None]),
+        "content_type": rng.choice(["video", "image"]),
+        "custom_fields": custom,
+        "ai_summary": None,
+        "context": None,
+        "detected_brands": rng.sample(["acme", "umbrella"], rng.randint(0, 2)),
+        "channel_type": rng.choice(["ugc", "brand", None]),
+        "media_refs": None,
+        "topic_ids": rng.sample([1, 2, 3, 7], rng.randint(0, 2)),
+        "like_count": rng.randint(0, 500),
+        "view_count": rng.randint(0, 10_000),
+        "comment_count": rng.randint(0, 50),
+        "share_count": rng.randint(0, 20),
+    }
+
+
+def _filters(rng: random.Random, widget: bool) -> dict:
+    f: dict = {}
+
+    def maybe(key, pool, k=2):
+        if rng.random() < 0.4:
+            f[key] = rng.sample(pool, rng.randint(0, min(k, len(pool))))
+
+    maybe("platform", _PLATFORMS + ["mastodon"])
+    maybe("sentiment", ["positive", "negative", "", "neutral"])
+    maybe("emotion", ["joy", "anger"])
+    maybe("language", ["en", "es", ""])
+    maybe("content_type", ["video", "image"])
+    maybe("collection", ["c1", "c2", "c9"])
+    maybe("channels", ["h1", "h2", ""])
+    maybe("themes", _THEMES + ["nope"], 3)
+    maybe("entities", ["acme", "globex"])
+    maybe("topics", [1, 2, 7, "7"])
+    if rng.random() < 0.4:
+        day = lambda: f"2026-01-{rng.randint(1, 28):02d}"  # noqa: E731
+        f["date_range"] = {"from": rng.choice([None, day()]), "to": rng.choice([None, day()])}
+    if widget:
+        maybe("channel_type", ["ugc", "brand", ""])
+        maybe("brands", ["acme", "umbrella"])
+        if rng.random() < 0.5:
+            f["custom_fields"] = {
+                name: rng.sample(pool, rng.randint(0, 2))
+                for name, pool in [
+                    ("region", _REGIONS + ["west"]),
+                    ("score", ["1", "2.5", "true", "null"]),
+                    ("people.role", ["ceo", "cto"]),
+                    ("people.age", ["30", "null", "undefined"]),
+                ]
+                if rng.random() < 0.5
+            }
+        if rng.random() < 0.3:
+            f["conditions"] = [rng.choice([
+                {"field": "like_count", "operator": "greaterThan", "value": 200},
+                {"field": "posted_at", "operator": "after", "value": "2026-01-10"},
+                {"field": "platform", "operator": "isNoneOf", "values": ["tiktok"]},
+                {"field": "text", "operator": "contains", "value": "1"},
+            ])]
+    return f
+
+
+def _ids(posts) -> list[str]:
+    return [p["post_id"] for p in posts]
+
+
+def test_dashboard_filters_match_the_row_predicate():
+    rng = random.Random(7)
+    rows = [_post(rng, i) for i in range(400)]
+    cols = PostColumns.from_posts(rows)
+    for _ in range(300):
+        filters = _filters(rng, widget=False)
+        out = apply_filters(cols, filters)
+        assert isinstance(out, PostColumns)
+        assert _ids(out) == [p["post_id"] for p in rows if _keep(p, filters)], filters
+
+
+def test_widget_filters_match_the_row_predicate():
+    rng = random.Random(11)
+    rows = [_post(rng, i) for i in range(400)]
+    cols = PostColumns.from_posts(rows)
+    for _ in range(300):
+        filters = _filters(rng, widget=True)
+        out = apply_widget_filters(cols, filters)
+        assert isinstance(out, PostColumns)
+        assert _ids(out) == [p["post_id"] for p in rows if _row_keep(p, filters)], filters
+
+
+def test_index_is_built_once_per_store():
+    rng = random.Random(3)
+    cols = PostColumns.from_posts([_post(rng, i) for i in range(50)])
+    index = filter_index(cols)
+    apply_filters(cols, {"platform": ["tiktok"]})
+    apply_widget_filters(cols, {"custom_fields": {"region": ["north"]}})
+    assert filter_index(cols) is index
+    assert ("scalar", "platform") in index._postings
+    assert ("derived", "custom_fields", "region") in index._postings
+
+    sub = apply_filters(cols, {"themes": ["ai"]})
+    assert filter_index(sub) is not index  # a filtered set indexes its own rows
+
+
+def test_string_selection_keeps_the_row_semantics():
+    rng = random.Random(5)
+    rows = [_post(rng, i) for i in range(60)]
+    cols = PostColumns.from_posts(rows)
+    filters = {"platform": "tiktok instagram"}  # substring test in the row walk
+    assert _ids(apply_filters(cols, filters)) == [p["post_id"] for p in rows if _keep(p, filters)]
@@ -13,7 +13,13 @@ from fastapi.testclient import TestClient
 
 from api.auth.dependencies import CurrentUser, get_current_user
 from api.routers import dashboard as dash_router
-from api.services.dashboard_aggregate import compute_custom
+from api.services import dashboard_cache, dashboard_studio_agg
+from api.services.dashboard_aggregate import (
+    build_feed_data_map,
+    build_table_data_map,
+    build_widget_data_map,
+    compute_custom,
+)
 
 _POSTS = [
     {"post_id": "a", "platform": "twitter",  "sentiment": "positive",
@@ -68,6 +74,8 @@ class _FakeFS:
 
 @pytest.fixture
 def client(monkeypatch):
+    dashboard_cache._studio_filtered.clear()
+    dashboard_cache._studio_widgets.clear()
     fs = _FakeFS()
     monkeypatch.setattr(dash_router, "get_fs", lambda: fs)
     monkeypatch.setattr(dash_router, "get_bq", lambda: object())
@@ -217,3 +225,74 @@ def test_different_filters_produce_different_results(client):
     assert wd1["w-nc"]["value"] != wd2["w-nc"]["value"]
     assert wd1["w-nc"]["value"] == 150   # twitter
     assert wd2["w-nc"]["value"] == 200   # youtube
+
+
+# --- Per-widget memoization ---
+
+_TABLE = {"i": "w-table", "aggregation": "custom", "chartType": "table",
+          "tableConfig": {"columns": [
+              {"id": "d", "kind": "dimension", "dimension": "platform"},
+              {"id": "m", "kind": "metric", "metric": "view_count", "agg": "sum"},
+          ], "sortBy": "m"}}
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Record which widgets are actually aggregated (cache misses)."""
+    seen: list[str] = []
+    real = dashboard_studio_agg.compute_widget
+
+    def _spy(posts, widget):
+        seen.append(widget["i"])
+        return real(posts, widget)
+
+    monkeypatch.setattr(dashboard_studio_agg, "compute_widget", _spy)
+    return seen
+
+
+def test_layout_matches_the_map_builders(client):
+    layout = _LAYOUT + [_TABLE]
+    body = _post(client, layout=layout).json()
+    assert body["widgetData"] == build_widget_data_map(_POSTS, layout)
+    assert body["tableData"] == build_table_data_map(_POSTS, layout)
+    assert body["feedData"] == {
+        wid: [p["post_id"] for p in plist] for wid, plist in build_feed_data_map(_POSTS, layout).items()
+    }
+    assert set(body["tableData"]) == {"w-table"}
+
+
+def test_editing_one_widget_recomputes_only_that_widget(client, computed):
+    _post(client)
+    assert sorted(computed) == sorted(w["i"] for w in _LAYOUT)
+
+    computed.clear()
+    edited = [dict(w) for w in _LAYOUT]
+    edited[0] = {**edited[0], "customConfig": {"dimension": "sentiment", "metric": "post_count"}}
+    body = _post(client, layout=edited + [_TABLE]).json()
+    assert computed == ["w-bar", "w-table"]
+    assert body["widgetData"]["w-bar"]["labels"] == ["positive", "negative"]
+    assert body["widgetData"]["w-nc"]["value"] == 350
+
+
+def test_moving_widgets_is_served_from_cache(client, computed):
+    _post(client)
+    computed.clear()
+    moved = [{**w, "x": 3, "y": 7, "w": 6} for w in reversed(_LAYOUT)]
+    body = _post(client, layout=moved).json()
+    assert computed == []
+    assert body["widgetData"]["w-nc"]["value"] == 350
+
+
+def test_filtered_set_is_shared_across_layouts(client, monkeypatch):
+    calls = []
+    real = dashboard_studio_agg.apply_filters
+    monkeypatch.setattr(
+        dashboard_studio_agg, "apply_filters", lambda posts, f: calls.append(f) or real(posts, f)
+    )
+    _post(client, filters={"platform": ["twitter"]})
+    body = _post(client, filters={"platform": ["twitter"]}, layout=[_TABLE]).json()
+    assert len(calls) == 1
+    assert body["tableData"]["w-table"][0]["m"] == 150
+
+    _post(client, filters={"platform": ["youtube"]}, layout=[_TABLE])
+    assert len(calls) == 2
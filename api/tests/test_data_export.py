@@ -0,0 +1,236 @@
+"""File-backed export_data (api/services/data_export.py).
+
+The export used to return every row through the tool result. It must now
+stream the query page by page into a GCS file, hand the agent only a preview
+and a handle, track progress in Firestore, and serve the file only to its
+owner once it's ready.
+"""
+
+import asyncio
+import csv
+import io
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from api.agent.tools import export_data as export_tool
+from api.auth.dependencies import CurrentUser
+from api.routers import exports as exports_router
+from api.services import artifact_service, data_export
+
+USER = CurrentUser(uid="u1", email="u1@x.com", display_name="u1", org_id=None, org_role=None)
+
+
+class _File(io.BytesIO):
+    def __init__(self, store, name):
+        super().__init__()
+        self._store, self._name = store, name
+
+    def close(self):
+        self._store[self._name] = self.getvalue()
+        super().close()
+
+
+class _Blob:
+    def __init__(self, store, name, readers):
+        self._store, self.name, self._readers = store, name, readers
+
+    def open(self, mode, content_type=None):
+        if mode == "rb":
+            self._readers.append(io.BytesIO(self._store[self.name]))
+            return self._readers[-1]
+        return _File(self._store, self.name)
+
+    def exists(self):
+        return self.name in self._store
+
+
+class _GCS:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.readers: list[io.BytesIO] = []
+
+    def bucket(self, name):
+        return SimpleNamespace(blob=lambda path: _Blob(self.objects, path, self.readers))
+
+
+class _FS:
+    def __init__(self):
+        self.exports: dict[str, dict] = {}
+
+    def create_data_export(self, export_id, data):
+        self.exports[export_id] = dict(data)
+
+    def get_data_export(self, export_id):
+        doc = self.exports.get(export_id)
+        return {**doc, "export_id": export_id} if doc else None
+
+    def update_data_export(self, export_id, fields):
+        self.exports[export_id].update(fields)
+
+
+def _field(name, field_type="STRING", mode="NULLABLE"):
+    return SimpleNamespace(name=name, field_type=field_type, mode=mode)
+
+
+SCHEMA = [
+    _field("post_id"),
+    _field("themes", mode="REPEATED"),
+    _field("entities", mode="REPEATED"),
+    _field("media_refs", "JSON"),
+    _field("views", "INTEGER"),
+]
+
+
+class _BQ:
+    def __init__(self, pages):
+        self.pages = pages
+        self.page_rows = None
+
+    def iter_query_from_file(self, sql_file, params, page_rows, on_schema=None):
+        self.page_rows = page_rows
+        if on_schema is not None:
+            on_schema(SCHEMA)
+        for page in self.pages:
+            yield [dict(r) for r in page]
+
+
+class _Request:
+    """Starlette request stand-in whose client leaves after `chunks` reads."""
+
+    def __init__(self, chunks=None):
+        self.chunks = chunks
+
+    async def is_disconnected(self):
+        if self.chunks is None:
+            return False
+        self.chunks -= 1
+        return self.chunks < 0
+
+
+def _post(i):
+    return {"post_id": f"p{i}", "themes": ["a", "b"], "entities": [], "media_refs": [{"u": i}], "views": i}
+
+
+async def _drain(response):
+    return [chunk async for chunk in response.body_iterator]
+
+
+@pytest.fixture
+def env(monkeypatch):
+    gcs, fs = _GCS(), _FS()
+    bq = _BQ([[_post(1), _post(2)], [_post(3)]])
+    monkeypatch.setattr(data_export, "get_gcs", lambda: gcs)
+    monkeypatch.setattr(data_export, "get_fs", lambda: fs)
+    monkeypatch.setattr(data_export, "get_bq", lambda: bq)
+    monkeypatch.setattr(exports_router, "get_gcs", lambda: gcs)
+    monkeypatch.setattr(exports_router, "get_fs", lambda: fs)
+    return SimpleNamespace(gcs=gcs, fs=fs, bq=bq)
+
+
+def test_export_streams_pages_into_a_csv_file(env):
+    job = data_export.start_export(["c1"], user_id="u1")
+    assert job.wait(5) and job.status == data_export.READY
+
+    rows = list(csv.DictReader(io.StringIO(env.gcs.objects[job.gcs_path].decode())))
+    assert [r["post_id"] for r in rows] == ["p1", "p2", "p3"]
+    assert rows[0]["themes"] == "a; b" and rows[0]["media_refs"] == '[{"u": 1}]'
+
+    assert job.rows_written == 3 and len(job.preview) == 3
+    doc = env.fs.exports[job.export_id]
+    assert doc["status"] == "ready" and doc["rows_written"] == 3
+    assert doc["bytes_written"] == len(env.gcs.objects[job.gcs_path])
+
+
+def test_empty_result_still_writes_the_csv_header(env):
+    env.bq.pages = []
+    job = data_export.start_export(["c1"], user_id="u1")
+    assert job.wait(5) and job.status == data_export.READY
+
+    assert env.gcs.objects[job.gcs_path].decode().splitlines() == [
+        "post_id,themes,entities,media_refs,views",
+    ]
+    assert job.rows_written == 0 and job.column_names == [f.name for f in SCHEMA]
+
+
+def test_parquet_schema_comes_from_the_result_not_the_first_page(env):
+    pq = pytest.importorskip("pyarrow.parquet")
+    first = {**_post(1), "views": None}
+    env.bq.pages = [[first], [_post(2)]]
+    job = data_export.start_export(["c1"], "parquet", user_id="u1")
+    assert job.wait(5) and job.status == data_export.READY
+
+    table = pq.read_table(io.BytesIO(env.gcs.objects[job.gcs_path]))
+    assert str(table.schema.field("views").type) == "int64"
+    assert str(table.schema.field("themes").type) == "string"
+    assert table.column("views").to_pylist() == [None, 2]
+
+
+def test_failed_query_marks_export_failed(env):
+    env.bq.pages = [[_post(1)], None]  # second page blows up mid-stream
+    job = data_export.start_export(["c1"], user_id="u1")
+    assert job.wait(5) and job.status == data_export.FAILED
+    assert env.fs.exports[job.export_id]["status"] == "failed"
+
+
+def test_missing_optional_writer_is_a_format_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "openpyxl", None)
+    with pytest.raises(data_export.ExportFormatError):
+        data_export.start_export(["c1"], "xlsx", user_id="u1")
+    with pytest.raises(data_export.ExportFormatError):
+        data_export.start_export(["c1"], "json", user_id="u1")
+
+
+def test_tool_returns_preview_and_handle_not_all_rows(env, monkeypatch):
+    env.bq.pages = [[_post(i) for i in range(50)]]
+    monkeypatch.setattr(export_tool, "get_settings", lambda: SimpleNamespace(data_export_wait_sec=5))
+    ctx = SimpleNamespace(state={"user_id": "u1", "session_id": "s1"})
+    result = export_tool.export_data(collection_ids=["c1"], tool_context=ctx)
+
+    assert result["status"] == "success" and result["export_status"] == "ready"
+    assert result["row_count"] == 50 and len(result["rows"]) == 20
+    assert env.fs.exports[result["export_id"]]["session_id"] == "s1"
+
+    payload = {}
+    monkeypatch.setattr(artifact_service, "get_fs", lambda: SimpleNamespace(
+        create_artifact=lambda aid, data: payload.update(data["payload"])))
+    artifact_service.persist_tool_result_artifact("export_data", result, "u1", None, "s1")
+    assert payload["export_id"] == result["export_id"] and payload["truncated"] is True
+
+
+def test_download_is_owner_only_and_waits_for_ready(env, monkeypatch):
+    monkeypatch.setattr(data_export, "signed_url", lambda export: "https://signed/" + export["gcs_path"])
+    job = data_export.start_export(["c1"], user_id="u1")
+    job.wait(5)
+
+    other = CurrentUser(uid="u2", email="u2@x.com", display_name="u2", org_id=None, org_role=None)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(exports_router.download_export(job.export_id, _Request(), user=other))
+    assert exc.value.status_code == 403
+
+    status = asyncio.run(exports_router.get_export_status(job.export_id, user=USER))
+    assert status["status"] == "ready" and status["rows_written"] == 3
+    assert status["download_url"] == f"https://signed/{job.gcs_path}"
+
+    response = asyncio.run(exports_router.download_export(job.export_id, _Request(), user=USER))
+    assert response.headers["content-disposition"].endswith('.csv"')
+    assert b"".join(asyncio.run(_drain(response))) == env.gcs.objects[job.gcs_path]
+
+    env.fs.exports[job.export_id]["status"] = "running"
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(exports_router.download_export(job.export_id, _Request(), user=USER))
+    assert exc.value.status_code == 409
+
+
+def test_download_stops_reading_when_the_client_disconnects(env):
+    job = data_export.start_export(["c1"], user_id="u1")
+    job.wait(5)
+    env.gcs.objects[job.gcs_path] = b"x" * (3 * exports_router._CHUNK_BYTES)
+
+    response = asyncio.run(exports_router.download_export(job.export_id, _Request(chunks=1), user=USER))
+    chunks = asyncio.run(_drain(response))
+
+    assert len(chunks) == 1
+    assert env.gcs.readers[-1].closed
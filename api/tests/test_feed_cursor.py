@@ -0,0 +1,128 @@
+"""Keyset (cursor) pagination for POST /feed.
+
+Deep pages used to be `LIMIT @limit OFFSET @offset`, re-sorting and discarding
+every skipped row and recomputing the window totals. A page fetched with the
+previous page's `next_cursor` must instead filter strictly after the last
+row's sort key, skip the totals, and fall back to OFFSET once the data (the
+freshness stamp) has moved under the cursor.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from api.auth.dependencies import CurrentUser
+from api.routers import feed as feed_router
+from api.routers.feed import _SORT_KEYS_TVF, _build_legacy_sql, _build_tvf_sql
+from api.schemas.requests import MultiFeedRequest
+from api.services import feed_cursor
+
+USER = CurrentUser(uid="u1", email="u1@x.com", display_name="u1", org_id=None, org_role=None)
+T = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+
+def _req(**kw) -> MultiFeedRequest:
+    base = dict(collection_ids=["c1"], agent_id="agent-1", limit=2)
+    base.update(kw)
+    return MultiFeedRequest(**base)
+
+
+def _cursor(**kw) -> feed_cursor.FeedCursor:
+    base = dict(sort="views", values=[10, T.isoformat(), "p2"], stamp="s1",
+                filter_hash="h", position=2, total=5, total_views=100, total_sources=1)
+    base.update(kw)
+    return feed_cursor.FeedCursor(**base)
+
+
+def test_cursor_round_trip_and_rejects_tampering():
+    token = feed_cursor.encode(_cursor())
+    assert feed_cursor.decode(token, _SORT_KEYS_TVF) == _cursor()
+
+    bad = feed_cursor.encode(_cursor(values=["ten", T.isoformat(), "p2"]))
+    for token in (bad, "not-a-cursor", feed_cursor.encode(_cursor(sort="nope"))):
+        with pytest.raises(ValueError):
+            feed_cursor.decode(token, _SORT_KEYS_TVF)
+
+
+@pytest.mark.parametrize("builder", [_build_tvf_sql, _build_legacy_sql])
+def test_cursor_page_is_keyset_without_offset_or_totals(builder):
+    first_sql, first_params = builder(_req(offset=4))
+    assert "LIMIT @limit OFFSET @offset" in first_sql and first_params["offset"] == 4
+    assert "_total_sources" in first_sql and "_sort_k2" in first_sql
+
+    sql, params = builder(_req(offset=4), _cursor())
+    assert "OFFSET" not in sql and "offset" not in params
+    assert "OVER()" not in sql
+    assert "TIMESTAMP(@cursor_k1)" in sql
+    assert params["cursor_k0"] == 10 and params["cursor_k2"] == "p2"
+
+
+def test_after_sql_expands_keyset_predicate():
+    keys = _SORT_KEYS_TVF["sentiment"]
+    params: dict = {}
+    sql = feed_cursor.after_sql(keys, _cursor(sort="sentiment", values=["neg", T.isoformat(), "p"]), params)
+    # sentiment ascending, then posted_at / post_id descending
+    assert sql.count(" OR ") == 2
+    assert "COALESCE(base.sentiment, '') > @cursor_k0" in sql
+    assert "base.post_id < @cursor_k2" in sql
+
+
+class _FS:
+    def __init__(self):
+        self.updated_at = "2026-05-01T00:00:00"
+
+    def get_collection_status(self, cid):
+        return {"user_id": "u1", "updated_at": self.updated_at}
+
+
+class _BQ:
+    def __init__(self, pages):
+        self.pages, self.calls = list(pages), []
+
+    def query(self, sql, params):
+        self.calls.append((sql, params))
+        return self.pages.pop(0)
+
+
+def _row(post_id, views, with_totals=True):
+    row = {"post_id": post_id, "platform": "tiktok", "views": views,
+           "_sort_k0": views, "_sort_k1": T, "_sort_k2": post_id}
+    if with_totals:
+        row.update(_total=5, _total_views=60, _total_sources=1)
+    return row
+
+
+def test_feed_pages_by_cursor_and_restarts_on_stale_stamp(monkeypatch):
+    fs = _FS()
+    bq = _BQ([
+        [_row("p1", 30), _row("p2", 20)],
+        [_row("p3", 5, with_totals=False), _row("p4", 3, with_totals=False)],
+        [_row("p5", 2)],
+    ])
+    monkeypatch.setattr(feed_router, "get_fs", lambda: fs)
+    monkeypatch.setattr(feed_router, "get_bq", lambda: bq)
+
+    def _page(**kw):
+        return asyncio.run(feed_router.get_multi_collection_feed(_req(**kw), user=USER))
+
+    first = _page()
+    assert first.next_cursor and first.total == 5
+
+    second = _page(cursor=first.next_cursor)
+    sql, params = bq.calls[1]
+    assert "OFFSET" not in sql and params["cursor_k2"] == "p2"
+    assert [p.post_id for p in second.posts] == ["p3", "p4"]
+    assert (second.offset, second.total, second.total_views) == (2, 5, 60)
+
+    # Data changed under the cursor: this page is served by OFFSET instead.
+    fs.updated_at = "2026-05-02T00:00:00"
+    third = _page(cursor=second.next_cursor)
+    sql, params = bq.calls[2]
+    assert "OFFSET" in sql and params["offset"] == 4
+    assert third.offset == 4 and third.next_cursor is None
+
+    with pytest.raises(HTTPException) as exc:
+        _page(cursor="garbage")
+    assert exc.value.status_code == 400
@@ -16,6 +16,8 @@ from __future__ import annotations
 
 import io
 
+from PIL import Image
+
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -62,6 +64,14 @@ class FakeGCS:
         return self._bucket
 
 
+@pytest.fixture(autouse=True)
+def _clear_meta_cache():
+    # Every test serves "abc/clip_0.mp4" with different bytes.
+    media_router._META_CACHE.clear()
+    yield
+    media_router._META_CACHE.clear()
+
+
 @pytest.fixture
 def make_client(monkeypatch):
     def _make(data: bytes, content_type: str | None = "application/octet-stream"):
@@ -123,3 +133,114 @@ def test_unsatisfiable_range_416(make_client):
     client = make_client(b"A" * 100)
     resp = client.get("/media/abc/clip_0.mp4", headers={"Range": "bytes=500-600"})
     assert resp.status_code == 416, resp.text
+
+
+# ---------------------------------------------------------------------------
+# Renditions (?variant=)
+# ---------------------------------------------------------------------------
+
+
+class NamedBlob(FakeBlob):
+    def __init__(self, bucket: "NamedBucket", name: str):
+        self._bucket, self.name = bucket, name
+        stored = bucket.objects.get(name)
+        super().__init__(stored[0] if stored else None, stored[1] if stored else None)
+        self.size = len(self._data) if stored else None
+        self.cache_control = None
+
+    def download_as_bytes(self) -> bytes:
+        return self._data
+
+    def upload_from_string(self, data: bytes, content_type: str | None = None) -> None:
+        self._bucket.objects[self.name] = (data, content_type)
+
+
+class NamedBucket:
+    def __init__(self):
+        self.objects: dict[str, tuple[bytes, str | None]] = {}
+        self.lookups = 0
+
+    def blob(self, name: str) -> NamedBlob:
+        self.lookups += 1
+        return NamedBlob(self, name)
+
+    def get_blob(self, name: str) -> NamedBlob | None:
+        return NamedBlob(self, name) if name in self.objects else None
+
+
+@pytest.fixture
+def named_client(monkeypatch):
+    bucket = NamedBucket()
+    gcs = FakeGCS(FakeBlob(b"", None))
+    gcs._bucket = bucket
+    monkeypatch.setattr(media_router, "get_gcs", lambda: gcs)
+    app = FastAPI()
+    app.include_router(media_router.router)
+    return bucket, TestClient(app)
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(out, "JPEG")
+    return out.getvalue()
+
+
+def test_thumb_variant_is_generated_once_and_cached(named_client):
+    bucket, client = named_client
+    bucket.objects["media/sha256/ab/ab12.jpg"] = (_jpeg(1200, 800), "image/jpeg")
+
+    resp = client.get("/media/media/sha256/ab/ab12.jpg?variant=thumb")
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"] == "image/webp"
+    assert "immutable" in resp.headers["cache-control"]
+    assert Image.open(io.BytesIO(resp.content)).size == (320, 213)
+    assert "renditions/card/media/sha256/ab/ab12.jpg.webp" in bucket.objects
+
+    lookups = bucket.lookups
+    assert client.get("/media/media/sha256/ab/ab12.jpg?variant=thumb").status_code == 200
+    assert bucket.lookups - lookups == 1  # only the blob handle for the read
+
+
+def test_unknown_variant_400_and_video_without_poster_404(named_client, monkeypatch):
+    bucket, client = named_client
+    bucket.objects["media/sha256/ab/ab12.mp4"] = (b"\x00" * 10, "video/mp4")
+    monkeypatch.setattr(media_router.media_renditions, "posters_available", lambda: False)
+
+    assert client.get("/media/media/sha256/ab/ab12.mp4?variant=huge").status_code == 400
+    assert client.get("/media/media/sha256/ab/ab12.mp4?variant=poster").status_code == 404
+    assert client.get("/media/media/sha256/ab/ab12.mp4").status_code == 200
+
+
+def test_variants_only_for_stored_media(named_client):
+    bucket, client = named_client
+    bucket.objects["media/sha256/ab/ab12.jpg"] = (_jpeg(1200, 800), "image/jpeg")
+    assert client.get("/media/media/sha256/ab/ab12.jpg?variant=thumb").status_code == 200
+    before = set(bucket.objects)
+
+    for path in (
+        "renditions/thumb/media/sha256/ab/ab12.jpg.webp",
+        "media/staging/0123",
+        "media/by-url/0123",
+        "elsewhere/deep/photo.jpg",
+    ):
+        assert client.get(f"/media/{path}?variant=card").status_code == 400, path
+    assert set(bucket.objects) == before
+
+
+def test_large_image_variant_is_not_rendered_on_request(named_client, monkeypatch):
+    bucket, client = named_client
+    monkeypatch.setattr(media_router.media_renditions, "MAX_IMAGE_SOURCE_BYTES", 100)
+    bucket.objects["c1/p1_0.jpg"] = (_jpeg(1200, 800), "image/jpeg")
+
+    resp = client.get("/media/c1/p1_0.jpg?variant=thumb")
+    assert resp.status_code == 200 and resp.headers["content-type"] == "image/jpeg"
+    assert list(bucket.objects) == ["c1/p1_0.jpg"]
+
+
+def test_undecodable_image_variant_falls_back_to_original(named_client):
+    bucket, client = named_client
+    bucket.objects["media/sha256/ab/ab12.jpg"] = (b"not really a jpeg", "image/jpeg")
+    resp = client.get("/media/media/sha256/ab/ab12.jpg?variant=card")
+    assert resp.status_code == 200
+    assert resp.content == b"not really a jpeg"
+    assert resp.headers["cache-control"] == "public, max-age=86400"
@@ -0,0 +1,336 @@
+"""Tests for the append-only Firestore session store."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.cloud import firestore
+from google.cloud.firestore_v1.field_path import FieldPath
+from google.genai import types
+
+from api.auth.session_service import FirestoreSessionService
+
+
+# ─── In-memory Firestore (just what the session store uses) ──────────────
+
+
+class _Snap:
+    def __init__(self, ref, data):
+        self.reference, self.id = ref, ref.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class _Query:
+    def __init__(self, db, path, filters=(), order=None, desc=False, limit=None):
+        self._db, self._path = db, path
+        self._filters, self._order, self._desc, self._limit = filters, order, desc, limit
+
+    def _with(self, **kw):
+        args = dict(filters=self._filters, order=self._order, desc=self._desc, limit=self._limit)
+        args.update(kw)
+        return _Query(self._db, self._path, **args)
+
+    def where(self, field, op, value):
+        return self._with(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field, direction="ASCENDING"):
+        return self._with(order=field, desc=direction == firestore.Query.DESCENDING)
+
+    def limit(self, n):
+        return self._with(limit=n)
+
+    def stream(self):
+        ops = {"==": lambda a, b: a == b, "<": lambda a, b: a < b}
+        docs = [
+            (key[-1], data) for key, data in self._db.docs.items()
+            if key[:-1] == self._path
+            and all(ops[op](data.get(f), v) for f, op, v in self._filters)
+        ]
+        if self._order:
+            docs.sort(key=lambda d: d[1][self._order], reverse=self._desc)
+        self._db.reads += len(docs[: self._limit] if self._limit else docs)
+        for doc_id, _ in docs[: self._limit] if self._limit else docs:
+            yield _Snap(_Doc(self._db, self._path + (doc_id,)), self._db.docs[self._path + (doc_id,)])
+
+
+class _Collection(_Query):
+    def document(self, doc_id):
+        return _Doc(self._db, self._path + (doc_id,))
+
+
+class _Doc:
+    def __init__(self, db, path):
+        self._db, self._path, self.id = db, path, path[-1]
+
+    def collection(self, name):
+        return _Collection(self._db, self._path + (name,))
+
+    def get(self):
+        self._db.reads += 1
+        return _Snap(self, self._db.docs.get(self._path))
+
+    def set(self, data):
+        self._db.docs[self._path] = copy.deepcopy(data)
+
+    def update(self, fields):
+        doc = self._db.docs[self._path]  # KeyError ~ NotFound
+        for path, value in fields.items():
+            parts = FieldPath.from_api_repr(path).parts
+            target = doc
+            for p in parts[:-1]:
+                target = target.setdefault(p, {})
+            if value is firestore.DELETE_FIELD:
+                target.pop(parts[-1], None)
+            else:
+                target[parts[-1]] = copy.deepcopy(value)
+
+    def delete(self):
+        self._db.docs.pop(self._path, None)
+
+
+class _Batch:
+    def __init__(self, db):
+        self._db, self._ops = db, []
+
+    def set(self, ref, data):
+        self._ops.append(lambda: ref.set(data))
+
+    def update(self, ref, fields):
+        self._ops.append(lambda: ref.update(fields))
+
+    def delete(self, ref):
+        self._ops.append(ref.delete)
+
+    def commit(self):
+        self._db.writes += len(self._ops)
+        for op in self._ops:
+            op()
+
+
+class _FakeFirestore:
+    def __init__(self):
+        self.docs: dict[tuple, dict] = {}
+        self.reads = self.writes = 0
+
+    def collection(self, name):
+        return _Collection(self, (name,))
+
+    def batch(self):
+        return _Batch(self)
+
+
+# ─── Helpers ─────────────────────────────────────────────────────────────
+
+
+def _text(role, text):
+    return types.Content(role=role, parts=[types.Part.from_text(text=text)])
+
+
+def _turn(session_id: str, n: int) -> list[Event]:
+    """One user turn: the user message, a tool round-trip, the model answer."""
+    call = types.Part.from_function_call(name="lookup", args={"q": n})
+    result = types.Part.from_function_response(name="lookup", response={"rows": [n]})
+    return [
+        Event(author="user", invocation_id=f"i{n}", content=_text("user", f"question {n}")),
+        Event(author="agent", invocation_id=f"i{n}", content=types.Content(role="model", parts=[call])),
+        Event(author="agent", invocation_id=f"i{n}", content=types.Content(role="user", parts=[result])),
+        Event(author="agent", invocation_id=f"i{n}", content=_text("model", f"answer {n}"),
+              actions=EventActions(state_delta={"turns": n + 1})),
+    ]
+
+
+def _svc(db=None) -> FirestoreSessionService:
+    return FirestoreSessionService(db=db or _FakeFirestore())
+
+
+def _get(svc, sid="s1", user="u1", config=None):
+    return asyncio.run(svc.get_session(app_name="app", user_id=user, session_id=sid, config=config))
+
+
+def _chat(svc, turns: range, sid="s1"):
+    """Run `turns` as separate requests: load, append, flush."""
+    for n in turns:
+        session = _get(svc, sid)
+        for event in _turn(sid, n):
+            asyncio.run(svc.append_event(session, event))
+        svc.flush(session)
+
+
+def _events(db, sid="s1"):
+    return sorted(
+        (data for key, data in db.docs.items() if key[:3] == ("sessions", sid, "events")),
+        key=lambda d: d["seq"],
+    )
+
+
+def _new(svc, sid="s1", **state):
+    return asyncio.run(svc.create_session(app_name="app", user_id="u1", session_id=sid, state=state))
+
+
+# ─── Tests ───────────────────────────────────────────────────────────────
+
+
+def test_flush_appends_only_new_events():
+    db = _FakeFirestore()
+    svc = _svc(db)
+    _new(svc)
+    _chat(svc, range(3))
+
+    records = _events(db)
+    assert [r["seq"] for r in records] == list(range(12))
+    assert [r["user_turn"] for r in records[:4]] == [True, False, False, False]
+    doc = db.docs[("sessions", "s1")]
+    assert doc["event_count"] == 12 and "events_json" not in doc
+    assert doc["state"]["turns"] == 3
+
+    db.writes = 0
+    _chat(svc, range(3, 4))
+    assert db.writes == 5  # four event docs + one session-doc update
+
+
+def test_round_trip_full_history():
+    svc = _svc()
+    _new(svc, theme="dark")
+    _chat(svc, range(3))
+
+    session = _get(svc, config=GetSessionConfig())
+    assert [e.content.parts[0].text for e in session.events[::4]] == ["question 0", "question 1", "question 2"]
+    assert session.events[1].content.parts[0].function_call.args == {"q": 0}
+    assert session.state == {"theme": "dark", "turns": 3}
+
+
+def test_default_load_is_the_recent_user_turn_window():
+    svc = _svc()
+    svc._load_user_turns = 2
+    _new(svc)
+    _chat(svc, range(5))
+
+    session = _get(svc)
+    texts = [e.content.parts[0].text for e in session.events if e.content.parts[0].text]
+    assert texts == ["question 3", "answer 3", "question 4", "answer 4"]
+
+    svc._load_max_events = 3
+    svc._session_cache.clear()
+    assert len(_get(svc).events) == 3
+
+
+def test_trimmed_and_restored_window_does_not_duplicate():
+    db = _FakeFirestore()
+    svc = _svc(db)
+    _new(svc)
+    _chat(svc, range(4))
+
+    session = _get(svc)
+    prefix, session.events = session.events[:4], session.events[4:]  # LLM trim
+    for event in _turn("s1", 4):
+        asyncio.run(svc.append_event(session, event))
+    session.events = prefix + session.events
+    svc.flush(session)
+
+    records = _events(db)
+    assert len(records) == 20
+    assert len({r["event"]["id"] for r in records}) == 20
+
+
+def test_state_is_written_as_a_delta():
+    db = _FakeFirestore()
+    svc = _svc(db)
+    session = _new(svc, keep=1, drop=2, title="New Session")
+
+    session.state["title"] = "Named"
+    del session.state["drop"]
+    db.docs[("sessions", "s1")]["state"]["other_writer"] = True  # e.g. a concurrent update
+    svc._write_session(session)
+
+    assert db.docs[("sessions", "s1")]["state"] == {"keep": 1, "title": "Named", "other_writer": True}
+
+
+def test_legacy_events_json_is_read_and_migrated():
+    db = _FakeFirestore()
+    legacy = []
+    for n in range(2):
+        for e in _turn("s1", n):
+            legacy.append(e.model_dump(mode="json", exclude_none=True))
+    db.docs[("sessions", "s1")] = {
+        "session_id": "s1", "app_name": "app", "user_id": "u1",
+        "state": {"turns": 2}, "last_update_time": 1.0, "events_json": legacy,
+    }
+    svc = _svc(db)
+    svc._load_user_turns = 1
+
+    session = _get(svc)
+    assert len(session.events) == 4
+    for event in _turn("s1", 2):
+        asyncio.run(svc.append_event(session, event))
+    svc.flush(session)
+
+    doc = db.docs[("sessions", "s1")]
+    assert "events_json" not in doc and doc["event_count"] == 12
+    assert [r["event"]["id"] for r in _events(db)[:8]] == [e["id"] for e in legacy]
+    assert len(_get(svc, config=GetSessionConfig()).events) == 12
+
+
+def test_reads_stop_at_the_committed_event_count():
+    db = _FakeFirestore()
+    svc = _svc(db)
+    _new(svc)
+    _chat(svc, range(2))
+    # An old session re-created under the same id leaves stale event docs.
+    svc._session_cache.clear()
+    _new(svc)
+
+    assert _get(svc, config=GetSessionConfig()).events == []
+
+
+def test_write_without_a_loaded_log_recovers_it():
+    db = _FakeFirestore()
+    svc = _svc(db)
+    _new(svc)
+    _chat(svc, range(2))
+
+    other = _svc(db)  # e.g. a session object handed over from another service
+    session = _get(svc, config=GetSessionConfig())
+    session.events.extend(_turn("s1", 2))
+    other._write_session(session)
+
+    assert len(_events(db)) == 12
+    assert db.docs[("sessions", "s1")]["event_count"] == 12
+
+
+def test_filters_and_ownership():
+    svc = _svc()
+    _new(svc)
+    _chat(svc, range(3))
+
+    assert _get(svc, user="intruder") is None
+    svc._session_cache.clear()
+    assert _get(svc, user="intruder") is None
+    assert len(_get(svc, config=GetSessionConfig(num_recent_events=5)).events) == 5
+
+
+def test_delete_removes_the_event_log():
+    db = _FakeFirestore()
+    svc = _svc(db)
+    _new(svc)
+    _chat(svc, range(2))
+
+    asyncio.run(svc.delete_session(app_name="app", user_id="u1", session_id="s1"))
+    assert db.docs == {}
+
+
+def test_session_cache_is_bounded():
+    svc = _svc()
+    for i in range(svc._session_cache.maxsize + 5):
+        _new(svc, sid=f"s{i}")
+    assert len(svc._session_cache) == svc._session_cache.maxsize
+    assert "s0" not in svc._session_cache
@@ -0,0 +1,122 @@
+"""Shared execute_sql result cache (api/services/sql_result_cache.py).
+
+Repeated agent probes across sessions must be answered from the cache while
+the agent's freshness stamp holds, literal-sensitive and never for
+non-deterministic SQL; a data change (new stamp) must reach BigQuery again.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from api.agent import callbacks
+from api.services import sql_result_cache
+from api.services.sql_result_cache import SqlResultCache, cache_key, canonicalize_sql
+
+SQL = "SELECT platform, COUNT(*) AS n\nFROM social_listening.scope_posts('a1') WHERE x = 'Nike' GROUP BY 1"
+
+
+def test_canonicalize_keeps_literals_and_drops_comments():
+    a = canonicalize_sql(SQL)
+    b = canonicalize_sql("select   PLATFORM, count(*) as N -- probe\n from social_listening.scope_posts('a1') "
+                         "/* block */ where X = 'Nike' group by 1;")
+    assert a == b
+    assert "'Nike'" in a
+    assert canonicalize_sql(SQL.replace("'Nike'", "'nike'")) != a
+
+
+def test_only_deterministic_reads_are_cacheable():
+    assert cache_key("a1", ["c1"], "s", SQL)
+    assert cache_key("a1", ["c1"], "s", "WITH t AS (SELECT 1) SELECT * FROM t")
+    assert cache_key("a1", ["c1"], "s", "SELECT * FROM t WHERE d > CURRENT_DATE()") is None
+    assert cache_key("a1", ["c1"], "s", "SELECT RAND()") is None
+    assert cache_key("a1", ["c1"], "s", "INSERT INTO t VALUES (1)") is None
+    # A literal that merely mentions a function is fine.
+    assert cache_key("a1", ["c1"], "s", "SELECT * FROM t WHERE c = 'current_date'")
+
+
+def test_key_includes_the_selected_sources():
+    key = cache_key("a1", ["c1", "c2"], "s", SQL)
+    assert cache_key("a1", ["c2", "c1", "c1"], "s", SQL) == key
+    assert cache_key("a1", ["c1"], "s", SQL) != key
+
+
+def test_lru_bounded_by_bytes():
+    now = [0.0]
+    cache = SqlResultCache(max_bytes=200, max_entry_bytes=150, ttl=10, timer=lambda: now[0])
+    small = {"status": "SUCCESS", "rows": [{"n": 1}]}
+    assert cache.put(("k1",), small) is not None
+    assert cache.put(("k1",), small) is None  # already cached
+    assert cache.put(("big",), {"rows": ["x" * 200]}) is None
+    for i in range(2, 8):
+        cache.put((f"k{i}",), small)
+    assert cache.total_bytes <= 200 and cache.get(("k1",)) is None and cache.get(("k7",))
+
+    now[0] = 11
+    assert cache.get(("k7",)) is None and cache.total_bytes < 200
+
+
+class _Tool:
+    name = "execute_sql"
+
+
+@pytest.fixture
+def agent_ctx(monkeypatch):
+    monkeypatch.setattr(sql_result_cache, "_default", None)
+    monkeypatch.setattr(sql_result_cache, "_stamps", None)
+    statuses = {"c1": {"updated_at": "2026-05-01T00:00:00"}}
+    monkeypatch.setattr("api.deps.get_fs", lambda: SimpleNamespace(get_collection_status=statuses.get))
+    reports = []
+    monkeypatch.setattr(sql_result_cache, "report", lambda entry, *, hit, **kw: reports.append(hit))
+
+    def _ctx():
+        return SimpleNamespace(state={"active_agent_id": "a1", "agent_selected_sources": ["c1"]})
+
+    return _ctx, statuses, reports
+
+
+def test_results_are_shared_across_sessions_until_data_changes(agent_ctx):
+    make_ctx, statuses, reports = agent_ctx
+    args = {"query": SQL}
+    response = {"status": "SUCCESS", "rows": [{"platform": "tiktok", "n": 3}]}
+
+    first = make_ctx()
+    assert callbacks.serve_cached_sql(_Tool(), args, first) is None
+    callbacks.store_sql_result(_Tool(), args, first, response)
+
+    other_session = make_ctx()
+    assert callbacks.serve_cached_sql(_Tool(), args, other_session) == response
+    # The served response flows through the after-tool chain again - no re-store.
+    callbacks.store_sql_result(_Tool(), args, other_session, response)
+    assert reports == [False, True]
+
+    # Errors aren't cached.
+    callbacks.store_sql_result(_Tool(), {"query": "SELECT 2"}, first, {"status": "ERROR"})
+    assert callbacks.serve_cached_sql(_Tool(), {"query": "SELECT 2"}, first) is None
+
+    # Another source selection on the same agent is a different scope, even
+    # with the same freshness stamp.
+    statuses["c2"] = {"updated_at": "2026-04-01T00:00:00"}
+    narrowed = make_ctx()
+    narrowed.state["agent_selected_sources"] = ["c1", "c2"]
+    assert callbacks.serve_cached_sql(_Tool(), args, narrowed) is None
+
+    # New data bumps the stamp; once the memoised stamp lapses it's a miss.
+    statuses["c1"] = {"updated_at": "2026-05-02T00:00:00"}
+    sql_result_cache._stamps.clear()
+    assert callbacks.serve_cached_sql(_Tool(), args, make_ctx()) is None
+
+
+def test_in_session_duplicate_gets_cached_rows_instead_of_refusal(agent_ctx):
+    make_ctx, _, _ = agent_ctx
+    ctx = make_ctx()
+    args = {"query": SQL}
+    response = {"status": "SUCCESS", "rows": [{"n": 1}]}
+    assert callbacks.dedup_sql_calls(_Tool(), args, ctx) is None
+    callbacks.store_sql_result(_Tool(), args, ctx, response)
+
+    assert callbacks.dedup_sql_calls(_Tool(), args, ctx) == response
+    assert ctx.state["_execute_sql_count"] == 1
+
+    sql_result_cache.get_cache().clear()
+    assert callbacks.dedup_sql_calls(_Tool(), args, ctx)["status"] == "duplicate"
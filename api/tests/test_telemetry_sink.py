@@ -0,0 +1,157 @@
+"""Tests for the batched usage_events writer."""
+
+import json
+import os
+import time
+
+from api.services.telemetry_sink import UsageEventSink
+
+
+class _Recorder:
+    def __init__(self, fail: int = 0):
+        self.batches: list[list[dict]] = []
+        self.charges: list[tuple[str, int]] = []
+        self.fail = fail
+
+    def insert(self, rows):
+        self.batches.append(list(rows))
+        return self.fail
+
+    def charge(self, user_id, micros):
+        self.charges.append((user_id, micros))
+
+
+def _sink(rec, **kw):
+    kw.setdefault("max_queue", 1000)
+    kw.setdefault("batch_rows", 100)
+    kw.setdefault("flush_sec", 5.0)
+    return UsageEventSink(insert=rec.insert, charge=rec.charge, **kw)
+
+
+def test_rows_are_batched_into_one_insert():
+    rec = _Recorder()
+    sink = _sink(rec)
+    for i in range(50):
+        sink.submit({"n": i})
+    sink.start()
+    assert sink.flush(timeout=5)
+    sink.shutdown()
+
+    assert len(rec.batches) == 1
+    assert [r["n"] for r in rec.batches[0]] == list(range(50))
+    assert sink.stats()["written"] == 50
+
+
+def test_batch_is_cut_at_batch_rows():
+    rec = _Recorder()
+    sink = _sink(rec, batch_rows=10)
+    for i in range(25):
+        sink.submit({"n": i})
+    sink.start()
+    sink.shutdown()
+
+    assert [len(b) for b in rec.batches] == [10, 10, 5]
+
+
+def test_partial_batch_flushes_after_flush_sec():
+    rec = _Recorder()
+    sink = _sink(rec, flush_sec=0.05)
+    sink.start()
+    sink.submit({"n": 1})
+    deadline = 200
+    while not rec.batches and deadline:
+        time.sleep(0.01)
+        deadline -= 1
+    sink.shutdown()
+
+    assert rec.batches == [[{"n": 1}]]
+
+
+def test_charges_are_summed_per_user_per_batch():
+    rec = _Recorder()
+    sink = _sink(rec)
+    sink.submit({"n": 1}, user_id="u1", charge_micros=100)
+    sink.submit({"n": 2}, user_id="u1", charge_micros=50)
+    sink.submit({"n": 3}, user_id="u2", charge_micros=7)
+    sink.submit({"n": 4})
+    sink.start()
+    sink.shutdown()
+
+    assert sorted(rec.charges) == [("u1", 150), ("u2", 7)]
+
+
+def test_failed_insert_is_counted_and_still_charges():
+    rec = _Recorder()
+
+    def boom(rows):
+        raise RuntimeError("bq down")
+
+    sink = UsageEventSink(max_queue=10, batch_rows=10, flush_sec=0.01, insert=boom, charge=rec.charge)
+    sink.submit({"n": 1}, user_id="u1", charge_micros=9)
+    sink.shutdown()
+
+    stats = sink.stats()
+    assert stats["failed"] == 1 and stats["written"] == 0
+    assert rec.charges == [("u1", 9)]
+
+
+def test_overflow_drops_without_spill_dir():
+    rec = _Recorder()
+    sink = _sink(rec, max_queue=3)
+    for i in range(5):
+        sink.submit({"n": i})
+
+    assert sink.stats()["dropped"] == 2
+    sink.shutdown()
+    assert sum(len(b) for b in rec.batches) == 3
+
+
+def test_dropped_row_still_charges_the_wallet():
+    rec = _Recorder()
+    sink = _sink(rec, max_queue=1)
+    sink.submit({"n": 0}, user_id="u1", charge_micros=5)
+    sink.submit({"n": 1}, user_id="u2", charge_micros=7)  # queue full, no spill
+
+    assert sink.stats()["dropped"] == 1
+    assert rec.charges == [("u2", 7)]  # applied inline, before any flush
+    sink.shutdown()
+    assert sorted(rec.charges) == [("u1", 5), ("u2", 7)]
+    assert [r["n"] for b in rec.batches for r in b] == [0]
+
+
+def test_overflow_spills_and_is_respooled(tmp_path):
+    rec = _Recorder()
+    sink = _sink(rec, max_queue=3, spill_dir=str(tmp_path), spill_max_bytes=1 << 20)
+    for i in range(8):
+        sink.submit({"n": i}, user_id="u1", charge_micros=1)
+
+    stats = sink.stats()
+    assert stats["spilled"] == 5 and stats["dropped"] == 0
+    spill = tmp_path / "usage_events.spill.ndjson"
+    assert [json.loads(line)["row"]["n"] for line in spill.read_text().splitlines()] == [3, 4, 5, 6, 7]
+
+    sink.shutdown()
+
+    assert sorted(r["n"] for b in rec.batches for r in b) == list(range(8))
+    assert sum(m for _, m in rec.charges) == 8
+    assert os.path.getsize(spill) == 0
+
+
+def test_spill_respects_size_cap(tmp_path):
+    rec = _Recorder()
+    sink = _sink(rec, max_queue=1, spill_dir=str(tmp_path), spill_max_bytes=80)  # room for one line
+    for i in range(4):
+        sink.submit({"n": i})
+
+    stats = sink.stats()
+    assert stats["spilled"] == 1 and stats["dropped"] == 2
+
+
+def test_submit_after_shutdown_writes_inline():
+    rec = _Recorder()
+    sink = _sink(rec)
+    sink.start()
+    sink.shutdown()
+    sink.submit({"n": 1})
+
+    assert rec.batches[-1] == [{"n": 1}]
@@ -23,6 +23,9 @@ import pytest
 from api.services import cost_meter, usage_service
 
 
+pytestmark = pytest.mark.usefixtures("usage_events_sink")
+
+
 class _FakeBQ:
     def __init__(self) -> None:
         self.rows: list[dict[str, Any]] = []
@@ -0,0 +1,68 @@
+-- Incremental refresh of enriched_posts_latest: fold enriched_posts rows
+-- written since @since into the current enrichment per (post_id, agent_id).
+-- Winner order is scope_posts' dedup: user_override first, then the highest
+-- agent_version, then the latest enriched_at (NULLs rank last throughout).
+-- A source row replaces the stored one only if it ranks at least as high, so
+-- an older override outside the lookback window is never displaced by a
+-- newer auto row. Rows without an agent_id are never read by the scope TVFs.
+-- Columns are named in UPDATE SET / INSERT, never matched by position: the
+-- base tables grew through ALTER TABLE ADD COLUMN, so their physical column
+-- order differs from the DDL files.
+MERGE social_listening.enriched_posts_latest T
+USING (
+    SELECT *
+    FROM social_listening.enriched_posts
+    WHERE (enriched_at >= TIMESTAMP(@since) OR enriched_at IS NULL)
+      AND agent_id IS NOT NULL
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY post_id, agent_id
+        ORDER BY (source = 'user_override') DESC,
+                 agent_version DESC NULLS LAST,
+                 enriched_at DESC
+    ) = 1
+) S
+ON T.post_id = S.post_id AND T.agent_id = S.agent_id
+WHEN MATCHED AND (
+    IFNULL(S.source = 'user_override', FALSE) > IFNULL(T.source = 'user_override', FALSE)
+    OR (
+        IFNULL(S.source = 'user_override', FALSE) = IFNULL(T.source = 'user_override', FALSE)
+        AND (
+            IFNULL(S.agent_version, -1) > IFNULL(T.agent_version, -1)
+            OR (
+                IFNULL(S.agent_version, -1) = IFNULL(T.agent_version, -1)
+                AND IFNULL(S.enriched_at, TIMESTAMP('1970-01-01'))
+                    >= IFNULL(T.enriched_at, TIMESTAMP('1970-01-01'))
+            )
+        )
+    )
+)
+THEN UPDATE SET
+    collection_id = S.collection_id,
+    agent_version = S.agent_version,
+    context = S.context,
+    sentiment = S.sentiment,
+    emotion = S.emotion,
+    entities = S.entities,
+    themes = S.themes,
+    ai_summary = S.ai_summary,
+    language = S.language,
+    content_type = S.content_type,
+    relevance_reason = S.relevance_reason,
+    is_related_to_task = S.is_related_to_task,
+    detected_brands = S.detected_brands,
+    channel_type = S.channel_type,
+    custom_fields = S.custom_fields,
+    source = S.source,
+    enriched_at = S.enriched_at
+WHEN NOT MATCHED THEN INSERT (
+    post_id, collection_id, agent_id, agent_version, context, sentiment,
+    emotion, entities, themes, ai_summary, language, content_type,
+    relevance_reason, is_related_to_task, detected_brands, channel_type,
+    custom_fields, source, enriched_at
+) VALUES (
+    S.post_id, S.collection_id, S.agent_id, S.agent_version, S.context,
+    S.sentiment, S.emotion, S.entities, S.themes, S.ai_summary, S.language,
+    S.content_type, S.relevance_reason, S.is_related_to_task,
+    S.detected_brands, S.channel_type, S.custom_fields, S.source,
+    S.enriched_at
+);
@@ -0,0 +1,37 @@
+-- Incremental refresh of post_engagements_latest: fold engagement snapshots
+-- fetched since @since into the latest snapshot per post_id. The fetched_at
+-- filter prunes post_engagements' daily partitions.
+-- Columns are named in UPDATE SET / INSERT, never matched by position: the
+-- base tables grew through ALTER TABLE ADD COLUMN, so their physical column
+-- order differs from the DDL files.
+MERGE social_listening.post_engagements_latest T
+USING (
+    SELECT *
+    FROM social_listening.post_engagements
+    WHERE fetched_at >= TIMESTAMP(@since) OR fetched_at IS NULL
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY post_id ORDER BY fetched_at DESC
+    ) = 1
+) S
+ON T.post_id = S.post_id
+WHEN MATCHED
+    AND IFNULL(S.fetched_at, TIMESTAMP('1970-01-01'))
+        >= IFNULL(T.fetched_at, TIMESTAMP('1970-01-01'))
+THEN UPDATE SET
+    engagement_id = S.engagement_id,
+    likes = S.likes,
+    shares = S.shares,
+    comments_count = S.comments_count,
+    views = S.views,
+    saves = S.saves,
+    comments = S.comments,
+    platform_engagements = S.platform_engagements,
+    source = S.source,
+    fetched_at = S.fetched_at
+WHEN NOT MATCHED THEN INSERT (
+    engagement_id, post_id, likes, shares, comments_count, views, saves,
+    comments, platform_engagements, source, fetched_at
+) VALUES (
+    S.engagement_id, S.post_id, S.likes, S.shares, S.comments_count, S.views,
+    S.saves, S.comments, S.platform_engagements, S.source, S.fetched_at
+);
@@ -0,0 +1,50 @@
+-- Incremental refresh of posts_latest: fold posts rows collected since @since
+-- (an ISO-8601 timestamp; see workers/shared/latest_tables.py) into the
+-- current-state table. The `collected_at` filter prunes posts' daily
+-- partitions, so a refresh reads the last lookback window, not history.
+-- Ties on collected_at update too: the runner rewrites media_refs in place
+-- without bumping collected_at, and the lookback re-reads those rows.
+-- NULL collected_at rows (legacy) live in the NULL partition and are re-read
+-- every time; they only win when the post has no dated row.
+-- Columns are named in UPDATE SET / INSERT, never matched by position: the
+-- base tables grew through ALTER TABLE ADD COLUMN, so their physical column
+-- order differs from the DDL files.
+MERGE social_listening.posts_latest T
+USING (
+    SELECT *
+    FROM social_listening.posts
+    WHERE collected_at >= TIMESTAMP(@since) OR collected_at IS NULL
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY post_id ORDER BY collected_at DESC
+    ) = 1
+) S
+ON T.post_id = S.post_id
+WHEN MATCHED
+    AND IFNULL(S.collected_at, TIMESTAMP('1970-01-01'))
+        >= IFNULL(T.collected_at, TIMESTAMP('1970-01-01'))
+THEN UPDATE SET
+    collection_id = S.collection_id,
+    platform = S.platform,
+    channel_handle = S.channel_handle,
+    channel_id = S.channel_id,
+    title = S.title,
+    content = S.content,
+    post_url = S.post_url,
+    posted_at = S.posted_at,
+    post_type = S.post_type,
+    parent_post_id = S.parent_post_id,
+    media_refs = S.media_refs,
+    platform_metadata = S.platform_metadata,
+    crawl_provider = S.crawl_provider,
+    search_keyword = S.search_keyword,
+    collected_at = S.collected_at
+WHEN NOT MATCHED THEN INSERT (
+    post_id, collection_id, platform, channel_handle, channel_id, title,
+    content, post_url, posted_at, post_type, parent_post_id, media_refs,
+    platform_metadata, crawl_provider, search_keyword, collected_at
+) VALUES (
+    S.post_id, S.collection_id, S.platform, S.channel_handle, S.channel_id,
+    S.title, S.content, S.post_url, S.posted_at, S.post_type,
+    S.parent_post_id, S.media_refs, S.platform_metadata, S.crawl_provider,
+    S.search_keyword, S.collected_at
+);
@@ -0,0 +1,130 @@
+-- Current-state readers over the *_latest tables (schemas/*_latest.sql).
+--
+-- The latest tables hold one row per key and are refreshed by a scheduled
+-- incremental MERGE (workers/shared/latest_tables.py), so they lag the base
+-- tables by up to one refresh interval. To keep reads exact, each reader
+-- overlays the last `INTERVAL 2 DAY` of base rows (the "delta") on the
+-- latest table: keys with no recent base rows come straight from the latest
+-- table, keys with recent rows are re-deduped with the original ordering.
+-- The delta filter is a constant expression on the base table's partition
+-- column, so it prunes to ~3 daily partitions instead of scanning history.
+--
+-- Results are therefore identical to deduping the base tables directly -
+-- same rows the moment they land - as long as a refresh has succeeded within
+-- the last 2 days. That keeps scope_posts consistent with the dashboard
+-- freshness stamp (collection_status.updated_at), which moves when base rows
+-- are written, not when the latest tables catch up.
+--
+-- Every SELECT names its columns: UNION ALL matches by position, and the base
+-- tables' physical column order (grown via ALTER TABLE ADD COLUMN) differs
+-- from the latest tables'. Keep the lists in step with schemas/*_latest.sql.
+--
+-- Apply before scope.sql (scope_* read these).
+
+-- Latest collected record per post_id.
+CREATE OR REPLACE VIEW social_listening.posts_current AS
+WITH delta AS (
+    SELECT
+        post_id, collection_id, platform, channel_handle, channel_id, title,
+        content, post_url, posted_at, post_type, parent_post_id, media_refs,
+        platform_metadata, crawl_provider, search_keyword, collected_at
+    FROM social_listening.posts
+    WHERE collected_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 2 DAY)
+),
+-- Dedup is max-collected_at, so a key with any delta row is decided by the
+-- delta alone (every latest-table row older than the window loses).
+fresh AS (
+    SELECT *
+    FROM delta
+    WHERE TRUE
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY post_id ORDER BY collected_at DESC
+    ) = 1
+)
+SELECT
+    post_id, collection_id, platform, channel_handle, channel_id, title,
+    content, post_url, posted_at, post_type, parent_post_id, media_refs,
+    platform_metadata, crawl_provider, search_keyword, collected_at
+FROM social_listening.posts_latest
+WHERE post_id NOT IN (SELECT post_id FROM delta)
+UNION ALL
+SELECT * FROM fresh;
+
+
+-- Latest engagement snapshot per post_id.
+CREATE OR REPLACE VIEW social_listening.post_engagements_current AS
+WITH delta AS (
+    SELECT
+        engagement_id, post_id, likes, shares, comments_count, views, saves,
+        comments, platform_engagements, source, fetched_at
+    FROM social_listening.post_engagements
+    WHERE fetched_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 2 DAY)
+),
+fresh AS (
+    SELECT *
+    FROM delta
+    WHERE TRUE
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY post_id ORDER BY fetched_at DESC
+    ) = 1
+)
+SELECT
+    engagement_id, post_id, likes, shares, comments_count, views, saves,
+    comments, platform_engagements, source, fetched_at
+FROM social_listening.post_engagements_latest
+WHERE post_id NOT IN (SELECT post_id FROM delta)
+UNION ALL
+SELECT * FROM fresh;
+
+
+-- Current enrichment per post_id for one agent (user_override > agent_version
+-- > enriched_at). Unlike the views above the winner isn't simply the newest
+-- row - an old override beats a new auto row - so keys touched by the delta
+-- are re-ranked together with their stored latest row.
+CREATE OR REPLACE TABLE FUNCTION social_listening.enriched_posts_current(
+    p_agent_id STRING
+) AS (
+    WITH delta AS (
+        SELECT
+            post_id, collection_id, agent_id, agent_version, context, sentiment,
+            emotion, entities, themes, ai_summary, language, content_type,
+            relevance_reason, is_related_to_task, detected_brands, channel_type,
+            custom_fields, source, enriched_at
+        FROM social_listening.enriched_posts
+        WHERE agent_id = p_agent_id
+          AND enriched_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 2 DAY)
+    ),
+    stored AS (
+        SELECT
+            post_id, collection_id, agent_id, agent_version, context, sentiment,
+            emotion, entities, themes, ai_summary, language, content_type,
+            relevance_reason, is_related_to_task, detected_brands, channel_type,
+            custom_fields, source, enriched_at
+        FROM social_listening.enriched_posts_latest
+        WHERE agent_id = p_agent_id
+    ),
+    -- delta and stored list the same columns in the same order, so the
+    -- positional UNIONs below line up.
+    reranked AS (
+        SELECT * EXCEPT(_fresh)
+        FROM (
+            SELECT *, TRUE AS _fresh FROM delta
+            UNION ALL
+            SELECT *, FALSE AS _fresh FROM stored
+            WHERE post_id IN (SELECT post_id FROM delta)
+        )
+        WHERE TRUE
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY post_id
+            ORDER BY (source = 'user_override') DESC,
+                     agent_version DESC NULLS LAST,
+                     enriched_at DESC,
+                     _fresh DESC
+        ) = 1
+    )
+    SELECT *
+    FROM stored
+    WHERE post_id NOT IN (SELECT post_id FROM delta)
+    UNION ALL
+    SELECT * FROM reranked
+);
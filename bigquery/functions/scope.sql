@@ -4,8 +4,12 @@
 --   * has been enriched by this agent (joined to `enriched_posts` on agent_id)
 --   * is marked relevant to the agent's task (is_related_to_task IS TRUE)
 --   * is deduped to the latest collection record (latest collected_at),
---     latest enrichment (latest agent_version, then enriched_at),
---     and latest engagement snapshot (latest fetched_at)
+--     latest enrichment (user_override, then latest agent_version, then
+--     enriched_at), and latest engagement snapshot (latest fetched_at).
+--     The dedup is precomputed: posts_current / enriched_posts_current /
+--     post_engagements_current (latest.sql) read the incrementally
+--     maintained *_latest tables plus a pruned 2-day delta, instead of
+--     ROW_NUMBER() over the full history on every call.
 --   * has `posted_at` >= the agent's currently-active `data_start_date`
 --     (the most recent row in `agents` for this agent_id, by `created_at`).
 --     Agents with no `data_start_date` row (legacy) get no lower bound.
@@ -23,35 +27,10 @@ CREATE OR REPLACE TABLE FUNCTION social_listening.scope_post_ids(
           AND data_start_date IS NOT NULL
         ORDER BY created_at DESC NULLS LAST
         LIMIT 1
-    ),
-    dedup_posts AS (
-        SELECT * EXCEPT(_rn) FROM (
-            SELECT p.*,
-                   ROW_NUMBER() OVER (
-                       PARTITION BY p.post_id
-                       ORDER BY p.collected_at DESC
-                   ) AS _rn
-            FROM social_listening.posts p
-        )
-        WHERE _rn = 1
-    ),
-    dedup_enr AS (
-        SELECT * EXCEPT(_rn) FROM (
-            SELECT ep.*,
-                   ROW_NUMBER() OVER (
-                       PARTITION BY ep.post_id
-                       ORDER BY (ep.source = 'user_override') DESC,
-                                ep.agent_version DESC NULLS LAST,
-                                ep.enriched_at DESC
-                   ) AS _rn
-            FROM social_listening.enriched_posts ep
-            WHERE ep.agent_id = p_agent_id
-        )
-        WHERE _rn = 1
     )
     SELECT p.post_id
-    FROM dedup_posts p
-    JOIN dedup_enr ep USING (post_id)
+    FROM social_listening.posts_current p
+    JOIN social_listening.enriched_posts_current(p_agent_id) ep USING (post_id)
     WHERE ep.is_related_to_task IS TRUE
       AND p.posted_at >= COALESCE(
           TIMESTAMP((SELECT data_start_date FROM agent_window)),
@@ -71,39 +50,11 @@ CREATE OR REPLACE TABLE FUNCTION social_listening.scope_posts(
         ORDER BY created_at DESC NULLS LAST
         LIMIT 1
     ),
-    dedup_posts AS (
-        SELECT * EXCEPT(_rn) FROM (
-            SELECT p.*,
-                   ROW_NUMBER() OVER (
-                       PARTITION BY p.post_id
-                       ORDER BY p.collected_at DESC
-                   ) AS _rn
-            FROM social_listening.posts p
-        )
-        WHERE _rn = 1
-    ),
-    dedup_enr AS (
-        SELECT * EXCEPT(_rn) FROM (
-            SELECT ep.*,
-                   ROW_NUMBER() OVER (
-                       PARTITION BY ep.post_id
-                       ORDER BY (ep.source = 'user_override') DESC,
-                                ep.agent_version DESC NULLS LAST,
-                                ep.enriched_at DESC
-                   ) AS _rn
-            FROM social_listening.enriched_posts ep
-            WHERE ep.agent_id = p_agent_id
-        )
-        WHERE _rn = 1
-    ),
     dedup_eng AS (
         SELECT post_id, likes, views, comments_count, shares, saves,
                comments, platform_engagements,
                source AS engagement_source, fetched_at
-        FROM social_listening.post_engagements
-        QUALIFY ROW_NUMBER() OVER (
-            PARTITION BY post_id ORDER BY fetched_at DESC
-        ) = 1
+        FROM social_listening.post_engagements_current
     )
     SELECT
       p.post_id, p.collection_id, p.platform, p.channel_handle, p.channel_id,
@@ -119,8 +70,8 @@ CREATE OR REPLACE TABLE FUNCTION social_listening.scope_posts(
       eng.likes, eng.views, eng.comments_count, eng.shares, eng.saves,
       eng.comments, eng.platform_engagements, eng.engagement_source,
       eng.fetched_at
-    FROM dedup_posts p
-    JOIN dedup_enr ep USING (post_id)
+    FROM social_listening.posts_current p
+    JOIN social_listening.enriched_posts_current(p_agent_id) ep USING (post_id)
     LEFT JOIN dedup_eng eng USING (post_id)
     WHERE ep.is_related_to_task IS TRUE
       AND p.posted_at >= COALESCE(
@@ -185,29 +136,13 @@ CREATE OR REPLACE TABLE FUNCTION social_listening.scope_comments(
     ),
     -- Parent post (latest collected record) for collection_id + the window gate.
     dedup_parent AS (
-        SELECT post_id, collection_id, posted_at, post_url, content FROM (
-            SELECT p.post_id, p.collection_id, p.posted_at, p.post_url, p.content,
-                   ROW_NUMBER() OVER (
-                       PARTITION BY p.post_id ORDER BY p.collected_at DESC
-                   ) AS _rn
-            FROM social_listening.posts p
-        )
-        WHERE _rn = 1
+        SELECT post_id, collection_id, posted_at, post_url, content
+        FROM social_listening.posts_current
     ),
     -- Parent's own enrichment, for the denormalized parent_ai_summary.
     dedup_parent_enr AS (
-        SELECT post_id, ai_summary FROM (
-            SELECT ep.post_id, ep.ai_summary,
-                   ROW_NUMBER() OVER (
-                       PARTITION BY ep.post_id
-                       ORDER BY (ep.source = 'user_override') DESC,
-                                ep.agent_version DESC NULLS LAST,
-                                ep.enriched_at DESC
-                   ) AS _rn
-            FROM social_listening.enriched_posts ep
-            WHERE ep.agent_id = p_agent_id
-        )
-        WHERE _rn = 1
+        SELECT post_id, ai_summary
+        FROM social_listening.enriched_posts_current(p_agent_id)
     )
     SELECT
       c.comment_id,
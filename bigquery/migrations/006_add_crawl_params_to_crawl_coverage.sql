@@ -0,0 +1,5 @@
+-- Provider-specific crawl config (X API has_media / sort_order, Vetric
+-- max_calls, HikerAPI n_posts) joins the crawl-coverage key. Rows written
+-- before this column existed read back NULL and are never reused.
+ALTER TABLE `social-listening-pl.social_listening.crawl_coverage`
+ADD COLUMN IF NOT EXISTS crawl_params STRING;
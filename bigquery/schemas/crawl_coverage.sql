@@ -0,0 +1,25 @@
+-- One row per (platform, keyword, time window) a keyword crawl fully covered
+-- (workers/collection/crawl_coverage.py). Before buying a crawl, the pipeline
+-- serves the part of its window covered by a fresh row from the covering
+-- collection's stored posts and only sends the uncovered gap to the vendor.
+-- `query` is the normalized keyword; `sole_query` marks crawls that ran this
+-- keyword alone on the platform, so posts without search_keyword still
+-- attribute to it. `crawl_params` is the provider-specific config that
+-- shapes the crawl (media filter, sort order, page / post budgets) as
+-- canonical JSON, "" when none is set; coverage only serves a crawl with the
+-- same value.
+CREATE TABLE IF NOT EXISTS social_listening.crawl_coverage (
+    platform STRING NOT NULL,
+    query STRING NOT NULL,
+    window_start TIMESTAMP NOT NULL,
+    window_end TIMESTAMP NOT NULL,
+    provider STRING NOT NULL,
+    crawl_params STRING,
+    fetched_at TIMESTAMP NOT NULL,
+    collection_id STRING NOT NULL,
+    agent_id STRING,
+    sole_query BOOL,
+    posts_found INT64
+)
+PARTITION BY DATE(fetched_at)
+CLUSTER BY platform, query;
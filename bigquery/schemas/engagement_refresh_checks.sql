@@ -0,0 +1,13 @@
+-- One row per post checked by the adaptive engagement refresh
+-- (workers/engagement/worker.py), including checks whose metrics were
+-- unchanged and therefore wrote no post_engagements snapshot. The planner
+-- reads MAX(checked_at) per post so an unchanged post isn't re-fetched as if
+-- it had never been checked.
+CREATE TABLE IF NOT EXISTS social_listening.engagement_refresh_checks (
+    post_id STRING NOT NULL,
+    checked_at TIMESTAMP NOT NULL,
+    vendor STRING,
+    changed BOOL
+)
+PARTITION BY DATE(checked_at)
+CLUSTER BY post_id;
@@ -0,0 +1,27 @@
+-- Current enrichment per (post_id, agent_id): the row scope_posts' dedup
+-- picks (user_override > agent_version > enriched_at). Maintained by
+-- batch_queries/refresh_enriched_posts_latest.sql and read through
+-- enriched_posts_current(@agent_id) (functions/latest.sql). The MERGE and the
+-- readers name every column, so a column added here must be added there too.
+CREATE TABLE IF NOT EXISTS social_listening.enriched_posts_latest (
+    post_id STRING NOT NULL,
+    collection_id STRING,
+    agent_id STRING,
+    agent_version INT64,
+    context STRING,
+    sentiment STRING,
+    emotion STRING,
+    entities ARRAY<STRING>,
+    themes ARRAY<STRING>,
+    ai_summary STRING,
+    language STRING,
+    content_type STRING,
+    relevance_reason STRING,
+    is_related_to_task BOOL,
+    detected_brands ARRAY<STRING>,
+    channel_type STRING,
+    custom_fields JSON,
+    source STRING,
+    enriched_at TIMESTAMP
+)
+CLUSTER BY agent_id, post_id;
@@ -0,0 +1,17 @@
+-- Latest engagement snapshot per post_id (max fetched_at). Maintained by
+-- batch_queries/refresh_post_engagements_latest.sql and read through the
+-- post_engagements_current view (functions/latest.sql). The MERGE and the
+-- view name every column, so a column added here must be added there too.
+CREATE TABLE IF NOT EXISTS social_listening.post_engagements_latest (
+    engagement_id STRING NOT NULL,
+    post_id STRING NOT NULL,
+    likes INT64,
+    shares INT64,
+    comments_count INT64,
+    views INT64,
+    saves INT64,
+    comments JSON,
+    platform_engagements JSON,
+    source STRING NOT NULL,
+    fetched_at TIMESTAMP )
+CLUSTER BY post_id;
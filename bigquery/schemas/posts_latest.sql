@@ -0,0 +1,25 @@
+-- Current state of `posts`: one row per post_id (the latest collected_at).
+-- Maintained by batch_queries/refresh_posts_latest.sql (MERGE, see
+-- workers/shared/latest_tables.py) and read through the posts_current view
+-- (functions/latest.sql). The MERGE and the view name every column (base
+-- posts' physical order differs from posts.sql), so a posts column added
+-- here must be added to both too.
+CREATE TABLE IF NOT EXISTS social_listening.posts_latest (
+    post_id STRING NOT NULL,
+    collection_id STRING NOT NULL,
+    platform STRING NOT NULL,
+    channel_handle STRING,
+    channel_id STRING,
+    title STRING,
+    content STRING,
+    post_url STRING,
+    posted_at TIMESTAMP,
+    post_type STRING,
+    parent_post_id STRING,
+    media_refs JSON,
+    platform_metadata JSON,
+    crawl_provider STRING,
+    search_keyword STRING,
+    collected_at TIMESTAMP
+)
+CLUSTER BY collection_id, post_id;
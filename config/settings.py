@@ -58,12 +58,57 @@ class Settings(BaseSettings):
     enrichment_per_post_timeout_sec: float = 480.0
 
     # Streaming enrichment - the consumer flushes pending Gemini results into
-    # BigQuery via MERGE either when `flush_size` accumulates or `flush_interval_sec`
-    # elapses. Smaller flush_size = smoother `posts_enriched` counter advancement
-    # at the cost of more BQ MERGEs.
+    # BigQuery via the bulk writer either when `flush_size` accumulates or
+    # `flush_interval_sec` elapses. Smaller flush_size = smoother `posts_enriched`
+    # counter advancement at the cost of more BQ write commits.
     enrichment_bq_flush_size: int = 25
     enrichment_bq_flush_interval_sec: float = 3.0
 
+    # Bulk BigQuery writes (BQClient.write_rows_bulk) - "storage" commits each
+    # call atomically through a Storage Write API pending stream, falling back
+    # to a load job when google-cloud-bigquery-storage isn't installed or the
+    # stream can't be opened; "load_job" always uses an NDJSON load job.
+    bq_bulk_write_method: str = "storage"  # storage, load_job
+
+    # Current-state tables behind scope_posts (schemas/*_latest.sql) - a
+    # scheduled MERGE folds new base rows in, re-reading `lookback_hours`
+    # before each table's newest row to catch late and in-place-updated rows.
+    # The scope readers overlay a 2-day delta of base rows, so a refresh must
+    # succeed at least once every 2 days; `refresh_minutes` is the dev
+    # scheduler's cadence (Cloud Scheduler owns it in production).
+    latest_tables_refresh_enabled: bool = True
+    latest_tables_refresh_minutes: int = 15
+    latest_tables_lookback_hours: int = 24
+
+    # Batch enrichment - standalone re-enrichment (agent version bumps,
+    # overnight recurring runs) can go through one Gemini batch prediction
+    # job instead of a synchronous call per post: cheaper and on its own
+    # quota, but minutes-to-hours latency. `enrichment_mode` is the default;
+    # a collection's `config.enrichment_mode` overrides it. Runs only submit
+    # the jobs; /internal/enrichment-batches/collect (Cloud Scheduler in
+    # production, OngoingScheduler every `collect_minutes` in dev) writes the
+    # results of finished ones.
+    enrichment_mode: str = "sync"  # sync, batch
+    enrichment_batch_location: str = "us-central1"  # batch jobs are regional
+    enrichment_batch_max_requests: int = 10000  # posts per job
+    enrichment_batch_collect_enabled: bool = True
+    enrichment_batch_collect_minutes: int = 10
+
+    # Content-hash enrichment cache - Firestore `enrichment_cache/{sha256}`
+    # keyed by the prompt inputs + agent version (workers/enrichment/
+    # result_cache.py). Retweets, cross-posts and keyword overlaps reuse one
+    # Gemini call. Expiry is a Firestore TTL policy on `expires_at`.
+    enrichment_cache_enabled: bool = True
+    enrichment_cache_ttl_days: int = 30
+    enrichment_cache_metrics_every: int = 200  # lookups per hit/miss cost-meter row
+
+    # Gemini context caching for the static enrichment instructions - one
+    # cachedContents prefix per distinct instruction text (custom fields +
+    # enrichment_context), re-created when it nears its TTL. Prefixes below
+    # the model's minimum cacheable size fall back to inline instructions.
+    enrichment_context_cache_enabled: bool = True
+    enrichment_context_cache_ttl_sec: float = 3600.0
+
     # Pipeline liveness - a dedicated thread inside the runner touches
     # `collection_status.updated_at` every N seconds, independent of the main
     # loop, so the stale-pipeline watchdog can detect a wedged loop quickly
@@ -73,11 +118,81 @@ class Settings(BaseSettings):
     # considered stale and recovered. Must be comfortably larger than the
     # heartbeat cadence to absorb transient Firestore latency.
     pipeline_stall_threshold_minutes: int = 10
+    # Streaming claims - the download/enrich producers lease posts in batches
+    # of `claim_batch_size` (one Firestore transaction per refill) into a local
+    # prefetch queue. The lease must outlive `enrichment_per_post_timeout_sec`
+    # plus prefetch wait; an expired lease makes the post reclaimable by
+    # continuation recovery.
+    pipeline_claim_batch_size: int = 20
+    pipeline_claim_lease_sec: int = 600
+    # Write-behind for post_state transitions - buffered in memory, coalesced
+    # per post and flushed as one Firestore batch (one `counts.*` write on a
+    # counter shard) when `max_posts` accumulate or the oldest entry is
+    # `max_age_sec` old, instead of one counter write per step flush.
+    pipeline_write_behind_enabled: bool = True
+    pipeline_write_behind_max_posts: int = 200
+    pipeline_write_behind_max_age_sec: float = 2.0
+    # Counter shards under each collection_status doc - writers Increment a
+    # random shard, readers sum them (workers/shared/counter_shards.py). Each
+    # shard sustains ~1 write/sec. Only ever raise this: batched status readers
+    # fetch shards 0..N-1, so lowering it would hide the higher shards.
+    pipeline_counter_shards: int = 8
 
     # Max concurrent CDN/GCS downloads per collection (owned by PipelineRunner).
     # Decouples media I/O from the step orchestration pool so a slow download
     # batch can't starve enrich/embed progress.
     media_download_concurrency: int = 16
+    # Media is stored content-addressed (media/sha256/...) with a URL index, so
+    # a URL or body already stored by any collection isn't downloaded/stored
+    # again. Bodies up to this many MB are hashed in memory and uploaded in
+    # one request; larger ones stream through a resumable upload in chunks of
+    # this size. Bounds per-download memory. Must be >= 1.
+    media_stream_buffer_mb: int = 8
+    # Generate WebP thumb/card renditions (workers/shared/media_renditions.py)
+    # when an image is stored, and posters when yt-dlp leaves a video on disk.
+    # Off → the /media proxy still generates them lazily on first request.
+    media_renditions_at_download: bool = True
+    # /media proxy: blob metadata (size, content type) cached in-process, so a
+    # feed of cards doesn't pay two GCS metadata round trips per image.
+    media_meta_cache_ttl_sec: int = 300
+    media_meta_cache_size: int = 4096
+
+    # Shared execute_sql result cache (api/services/sql_result_cache.py):
+    # repeated agent probes across chats / Concierge turns / continuations are
+    # answered from memory while the agent's freshness stamp holds. Bounded by
+    # total result bytes (LRU); larger single results aren't cached. The TTL
+    # is a safety net - the stamp is the real invalidation. Stamps are
+    # memoised for `stamp_ttl` so parallel probes share one Firestore read.
+    agent_sql_cache_enabled: bool = True
+    agent_sql_cache_max_mb: int = 256
+    agent_sql_cache_max_entry_mb: int = 8
+    agent_sql_cache_ttl_sec: float = 3600.0
+    agent_sql_cache_stamp_ttl_sec: float = 15.0
+
+    # File-backed data exports (api/services/data_export.py): export_data
+    # streams the query page by page into a file in `gcs_exports_bucket`
+    # and returns a preview plus a download handle instead of every row.
+    # The tool waits up to `wait_sec` so small exports come back ready;
+    # larger ones keep running and report progress via GET /exports/{id}.
+    # Signed download URLs live for `url_ttl_min`.
+    data_export_wait_sec: float = 20.0
+    data_export_preview_rows: int = 20
+    data_export_page_rows: int = 10_000
+    data_export_url_ttl_min: int = 60
+
+    # Batched usage_events writer (api/services/telemetry_sink.py): log_cost
+    # rows go on a bounded in-process queue drained by one writer thread,
+    # flushed in batches of up to `batch_rows`, at most `flush_sec` after a
+    # batch's first row. A full queue spills rows to NDJSON under `spill_dir`
+    # (capped at `spill_max_mb`, re-queued when the writer is idle); past
+    # that they're dropped and counted. Empty `spill_dir` disables spilling.
+    # Queue/drop counters are logged every `stats_log_sec`.
+    usage_events_queue_size: int = 10_000
+    usage_events_batch_rows: int = 500
+    usage_events_flush_sec: float = 0.5
+    usage_events_spill_dir: str = "/tmp/usage-events-spill"
+    usage_events_spill_max_mb: int = 64
+    usage_events_stats_log_sec: float = 60.0
 
     # Pipeline embedding step (BQ AI.GENERATE_EMBEDDING - paid per row).
     # Disabled by default because the current default topic algorithm
@@ -91,11 +206,54 @@ class Settings(BaseSettings):
     # Off by default - flip after verifying per-adapter snapshot accounting in
     # a canary agent. Only affects multi-provider collections.
     parallel_adapters: bool = False
+    # Cross-agent crawl reuse (workers/collection/crawl_coverage.py). Keyword
+    # crawls record the (platform, keyword, window, provider) they covered; a
+    # later crawl serves the covered part of its window from those stored
+    # posts and only buys the uncovered gap. Coverage older than
+    # max_age_hours is ignored (the freshness tolerance).
+    crawl_reuse_enabled: bool = True
+    crawl_reuse_max_age_hours: float = 6.0
+
+    # Adaptive engagement refresh (workers/engagement/planner.py). A
+    # collection refresh only re-fetches posts whose own interval has elapsed:
+    #   interval = min_hours * 2^(age / age_doubling_hours)
+    #              / (1 + velocity / velocity_scale)      (clamped to max_hours)
+    # where velocity is engagement-score growth per hour across the last
+    # snapshots. Picks are capped per vendor (budget_per_vendor, overridable
+    # per vendor as "apify=300,brightdata=500") and overall (max_posts).
+    # Disable to refresh every post on every run (the old behaviour).
+    engagement_adaptive_refresh_enabled: bool = True
+    engagement_refresh_min_hours: float = 1.0
+    engagement_refresh_max_hours: float = 168.0
+    engagement_refresh_age_doubling_hours: float = 48.0
+    engagement_refresh_velocity_scale: float = 100.0
+    engagement_refresh_budget_per_vendor: int = 500
+    engagement_refresh_vendor_budgets: str = ""
+    engagement_refresh_max_posts: int = 2000
 
     # Clustering (brothers algorithm) thresholds
     clustering_brothers_threshold: float = 0.17
     clustering_max_intra_group_mean: float = 0.20
     clustering_max_distance_ungrouped: float = 0.21
+    # Neighbor search for brothers clustering. "" = exact blocked search
+    # (identical clusters to the dense reference); "hnswlib" = approximate
+    # k-NN candidates (needs `pip install hnswlib`, falls back to exact when
+    # missing). Only worth it well past ~50k posts, and a post with more than
+    # clustering_ann_neighbors true neighbors may lose some of them.
+    clustering_ann_backend: str = ""
+    clustering_ann_neighbors: int = 100
+    # Incremental brothers_v1 runs (workers/clustering/incremental.py): update
+    # the previous run's clusters with new posts instead of re-clustering the
+    # window. New posts join a prior cluster when within
+    # assign_distance (cosine) of its centroid - tighter than
+    # max_distance_ungrouped because centroid distances run smaller than
+    # pairwise ones. A prior cluster is re-labeled by Gemini only when
+    # added + expired members exceed relabel_change_ratio of its old size.
+    # More than max_new_ratio of the window unclustered → full rebuild.
+    clustering_incremental_enabled: bool = True
+    clustering_incremental_assign_distance: float = 0.15
+    clustering_relabel_change_ratio: float = 0.25
+    clustering_incremental_max_new_ratio: float = 0.5
 
     # LLM-taxonomy topic algorithm (alternative to brothers_v1 - no embeddings).
     # Toggle via topics_algorithm; per-agent override lives in the agent doc's
@@ -126,6 +284,16 @@ class Settings(BaseSettings):
     # final topic (~50 calls on a typical run, comparable to pass-1 batch count).
     topics_pass3_filter_enabled: bool = True
     topics_pass3_min_members_after: int = 1  # drop topic if fewer kept members
+    # Pass-1 candidate cache: posts whose candidates were stored by an earlier
+    # run (same brief, prompt, model, thinking level) are not re-sent to
+    # Gemini; only new sample posts are batched. Entries live under
+    # agents/{id}/topic_candidates and expire after the TTL (Firestore TTL on
+    # `expires_at`). prefer_cached makes the sampler pick cached posts ahead of
+    # uncached ones within a signature - more reuse, but a fresh high-engagement
+    # post can lose its slot to a cached one, so it is opt-in.
+    topics_candidate_cache_enabled: bool = True
+    topics_candidate_cache_ttl_days: int = 30
+    topics_sample_prefer_cached: bool = False
 
     vetric_api_key_twitter: str = ""
     vetric_api_key_instagram: str = ""
@@ -266,6 +434,30 @@ class Settings(BaseSettings):
     # silently degrades to L1-only. Kill switch in case GCS misbehaves.
     dashboard_cache_l2: bool = True
 
+    # Row cap for one dashboard core (posts, and separately comments). The core
+    # is held column-wise (dashboard_columns.PostColumns - dictionary-encoded
+    # categoricals, int64 counts), streamed from BigQuery page by page, so this
+    # is a memory guard far above real agents rather than the old 50k cut.
+    # Hitting it sets `truncated` on the response.
+    dashboard_max_rows: int = 500_000
+
+    # Worker threads for POST /dashboard/aggregate: widgets missing from the
+    # per-widget result cache are aggregated in parallel on this pool (the
+    # NumPy column kernels release the GIL; pure-Python paths interleave).
+    dashboard_agg_workers: int = 4
+
+    # Agent session store (api/auth/session_service.py). Events live in an
+    # append-only `sessions/{id}/events` subcollection; a plain get_session
+    # loads only the tail the LLM window can use - the last
+    # `session_load_user_turns` user turns (keep >= the widest caller window:
+    # chat mid-flow 6, WhatsApp concierge 10), capped at
+    # `session_load_max_events`. The sessions router still reads the full log
+    # for restoring the UI. `session_cache_size` bounds the in-process LRU of
+    # live Session objects shared between /chat and the ADK Runner.
+    session_load_user_turns: int = 10
+    session_load_max_events: int = 500
+    session_cache_size: int = 256
+
     # Dev-only kill switch for the OngoingScheduler daemon. In development the
     # scheduler auto-dispatches due recurring agents (and runs stale-pipeline
     # recovery), which fires real collection pipelines without user action.
@@ -312,6 +504,17 @@ class Settings(BaseSettings):
     render_service_token: str = ""
     alert_render_secret: str = ""
 
+    # Streaming alerts (workers/alerts/stream.py): match posts against the
+    # agent's alerts as enrichment results are flushed, instead of only at
+    # agent-run completion (which stays on as the reconciliation sweep).
+    # Matches are emailed per alert once batch_size posts accumulate or the
+    # oldest match is max_delay_sec old; alert definitions are re-read every
+    # refresh_sec.
+    alerts_streaming_enabled: bool = True
+    alerts_stream_batch_size: int = 25
+    alerts_stream_max_delay_sec: float = 600.0
+    alerts_stream_refresh_sec: float = 300.0
+
     # WhatsApp channel (spec docs/whatsapp-channel-impl-spec.md §5).
     # api service needs app_secret + verify_token (webhook); worker service
     # needs access_token + phone_number_id + business_account_id (outbound).
@@ -0,0 +1,36 @@
+"""Repo-wide pytest fixtures."""
+
+import pytest
+
+from api.services import telemetry_sink
+
+
+@pytest.fixture(autouse=True)
+def _usage_events_sink_writes_nowhere(monkeypatch):
+    """Code under test that logs a cost reaches the process-wide usage_events
+    sink. Swap in an unstarted sink whose insert and wallet charge are no-ops,
+    so no test writes to BigQuery or Firestore - neither while running nor
+    from the real sink's atexit flush. Tests that assert on rows use
+    `usage_events_sink` instead."""
+    sink = telemetry_sink.UsageEventSink(
+        max_queue=10_000,
+        batch_rows=500,
+        flush_sec=0.5,
+        insert=lambda rows: 0,
+        charge=lambda user_id, micros: None,
+    )
+    monkeypatch.setattr(telemetry_sink, "_default", sink)
+    yield sink
+
+
+@pytest.fixture
+def usage_events_sink(monkeypatch):
+    """Opt-in for tests that assert on usage_events rows or wallet charges: a
+    started, fast-flushing sink with the real insert and charge, so rows reach
+    whatever `api.deps.get_bq` / `get_fs` the test has faked. Drained before
+    those fakes are unpatched, so no row leaks into another test."""
+    sink = telemetry_sink.UsageEventSink(max_queue=1000, batch_rows=100, flush_sec=0.01)
+    sink.start()
+    monkeypatch.setattr(telemetry_sink, "_default", sink)
+    yield sink
+    sink.shutdown()
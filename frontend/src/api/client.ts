@@ -239,16 +239,21 @@ export async function apiDelete<T = void>(path: string): Promise<T> {
   return res.json();
 }
 
+/** Sized WebP renditions served by /media: 320px / 640px wide stills
+ *  (a video's first frame for video refs). */
+export type MediaVariant = 'thumb' | 'card' | 'poster';
+
 /**
  * Convert a media reference to a proxied URL.
  * GCS URIs go through /media/{path}, external URLs go through /media-proxy.
  * This avoids CORS issues with social platform CDNs (Twitter, Instagram, etc.).
+ * `variant` asks /media for a downscaled rendition instead of the original.
  */
-export function mediaUrl(gcsUri?: string, originalUrl?: string): string {
+export function mediaUrl(gcsUri?: string, originalUrl?: string, variant?: MediaVariant): string {
   if (gcsUri) {
     const match = gcsUri.match(/^gs:\/\/[^/]+\/(.+)$/);
     if (match) {
-      return `${API_BASE}/media/${match[1]}`;
+      return `${API_BASE}/media/${match[1]}${variant ? `?variant=${variant}` : ''}`;
     }
   }
   if (originalUrl) {
@@ -1,9 +1,47 @@
 import { apiDelete, apiGet, apiPost } from '../client.ts';
-import type { DashboardAggregateResponse, DashboardDataResponse, DashboardShareInfo, SharedDashboardDataResponse } from '../types.ts';
+import type {
+  DashboardAggregateResponse,
+  DashboardDataResponse,
+  DashboardPost,
+  DashboardShareInfo,
+  PostColumnsWire,
+  SharedDashboardDataResponse,
+} from '../types.ts';
 import type { ReportConfig, SocialDashboardWidget } from '../../features/studio/dashboard/types-social-dashboard.ts';
 import type { DashboardFilters } from '../../features/studio/dashboard/use-dashboard-filters.ts';
 import type { PostDetails } from '../../features/studio/dashboard/use-post-details.tsx';
 
+/** Rebuild row objects from the server's JSON-columnar encoding
+ *  (dashboard_columns.PostColumns.to_wire). */
+export function decodePostColumns(wire: PostColumnsWire): DashboardPost[] {
+  const cols = Object.entries(wire.columns);
+  const posts: DashboardPost[] = new Array(wire.length);
+  for (let i = 0; i < wire.length; i++) {
+    const post: Record<string, unknown> = {};
+    for (const [name, col] of cols) {
+      if ('values' in col) {
+        post[name] = col.values[i];
+      } else if (col.offsets) {
+        const out: unknown[] = [];
+        for (let j = col.offsets[i]; j < col.offsets[i + 1]; j++) out.push(col.dict[col.codes[j]]);
+        post[name] = out;
+      } else {
+        post[name] = col.dict[col.codes[i]];
+      }
+    }
+    posts[i] = post as unknown as DashboardPost;
+  }
+  return posts;
+}
+
+function decodeColumnarBody<T extends DashboardDataResponse | SharedDashboardDataResponse>(body: T): T {
+  if (body.posts_columnar) body.posts = decodePostColumns(body.posts_columnar);
+  if (body.comments_columnar) body.comments = decodePostColumns(body.comments_columnar);
+  delete body.posts_columnar;
+  delete body.comments_columnar;
+  return body;
+}
+
 export async function getDashboardData(
   collectionIds: string[],
   agentId?: string,
@@ -13,12 +51,16 @@ export async function getDashboardData(
   // DashboardDetailsProvider may set this; others get the full payload.
   slim = false,
 ): Promise<DashboardDataResponse> {
-  return apiPost('/dashboard/data', {
+  // Rows travel column-encoded (dictionary-coded categoricals, flat number
+  // arrays) and are rebuilt here, so callers still get `posts` as rows.
+  const body = await apiPost<DashboardDataResponse>('/dashboard/data', {
     collection_ids: collectionIds,
     agent_id: agentId,
     report_config: reportConfig ?? undefined,
     slim,
+    columnar: true,
   });
+  return decodeColumnarBody(body);
 }
 
 /** Lazy-fetch the display-only fields (ai_summary/context/media_refs) for the
@@ -109,11 +151,11 @@ export async function getSharedDashboardData(
   // to force the legacy full-posts path (the `?agg=client` debug escape hatch);
   // the backend `DASHBOARD_SERVER_AGG` setting is the authoritative kill switch.
   const params = opts.serverAgg ? '?slim=1&agg=server' : '?slim=1&agg=client';
-  const res = await fetch(`${API_BASE}/dashboard/shares/public/${token}${params}`);
+  const res = await fetch(`${API_BASE}/dashboard/shares/public/${token}${params}&columnar=1`);
   if (!res.ok) {
     throw new Error(`HTTP ${res.status}`);
   }
-  return res.json();
+  return decodeColumnarBody((await res.json()) as SharedDashboardDataResponse);
 }
 
 /** Public (tokenless) lazy-fetch of display-only fields for visible posts. */
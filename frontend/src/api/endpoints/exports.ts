@@ -0,0 +1,30 @@
+import { apiGet, apiGetBlob } from '../client.ts';
+import type { DataExportStatus } from '../types.ts';
+
+export function getDataExport(exportId: string): Promise<DataExportStatus> {
+  return apiGet<DataExportStatus>(`/exports/${exportId}`);
+}
+
+/** Download a finished export - straight from storage when the API handed
+ *  out a signed URL, otherwise streamed through the API. */
+export async function downloadDataExport(
+  status: DataExportStatus,
+  titleHint: string,
+): Promise<void> {
+  const today = new Date().toISOString().slice(0, 10).replace(/-/g, '');
+  const slug = titleHint.slice(0, 40).replace(/[^a-z0-9]+/gi, '_');
+  const filename = `${slug}_${today}.${status.format}`;
+  const a = document.createElement('a');
+  if (status.download_url) {
+    a.href = status.download_url;
+    a.download = filename;
+    a.click();
+    return;
+  }
+  const blob = await apiGetBlob(`/exports/${status.export_id}/download`);
+  const url = URL.createObjectURL(blob);
+  a.href = url;
+  a.download = filename;
+  a.click();
+  URL.revokeObjectURL(url);
+}
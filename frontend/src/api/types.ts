@@ -294,6 +294,8 @@ export interface FeedResponse {
   offset: number;
   limit: number;
   kpis?: FeedKpis | null;
+  /** Pass back as `cursor` to fetch the next page; null on the last page. */
+  next_cursor?: string | null;
 }
 
 export interface MultiFeedParams {
@@ -317,6 +319,9 @@ export interface MultiFeedParams {
   /** Request full-window KPI aggregates alongside the (possibly truncated)
    *  posts. Agent-scoped path only. */
   include_kpis?: boolean;
+  /** Keyset cursor from the previous page's `next_cursor`; `offset` is
+   *  ignored when set. */
+  cursor?: string;
 }
 
 export interface BreakdownItem {
@@ -625,12 +630,27 @@ export interface TopicMetric {
   content_type_counts: TopicBreakdownEntry[];
 }
 
+/** JSON-columnar post encoding (`?columnar` / `columnar: true`). Categorical
+ *  columns carry a value dictionary plus one code per row; multi-valued ones
+ *  add CSR `offsets` into a flat `codes` array; the rest are plain `values`. */
+export interface PostColumnsWire {
+  length: number;
+  columns: Record<
+    string,
+    { values: unknown[] } | { dict: unknown[]; codes: number[]; offsets?: number[] }
+  >;
+}
+
 export interface DashboardDataResponse {
   posts: DashboardPost[];
   topics?: TopicMetric[];
   /** Post-shaped comment rows (from scope_comments) for dataSource:
    *  comments/both widgets. Empty when the agent has no enriched comments. */
   comments?: DashboardPost[];
+  /** Columnar form of `posts`/`comments` when requested; decoded into the row
+   *  arrays by the endpoint wrappers, so consumers only ever see rows. */
+  posts_columnar?: PostColumnsWire;
+  comments_columnar?: PostColumnsWire;
   collection_names: Record<string, string>;
   truncated: boolean;
   kpis?: DashboardKpis;
@@ -684,6 +704,8 @@ export interface SharedDashboardDataResponse {
   topics?: TopicMetric[];
   /** Post-shaped comment rows for dataSource: comments/both widgets. */
   comments?: DashboardPost[];
+  posts_columnar?: PostColumnsWire;
+  comments_columnar?: PostColumnsWire;
   collection_names: Record<string, string>;
   truncated: boolean;
   meta: {
@@ -771,6 +793,24 @@ export interface DataExportResult {
   row_count: number;
   column_names: string[];
   collection_id?: string;
+  /** File-backed export: `rows` is a preview, the file comes from /exports. */
+  export_id?: string;
+  export_status?: DataExportStatus['status'];
+  format?: DataExportStatus['format'];
+}
+
+export interface DataExportStatus {
+  export_id: string;
+  status: 'running' | 'ready' | 'failed';
+  format: 'csv' | 'xlsx' | 'parquet';
+  rows_written: number;
+  bytes_written: number;
+  truncated: boolean;
+  error: string | null;
+  created_at: string | null;
+  completed_at: string | null;
+  /** Short-lived signed URL, when the server can sign one. */
+  download_url: string | null;
 }
 
 // --- Topic Clustering types ---
@@ -225,7 +225,7 @@ function ThumbnailGrid({
         refs.find((r) => r.media_type === 'image' && r.original_url) ??
         refs.find((r) => r.original_url);
       if (!imageRef) return [];
-      const url = mediaUrl(imageRef.gcs_uri, imageRef.original_url);
+      const url = mediaUrl(imageRef.gcs_uri, imageRef.original_url, 'thumb');
       if (!url) return [];
       return [url];
     })
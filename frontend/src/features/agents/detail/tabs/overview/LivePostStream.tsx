@@ -168,12 +168,12 @@ export function PostsFeedGrid({
 
   const { data, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
     queryKey,
-    queryFn: ({ pageParam = 0 }) =>
+    queryFn: ({ pageParam }) =>
       getMultiCollectionPosts({
         collection_ids: collectionIds,
         sort: 'views',
         limit: PAGE_SIZE,
-        offset: pageParam,
+        cursor: pageParam ?? undefined,
         dedup,
         platform,
         sentiment,
@@ -181,11 +181,8 @@ export function PostsFeedGrid({
         end_date: endDate,
         agent_id: agentId,
       }),
-    initialPageParam: 0,
-    getNextPageParam: (lastPage) => {
-      const loaded = lastPage.offset + lastPage.posts.length;
-      return loaded < lastPage.total ? loaded : undefined;
-    },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
     enabled: collectionIds.length > 0,
     staleTime: 10_000,
     refetchInterval: isAgentRunning || anyCollecting ? 10_000 : false,
@@ -269,7 +266,7 @@ function PostCard({ post, isLatest, agentId }: { post: FeedPost; isLatest: boole
   const resolvedImg = media
     ? isVideo && media.preview_image_url
       ? mediaUrl(undefined, media.preview_image_url)
-      : mediaUrl(media.gcs_uri, media.original_url)
+      : mediaUrl(media.gcs_uri, media.original_url, 'card')
     : null;
   const body = post.content || post.title || post.ai_summary || '';
 
@@ -44,6 +44,7 @@ export function convertToStudioArtifact(detail: ArtifactDetail): Artifact | null
         rowCount: (p.row_count ?? 0) as number,
         columnNames: (p.column_names ?? []) as string[],
         sourceIds: detail.collection_ids,
+        exportId: p.export_id as string | undefined,
       } as Extract<Artifact, { type: 'data_export' }>;
     case 'presentation':
       return {
@@ -1,6 +1,8 @@
 import { useState } from 'react';
+import { useQuery } from '@tanstack/react-query';
 import { useStudioStore, type Artifact } from '../../stores/studio-store.ts';
 import { downloadCollection } from '../../api/endpoints/collections.ts';
+import { downloadDataExport, getDataExport } from '../../api/endpoints/exports.ts';
 import { PostDataTable } from './PostDataTable.tsx';
 import { UnderlyingDataDialog } from './UnderlyingDataDialog.tsx';
 
@@ -13,26 +15,44 @@ export function DataExportView({ artifact }: DataExportViewProps) {
   const [downloading, setDownloading] = useState(false);
   const [showUnderlyingData, setShowUnderlyingData] = useState(false);
 
+  // File-backed exports keep writing after the tool returns - poll until done.
+  const { data: exportStatus } = useQuery({
+    queryKey: ['data-export', artifact.exportId],
+    queryFn: () => getDataExport(artifact.exportId!),
+    enabled: !!artifact.exportId,
+    refetchInterval: (query) => (query.state.data?.status === 'running' ? 3_000 : false),
+  });
+
   const handleDownload = async () => {
-    const collectionId = artifact.sourceIds[0];
-    if (!collectionId) return;
     setDownloading(true);
     try {
-      await downloadCollection(collectionId, artifact.title);
+      if (exportStatus) {
+        // Re-fetch for a fresh signed URL; the polled one may have expired.
+        await downloadDataExport(await getDataExport(exportStatus.export_id), artifact.title);
+      } else if (artifact.sourceIds[0]) {
+        await downloadCollection(artifact.sourceIds[0], artifact.title);
+      }
     } finally {
       setDownloading(false);
     }
   };
 
+  const canDownload = artifact.exportId
+    ? !!exportStatus && exportStatus.status !== 'failed'
+    : !!artifact.sourceIds[0];
+  const preparing = exportStatus?.status === 'running';
+  let downloadLabel = downloading ? 'Downloading…' : `Download ${(exportStatus?.format ?? 'csv').toUpperCase()}`;
+  if (preparing) downloadLabel = 'Preparing file…';
+
   return (
     <div className="flex h-full flex-col overflow-hidden">
       <PostDataTable
         rows={artifact.rows}
-        rowCount={artifact.rowCount}
+        rowCount={exportStatus?.rows_written ?? artifact.rowCount}
         onBack={collapseReport}
-        onDownload={artifact.sourceIds[0] ? handleDownload : undefined}
-        downloadLabel={downloading ? 'Downloading…' : 'Download CSV'}
-        downloading={downloading}
+        onDownload={canDownload ? handleDownload : undefined}
+        downloadLabel={downloadLabel}
+        downloading={downloading || preparing}
         onShowData={artifact.sourceIds.length > 0 ? () => setShowUnderlyingData(true) : undefined}
       />
       <UnderlyingDataDialog
@@ -91,25 +91,22 @@ export function FeedTab() {
 
   const { data, fetchNextPage, hasNextPage, isFetching, isLoading, isError } = useInfiniteQuery({
     queryKey: ['feed-multi', effectiveIds.join(','), sort, platform, sentiment, topicFilter?.id ?? '', agentStartDate ?? '', agentEndDate ?? '', activeAgentId ?? '', feedSource],
-    queryFn: ({ pageParam = 0 }) =>
+    queryFn: ({ pageParam }) =>
       getMultiCollectionPosts({
         collection_ids: effectiveIds,
         sort,
         platform,
         sentiment,
         limit: 12,
-        offset: pageParam,
+        cursor: pageParam ?? undefined,
         start_date: agentStartDate,
         end_date: agentEndDate,
         agent_id: activeAgentId ?? undefined,
         source: feedSource,
         ...(topicFilter ? { topic_cluster_id: topicFilter.id } : {}),
       }),
-    getNextPageParam: (lastPage) => {
-      const nextOffset = lastPage.offset + lastPage.limit;
-      return nextOffset < lastPage.total ? nextOffset : undefined;
-    },
-    initialPageParam: 0,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+    initialPageParam: null as string | null,
     enabled: effectiveIds.length > 0,
     refetchInterval: showCollectingSpinner ? 3000 : false,
   });
@@ -1,7 +1,7 @@
 import { useState } from 'react';
 import { ExternalLink, Play, ImageOff, ThumbsUp, MessageCircle, Eye, Share2, ChevronLeft, ChevronRight } from 'lucide-react';
 import type { FeedPost, MediaRef } from '../../api/types.ts';
-import { mediaUrl } from '../../api/client.ts';
+import { mediaUrl, type MediaVariant } from '../../api/client.ts';
 import { PLATFORM_COLORS, SENTIMENT_COLORS } from '../../lib/constants.ts';
 import { formatNumber, timeAgo } from '../../lib/format.ts';
 import { Card } from '../../components/ui/card.tsx';
@@ -184,9 +184,9 @@ function PlatformIcon({ platform, className }: { platform: string; className?: s
  * GCS URIs need the backend proxy. External URLs can be used directly
  * since <img> and <video> tags are not subject to CORS restrictions.
  */
-function resolveUrl(m: MediaRef): string {
+function resolveUrl(m: MediaRef, variant?: MediaVariant): string {
   if (m.gcs_uri) {
-    return mediaUrl(m.gcs_uri);
+    return mediaUrl(m.gcs_uri, undefined, variant);
   }
   return m.original_url || '';
 }
@@ -257,7 +257,7 @@ function ImageCarousel({ images }: { images: MediaRef[] }) {
 }
 
 function MediaImage({ media, className }: { media: MediaRef; className?: string }) {
-  const primarySrc = resolveUrl(media);
+  const primarySrc = resolveUrl(media, 'card');
   const fallbackSrc = media.original_url
     ? mediaUrl(undefined, media.original_url)
     : undefined;
@@ -359,7 +359,7 @@ function InlineVideo({ media, postUrl, thumbnailMedia, defaultPlaying = false }:
   if (!playing) {
     // Show thumbnail with play button - video is only loaded on click
     const thumbUrl = thumbnailMedia
-      ? resolveUrl(thumbnailMedia)
+      ? resolveUrl(thumbnailMedia, 'card')
       : media.original_url ? mediaUrl(undefined, media.original_url) : undefined;
     return (
       <button
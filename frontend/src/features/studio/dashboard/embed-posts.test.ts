@@ -141,7 +141,7 @@ describe('embedPostThumbnail', () => {
     const thumb = embedPostThumbnail(p({ media_refs: refs }));
     expect(thumb).not.toBeNull();
     expect(thumb!.isVideo).toBe(false);
-    expect(thumb!.url).toContain('/media/path/x.jpg');
+    expect(thumb!.url).toContain('/media/path/x.jpg?variant=thumb');
   });
 
   it('falls back to a video ref and marks it as video', () => {
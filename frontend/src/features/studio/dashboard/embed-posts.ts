@@ -93,7 +93,7 @@ export function embedPostThumbnail(post: DashboardPost): EmbedThumbnail | null {
 
 function thumbUrl(m: MediaRef | undefined): string {
   if (!m) return '';
-  if (m.gcs_uri) return mediaUrl(m.gcs_uri);
+  if (m.gcs_uri) return mediaUrl(m.gcs_uri, undefined, 'thumb');
   if (m.preview_image_url) return mediaUrl(undefined, m.preview_image_url);
   if (m.original_url) return mediaUrl(undefined, m.original_url);
   return '';
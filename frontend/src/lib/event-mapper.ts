@@ -167,6 +167,7 @@ export function mapToolResult(
       rowCount: result.row_count as number,
       columnNames: result.column_names as string[],
       sourceIds: ctx.dataExportSourceIds,
+      exportId: result.export_id,
       createdAt: new Date(ts),
     });
   } else if (isChartResult(toolName, result)) {
@@ -10,6 +10,8 @@ interface DataExportArtifact {
   rowCount: number;
   columnNames: string[];
   sourceIds: string[];
+  /** Set for file-backed exports; `rows` is then a preview. */
+  exportId?: string;
   createdAt: Date;
 }
 
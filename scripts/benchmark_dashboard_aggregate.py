@@ -0,0 +1,175 @@
+"""Benchmark: dashboard widget aggregation, row walk vs columnar backend.
+
+Builds a synthetic post set (`--posts`, default 50k) and a layout of
+`--widgets` server-aggregated widgets - categorical bars on built-in, array
+and custom-field dimensions, number cards (sum/avg/median/distinct), day/week
+time series with and without a breakdown, heatmaps and group tables, some with
+per-widget filters. Each widget runs through the real per-widget pipeline
+(`compute_widget`: row filter, value filter, aggregate) on
+  - a list of post dicts (the row-by-row engine), and
+  - the same posts as a `PostColumns` (the vectorized engine), cold - a fresh
+    store, so factorization is included - and warm (factors memoized).
+Outputs are checked for byte-identical JSON before timing is reported.
+
+Usage:
+    uv run python scripts/benchmark_dashboard_aggregate.py
+    uv run python scripts/benchmark_dashboard_aggregate.py --posts 200000 --repeats 5
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.services.dashboard_columns import PostColumns  # noqa: E402
+from api.services.dashboard_studio_agg import compute_widget  # noqa: E402
+
+PLATFORMS = ["tiktok", "instagram", "youtube", "twitter", "facebook"]
+SENTIMENTS = ["positive", "negative", "neutral", "mixed", None]
+THEMES = [f"theme-{i}" for i in range(40)]
+ENTITIES = [f"entity-{i}" for i in range(200)]
+BRANDS = [f"brand-{i}" for i in range(25)]
+REGIONS = ["north", "south", "east", "west", "central"]
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_posts(n: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    posts = []
+    for i in range(n):
+        day = START + timedelta(days=rng.randint(0, 89), hours=rng.randint(0, 23))
+        posts.append({
+            "post_id": f"p{i}",
+            "collection_id": f"c{rng.randint(0, 3)}",
+            "platform": rng.choice(PLATFORMS),
+            "channel_handle": f"h{rng.randint(0, 3000)}",
+            "posted_at": day.isoformat(),
+            "title": None,
+            "content": f"post {i}",
+            "post_url": None,
+            "sentiment": rng.choice(SENTIMENTS),
+            "emotion": rng.choice(["joy", "anger", "fear", None]),
+            "themes": rng.sample(THEMES, rng.randint(0, 4)),
+            "entities": rng.sample(ENTITIES, rng.randint(0, 3)),
+            "language": rng.choice(["en", "es", "de", None]),
+            "content_type": rng.choice(["video", "image", "text"]),
+            "custom_fields": {"region": rng.choice(REGIONS), "tier": rng.choice([1, 2, 3]),
+                              "tags": rng.sample(REGIONS, rng.randint(0, 2))},
+            "ai_summary": None,
+            "context": None,
+            "detected_brands": rng.sample(BRANDS, rng.randint(0, 2)),
+            "channel_type": rng.choice(["ugc", "brand", "media"]),
+            "media_refs": None,
+            "topic_ids": [],
+            "like_count": rng.randint(0, 5000),
+            "view_count": rng.randint(0, 200_000),
+            "comment_count": rng.randint(0, 300),
+            "share_count": rng.randint(0, 100),
+        })
+    return posts
+
+
+def make_layout(count: int) -> list[dict]:
+    def chart(chart_type, **cfg):
+        return {"aggregation": "custom", "chartType": chart_type, "customConfig": cfg}
+
+    templates = [
+        chart("bar", dimension="platform", metric="view_count"),
+        chart("bar", dimension="themes", metric="post_count", topN=10, includeOthers=True),
+        chart("pie", dimension="sentiment", metric="engagement_total"),
+        chart("bar", dimension="entities", metric="like_count", metricAgg="avg", topN=15),
+        chart("bar", dimension="custom:region", metric="view_count", metricAgg="max"),
+        chart("word-cloud", dimension="custom:tags", metric="post_count"),
+        chart("bar", dimension="channel_handle", metric="view_count", topN=20),
+        chart("number-card", metric="view_count", metricAgg="median"),
+        chart("number-card", metric="like_count", metricAgg="avg"),
+        chart("number-card", metric="post_count", metricAgg="distinct", categoricalField="brands"),
+        chart("line", dimension="posted_at", metric="post_count", timeBucket="day"),
+        chart("line", dimension="posted_at", metric="view_count", timeBucket="week", cumulative=True),
+        chart("line", dimension="posted_at", metric="post_count", timeBucket="day",
+              breakdownDimension="platform"),
+        chart("line", dimension="posted_at", metric="engagement_total", timeBucket="week",
+              breakdownDimension="themes", topN=5, includeOthers=True),
+        chart("heatmap", dimension="platform", breakdownDimension="sentiment", metric="post_count"),
+        chart("heatmap", dimension="themes", breakdownDimension="custom:region", metric="view_count",
+              metricAgg="avg"),
+        {"aggregation": "custom", "chartType": "table", "tableConfig": {
+            "columns": [
+                {"id": "d", "kind": "dimension", "dimension": "channel_handle"},
+                {"id": "v", "kind": "metric", "metric": "view_count", "agg": "sum"},
+                {"id": "n", "kind": "metric", "metric": "post_count"},
+            ],
+            "sortBy": "v", "rowLimit": 25,
+        }},
+        {"aggregation": "custom", "chartType": "table", "tableConfig": {
+            "columns": [
+                {"id": "p", "kind": "dimension", "dimension": "platform"},
+                {"id": "t", "kind": "dimension", "dimension": "themes"},
+                {"id": "l", "kind": "metric", "metric": "like_count", "agg": "avg"},
+            ],
+            "sortBy": "l", "rowLimit": 50,
+        }},
+    ]
+    filter_sets = [
+        None,
+        {"platform": ["tiktok", "instagram"]},
+        {"themes": ["theme-1", "theme-2", "theme-3"]},
+        {"sentiment": ["positive"], "custom_fields": {"region": ["north", "south"]}},
+    ]
+    layout = []
+    for i in range(count):
+        w = json.loads(json.dumps(templates[i % len(templates)]))
+        w["i"] = f"w{i}"
+        filters = filter_sets[(i // len(templates)) % len(filter_sets)] if i >= len(templates) else None
+        if filters:
+            w["filters"] = filters
+        layout.append(w)
+    return layout
+
+
+def run(posts, layout) -> tuple[float, dict]:
+    t0 = time.perf_counter()
+    out = {w["i"]: compute_widget(posts, w) for w in layout}
+    return time.perf_counter() - t0, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--widgets", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = make_posts(args.posts, args.seed)
+    layout = make_layout(args.widgets)
+
+    row_s, cold_s, warm_s = [], [], []
+    for _ in range(args.repeats):
+        elapsed, expected = run(rows, layout)
+        row_s.append(elapsed)
+        cols = PostColumns.from_posts(rows)
+        elapsed, cold = run(cols, layout)
+        cold_s.append(elapsed)
+        elapsed, warm = run(cols, layout)
+        warm_s.append(elapsed)
+        for wid in expected:
+            if json.dumps(expected[wid]) != json.dumps(cold[wid]) or json.dumps(cold[wid]) != json.dumps(warm[wid]):
+                raise SystemExit(f"widget {wid}: columnar output differs from the row walk")
+
+    row, cold, warm = (statistics.median(v) for v in (row_s, cold_s, warm_s))
+    print(f"{args.posts} posts x {len(layout)} widgets (median of {args.repeats})")
+    print(f"  row walk           {row * 1000:9.1f}ms")
+    print(f"  columnar, cold     {cold * 1000:9.1f}ms  ({row / cold:5.1f}x)")
+    print(f"  columnar, warm     {warm * 1000:9.1f}ms  ({row / warm:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
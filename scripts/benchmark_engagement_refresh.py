@@ -0,0 +1,148 @@
+"""Simulate engagement refresh: fixed-cadence refresh-everything vs the adaptive planner.
+
+Synthetic posts arrive over the simulated window. Each accumulates
+engagement along a saturating curve, score(age) = A * (1 - exp(-age / tau)),
+with a heavy-tailed reach A and a per-post tau, so a few posts trend and
+most stop moving within a day or two. Both strategies see only what they
+fetched.
+
+Metrics:
+  calls      - vendor post fetches (what the vendor bills)
+  snapshots  - post_engagements rows written (unchanged snapshots skipped)
+  top-N err  - mean relative error of the observed vs true score over the N
+               highest-engagement posts, averaged over every simulated hour
+
+The adaptive planner is swept over min_hours; the report marks the cheapest
+setting whose top-N error is no worse than the baseline's.
+
+Usage:
+    uv run python scripts/benchmark_engagement_refresh.py
+    uv run python scripts/benchmark_engagement_refresh.py --posts 5000 --days 21 --baseline-hours 6
+"""
+
+import argparse
+import math
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from workers.engagement.planner import (  # noqa: E402
+    PostRefreshState,
+    RefreshPolicy,
+    metrics_changed,
+    plan_refresh,
+)
+
+_T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class _World:
+    def __init__(self, n_posts: int, days: int, seed: int):
+        rng = np.random.default_rng(seed)
+        self.hours = days * 24
+        self.arrival = np.sort(rng.uniform(0, self.hours * 0.8, n_posts))
+        self.reach = rng.lognormal(mean=6.0, sigma=2.0, size=n_posts)
+        self.tau = rng.uniform(6.0, 72.0, n_posts)
+
+    def views(self, i: int, hour: float) -> int:
+        age = hour - self.arrival[i]
+        if age <= 0:
+            return 0
+        return int(self.reach[i] * (1.0 - math.exp(-age / self.tau[i])))
+
+    def all_views(self, hour: float) -> np.ndarray:
+        age = np.clip(hour - self.arrival, 0.0, None)
+        return np.floor(self.reach * (1.0 - np.exp(-age / self.tau)))
+
+
+def _metrics(views: int) -> dict:
+    # Likes track views; the planner's score weights them, the sim doesn't care.
+    return {"views": views, "likes": views // 20, "comments_count": views // 200,
+            "shares": views // 500, "saves": 0}
+
+
+def _simulate(world: _World, top_n: int, policy: RefreshPolicy | None, baseline_hours: float) -> dict:
+    n = len(world.arrival)
+    states = [
+        PostRefreshState(post_id=str(i), platform="tiktok", post_url=str(i),
+                         posted_at=_T0 + timedelta(hours=float(world.arrival[i])))
+        for i in range(n)
+    ]
+    observed = np.zeros(n)
+    calls = snapshots = 0
+    errors = []
+
+    for hour in range(world.hours):
+        now = _T0 + timedelta(hours=hour)
+        live = [s for s in states if s.posted_at <= now]
+        if policy is None:
+            due = live if hour % baseline_hours == 0 else []
+        else:
+            due = plan_refresh(live, now, vendor_for=lambda p: "apify",
+                               budgets=lambda v: 10**9, policy=policy)
+
+        for s in due:
+            i = int(s.post_id)
+            m = _metrics(world.views(i, hour))
+            calls += 1
+            if metrics_changed(s.last_metrics, m):
+                snapshots += 1
+                s.prev_metrics, s.prev_fetched_at = s.last_metrics, s.last_fetched_at
+                s.last_metrics, s.last_fetched_at = m, now
+                observed[i] = m["views"]
+            s.last_checked_at = now
+
+        truth = world.all_views(hour)
+        top = np.argsort(truth)[-top_n:]
+        top = top[truth[top] > 0]
+        if len(top):
+            errors.append(float(np.mean(np.abs(truth[top] - observed[top]) / truth[top])))
+
+    return {"calls": calls, "snapshots": snapshots, "top_err": float(np.mean(errors))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--top-n", type=int, default=100)
+    parser.add_argument("--baseline-hours", type=int, default=6,
+                        help="refresh-everything cadence to compare against")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    world = _World(args.posts, args.days, args.seed)
+    base = _simulate(world, args.top_n, None, args.baseline_hours)
+
+    print(f"{args.posts} posts, {args.days} days, top-{args.top_n} freshness\n")
+    print("| strategy | calls | snapshots | top-N err | calls saved |")
+    print("|---|---:|---:|---:|---:|")
+    print(f"| every post every {args.baseline_hours}h | {base['calls']} | {base['snapshots']} "
+          f"| {base['top_err']:.4f} | - |")
+
+    best = None
+    for min_hours in (0.5, 1.0, 2.0, 3.0, 4.0, 6.0):
+        policy = RefreshPolicy(min_hours=min_hours)
+        r = _simulate(world, args.top_n, policy, args.baseline_hours)
+        saved = 1.0 - r["calls"] / base["calls"]
+        ok = r["top_err"] <= base["top_err"]
+        if ok and (best is None or r["calls"] < best[1]["calls"]):
+            best = (min_hours, r)
+        print(f"| adaptive min_hours={min_hours:g} | {r['calls']} | {r['snapshots']} "
+              f"| {r['top_err']:.4f} | {saved:.0%}{'' if ok else ' (staler)'} |")
+
+    if best:
+        saved = 1.0 - best[1]["calls"] / base["calls"]
+        print(f"\nAt equal-or-better top-{args.top_n} freshness: min_hours={best[0]:g} "
+              f"saves {saved:.0%} of vendor calls.")
+    else:
+        print("\nNo adaptive setting matched the baseline's freshness.")
+
+
+if __name__ == "__main__":
+    main()
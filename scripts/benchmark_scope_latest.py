@@ -0,0 +1,382 @@
+"""Benchmark: scope_posts / scope_post_ids over the *_latest tables vs the
+original full-history ROW_NUMBER() TVFs, on a synthetic dataset.
+
+Creates a scratch dataset, fills posts / enriched_posts / post_engagements
+with synthetic history (every post re-collected, re-enriched and re-fetched
+several times, spread over `--days` of partitions), builds the *_latest
+tables with a full refresh, then runs the same dashboard-shaped queries
+through both TVF versions with the query cache off. Reports median bytes
+processed, slot-ms and elapsed time per query, then drops the dataset
+(unless --keep).
+
+Usage:
+    uv run python scripts/benchmark_scope_latest.py --posts 200000 --recrawls 4
+    uv run python scripts/benchmark_scope_latest.py --posts 50000 --keep
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+load_dotenv(project_root / ".env")
+
+from google.cloud import bigquery  # noqa: E402
+
+from config.settings import get_settings  # noqa: E402
+from workers.shared.bq_client import SQL_BASE_DIR, BQClient  # noqa: E402
+from workers.shared.latest_tables import refresh_latest_tables  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("benchmark_scope")
+
+AGENT_ID = "bench-agent-0"
+
+# The pre-latest-tables TVFs, verbatim apart from the _legacy suffix.
+LEGACY_TVFS = """\
+CREATE OR REPLACE TABLE FUNCTION social_listening.scope_post_ids_legacy(
+    p_agent_id STRING
+) AS (
+    WITH agent_window AS (
+        SELECT data_start_date
+        FROM social_listening.agents
+        WHERE agent_id = p_agent_id
+          AND data_start_date IS NOT NULL
+        ORDER BY created_at DESC NULLS LAST
+        LIMIT 1
+    ),
+    dedup_posts AS (
+        SELECT * EXCEPT(_rn) FROM (
+            SELECT p.*,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY p.post_id
+                       ORDER BY p.collected_at DESC
+                   ) AS _rn
+            FROM social_listening.posts p
+        )
+        WHERE _rn = 1
+    ),
+    dedup_enr AS (
+        SELECT * EXCEPT(_rn) FROM (
+            SELECT ep.*,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY ep.post_id
+                       ORDER BY (ep.source = 'user_override') DESC,
+                                ep.agent_version DESC NULLS LAST,
+                                ep.enriched_at DESC
+                   ) AS _rn
+            FROM social_listening.enriched_posts ep
+            WHERE ep.agent_id = p_agent_id
+        )
+        WHERE _rn = 1
+    )
+    SELECT p.post_id
+    FROM dedup_posts p
+    JOIN dedup_enr ep USING (post_id)
+    WHERE ep.is_related_to_task IS TRUE
+      AND p.posted_at >= COALESCE(
+          TIMESTAMP((SELECT data_start_date FROM agent_window)),
+          TIMESTAMP('1970-01-01')
+      )
+);
+
+
+CREATE OR REPLACE TABLE FUNCTION social_listening.scope_posts_legacy(
+    p_agent_id STRING
+) AS (
+    WITH agent_window AS (
+        SELECT data_start_date
+        FROM social_listening.agents
+        WHERE agent_id = p_agent_id
+          AND data_start_date IS NOT NULL
+        ORDER BY created_at DESC NULLS LAST
+        LIMIT 1
+    ),
+    dedup_posts AS (
+        SELECT * EXCEPT(_rn) FROM (
+            SELECT p.*,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY p.post_id
+                       ORDER BY p.collected_at DESC
+                   ) AS _rn
+            FROM social_listening.posts p
+        )
+        WHERE _rn = 1
+    ),
+    dedup_enr AS (
+        SELECT * EXCEPT(_rn) FROM (
+            SELECT ep.*,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY ep.post_id
+                       ORDER BY (ep.source = 'user_override') DESC,
+                                ep.agent_version DESC NULLS LAST,
+                                ep.enriched_at DESC
+                   ) AS _rn
+            FROM social_listening.enriched_posts ep
+            WHERE ep.agent_id = p_agent_id
+        )
+        WHERE _rn = 1
+    ),
+    dedup_eng AS (
+        SELECT post_id, likes, views, comments_count, shares, saves,
+               comments, platform_engagements,
+               source AS engagement_source, fetched_at
+        FROM social_listening.post_engagements
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY post_id ORDER BY fetched_at DESC
+        ) = 1
+    )
+    SELECT
+      p.post_id, p.collection_id, p.platform, p.channel_handle, p.channel_id,
+      p.title, p.content, p.post_url, p.posted_at, p.post_type,
+      p.parent_post_id, p.media_refs, p.platform_metadata, p.crawl_provider,
+      p.search_keyword, p.collected_at,
+      SAFE_CAST(JSON_VALUE(p.platform_metadata, '$.is_retweet') AS BOOL) AS is_retweet,
+      SAFE_CAST(JSON_VALUE(p.platform_metadata, '$.is_quote_status') AS BOOL) AS is_quote,
+      ep.agent_version, ep.context, ep.sentiment, ep.emotion,
+      ep.entities, ep.themes, ep.ai_summary, ep.language, ep.content_type,
+      ep.detected_brands, ep.channel_type,
+      ep.custom_fields, ep.enriched_at,
+      eng.likes, eng.views, eng.comments_count, eng.shares, eng.saves,
+      eng.comments, eng.platform_engagements, eng.engagement_source,
+      eng.fetched_at
+    FROM dedup_posts p
+    JOIN dedup_enr ep USING (post_id)
+    LEFT JOIN dedup_eng eng USING (post_id)
+    WHERE ep.is_related_to_task IS TRUE
+      AND p.posted_at >= COALESCE(
+          TIMESTAMP((SELECT data_start_date FROM agent_window)),
+          TIMESTAMP('1970-01-01')
+      )
+);
+"""
+
+SYNTHETIC_POSTS = """\
+INSERT INTO social_listening.posts
+SELECT
+    CONCAT('p', i) AS post_id,
+    CONCAT('c', MOD(i, 20)) AS collection_id,
+    ['twitter', 'instagram', 'tiktok', 'youtube'][OFFSET(MOD(i, 4))] AS platform,
+    CONCAT('handle', MOD(i, 5000)) AS channel_handle,
+    CONCAT('ch', MOD(i, 5000)) AS channel_id,
+    NULL AS title,
+    REPEAT('synthetic post body ', 20) AS content,
+    CONCAT('https://example.com/p/', i) AS post_url,
+    TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL MOD(i, @days * 24) HOUR) AS posted_at,
+    'post' AS post_type,
+    NULL AS parent_post_id,
+    JSON '[]' AS media_refs,
+    JSON_OBJECT('is_retweet', MOD(i, 7) = 0) AS platform_metadata,
+    'synthetic' AS crawl_provider,
+    'bench' AS search_keyword,
+    TIMESTAMP_SUB(
+        CURRENT_TIMESTAMP(),
+        INTERVAL DIV(MOD(i, @days * 24) * (@recrawls - r), @recrawls) HOUR
+    ) AS collected_at
+FROM UNNEST(GENERATE_ARRAY(0, @posts - 1)) AS i,
+     UNNEST(GENERATE_ARRAY(0, @recrawls - 1)) AS r
+"""
+
+SYNTHETIC_ENRICHED = """\
+INSERT INTO social_listening.enriched_posts
+SELECT
+    CONCAT('p', i) AS post_id,
+    CONCAT('c', MOD(i, 20)) AS collection_id,
+    CONCAT('bench-agent-', a) AS agent_id,
+    v AS agent_version,
+    REPEAT('context ', 10) AS context,
+    ['positive', 'negative', 'neutral', 'mixed'][OFFSET(MOD(i + v, 4))] AS sentiment,
+    'neutral' AS emotion,
+    ['acme', 'globex'] AS entities,
+    ['pricing', 'quality'] AS themes,
+    REPEAT('summary ', 15) AS ai_summary,
+    'en' AS language,
+    'review' AS content_type,
+    'mentions the brand' AS relevance_reason,
+    MOD(i, 5) != 0 AS is_related_to_task,
+    ['acme'] AS detected_brands,
+    'ugc' AS channel_type,
+    JSON_OBJECT('score', MOD(i, 10)) AS custom_fields,
+    IF(MOD(i, 97) = 0 AND v = 1, 'user_override', NULL) AS source,
+    TIMESTAMP_SUB(
+        CURRENT_TIMESTAMP(),
+        INTERVAL DIV(MOD(i, @days * 24) * (@recrawls - v + 1), @recrawls) HOUR
+    ) AS enriched_at
+FROM UNNEST(GENERATE_ARRAY(0, @posts - 1)) AS i,
+     UNNEST(GENERATE_ARRAY(0, 2)) AS a,
+     UNNEST(GENERATE_ARRAY(1, @recrawls)) AS v
+"""
+
+SYNTHETIC_ENGAGEMENTS = """\
+INSERT INTO social_listening.post_engagements
+SELECT
+    CONCAT('e', i, '-', r) AS engagement_id,
+    CONCAT('p', i) AS post_id,
+    100 * r + MOD(i, 50) AS likes,
+    r AS shares,
+    MOD(i, 30) AS comments_count,
+    1000 * r + i AS views,
+    0 AS saves,
+    JSON '[]' AS comments,
+    JSON '{}' AS platform_engagements,
+    'synthetic' AS source,
+    TIMESTAMP_SUB(
+        CURRENT_TIMESTAMP(),
+        INTERVAL DIV(MOD(i, @days * 24) * (@recrawls - r), @recrawls) HOUR
+    ) AS fetched_at
+FROM UNNEST(GENERATE_ARRAY(0, @posts - 1)) AS i,
+     UNNEST(GENERATE_ARRAY(0, @recrawls - 1)) AS r
+"""
+
+AGENTS_ROW = """\
+INSERT INTO social_listening.agents (agent_id, user_id, title, created_at)
+VALUES (@agent_id, 'bench', 'bench', CURRENT_TIMESTAMP())
+"""
+
+# Dashboard-, feed- and alert-shaped reads. {tvf} / {ids_tvf} are swapped
+# between the legacy and the latest-table versions.
+QUERIES = {
+    "dashboard aggregate": """\
+SELECT platform, sentiment, COUNT(*) AS n, SUM(views) AS views, SUM(likes) AS likes
+FROM social_listening.{tvf}(@agent_id)
+WHERE collection_id IN ('c1', 'c2', 'c3')
+GROUP BY platform, sentiment
+""",
+    "feed page": """\
+SELECT post_id, content, ai_summary, views, posted_at
+FROM social_listening.{tvf}(@agent_id)
+ORDER BY posted_at DESC
+LIMIT 50
+""",
+    "scope ids count": """\
+SELECT COUNT(*) AS n FROM social_listening.{ids_tvf}(@agent_id)
+""",
+}
+
+
+def _qualify(sql: str, project: str, dataset: str) -> str:
+    return sql.replace("social_listening.", f"`{project}`.{dataset}.")
+
+
+def _run(client: bigquery.Client, sql: str, params: dict | None = None) -> bigquery.QueryJob:
+    query_params = []
+    for key, value in (params or {}).items():
+        kind = "INT64" if isinstance(value, int) else "STRING"
+        query_params.append(bigquery.ScalarQueryParameter(key, kind, value))
+    job = client.query(sql, job_config=bigquery.QueryJobConfig(
+        query_parameters=query_params, use_query_cache=False,
+    ))
+    job.result()
+    return job
+
+
+def _measure(client, sql, params, runs: int) -> dict:
+    bytes_processed, slot_ms, elapsed = [], [], []
+    for _ in range(runs):
+        job = _run(client, sql, params)
+        bytes_processed.append(job.total_bytes_processed or 0)
+        slot_ms.append(job.slot_millis or 0)
+        elapsed.append((job.ended - job.started).total_seconds())
+    return {
+        "bytes": statistics.median(bytes_processed),
+        "slot_ms": statistics.median(slot_ms),
+        "elapsed": statistics.median(elapsed),
+    }
+
+
+def _mb(n: float) -> str:
+    return f"{n / 1e6:,.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--recrawls", type=int, default=4, help="history rows per post/table")
+    parser.add_argument("--days", type=int, default=180, help="partitions the history spans")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="don't drop the scratch dataset")
+    args = parser.parse_args()
+
+    base = get_settings()
+    dataset = f"scope_bench_{int(time.time())}"
+    settings = base.model_copy(update={"bq_dataset": dataset})
+    bq = BQClient(settings)
+    client = bq._client
+    project = settings.gcp_project_id
+
+    def ddl(sql: str, params: dict | None = None) -> bigquery.QueryJob:
+        return _run(client, _qualify(sql, project, dataset), params)
+
+    client.create_dataset(bigquery.Dataset(f"{project}.{dataset}"), exists_ok=True)
+    logger.info("Scratch dataset %s.%s", project, dataset)
+    try:
+        for name in (
+            "posts", "enriched_posts", "post_engagements", "agents",
+            "posts_latest", "enriched_posts_latest", "post_engagements_latest",
+        ):
+            ddl((SQL_BASE_DIR / "schemas" / f"{name}.sql").read_text())
+        ddl((SQL_BASE_DIR / "functions" / "latest.sql").read_text())
+        ddl((SQL_BASE_DIR / "functions" / "scope.sql").read_text())
+        ddl(LEGACY_TVFS)
+
+        gen = {"posts": args.posts, "recrawls": args.recrawls, "days": args.days}
+        for label, sql in (
+            ("posts", SYNTHETIC_POSTS),
+            ("enriched_posts", SYNTHETIC_ENRICHED),
+            ("post_engagements", SYNTHETIC_ENGAGEMENTS),
+        ):
+            job = ddl(sql, gen)
+            logger.info("Generated %s rows of %s", f"{job.num_dml_affected_rows:,}", label)
+        ddl(AGENTS_ROW, {"agent_id": AGENT_ID})
+
+        t0 = time.monotonic()
+        refresh_latest_tables(bq, full=True)
+        full_refresh_sec = time.monotonic() - t0
+        t0 = time.monotonic()
+        refresh_latest_tables(bq)
+        incremental_refresh_sec = time.monotonic() - t0
+
+        rows = []
+        for name, template in QUERIES.items():
+            before = _measure(client, _qualify(
+                template.format(tvf="scope_posts_legacy", ids_tvf="scope_post_ids_legacy"),
+                project, dataset,
+            ), {"agent_id": AGENT_ID}, args.runs)
+            after = _measure(client, _qualify(
+                template.format(tvf="scope_posts", ids_tvf="scope_post_ids"),
+                project, dataset,
+            ), {"agent_id": AGENT_ID}, args.runs)
+            rows.append((name, before, after))
+
+        print()
+        print(
+            f"Synthetic dataset: {args.posts:,} posts x {args.recrawls} history rows "
+            f"per table over {args.days} days; median of {args.runs} runs, cache off."
+        )
+        print()
+        print("| Query | Bytes before | Bytes after | Slot-ms before | Slot-ms after | Elapsed before | Elapsed after |")
+        print("|---|---|---|---|---|---|---|")
+        for name, before, after in rows:
+            print(
+                f"| {name} | {_mb(before['bytes'])} | {_mb(after['bytes'])} "
+                f"| {before['slot_ms']:,.0f} | {after['slot_ms']:,.0f} "
+                f"| {before['elapsed']:.2f}s | {after['elapsed']:.2f}s |"
+            )
+        print()
+        print(f"Full refresh: {full_refresh_sec:.1f}s; incremental refresh: {incremental_refresh_sec:.1f}s")
+    finally:
+        if args.keep:
+            logger.info("Keeping dataset %s", dataset)
+        else:
+            client.delete_dataset(f"{project}.{dataset}", delete_contents=True, not_found_ok=True)
+            logger.info("Dropped dataset %s", dataset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Benchmark: FirestoreSessionService flush / load time vs session length.
+
+For each session length (in user turns) seeds a scratch session through the
+append-only store, then times
+  - flush of one more turn (append-only: the turn's events + a state delta),
+  - the default load (the LLM window of recent user turns),
+  - a full-history load (what the sessions router does to restore the UI),
+against the old single-document layout on the same events: serialize every
+event and set() the whole `events_json` array, and load + re-validate it all.
+Each turn is a user message, a tool call, a tool result with a realistic
+payload and a model answer. Scratch sessions are deleted afterwards (unless
+--keep). Point FIRESTORE_EMULATOR_HOST at an emulator to run without a
+project.
+
+Usage:
+    uv run python scripts/benchmark_session_store.py --turns 10,100,400,1000
+    uv run python scripts/benchmark_session_store.py --turns 50 --repeats 10 --keep
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+load_dotenv(project_root / ".env")
+
+from google.adk.events import Event, EventActions  # noqa: E402
+from google.adk.sessions.base_session_service import GetSessionConfig  # noqa: E402
+from google.cloud import firestore  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from api.auth.session_service import SESSIONS_COLLECTION, FirestoreSessionService  # noqa: E402
+from config.settings import get_settings  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("benchmark_session_store")
+
+APP_NAME = "bench"
+USER_ID = "bench-user"
+# Firestore's document size limit - the old layout fails past it.
+DOC_LIMIT_BYTES = 1024 * 1024
+
+
+def make_turn(n: int, payload_rows: int) -> list[Event]:
+    rows = [{"post_id": f"p{n}-{i}", "text": "lorem ipsum " * 8, "likes": i} for i in range(payload_rows)]
+    return [
+        Event(author="user", invocation_id=f"i{n}",
+              content=types.Content(role="user", parts=[types.Part.from_text(text=f"Question {n}?")])),
+        Event(author="agent", invocation_id=f"i{n}",
+              content=types.Content(role="model", parts=[
+                  types.Part.from_function_call(name="execute_sql", args={"query": f"SELECT {n}"}),
+              ])),
+        Event(author="agent", invocation_id=f"i{n}",
+              content=types.Content(role="user", parts=[
+                  types.Part.from_function_response(name="execute_sql", response={"rows": rows}),
+              ])),
+        Event(author="agent", invocation_id=f"i{n}",
+              content=types.Content(role="model", parts=[types.Part.from_text(text=f"Answer {n}. " * 20)]),
+              actions=EventActions(state_delta={"message_count": n + 1})),
+    ]
+
+
+async def append_turn(svc: FirestoreSessionService, session, n: int, payload_rows: int) -> None:
+    for event in make_turn(n, payload_rows):
+        await svc.append_event(session, event)
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+async def bench_length(svc, db, turns: int, repeats: int, payload_rows: int, seed_chunk: int) -> dict:
+    sid = f"bench-{turns}-{int(time.time())}"
+    session = await svc.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=sid)
+    for n in range(turns):
+        await append_turn(svc, session, n, payload_rows)
+        if (n + 1) % seed_chunk == 0:
+            svc.flush(session)
+            session = await svc.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=sid)
+    svc.flush(session)
+
+    flush_s, window_s, full_s = [], [], []
+    window_events = 0
+    for r in range(repeats):
+        t0 = time.perf_counter()
+        session = await svc.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=sid)
+        window_s.append(time.perf_counter() - t0)
+        window_events = len(session.events)
+        await append_turn(svc, session, turns + r, payload_rows)
+        flush_s.append(timed(lambda: svc.flush(session)))
+
+        t0 = time.perf_counter()
+        full = await svc.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=sid, config=GetSessionConfig())
+        full_s.append(time.perf_counter() - t0)
+    total_events = len(full.events)
+
+    # Old layout: every flush re-serialized all events into one document.
+    legacy_sid = f"{sid}-legacy"
+    legacy_ref = db.collection(SESSIONS_COLLECTION).document(legacy_sid)
+    doc_bytes = len(json.dumps([e.model_dump(mode="json", exclude_none=True) for e in full.events]))
+    legacy_flush_s, legacy_load_s = [], []
+    if doc_bytes < DOC_LIMIT_BYTES:
+        for _ in range(repeats):
+            def legacy_flush():
+                data = [
+                    json.loads(json.dumps(e.model_dump(mode="json", exclude_none=True)))
+                    for e in full.events
+                ]
+                legacy_ref.set({
+                    "session_id": legacy_sid, "app_name": APP_NAME, "user_id": USER_ID,
+                    "state": full.state, "last_update_time": time.time(), "events_json": data,
+                })
+
+            def legacy_load():
+                data = legacy_ref.get().to_dict()
+                [Event.model_validate(e) for e in data["events_json"]]
+
+            legacy_flush_s.append(timed(legacy_flush))
+            legacy_load_s.append(timed(legacy_load))
+        legacy_ref.delete()
+
+    return {
+        "sid": sid,
+        "turns": turns,
+        "events": total_events,
+        "window_events": window_events,
+        "doc_kb": doc_bytes / 1024,
+        "flush": statistics.median(flush_s),
+        "load_window": statistics.median(window_s),
+        "load_full": statistics.median(full_s),
+        "legacy_flush": statistics.median(legacy_flush_s) if legacy_flush_s else None,
+        "legacy_load": statistics.median(legacy_load_s) if legacy_load_s else None,
+    }
+
+
+def fmt(sec) -> str:
+    return "  over 1MiB" if sec is None else f"{sec * 1000:9.1f}ms"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", default="10,100,400,1000", help="comma-separated session lengths (user turns)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--payload-rows", type=int, default=5, help="rows in each tool result")
+    parser.add_argument("--seed-chunk", type=int, default=50, help="turns per flush while seeding")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch sessions")
+    args = parser.parse_args()
+
+    db = firestore.Client(project=get_settings().gcp_project_id)
+    svc = FirestoreSessionService(db=db)
+
+    results = []
+    for turns in (int(t) for t in args.turns.split(",")):
+        logger.warning("benchmarking %d turns", turns)
+        results.append(await bench_length(svc, db, turns, args.repeats, args.payload_rows, args.seed_chunk))
+
+    print(f"\n{'turns':>6} {'events':>7} {'window':>7} {'doc KB':>8} | {'flush':>11} {'load win':>11} "
+          f"{'load full':>11} | {'old flush':>11} {'old load':>11}")
+    for r in results:
+        print(f"{r['turns']:>6} {r['events']:>7} {r['window_events']:>7} {r['doc_kb']:>8.0f} | "
+              f"{fmt(r['flush'])} {fmt(r['load_window'])} {fmt(r['load_full'])} | "
+              f"{fmt(r['legacy_flush'])} {fmt(r['legacy_load'])}")
+
+    if not args.keep:
+        for r in results:
+            await svc.delete_session(app_name=APP_NAME, user_id=USER_ID, session_id=r["sid"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -389,7 +389,33 @@ gcloud scheduler jobs create http ongoing-scheduler \
     --project="$PROJECT_ID" \
     --quiet
 
-echo "  Cloud Scheduler configured (every 5 minutes)."
+# Current-state tables behind the scope TVFs (workers/shared/latest_tables.py).
+gcloud scheduler jobs delete latest-tables-refresh \
+    --location="$REGION" --project="$PROJECT_ID" --quiet 2>/dev/null || true
+
+gcloud scheduler jobs create http latest-tables-refresh \
+    --schedule="*/15 * * * *" \
+    --uri="$API_URL/internal/latest-tables/refresh" \
+    --http-method=POST \
+    --oidc-service-account-email="$API_SA" \
+    --location="$REGION" \
+    --project="$PROJECT_ID" \
+    --quiet
+
+# Results of Gemini batch enrichment jobs (workers/enrichment/batch.py).
+gcloud scheduler jobs delete enrichment-batches-collect \
+    --location="$REGION" --project="$PROJECT_ID" --quiet 2>/dev/null || true
+
+gcloud scheduler jobs create http enrichment-batches-collect \
+    --schedule="*/10 * * * *" \
+    --uri="$API_URL/internal/enrichment-batches/collect" \
+    --http-method=POST \
+    --oidc-service-account-email="$API_SA" \
+    --location="$REGION" \
+    --project="$PROJECT_ID" \
+    --quiet
+
+echo "  Cloud Scheduler configured (tick every 5 minutes, latest tables every 15, batch enrichment every 10)."
 echo ""
 
 # ══════════════════════════════════════════════════
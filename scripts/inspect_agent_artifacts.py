@@ -179,7 +179,12 @@ def inspect(agent_id: str, repair: bool) -> int:
             print(f"  session {sid}: MISSING")
             continue
         sdata = sdoc.to_dict()
-        events = sdata.get("events_json") or []
+        events = sdata.get("events_json")
+        if events is None:  # append-only layout: one doc per event
+            events = [
+                (d.to_dict() or {}).get("event") or {}
+                for d in sdoc.reference.collection("events").order_by("seq").stream()
+            ]
         hits = []
         all_tool_names = []
         for e in events:
@@ -35,6 +35,13 @@ for SQL_FILE in "$BQ_DIR"/schemas/*.sql; do
     bq query --use_legacy_sql=false --project_id="$PROJECT_ID" < "$SQL_FILE"
 done
 
+# Create views + table functions. latest.sql first - scope.sql reads it.
+echo "Creating table functions..."
+for SQL_FILE in "$BQ_DIR/functions/latest.sql" $(ls "$BQ_DIR"/functions/*.sql | grep -v '/latest.sql$'); do
+    echo "  Running $(basename "$SQL_FILE")..."
+    bq query --use_legacy_sql=false --project_id="$PROJECT_ID" < "$SQL_FILE"
+done
+
 # Create media objects external table
 echo "Creating media_objects external table..."
 bq query --use_legacy_sql=false "
@@ -60,12 +60,13 @@ def _media_base() -> str:
     return (getattr(settings, "api_service_url", "") or "").rstrip("/") or "http://localhost:8000"
 
 
-def _gcs_to_media(gcs_uri: str, media_base: str) -> str:
+def _gcs_to_media(gcs_uri: str, media_base: str, variant: str | None = None) -> str:
     # gs://bucket/path → {api}/media/path (public proxy)
     if gcs_uri.startswith("gs://"):
         _, _, path = gcs_uri[5:].partition("/")
         if path:
-            return f"{media_base}/media/{path}"
+            url = f"{media_base}/media/{path}"
+            return f"{url}?variant={variant}" if variant else url
     return ""
 
 
@@ -73,8 +74,8 @@ def _thumb_url(post: dict, media_base: str) -> str:
     """Best public thumbnail URL for a post, or '' if none.
 
     Prefers already-public URLs (platform CDN / preview) so the image loads in an
-    inbox even when our own /media proxy is on localhost; falls back to the GCS
-    copy via the public proxy.
+    inbox even when our own /media proxy is on localhost; falls back to the
+    320px `thumb` rendition of the GCS copy via the public proxy.
     """
     # Top-level thumbnail (videos), then media_refs.
     top = post.get("thumbnail_url")
@@ -82,7 +83,7 @@ def _thumb_url(post: dict, media_base: str) -> str:
         return str(top)
     tg = post.get("thumbnail_gcs_uri")
     if tg:
-        url = _gcs_to_media(str(tg), media_base)
+        url = _gcs_to_media(str(tg), media_base, "thumb")
         if url:
             return url
 
@@ -102,7 +103,7 @@ def _thumb_url(post: dict, media_base: str) -> str:
         if (ref.get("media_type") or "image") == "image" and ref.get("original_url"):
             return str(ref["original_url"])
         if ref.get("gcs_uri"):
-            url = _gcs_to_media(str(ref["gcs_uri"]), media_base)
+            url = _gcs_to_media(str(ref["gcs_uri"]), media_base, "thumb")
             if url:
                 return url
     return ""
@@ -12,6 +12,10 @@ emotion / themes / entities / brands / custom_fields all populated).
 its collections hold exactly the posts newly collected in that run. Cross-run /
 overlapping duplicates are caught by the per-alert `alerted_posts` dedup ledger
 so the same post never alerts twice.
+
+The streaming evaluator (workers/alerts/stream.py) emails most matches earlier,
+as posts are enriched; this run-completion pass then acts as the
+reconciliation sweep.
 """
 
 from __future__ import annotations
@@ -96,6 +100,72 @@ def evaluate_alerts_for_collection(collection_id: str, *, bq, fs) -> dict:
     return evaluate_alerts_for_agent_run(agent_id, [collection_id], bq=bq, fs=fs)
 
 
+def notify_alert(alert: dict, matched: list[dict], *, agent_id: str, fs) -> int:
+    """Email one alert's matched posts, minus any already alerted (dedup ledger).
+
+    Shared by the run-completion sweep below and the streaming evaluator
+    (workers/alerts/stream.py). Returns the number of emails sent; 0 when
+    every match was already notified or no send succeeded. On success the
+    posts are marked alerted and the alert's trigger stats are bumped."""
+    from datetime import datetime, timezone
+
+    from config.settings import get_settings
+    from workers.alerts.email import build_alert_email_html
+    from workers.alerts.render_client import render_alert_widgets
+    from workers.notifications.service import send_composed_html_email
+
+    alert_id = alert["alert_id"]
+    match_ids = [p.get("post_id") for p in matched if p.get("post_id")]
+    unseen_ids = set(fs.filter_unseen_post_ids(alert_id, match_ids))
+    if not unseen_ids:
+        return 0
+    unseen = [p for p in matched if p.get("post_id") in unseen_ids]
+
+    recipients = _recipients_for(alert, fs)
+    if not recipients:
+        logger.warning("Alert %s matched %d posts but has no recipients", alert_id, len(unseen))
+        return 0
+
+    max_items = int(alert.get("max_items_per_email") or 10)
+    alert_name = alert.get("name") or "Alert"
+
+    # Render the alert's widgets to PNGs (empty on no widgets / failure /
+    # unconfigured render service). The email always shows the post feed;
+    # widget images, when present, sit above it.
+    images = render_alert_widgets(alert_id, alert.get("widgets") or [])
+    subject, html = build_alert_email_html(
+        alert_name=alert_name,
+        posts=unseen,
+        total_matched=len(unseen),
+        max_items=max_items,
+        app_url=get_settings().frontend_url,
+        agent_id=agent_id,
+        images=images or None,
+    )
+
+    sent = 0
+    for recipient in recipients:
+        result = send_composed_html_email(
+            recipient_email=recipient, subject=subject, body_html=html
+        )
+        if result.get("status") == "success":
+            sent += 1
+        else:
+            logger.error("Alert %s email to %s failed: %s", alert_id, recipient, result.get("message"))
+
+    if sent:
+        # Mark every matched post seen (not just the rendered first N) so
+        # the "+N more" tail can't re-alert on a later overlapping run.
+        fs.mark_posts_alerted(alert_id, list(unseen_ids))
+        fs.update_alert(
+            alert_id,
+            last_triggered_at=datetime.now(timezone.utc),
+            last_match_count=len(unseen),
+            trigger_count=int(alert.get("trigger_count") or 0) + 1,
+        )
+    return sent
+
+
 def evaluate_alerts_for_agent_run(
     agent_id: str, collection_ids: list[str], *, bq, fs
 ) -> dict:
@@ -103,14 +173,13 @@ def evaluate_alerts_for_agent_run(
     agent's enabled alerts and email recipients on a match. One call per agent-run
     completion → at most one email per alert per run, batching matches from every
     collection. Returns a small summary dict. Never raises for per-alert failures -
-    one bad alert must not block the others or the pipeline."""
-    from datetime import datetime, timezone
+    one bad alert must not block the others or the pipeline.
 
+    With streaming alerts on, most matches were already emailed during
+    enrichment; this pass is the reconciliation sweep - it catches alerts the
+    stream can't evaluate (engagement / topic filters) and anything the stream
+    missed, while the dedup ledger keeps already-sent posts out."""
     from api.services.dashboard_widget_filters import apply_widget_filters
-    from config.settings import get_settings
-    from workers.alerts.email import build_alert_email_html
-    from workers.alerts.render_client import render_alert_widgets
-    from workers.notifications.service import send_composed_html_email
 
     summary = {
         "agent_id": agent_id,
@@ -132,9 +201,6 @@ def evaluate_alerts_for_agent_run(
     if not posts:
         return summary
 
-    settings = get_settings()
-    app_url = settings.frontend_url
-
     for alert in alerts:
         summary["alerts_evaluated"] += 1
         alert_id = alert["alert_id"]
@@ -142,56 +208,9 @@ def evaluate_alerts_for_agent_run(
             matched = apply_widget_filters(posts, alert.get("filters"))
             if not matched:
                 continue
-
-            match_ids = [p.get("post_id") for p in matched if p.get("post_id")]
-            unseen_ids = set(fs.filter_unseen_post_ids(alert_id, match_ids))
-            if not unseen_ids:
-                continue
-            unseen = [p for p in matched if p.get("post_id") in unseen_ids]
-
-            recipients = _recipients_for(alert, fs)
-            if not recipients:
-                logger.warning("Alert %s matched %d posts but has no recipients", alert_id, len(unseen))
-                continue
-
-            max_items = int(alert.get("max_items_per_email") or 10)
-            alert_name = alert.get("name") or "Alert"
-
-            # Render the alert's widgets to PNGs (empty on no widgets / failure /
-            # unconfigured render service). The email always shows the post feed;
-            # widget images, when present, sit above it.
-            images = render_alert_widgets(alert_id, alert.get("widgets") or [])
-            subject, html = build_alert_email_html(
-                alert_name=alert_name,
-                posts=unseen,
-                total_matched=len(unseen),
-                max_items=max_items,
-                app_url=app_url,
-                agent_id=agent_id,
-                images=images or None,
-            )
-
-            sent_any = False
-            for recipient in recipients:
-                result = send_composed_html_email(
-                    recipient_email=recipient, subject=subject, body_html=html
-                )
-                if result.get("status") == "success":
-                    sent_any = True
-                    summary["emails_sent"] += 1
-                else:
-                    logger.error("Alert %s email to %s failed: %s", alert_id, recipient, result.get("message"))
-
-            if sent_any:
-                # Mark every matched post seen (not just the rendered first N) so
-                # the "+N more" tail can't re-alert on a later overlapping run.
-                fs.mark_posts_alerted(alert_id, list(unseen_ids))
-                fs.update_alert(
-                    alert_id,
-                    last_triggered_at=datetime.now(timezone.utc),
-                    last_match_count=len(unseen),
-                    trigger_count=int(alert.get("trigger_count") or 0) + 1,
-                )
+            sent = notify_alert(alert, matched, agent_id=agent_id, fs=fs)
+            if sent:
+                summary["emails_sent"] += sent
                 summary["alerts_triggered"] += 1
         except Exception:
             logger.exception("Alert %s evaluation failed for agent %s run", alert_id, agent_id)
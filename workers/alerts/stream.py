@@ -0,0 +1,226 @@
+"""Streaming alert evaluation - match posts as they are enriched.
+
+The run-completion evaluator (evaluator.py) only fires once the whole agent
+run finishes and re-scans every post against every alert. This module is fed
+by the pipeline's enrich flush instead (`workers/pipeline/steps.py::enrich_flush`),
+so matches go out while the run is still going:
+
+- `AlertIndex` compiles an agent's alert filter trees into one inverted index.
+  Each alert is posted under the values of its most selective row-filter
+  dimension (sentiment / platform / themes / entities / brands / ...), so a
+  post only checks alerts sharing at least one of its values - one pass over
+  the post's values finds its candidate alerts, then `apply_widget_filters`
+  verifies each candidate with the dashboard engine's exact semantics.
+- `StreamingAlertEvaluator` buffers matches per alert and emails a batch when
+  it reaches `alerts_stream_batch_size` posts or its oldest match is
+  `alerts_stream_max_delay_sec` old (plus a final flush when the runner ends).
+
+Alerts that read data the enrich step doesn't have - engagement conditions
+(likes/views/... aren't fetched yet) and topic filters (topics come from a
+later clustering run) - are left out of the index. The run-completion pass
+still evaluates every alert as the reconciliation sweep; the shared
+`alerted_posts` ledger keeps it from re-sending what the stream already sent.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Condition fields the enrich-time post doesn't carry real values for.
+_ENGAGEMENT_FIELDS = {"like_count", "view_count", "comment_count", "share_count", "engagement_total"}
+
+
+def _streamable(filters: dict) -> bool:
+    if filters.get("topics"):
+        return False
+    return not any(
+        cond.get("field") in _ENGAGEMENT_FIELDS for cond in filters.get("conditions") or []
+    )
+
+
+class AlertIndex:
+    """Inverted index from (filter dimension, value) to the alerts requiring it."""
+
+    def __init__(self, alerts: list[dict]):
+        from api.services.dashboard_widget_filters import _ARRAY_FILTERS, _SCALAR_FILTERS
+
+        self._scalar = _SCALAR_FILTERS
+        self._array = _ARRAY_FILTERS
+        self.alerts: list[dict] = []
+        self.deferred: list[str] = []  # alert_ids left to the reconciliation sweep
+        self._postings: dict[tuple[str, str], list[int]] = defaultdict(list)
+        self._unanchored: list[int] = []  # no row-filter dimension - always a candidate
+        self._keys: set[str] = set()
+
+        for alert in alerts:
+            filters = alert.get("filters") or {}
+            if not _streamable(filters):
+                self.deferred.append(alert["alert_id"])
+                continue
+            i = len(self.alerts)
+            self.alerts.append(alert)
+            anchor = self._anchor(filters)
+            if anchor is None:
+                self._unanchored.append(i)
+                continue
+            self._keys.add(anchor)
+            for value in filters[anchor]:
+                self._postings[(anchor, value)].append(i)
+
+    def _anchor(self, filters: dict) -> str | None:
+        """The row-filter dimension with the fewest selected values - every
+        matching post must carry one of them."""
+        dims = [k for k in (*self._scalar, *self._array) if filters.get(k)]
+        return min(dims, key=lambda k: len(filters[k]), default=None)
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def match(self, post: dict) -> list[dict]:
+        """Alerts whose filters `post` passes, in index order."""
+        from api.services.dashboard_widget_filters import apply_widget_filters
+
+        candidates = set(self._unanchored)
+        for key in self._keys:
+            attr = self._scalar.get(key)
+            if attr is not None:
+                candidates.update(self._postings.get((key, post.get(attr) or ""), ()))
+                continue
+            for value in post.get(self._array[key]) or []:
+                candidates.update(self._postings.get((key, value), ()))
+        return [
+            self.alerts[i]
+            for i in sorted(candidates)
+            if apply_widget_filters([post], self.alerts[i].get("filters"))
+        ]
+
+
+def post_from_enrichment(
+    post_id: str, result, post_row: dict | None, collection_id: str,
+) -> dict:
+    """Alert-matching view of a just-enriched post, shaped like a
+    `build_dashboard_sql` row. Engagement isn't known yet (zeros), which is
+    why engagement-filtered alerts aren't streamed."""
+    from workers.alerts.evaluator import _normalize_post
+
+    row = post_row or {}
+    return _normalize_post({
+        "post_id": post_id,
+        "collection_id": collection_id,
+        "platform": row.get("platform"),
+        "channel_handle": row.get("channel_handle"),
+        "posted_at": row.get("posted_at"),
+        "title": row.get("title"),
+        "content": row.get("content"),
+        "post_url": row.get("post_url"),
+        "media_refs": row.get("media_refs"),
+        "sentiment": result.sentiment,
+        "emotion": result.emotion,
+        "themes": list(result.themes),
+        "entities": list(result.entities),
+        "detected_brands": list(result.detected_brands),
+        "language": result.language,
+        "content_type": result.content_type,
+        "channel_type": result.channel_type,
+        "ai_summary": result.ai_summary,
+        "custom_fields": result.custom_fields,
+        "topic_ids": [],
+        "like_count": 0,
+        "view_count": 0,
+        "comment_count": 0,
+        "share_count": 0,
+    })
+
+
+class StreamingAlertEvaluator:
+    """Per-agent matcher + per-alert email batcher. Thread-safe."""
+
+    def __init__(self, agent_id: str, fs, settings):
+        self.agent_id = agent_id
+        self._fs = fs
+        self._batch_size = max(1, settings.alerts_stream_batch_size)
+        self._max_delay = settings.alerts_stream_max_delay_sec
+        self._refresh_sec = settings.alerts_stream_refresh_sec
+        self._lock = threading.Lock()
+        self._index: AlertIndex | None = None
+        self._loaded_at = 0.0
+        self._buffers: dict[str, list[dict]] = {}
+        self._first_match_at: dict[str, float] = {}
+
+    def _current_index(self) -> AlertIndex:
+        # Re-list periodically so alerts created/edited mid-run take effect.
+        now = time.monotonic()
+        if self._index is None or now - self._loaded_at >= self._refresh_sec:
+            self._index = AlertIndex(self._fs.list_enabled_alerts_for_agent(self.agent_id))
+            self._loaded_at = now
+        return self._index
+
+    def observe(self, posts: list[dict]) -> int:
+        """Match freshly enriched posts and buffer the hits. Sends any batch
+        that became due. Returns the number of (alert, post) matches."""
+        matched = 0
+        with self._lock:
+            index = self._current_index()
+            now = time.monotonic()
+            for post in posts if len(index) else ():
+                for alert in index.match(post):
+                    alert_id = alert["alert_id"]
+                    self._buffers.setdefault(alert_id, []).append(post)
+                    self._first_match_at.setdefault(alert_id, now)
+                    matched += 1
+        self.flush()
+        return matched
+
+    def flush(self, force: bool = False) -> int:
+        """Email every due batch (all of them with `force`). Returns emails sent."""
+        now = time.monotonic()
+        with self._lock:
+            index = self._index
+            due = [
+                alert_id for alert_id, buf in self._buffers.items()
+                if force
+                or len(buf) >= self._batch_size
+                or now - self._first_match_at[alert_id] >= self._max_delay
+            ]
+            batches = [(alert_id, self._buffers.pop(alert_id)) for alert_id in due]
+            for alert_id in due:
+                self._first_match_at.pop(alert_id, None)
+        if not batches or index is None:
+            return 0
+
+        from workers.alerts.evaluator import notify_alert
+
+        alerts = {a["alert_id"]: a for a in index.alerts}
+        sent = 0
+        for alert_id, posts in batches:
+            alert = alerts.get(alert_id)
+            if alert is None:
+                continue
+            try:
+                n = notify_alert(alert, posts, agent_id=self.agent_id, fs=self._fs)
+                if n:
+                    # Keep the cached doc's counter in step with the one just written.
+                    alert["trigger_count"] = int(alert.get("trigger_count") or 0) + 1
+                sent += n
+            except Exception:
+                logger.exception("Streaming alert %s failed for agent %s", alert_id, self.agent_id)
+        return sent
+
+
+_streams: dict[str, StreamingAlertEvaluator] = {}
+_streams_lock = threading.Lock()
+
+
+def get_alert_stream(agent_id: str, fs, settings) -> StreamingAlertEvaluator:
+    """Process-wide evaluator for `agent_id`, shared by the agent's collection
+    runners in this process so their matches batch into the same emails."""
+    with _streams_lock:
+        stream = _streams.get(agent_id)
+        if stream is None:
+            stream = _streams[agent_id] = StreamingAlertEvaluator(agent_id, fs, settings)
+        return stream
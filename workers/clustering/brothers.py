@@ -1,6 +1,24 @@
 """Brothers clustering algorithm - groups posts by embedding similarity.
 
-Adapted from legacy code. Pure numpy/scipy, no external service dependencies.
+Same algorithm and output as the dense reference in brothers_dense.py, without
+materializing the N×N distance matrix, so a single worker can cluster 50k+
+posts in memory:
+
+- Pairwise distances are only needed where they can pass a threshold. A
+  blocked float32 product of the L2-normalized embeddings prefilters candidate
+  pairs (one row block at a time, bounded by `_BLOCK_BYTES`); candidates are
+  re-scored in float64 and kept in a sparse, symmetric neighbor graph at
+  radius max(brothers_threshold, max_distance_for_ungrouped).
+- Mean pairwise cosine distance between groups is 1 - (ΣA·ΣB) / (|A||B|) over
+  unit vectors, so phases 2 and 3 keep a running sum per group and update it
+  on merge/assign instead of re-slicing the matrix.
+- Phase 2 only scores group pairs whose mean vectors are close enough to ever
+  merge (a second, much smaller neighbor graph over group means).
+
+Optionally (`ann_backend="hnswlib"`) the prefilter is replaced by an
+approximate k-NN query; candidates are still verified exactly, but a post
+with more than `ann_neighbors` true neighbors may lose some of them, so the
+result is no longer guaranteed identical to the reference.
 
 Algorithm:
 1. Find brother posts based on a distance threshold.
@@ -8,20 +26,32 @@ Algorithm:
 3. Assign ungrouped items to existing groups based on max distance threshold.
 """
 
+import heapq
 import logging
+from dataclasses import dataclass
 from typing import Any
 
 import numpy as np
-from scipy.spatial.distance import cdist, squareform
 
 logger = logging.getLogger(__name__)
 
+# Memory budget for one block of the float32 similarity product.
+_BLOCK_BYTES = 256 * 1024 * 1024
+# Slack on the float32 prefilter so rounding never drops a pair that passes
+# the exact float64 check.
+_PREFILTER_MARGIN = 1e-3
+# Pairs re-scored per einsum call in the exact pass.
+_EXACT_CHUNK = 16_384
+
 
 def brothers_cluster(
     embeddings: np.ndarray,
     brothers_threshold: float = 0.25,
     max_intra_group_mean: float = 0.26,
     max_distance_for_ungrouped: float = 0.29,
+    *,
+    ann_backend: str | None = None,
+    ann_neighbors: int = 100,
 ) -> tuple[np.ndarray, dict[str, Any]]:
     """Cluster embeddings using the brothers algorithm.
 
@@ -30,6 +60,9 @@ def brothers_cluster(
         brothers_threshold: Max cosine distance for initial brother pairs.
         max_intra_group_mean: Max mean distance to combine groups.
         max_distance_for_ungrouped: Max distance to assign stragglers.
+        ann_backend: "hnswlib" to find neighbor candidates approximately;
+            None/"" for the exact blocked search.
+        ann_neighbors: k for the approximate search.
 
     Returns:
         clusters: (N,) array - cluster ID per post, NaN if unclustered.
@@ -39,32 +72,33 @@ def brothers_cluster(
     if n < 2:
         return np.full(n, np.nan), {"error": "need at least 2 posts"}
 
-    # Compute full cosine distance matrix
-    logger.info("Computing cosine distance matrix for %d posts", n)
-    dist = cdist(embeddings, embeddings, metric="cosine").astype(np.float32)
-    np.fill_diagonal(dist, 0)
+    unit = _normalize(embeddings)
+    radius = max(brothers_threshold, max_distance_for_ungrouped)
+    logger.info("Building neighbor graph for %d posts (radius=%.3f)", n, radius)
+    graph = _neighbor_graph(unit, radius, ann_backend, ann_neighbors)
+    logger.info("Neighbor graph: %d edges", len(graph.indices) - n)
 
     # Phase 1: Find brother groups
     logger.info("Phase 1: finding brothers (threshold=%.3f)", brothers_threshold)
-    brothers = _find_brothers(dist, brothers_threshold)
+    brothers = _find_brothers(graph, brothers_threshold)
     logger.info("Found %d initial brother groups", len(brothers))
 
     # Phase 2: Combine groups
     logger.info("Phase 2: combining groups (mean_threshold=%.3f)", max_intra_group_mean)
-    combined = _combine_groups(brothers, dist, max_intra_group_mean)
+    combined = _combine_groups(brothers, unit, max_intra_group_mean)
     logger.info("Combined into %d groups", len(combined))
 
     # Phase 3: Assign ungrouped
     logger.info("Phase 3: assigning ungrouped (max_dist=%.3f)", max_distance_for_ungrouped)
     final_groups, ungrouped = _assign_ungrouped(
-        combined, dist, max_distance_for_ungrouped, max_intra_group_mean,
+        combined, graph, unit, max_distance_for_ungrouped, max_intra_group_mean,
     )
     logger.info("Final: %d clusters, %d ungrouped", len(final_groups), len(ungrouped))
 
     # Build cluster assignment array
     clusters = np.full(n, np.nan)
     for idx, group in enumerate(final_groups):
-        clusters[list(group)] = idx
+        clusters[group] = idx
 
     stats = {
         "brothers_groups": len(brothers),
@@ -76,12 +110,142 @@ def brothers_cluster(
     return clusters, stats
 
 
-def _find_brothers(dist: np.ndarray, threshold: float) -> list[list[int]]:
+# ---------------------------------------------------------------------------
+# Neighbor graph
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _NeighborGraph:
+    """CSR adjacency: row i's neighbors are indices[indptr[i]:indptr[i+1]]
+    (ascending, including i itself at distance 0), with float32 cosine
+    distances in `dist` - the same values the dense matrix would hold."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    dist: np.ndarray
+
+    def row(self, i: int) -> tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        return self.indices[lo:hi], self.dist[lo:hi]
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    unit = np.asarray(embeddings, dtype=np.float64)
+    norms = np.linalg.norm(unit, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return unit / norms
+
+
+def _candidate_pairs(vectors: np.ndarray, min_sim: float) -> tuple[np.ndarray, np.ndarray]:
+    """Upper-triangle pairs (i < j) whose float32 dot product is >= min_sim.
+
+    Computed one row block at a time so peak memory stays at _BLOCK_BYTES
+    regardless of N.
+    """
+    n = vectors.shape[0]
+    v32 = np.ascontiguousarray(vectors, dtype=np.float32)
+    block = max(1, _BLOCK_BYTES // (4 * n))
+    rows_out: list[np.ndarray] = []
+    cols_out: list[np.ndarray] = []
+    for start in range(0, n, block):
+        end = min(start + block, n)
+        sims = v32[start:end] @ v32[start:].T
+        r, c = np.nonzero(sims >= min_sim)
+        upper = c > r  # column offset is relative to `start`, like r
+        rows_out.append((r[upper] + start).astype(np.int32))
+        cols_out.append((c[upper] + start).astype(np.int32))
+    if not rows_out:
+        return np.empty(0, np.int32), np.empty(0, np.int32)
+    return np.concatenate(rows_out), np.concatenate(cols_out)
+
+
+def _ann_candidate_pairs(
+    unit: np.ndarray, min_sim: float, k: int,
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """Approximate candidate pairs from an HNSW k-NN query, or None if
+    hnswlib isn't installed."""
+    try:
+        import hnswlib
+    except ImportError:
+        logger.warning("hnswlib not installed - falling back to exact neighbor search")
+        return None
+
+    n, dim = unit.shape
+    k = min(k + 1, n)  # +1: each point is its own nearest neighbor
+    v32 = np.ascontiguousarray(unit, dtype=np.float32)
+    index = hnswlib.Index(space="ip", dim=dim)
+    index.init_index(max_elements=n, ef_construction=200, M=16)
+    index.add_items(v32, np.arange(n))
+    index.set_ef(max(k, 64))
+    labels, distances = index.knn_query(v32, k=k)
+
+    rows = np.repeat(np.arange(n, dtype=np.int64), k)
+    cols = labels.reshape(-1).astype(np.int64)
+    keep = (1.0 - distances.reshape(-1) >= min_sim) & (rows != cols)
+    lo = np.minimum(rows[keep], cols[keep])
+    hi = np.maximum(rows[keep], cols[keep])
+    pairs = np.unique(lo * n + hi)  # kNN isn't symmetric - dedupe both directions
+    return (pairs // n).astype(np.int32), (pairs % n).astype(np.int32)
+
+
+def _exact_distances(unit: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """float64 cosine distance per pair, rounded to float32 like the dense matrix."""
+    out = np.empty(len(rows), dtype=np.float32)
+    for s in range(0, len(rows), _EXACT_CHUNK):
+        r, c = rows[s:s + _EXACT_CHUNK], cols[s:s + _EXACT_CHUNK]
+        out[s:s + _EXACT_CHUNK] = 1.0 - np.einsum("ij,ij->i", unit[r], unit[c])
+    return out
+
+
+def _neighbor_graph(
+    unit: np.ndarray, radius: float, ann_backend: str | None, ann_neighbors: int,
+) -> _NeighborGraph:
+    """All pairs within `radius` cosine distance, as a symmetric CSR graph."""
+    n = unit.shape[0]
+    min_sim = 1.0 - radius - _PREFILTER_MARGIN
+
+    pairs = None
+    if ann_backend == "hnswlib":
+        pairs = _ann_candidate_pairs(unit, min_sim, ann_neighbors)
+    elif ann_backend:
+        logger.warning("Unknown ANN backend %r - using exact neighbor search", ann_backend)
+    if pairs is None:
+        pairs = _candidate_pairs(unit, min_sim)
+    rows, cols = pairs
+
+    dist = _exact_distances(unit, rows, cols)
+    keep = dist <= np.float32(radius)
+    rows, cols, dist = rows[keep], cols[keep], dist[keep]
+
+    # Symmetrize and add self-loops (the dense matrix's zero diagonal).
+    diag = np.arange(n, dtype=np.int32)
+    all_rows = np.concatenate([rows, cols, diag])
+    all_cols = np.concatenate([cols, rows, diag])
+    all_dist = np.concatenate([dist, dist, np.zeros(n, dtype=np.float32)])
+    order = np.argsort(all_rows.astype(np.int64) * n + all_cols, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(all_rows, minlength=n), out=indptr[1:])
+    return _NeighborGraph(indptr=indptr, indices=all_cols[order], dist=all_dist[order])
+
+
+# ---------------------------------------------------------------------------
+# Phases
+# ---------------------------------------------------------------------------
+
+def _find_brothers(graph: _NeighborGraph, threshold: float) -> list[list[int]]:
     """Phase 1: Find cliques of mutually close posts."""
-    n = dist.shape[0]
-    valid = dist <= threshold
+    n = len(graph.indptr) - 1
+    t32 = np.float32(threshold)
     visited: set[int] = set()
     groups: list[list[int]] = []
+    close_cache: dict[int, set[int]] = {}
+
+    def close_to(i: int) -> set[int]:
+        close = close_cache.get(i)
+        if close is None:
+            idx, d = graph.row(i)
+            close = close_cache[i] = set(idx[d <= t32].tolist())
+        return close
 
     for i in range(n):
         if i in visited:
@@ -89,12 +253,14 @@ def _find_brothers(dist: np.ndarray, threshold: float) -> list[list[int]]:
         group = {i}
         visited.add(i)
 
-        candidates = set(np.where(valid[i])[0].tolist()) - visited
+        # Same set construction as the dense version, so candidates are
+        # visited in the same order and produce the same cliques.
+        idx, d = graph.row(i)
+        candidates = set(idx[d <= t32].tolist()) - visited
         while candidates:
             member = next(iter(candidates))
-            # Check compatibility with all current group members (vectorized)
-            group_list = list(group)
-            if np.all(dist[group_list, member] <= threshold):
+            # Compatible iff every current member is within threshold of it
+            if group <= close_to(member):
                 group.add(member)
                 visited.add(member)
             candidates.discard(member)
@@ -105,18 +271,27 @@ def _find_brothers(dist: np.ndarray, threshold: float) -> list[list[int]]:
     return groups
 
 
-def _mean_distance(dist: np.ndarray, group_a: list[int], group_b: list[int]) -> float:
-    """Mean pairwise distance between two groups."""
-    return float(dist[np.ix_(group_a, group_b)].mean())
-
-
 def _combine_groups(
-    groups: list[list[int]], dist: np.ndarray, mean_threshold: float,
+    groups: list[list[int]], unit: np.ndarray, mean_threshold: float,
 ) -> list[list[int]]:
-    """Phase 2: Merge groups whose combined mean distance is within threshold."""
+    """Phase 2: Merge groups whose combined mean distance is within threshold.
+
+    The merged group's mean vector is a weighted average of its parts, so it
+    can only reach group j if some part is itself within threshold of j -
+    only those pairs (from a neighbor graph over group means) are scored.
+    """
     if not groups:
         return []
 
+    sizes = np.array([len(g) for g in groups], dtype=np.float64)
+    sums = np.stack([unit[g].sum(axis=0) for g in groups])
+    pair_i, pair_j = _candidate_pairs(
+        sums / sizes[:, None], 1.0 - mean_threshold - _PREFILTER_MARGIN,
+    )
+    forward: list[list[int]] = [[] for _ in groups]
+    for a, b in zip(pair_i.tolist(), pair_j.tolist()):
+        forward[a].append(b)
+
     combined: list[list[int]] = []
     processed: set[int] = set()
 
@@ -124,14 +299,26 @@ def _combine_groups(
         if i in processed:
             continue
         current = list(groups[i])
+        current_sum = sums[i].copy()
         processed.add(i)
 
-        for j in range(i + 1, len(groups)):
-            if j in processed:
+        # Scan candidate j in ascending order, like the dense j loop; a merge
+        # adds j's own forward neighbors (all > j, so still ahead of the scan).
+        heap = list(forward[i])
+        heapq.heapify(heap)
+        last = i
+        while heap:
+            j = heapq.heappop(heap)
+            if j <= last or j in processed:
                 continue
-            if _mean_distance(dist, current, groups[j]) <= mean_threshold:
+            last = j
+            mean = 1.0 - float(current_sum @ sums[j]) / (len(current) * sizes[j])
+            if mean <= mean_threshold:
                 current.extend(groups[j])
+                current_sum += sums[j]
                 processed.add(j)
+                for k in forward[j]:
+                    heapq.heappush(heap, k)
 
         combined.append(sorted(set(current)))
 
@@ -140,37 +327,51 @@ def _combine_groups(
 
 def _assign_ungrouped(
     groups: list[list[int]],
-    dist: np.ndarray,
+    graph: _NeighborGraph,
+    unit: np.ndarray,
     max_dist: float,
     max_mean: float,
 ) -> tuple[list[list[int]], list[int]]:
-    """Phase 3: Assign ungrouped posts to nearest compatible group."""
-    grouped = set()
-    for g in groups:
-        grouped.update(g)
-    ungrouped = [i for i in range(dist.shape[0]) if i not in grouped]
+    """Phase 3: Assign ungrouped posts to nearest compatible group.
+
+    A group is compatible when every member is within max_dist of the item,
+    i.e. when all of its members show up among the item's graph neighbors.
+    """
+    n = unit.shape[0]
+    labels = np.full(n, -1, dtype=np.int64)
+    for gi, g in enumerate(groups):
+        labels[g] = gi
+    ungrouped = np.flatnonzero(labels < 0).tolist()
 
     if not ungrouped:
         return groups, []
 
     updated = [list(g) for g in groups]
+    sizes = np.array([len(g) for g in groups], dtype=np.int64)
+    sums = np.stack([unit[g].sum(axis=0) for g in groups]) if groups else np.empty((0, unit.shape[1]))
+    d32 = np.float32(max_dist)
     still_ungrouped = []
 
     for item in ungrouped:
-        best_idx = None
-        best_mean = float("inf")
+        idx, d = graph.row(item)
+        near_labels = labels[idx[d <= d32]]
+        cand, counts = np.unique(near_labels[near_labels >= 0], return_counts=True)
+        cand = cand[counts == sizes[cand]]
 
-        for gi, group in enumerate(updated):
-            if np.max(dist[item, group]) > max_dist:
-                continue
-            test = group + [item]
-            new_mean = float(dist[np.ix_(test, test)].mean())
-            if new_mean <= max_mean and new_mean < best_mean:
-                best_mean = new_mean
-                best_idx = gi
+        best_idx = None
+        if len(cand):
+            # Mean of the (n+1)×(n+1) distance block incl. its zero diagonal
+            s = sums[cand] + unit[item]
+            new_mean = 1.0 - np.einsum("ij,ij->i", s, s) / (sizes[cand] + 1) ** 2
+            ok = np.flatnonzero(new_mean <= max_mean)
+            if len(ok):
+                best_idx = int(cand[ok[np.argmin(new_mean[ok])]])
 
         if best_idx is not None:
             updated[best_idx].append(item)
+            labels[item] = best_idx
+            sizes[best_idx] += 1
+            sums[best_idx] += unit[item]
         else:
             still_ungrouped.append(item)
 
@@ -0,0 +1,210 @@
+"""Incremental brothers_v1 clustering - update the previous run instead of
+re-clustering the whole window.
+
+The previous run's clusters (latest `topic_clusters` snapshot for the agent)
+are the starting point:
+
+1. Members that fell out of the 30-day window (or stopped being eligible)
+   are expired; clusters left with fewer than 2 members are dropped.
+2. Each surviving cluster's centroid is the normalized mean of its current
+   members' embeddings. Posts not in any prior cluster (new posts, plus the
+   previous run's ungrouped leftovers) join the nearest centroid within
+   `clustering_incremental_assign_distance`.
+3. Whatever is still unassigned is clustered from scratch with the brothers
+   algorithm, producing new clusters.
+4. A prior cluster keeps its cluster_id and Gemini label unless its
+   membership changed by more than `clustering_relabel_change_ratio`.
+
+Clustering and labeling cost therefore scale with the new posts, not with
+the window. `plan_incremental` returns None when an update isn't meaningful
+(no usable prior run, or too much of the window is new) and the caller
+falls back to a full rebuild.
+"""
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from workers.shared.bq_client import BQClient
+
+logger = logging.getLogger(__name__)
+
+MIN_CLUSTER_SIZE = 2
+
+
+@dataclass
+class PriorCluster:
+    cluster_id: str
+    member_post_ids: list[str]
+    header: str | None = None
+    subheader: str | None = None
+    keywords: list[str] = field(default_factory=list)
+
+    def label(self) -> dict[str, Any]:
+        """The cluster's label in label_topics() output shape."""
+        return {
+            "topic_name": self.header,
+            "topic_summary": self.subheader,
+            "topic_keywords": list(self.keywords),
+        }
+
+
+@dataclass
+class PlannedCluster:
+    member_indices: list[int]
+    prior: PriorCluster | None = None  # None → new cluster
+    relabel: bool = True
+
+
+@dataclass
+class IncrementalPlan:
+    clusters: list[PlannedCluster]
+    stats: dict[str, Any]
+
+
+def load_prior_clusters(bq: BQClient, agent_id: str, algorithm_version: str) -> list[PriorCluster]:
+    """Clusters from the agent's latest run, if that run used `algorithm_version`.
+
+    Runs older than the 30-day clustering window are ignored - none of their
+    members would survive expiry anyway.
+    """
+    rows = bq.query(
+        """
+        SELECT cluster_id, algorithm_version, header, subheader, keywords, member_post_ids
+        FROM social_listening.topic_clusters
+        WHERE agent_id = @agent_id
+          AND clustered_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
+          AND clustered_at = (
+            SELECT MAX(clustered_at)
+            FROM social_listening.topic_clusters
+            WHERE agent_id = @agent_id
+              AND clustered_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
+          )
+        """,
+        {"agent_id": agent_id},
+    )
+    if not rows or any(r.get("algorithm_version") != algorithm_version for r in rows):
+        return []
+    return [
+        PriorCluster(
+            cluster_id=r["cluster_id"],
+            member_post_ids=list(r.get("member_post_ids") or []),
+            header=r.get("header"),
+            subheader=r.get("subheader"),
+            keywords=list(r.get("keywords") or []),
+        )
+        for r in rows
+    ]
+
+
+def plan_incremental(
+    prior: list[PriorCluster],
+    post_ids: list[str],
+    embeddings: np.ndarray,
+    cluster_leftovers: Callable[[np.ndarray], np.ndarray],
+    *,
+    assign_distance: float,
+    relabel_change_ratio: float,
+    max_new_ratio: float,
+) -> IncrementalPlan | None:
+    """Update `prior` clusters against the current window.
+
+    Args:
+        prior: Previous run's clusters.
+        post_ids: Current window's posts (row order of `embeddings`).
+        embeddings: (N, D) embeddings for `post_ids`.
+        cluster_leftovers: Clusters a subset of rows, given their indices;
+            returns per-index cluster ids (NaN = unclustered), like
+            brothers_cluster.
+        assign_distance: Max cosine distance from a centroid to join it.
+        relabel_change_ratio: Relabel a prior cluster when (added + expired)
+            members exceed this fraction of its previous size.
+        max_new_ratio: Give up (full rebuild) when more than this fraction of
+            the window isn't in any surviving prior cluster.
+
+    Returns:
+        The plan, or None if the caller should re-cluster from scratch.
+    """
+    n = len(post_ids)
+    index = {pid: i for i, pid in enumerate(post_ids)}
+
+    claimed = np.zeros(n, dtype=bool)
+    kept: list[tuple[PriorCluster, list[int]]] = []
+    expired_posts = 0
+    for pc in prior:
+        members = []
+        for pid in pc.member_post_ids:
+            i = index.get(pid)
+            if i is None or claimed[i]:
+                expired_posts += 1
+                continue
+            claimed[i] = True
+            members.append(i)
+        if len(members) >= MIN_CLUSTER_SIZE:
+            kept.append((pc, members))
+        else:
+            claimed[members] = False
+
+    unclaimed = np.flatnonzero(~claimed)
+    if not kept:
+        logger.info("Incremental clustering: no prior cluster survives the window")
+        return None
+    if len(unclaimed) > max_new_ratio * n:
+        logger.info(
+            "Incremental clustering: %d/%d posts unclustered (> %.0f%%) - full rebuild",
+            len(unclaimed), n, max_new_ratio * 100,
+        )
+        return None
+
+    unit = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    members_by_cluster = [list(m) for _, m in kept]
+
+    # Assign unclaimed posts to the nearest surviving centroid.
+    assigned = 0
+    leftovers = unclaimed
+    if len(unclaimed):
+        centroids = np.stack([unit[m].mean(axis=0) for m in members_by_cluster])
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        dist = 1.0 - unit[unclaimed] @ centroids.T
+        nearest = dist.argmin(axis=1)
+        ok = dist[np.arange(len(unclaimed)), nearest] <= assign_distance
+        for i, ci in zip(unclaimed[ok].tolist(), nearest[ok].tolist()):
+            members_by_cluster[ci].append(i)
+        assigned = int(ok.sum())
+        leftovers = unclaimed[~ok]
+
+    clusters: list[PlannedCluster] = []
+    relabeled = 0
+    for (pc, original), members in zip(kept, members_by_cluster):
+        changed = (len(pc.member_post_ids) - len(original)) + (len(members) - len(original))
+        relabel = changed > relabel_change_ratio * len(pc.member_post_ids)
+        relabeled += relabel
+        clusters.append(PlannedCluster(member_indices=sorted(members), prior=pc, relabel=relabel))
+
+    # Brothers on the leftovers → brand-new clusters.
+    new_clusters = 0
+    if len(leftovers) >= 2:
+        assignments = cluster_leftovers(leftovers)
+        groups: dict[int, list[int]] = {}
+        for i, cid in zip(leftovers.tolist(), assignments):
+            if not np.isnan(cid):
+                groups.setdefault(int(cid), []).append(i)
+        for _, members in sorted(groups.items()):
+            if len(members) >= MIN_CLUSTER_SIZE:
+                clusters.append(PlannedCluster(member_indices=members))
+                new_clusters += 1
+
+    stats = {
+        "prior_topics": len(prior),
+        "kept_topics": len(kept),
+        "relabeled_topics": relabeled,
+        "new_topics": new_clusters,
+        "expired_posts": expired_posts,
+        "assigned_posts": assigned,
+        "leftover_posts": len(leftovers),
+    }
+    logger.info("Incremental clustering plan: %s", stats)
+    return IncrementalPlan(clusters=clusters, stats=stats)
@@ -51,6 +51,7 @@ Here are the clusters to label:
 
 def label_topics(
     clusters_with_posts: list[dict[str, Any]],
+    existing_names: list[str] | None = None,
 ) -> list[dict[str, Any]]:
     """Label clusters using Gemini.
 
@@ -58,6 +59,8 @@ def label_topics(
         clusters_with_posts: List of dicts, each with:
             - cluster_index: int
             - posts: list of dicts with keys like ai_summary, platform, title, content, etc.
+        existing_names: Names of topics that keep their label (incremental
+            runs); new names are steered away from them like prior batches.
 
     Returns:
         List of dicts with cluster_index, topic_name, topic_summary, topic_keywords.
@@ -80,7 +83,7 @@ def label_topics(
     ]
 
     all_labels: list[dict[str, Any]] = []
-    prior_names: list[str] = []
+    prior_names: list[str] = list(existing_names or [])
 
     for batch_idx, batch in enumerate(batches):
         logger.info(
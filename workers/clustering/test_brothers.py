@@ -0,0 +1,88 @@
+"""Parity tests: the sparse brothers engine must match the dense reference."""
+
+import builtins
+
+import numpy as np
+import pytest
+
+from workers.clustering import brothers, brothers_dense
+
+_THRESHOLDS = [
+    (0.17, 0.20, 0.21),  # production defaults
+    (0.05, 0.08, 0.10),
+    (0.25, 0.26, 0.29),
+    (0.20, 0.30, 0.15),  # ungrouped radius below the brothers threshold
+]
+
+
+def _embeddings(seed: int, n: int, noise: float, dim: int = 48, topics: int = 12) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dim))
+    labels = rng.integers(0, topics, n)
+    return (centers[labels] + noise * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def _assert_same(x: np.ndarray, thresholds: tuple[float, float, float], **kw) -> dict:
+    expected, expected_stats = brothers_dense.brothers_cluster(x, *thresholds)
+    got, got_stats = brothers.brothers_cluster(x, *thresholds, **kw)
+    np.testing.assert_array_equal(got, expected)
+    assert got_stats == expected_stats
+    return got_stats
+
+
+@pytest.mark.parametrize("thresholds", _THRESHOLDS)
+@pytest.mark.parametrize("n,noise", [(40, 0.3), (300, 0.2), (300, 0.35), (800, 0.5)])
+def test_matches_dense_reference(n, noise, thresholds):
+    for seed in range(3):
+        _assert_same(_embeddings(seed, n, noise), thresholds)
+
+
+def test_all_phases_exercised():
+    # Guard against the fixtures degenerating into a trivial clustering.
+    stats = _assert_same(_embeddings(0, 400, 0.5), (0.17, 0.20, 0.21))
+    assert stats["brothers_groups"] > stats["combined_groups"] > 0
+    assert 0 < stats["ungrouped"] < 400
+    assert sum(stats["cluster_sizes"]) + stats["ungrouped"] == 400
+
+
+def test_blocked_product_matches_single_block(monkeypatch):
+    x = _embeddings(7, 500, 0.35)
+    # A few rows per block forces many blocks, incl. a ragged last one.
+    monkeypatch.setattr(brothers, "_BLOCK_BYTES", 4 * 500 * 7)
+    monkeypatch.setattr(brothers, "_EXACT_CHUNK", 97)
+    _assert_same(x, (0.17, 0.20, 0.21))
+
+
+def test_duplicate_and_zero_vectors():
+    x = _embeddings(3, 120, 0.3)
+    x[10] = x[11] = x[12]
+    x[50] = 0.0
+    clusters, _ = brothers.brothers_cluster(x, 0.17, 0.20, 0.21)
+    assert clusters[10] == clusters[11] == clusters[12]
+    assert np.isnan(clusters[50])
+
+
+def test_too_few_posts():
+    clusters, stats = brothers.brothers_cluster(np.ones((1, 4), dtype=np.float32))
+    assert np.isnan(clusters).all()
+    assert stats == {"error": "need at least 2 posts"}
+
+
+def test_ann_backend_falls_back_to_exact_without_hnswlib(monkeypatch):
+    real_import = builtins.__import__
+
+    def no_hnswlib(name, *args, **kwargs):
+        if name == "hnswlib":
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_hnswlib)
+    _assert_same(_embeddings(1, 300, 0.35), (0.17, 0.20, 0.21), ann_backend="hnswlib")
+
+
+def test_ann_backend_recovers_sparse_neighborhoods():
+    pytest.importorskip("hnswlib")
+    # With k above every post's true neighbor count the kNN candidates are
+    # complete, so the approximate path gives the exact answer.
+    _assert_same(_embeddings(2, 300, 0.35, topics=30), (0.17, 0.20, 0.21),
+                 ann_backend="hnswlib", ann_neighbors=64)
@@ -0,0 +1,113 @@
+"""Unit tests for incremental brothers_v1 clustering."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from workers.clustering.incremental import PriorCluster, load_prior_clusters, plan_incremental
+
+_DIM = 32
+
+
+def _topic_vectors(seed: int, topics: int) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(topics, _DIM))
+
+
+def _posts(centers: np.ndarray, per_topic: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    rows = np.repeat(centers, per_topic, axis=0)
+    return (rows + 0.05 * rng.normal(size=rows.shape)).astype(np.float32)
+
+
+def _plan(prior, post_ids, emb, leftovers=None, **kw):
+    calls = []
+
+    def cluster_leftovers(idx):
+        calls.append(idx.tolist())
+        if leftovers is not None:
+            return leftovers(idx)
+        return np.zeros(len(idx))  # everything in one cluster
+
+    params = {"assign_distance": 0.15, "relabel_change_ratio": 0.25, "max_new_ratio": 0.5}
+    params.update(kw)
+    return plan_incremental(prior, post_ids, emb, cluster_leftovers, **params), calls
+
+
+def test_new_posts_join_nearest_prior_cluster_without_relabel():
+    centers = _topic_vectors(0, 2)
+    emb = _posts(centers, 9)  # rows 0-8 topic A, 9-17 topic B
+    post_ids = [f"p{i}" for i in range(18)]
+    prior = [
+        PriorCluster("a", post_ids[0:8], header="A"),
+        PriorCluster("b", post_ids[9:17], header="B"),
+    ]
+    plan, calls = _plan(prior, post_ids, emb)
+
+    assert [c.prior.cluster_id for c in plan.clusters] == ["a", "b"]
+    assert plan.clusters[0].member_indices == list(range(0, 9))
+    assert plan.clusters[1].member_indices == list(range(9, 18))
+    assert not any(c.relabel for c in plan.clusters)  # 1 of 8 added
+    assert plan.stats["assigned_posts"] == 2
+    assert calls == []  # nothing left over to re-cluster
+
+
+def test_leftovers_become_new_clusters():
+    centers = _topic_vectors(1, 2)
+    emb = _posts(centers, 5)
+    post_ids = [f"p{i}" for i in range(10)]
+    prior = [PriorCluster("a", post_ids[:5], header="A")]
+    plan, calls = _plan(prior, post_ids, emb, max_new_ratio=0.6)
+
+    assert calls == [[5, 6, 7, 8, 9]]
+    new = [c for c in plan.clusters if c.prior is None]
+    assert len(new) == 1 and new[0].member_indices == [5, 6, 7, 8, 9]
+    assert new[0].relabel
+    assert plan.stats["new_topics"] == 1
+
+
+def test_expired_members_drop_and_trigger_relabel():
+    centers = _topic_vectors(2, 2)
+    emb = _posts(centers, 6)
+    post_ids = [f"p{i}" for i in range(12)]
+    prior = [
+        # Half its members fell out of the window → relabel.
+        PriorCluster("a", post_ids[0:6] + ["gone1", "gone2", "gone3", "gone4", "gone5", "gone6"]),
+        PriorCluster("b", post_ids[6:12]),
+        # Nothing left → dropped.
+        PriorCluster("c", ["gone7", "gone8"]),
+    ]
+    plan, _ = _plan(prior, post_ids, emb)
+
+    assert [c.prior.cluster_id for c in plan.clusters] == ["a", "b"]
+    assert [c.relabel for c in plan.clusters] == [True, False]
+    assert plan.stats["expired_posts"] == 8
+
+
+def test_full_rebuild_when_window_mostly_new():
+    centers = _topic_vectors(3, 4)
+    emb = _posts(centers, 5)
+    post_ids = [f"p{i}" for i in range(20)]
+    plan, _ = _plan([PriorCluster("a", post_ids[:5])], post_ids, emb)
+    assert plan is None
+
+
+def test_full_rebuild_when_no_prior_cluster_survives():
+    emb = _posts(_topic_vectors(4, 1), 4)
+    plan, _ = _plan([PriorCluster("a", ["old1", "old2"])], ["p0", "p1", "p2", "p3"], emb)
+    assert plan is None
+
+
+def test_load_prior_clusters_ignores_other_algorithms():
+    bq = MagicMock()
+    bq.query.return_value = [
+        {"cluster_id": "t1", "algorithm_version": "llm_taxonomy_v2", "member_post_ids": ["p1"]},
+    ]
+    assert load_prior_clusters(bq, "agent-1", "brothers_v1") == []
+
+    bq.query.return_value = [
+        {"cluster_id": "c1", "algorithm_version": "brothers_v1", "header": "H",
+         "subheader": "S", "keywords": ["k"], "member_post_ids": ["p1", "p2"]},
+    ]
+    (pc,) = load_prior_clusters(bq, "agent-1", "brothers_v1")
+    assert pc.member_post_ids == ["p1", "p2"]
+    assert pc.label() == {"topic_name": "H", "topic_summary": "S", "topic_keywords": ["k"]}
@@ -0,0 +1,53 @@
+"""Tests for the clustering worker's topic_clusters write."""
+
+from datetime import datetime, timezone
+
+from workers.clustering.worker import _write_cluster_rows
+from workers.shared.bq_client import BQClient
+
+
+class _Settings:
+    gcp_project_id = "proj"
+    bq_dataset = "ds"
+    bq_full_dataset = "proj.ds"
+    bq_bulk_write_method = "load"
+
+
+class _LoadClient:
+    def __init__(self):
+        self.job_ids: list[str] = []
+
+    def load_table_from_json(self, rows, table_ref, job_id=None, job_config=None):
+        self.job_ids.append(job_id)
+
+        class _Job:
+            def result(self):
+                pass
+
+        return _Job()
+
+
+def _bq(client) -> BQClient:
+    bq = object.__new__(BQClient)
+    bq._settings = _Settings()
+    bq._client = client
+    bq._bqwrite = False
+    return bq
+
+
+def _rows(clustered_at: datetime) -> list[dict]:
+    return [
+        {"agent_id": "a1", "cluster_id": cid, "clustered_at": clustered_at}
+        for cid in ("c1", "c2")
+    ]
+
+
+def test_runs_with_the_same_cluster_ids_are_separate_writes():
+    client = _LoadClient()
+    bq = _bq(client)
+    for day in (1, 2):
+        at = datetime(2026, 5, day, tzinfo=timezone.utc)
+        _write_cluster_rows(bq, _rows(at), at.isoformat())
+
+    first, second = client.job_ids
+    assert first.startswith("bulk_topic_clusters_") and first != second
@@ -21,8 +21,10 @@ import numpy as np
 
 from config.settings import get_settings
 from workers.clustering.brothers import brothers_cluster
+from workers.clustering.incremental import load_prior_clusters, plan_incremental
 from workers.clustering.labeler import label_topics
 from workers.shared.bq_client import BQClient
+from workers.shared.bq_rows import TopicClusterRow
 from workers.shared.firestore_client import FirestoreClient
 from workers.shared.sql_dedup import DEDUP_EMBEDDINGS
 
@@ -54,9 +56,11 @@ def _load_underlying_data_ctes() -> str:
 
 logger = logging.getLogger(__name__)
 
-# Max posts to cluster directly; beyond this, use sampling + two-pass
-DIRECT_CLUSTER_LIMIT = 5000
-SAMPLE_SIZE = 3000
+# Max posts to cluster directly; beyond this, use sampling + two-pass.
+# brothers_cluster uses a sparse neighbor graph (no N×N matrix), so ~50k
+# posts fit in about 1 GB on a single worker.
+DIRECT_CLUSTER_LIMIT = 60_000
+SAMPLE_SIZE = 40_000
 # Top engagement percentile to always include in sample
 TOP_ENGAGEMENT_RATIO = 0.20
 MAX_REPRESENTATIVES = 6
@@ -66,12 +70,22 @@ HALF_LIFE_DAYS = 7.0
 _LAMBDA = math.log(2) / HALF_LIFE_DAYS
 
 
-def run_clustering(agent_id: str, collection_ids: list[str]) -> dict[str, Any]:
+def run_clustering(
+    agent_id: str,
+    collection_ids: list[str],
+    *,
+    incremental: bool | None = None,
+) -> dict[str, Any]:
     """Run the full topic clustering pipeline across all agent collections.
 
     Clusters only posts that are relevant (is_related_to_task=TRUE) and
     published within the last 30 days.
 
+    With `incremental` (default: settings.clustering_incremental_enabled) the
+    previous brothers_v1 run is updated in place - see incremental.py - and
+    only new/changed clusters are sent to Gemini. Falls back to a full
+    rebuild when there's no usable previous run.
+
     Returns a stats dict with topics_count and other metadata.
     """
     settings = get_settings()
@@ -101,69 +115,69 @@ def run_clustering(agent_id: str, collection_ids: list[str]) -> dict[str, Any]:
     metadata = {r["post_id"]: r for r in rows}
     embeddings = np.array([_parse_embedding(r["embedding"]) for r in rows], dtype=np.float32)
 
-    # 2. Sampling for large datasets
-    sample_indices = None
-    if len(rows) > DIRECT_CLUSTER_LIMIT:
-        logger.info("Large dataset (%d posts) - sampling %d for clustering", len(rows), SAMPLE_SIZE)
-        sample_indices = _sample_indices(rows, SAMPLE_SIZE)
-        sample_embeddings = embeddings[sample_indices]
+    # 2. Incremental update of the previous run, when there is one to update.
+    # Drafts are (cluster_uuid, member_indices, label | None → needs labeling).
+    if incremental is None:
+        incremental = settings.clustering_incremental_enabled
+    plan = None
+    if incremental:
+        prior = load_prior_clusters(bq, agent_id, ALGORITHM_VERSION)
+        if prior:
+            plan = plan_incremental(
+                prior, post_ids, embeddings,
+                lambda idx: _cluster_embeddings([rows[i] for i in idx], embeddings[idx]),
+                assign_distance=settings.clustering_incremental_assign_distance,
+                relabel_change_ratio=settings.clustering_relabel_change_ratio,
+                max_new_ratio=settings.clustering_incremental_max_new_ratio,
+            )
+
+    drafts: list[tuple[str, list[int], dict | None]] = []
+    if plan is not None:
+        for pc in plan.clusters:
+            if pc.prior is None:
+                drafts.append((str(uuid.uuid4()), pc.member_indices, None))
+            else:
+                label = None if pc.relabel else pc.prior.label()
+                drafts.append((pc.prior.cluster_id, pc.member_indices, label))
     else:
-        sample_embeddings = embeddings
-
-    # 3. Run brothers algorithm
-    logger.info("Running brothers algorithm on %d posts", len(sample_embeddings))
-    cluster_assignments, stats = brothers_cluster(
-        sample_embeddings,
-        brothers_threshold=settings.clustering_brothers_threshold,
-        max_intra_group_mean=settings.clustering_max_intra_group_mean,
-        max_distance_for_ungrouped=settings.clustering_max_distance_ungrouped,
-    )
-    logger.info("Brothers stats: %s", stats)
-
-    # 4. If sampled, assign remaining posts to nearest centroid
-    if sample_indices is not None:
-        cluster_assignments = _two_pass_assign(
-            embeddings, sample_indices, cluster_assignments,
-        )
-        full_post_ids = post_ids
-    else:
-        full_post_ids = post_ids
-
-    # 5. Build cluster groups
-    cluster_groups: dict[int, list[int]] = {}
-    for idx, cid in enumerate(cluster_assignments):
-        if not np.isnan(cid):
-            cid_int = int(cid)
-            cluster_groups.setdefault(cid_int, []).append(idx)
-
-    if not cluster_groups:
+        # 3. Full rebuild: brothers over the whole window (sampled if large)
+        cluster_assignments = _cluster_embeddings(rows, embeddings)
+
+        # 4. Build cluster groups
+        cluster_groups: dict[int, list[int]] = {}
+        for idx, cid in enumerate(cluster_assignments):
+            if not np.isnan(cid):
+                cid_int = int(cid)
+                cluster_groups.setdefault(cid_int, []).append(idx)
+        for _, member_indices in sorted(cluster_groups.items()):
+            drafts.append((str(uuid.uuid4()), member_indices, None))
+
+    if not drafts:
         logger.warning("No clusters formed for agent %s", agent_id)
         return {"topics_count": 0, "error": "no clusters formed"}
 
-    logger.info("Formed %d clusters", len(cluster_groups))
+    logger.info("Formed %d clusters", len(drafts))
 
-    # 6. Recency scores, and select representatives. (Centroids used to be
+    # 5. Recency scores, and select representatives. (Centroids used to be
     # persisted to Firestore for similarity lookups; nothing reads them now,
     # so the computation was dropped along with the Firestore write.)
     now = datetime.now(timezone.utc)
-    cluster_ids: dict[int, str] = {}  # cluster_index -> uuid
     recency_scores: dict[int, float] = {}
     clusters_for_labeling: list[dict[str, Any]] = []
 
-    for cid, member_indices in sorted(cluster_groups.items()):
-        cluster_uuid = str(uuid.uuid4())
-        cluster_ids[cid] = cluster_uuid
-
+    for di, (_, member_indices, label) in enumerate(drafts):
         # Recency score
-        recency_scores[cid] = _compute_recency_score(member_indices, full_post_ids, metadata, now)
+        recency_scores[di] = _compute_recency_score(member_indices, post_ids, metadata, now)
+        if label is not None:
+            continue
 
         # Select representatives: top by engagement score
-        member_posts = [(i, metadata[full_post_ids[i]]) for i in member_indices]
+        member_posts = [(i, metadata[post_ids[i]]) for i in member_indices]
         member_posts.sort(key=lambda x: x[1].get("engagement_score", 0), reverse=True)
         representatives = member_posts[:MAX_REPRESENTATIVES]
 
         clusters_for_labeling.append({
-            "cluster_index": cid,
+            "cluster_index": di,
             "posts": [
                 {
                     "platform": r[1].get("platform", ""),
@@ -175,54 +189,93 @@ def run_clustering(agent_id: str, collection_ids: list[str]) -> dict[str, Any]:
             ],
         })
 
-    # 7. Gemini labeling
-    logger.info("Labeling %d topics with Gemini", len(clusters_for_labeling))
-    labels = label_topics(clusters_for_labeling)
+    # 6. Gemini labeling - only clusters without a still-valid label. Kept
+    # names are passed along so new labels don't duplicate them.
+    logger.info("Labeling %d of %d topics with Gemini", len(clusters_for_labeling), len(drafts))
+    kept_names = [label["topic_name"] for _, _, label in drafts if label and label.get("topic_name")]
+    labels = label_topics(clusters_for_labeling, existing_names=kept_names)
     label_map = {l["cluster_index"]: l for l in labels}
 
-    # 8. Write one row per cluster to topic_clusters (denormalised membership).
+    # 7. Write one row per cluster to topic_clusters (denormalised membership).
+    # Every run writes a full snapshot - readers take the latest clustered_at.
     # brothers_v1 operates on the full pool (with two-pass assignment for the
-    # >5K case), so estimated_* equals real values: factor = 1.0.
+    # sampled case), so estimated_* equals real values: factor = 1.0.
     clustered_at_dt = datetime.now(timezone.utc)
     clustered_at = clustered_at_dt.isoformat()
     cluster_rows = [
         _build_brothers_cluster_row(
             agent_id=agent_id,
-            cluster_uuid=cluster_ids[cid],
+            cluster_uuid=cluster_uuid,
             member_indices=member_indices,
-            full_post_ids=full_post_ids,
+            full_post_ids=post_ids,
             metadata=metadata,
-            label=label_map.get(cid, {}),
-            recency_score=recency_scores[cid],
+            label=label if label is not None else label_map.get(di, {}),
+            recency_score=recency_scores[di],
             clustered_at_dt=clustered_at_dt,
             clustered_at_iso=clustered_at,
         )
-        for cid, member_indices in cluster_groups.items()
+        for di, (cluster_uuid, member_indices, label) in enumerate(drafts)
     ]
 
     logger.info("Inserting %d topic_clusters rows into BQ", len(cluster_rows))
-    for i in range(0, len(cluster_rows), 500):
-        bq.insert_rows("topic_clusters", cluster_rows[i : i + 500])
+    _write_cluster_rows(bq, cluster_rows, clustered_at)
 
-    # 9. Update agent status. The `topics/` Firestore subcollection used to
+    # 8. Update agent status. The `topics/` Firestore subcollection used to
     # mirror each cluster doc here; readers now use `topic_metrics(@agent_id)`
     # so we only update the agent-level summary fields.
     fs.update_agent(
         agent_id,
-        topics_count=len(cluster_groups),
+        topics_count=len(drafts),
         topics_generated_at=datetime.now(timezone.utc),
     )
 
+    clustered_posts = sum(len(m) for _, m, _ in drafts)
     result = {
-        "topics_count": len(cluster_groups),
-        "total_posts": len(full_post_ids),
-        "clustered_posts": sum(len(m) for m in cluster_groups.values()),
-        "ungrouped_posts": int(np.isnan(cluster_assignments).sum()),
+        "topics_count": len(drafts),
+        "total_posts": len(post_ids),
+        "clustered_posts": clustered_posts,
+        "ungrouped_posts": len(post_ids) - clustered_posts,
+        "mode": "incremental" if plan is not None else "full",
+        "labeled_topics": len(clusters_for_labeling),
     }
+    if plan is not None:
+        result.update(plan.stats)
     logger.info("Clustering complete for agent %s: %s", agent_id, result)
     return result
 
 
+def _cluster_embeddings(rows: list[dict[str, Any]], embeddings: np.ndarray) -> np.ndarray:
+    """Brothers cluster ids per row (NaN = unclustered). Beyond
+    DIRECT_CLUSTER_LIMIT, clusters a sample and assigns the rest to the
+    nearest sample centroid."""
+    settings = get_settings()
+    sample_indices = None
+    if len(rows) > DIRECT_CLUSTER_LIMIT:
+        logger.info("Large dataset (%d posts) - sampling %d for clustering", len(rows), SAMPLE_SIZE)
+        sample_indices = _sample_indices(rows, SAMPLE_SIZE)
+        sample_embeddings = embeddings[sample_indices]
+    else:
+        sample_embeddings = embeddings
+
+    logger.info("Running brothers algorithm on %d posts", len(sample_embeddings))
+    cluster_assignments, stats = brothers_cluster(
+        sample_embeddings,
+        brothers_threshold=settings.clustering_brothers_threshold,
+        max_intra_group_mean=settings.clustering_max_intra_group_mean,
+        max_distance_for_ungrouped=settings.clustering_max_distance_ungrouped,
+        ann_backend=settings.clustering_ann_backend or None,
+        ann_neighbors=settings.clustering_ann_neighbors,
+    )
+    logger.info("Brothers stats: %s", stats)
+
+    # If sampled, assign remaining posts to nearest centroid
+    if sample_indices is not None:
+        cluster_assignments = _two_pass_assign(
+            embeddings, sample_indices, cluster_assignments,
+        )
+    return cluster_assignments
+
+
 def _build_brothers_cluster_row(
     agent_id: str,
     cluster_uuid: str,
@@ -367,6 +420,19 @@ def _build_embeddings_query(
         """
 
 
+def _write_cluster_rows(bq: BQClient, cluster_rows: list[dict], clustered_at: str) -> None:
+    """Append one run's snapshot to topic_clusters.
+
+    Incremental runs keep cluster_ids stable, so the rows' keys alone repeat
+    from run to run; the run's clustered_at is the batch key that keeps each
+    snapshot a separate write.
+    """
+    bq.write_rows_bulk(
+        [TopicClusterRow(**row) for row in cluster_rows],
+        write_id=f"clusters-{clustered_at}",
+    )
+
+
 def _fetch_posts_with_fallback(
     bq: BQClient, agent_id: str, collection_ids: list[str]
 ) -> list[dict[str, Any]]:
@@ -0,0 +1,429 @@
+"""Cross-agent crawl reuse - serve already-crawled keyword windows from `posts`.
+
+Many agents watch the same brands, so the same (platform, keyword, window)
+gets bought from Apify/BrightData/HikerAPI several times an hour apart. Every
+keyword crawl records what it covered in `crawl_coverage`:
+
+    (platform, normalized query, window_start, window_end, provider,
+     crawl_params, fetched_at, collection_id, sole_query, posts_found)
+
+Before the next crawl, `plan_crawl` looks up fresh coverage (fetched within
+`crawl_reuse_max_age_hours`, same provider the crawl would route to, same
+`crawl_params`) for each (platform, keyword) of the collection's time window:
+
+- the covered part is served from the covering collections' stored `posts`
+  rows (`load_reused_batches`), which the runner feeds through the normal
+  insert / `partition_by_time_range` / `mark_collected` path;
+- only the uncovered gap goes to the vendor. Coverage is clipped to its
+  `fetched_at` (posts published after the crawl can't be in it), so a window
+  ending "now" re-buys just the tail since the last crawl. Gaps are merged
+  into their hull - one vendor window per keyword, never a split crawl.
+
+A window only counts as covered if its stored posts can be attributed back
+to the keyword: the adapter stamped `search_keyword` on them, or the crawl
+had that keyword alone on the platform (`sole_query`). Crawls that hit
+`max_posts_per_keyword` or whose platform errored aren't recorded - the
+vendor stopped early, so the window isn't complete.
+
+`crawl_params` holds the provider-specific config that changes what a
+keyword crawl returns - X API's media filter and sort order, Vetric's page
+budget, HikerAPI's pooled post budget (`_PROVIDER_PARAM_KEYS`). Coverage only
+matches a crawl asking the vendor the same thing, so a media-only or
+two-page crawl never stands in for a full one.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from workers.collection.models import Batch, Channel, Post
+from workers.shared.time_range_gate import parse_time_range
+
+logger = logging.getLogger(__name__)
+
+# Config keys that narrow a crawl beyond (platform, keyword, window) - a
+# collection using any of them isn't interchangeable with a plain keyword crawl.
+_NON_KEYWORD_KEYS = ("channel_urls", "post_urls", "reddit_subreddits", "city")
+# Provider-specific config keys that filter, reorder or cap what a keyword
+# crawl returns (adapters: x_api.py, vetric.py, hikerapi.py). They're part of
+# the coverage key.
+_PROVIDER_PARAM_KEYS: dict[str, tuple[str, ...]] = {
+    "xapi": ("has_media", "sort_order"),
+    "vetric": ("max_calls",),
+    "hikerapi": ("n_posts",),
+}
+# Reused posts enter the crawl loop in batches this size, like an adapter's.
+_BATCH_SIZE = 200
+
+Window = tuple[datetime, datetime]
+
+
+def normalize_query(query: str | None) -> str:
+    """Case- and whitespace-insensitive keyword key."""
+    return " ".join((query or "").casefold().split())
+
+
+def crawl_params(config: dict, provider: str | None) -> str:
+    """Canonical form of the config keys that shape `provider`'s crawl
+    ("" when it has none set)."""
+    params = {}
+    for key in _PROVIDER_PARAM_KEYS.get(provider or "", ()):
+        value = config.get(key)
+        if value is None or value == "":
+            continue
+        params[key] = value.strip().lower() if isinstance(value, str) else value
+    return json.dumps(params, sort_keys=True, default=str) if params else ""
+
+
+def is_reusable(config: dict) -> bool:
+    """Plain keyword crawl over a bounded time window."""
+    if any(config.get(k) for k in _NON_KEYWORD_KEYS):
+        return False
+    return bool(config.get("keywords")) and parse_time_range(config) is not None
+
+
+@dataclass(frozen=True)
+class CoverageEntry:
+    platform: str
+    query: str
+    window_start: datetime
+    window_end: datetime
+    provider: str
+    fetched_at: datetime
+    collection_id: str
+    sole_query: bool = False
+    # None for rows recorded before crawl_params existed - they match nothing.
+    crawl_params: str | None = ""
+
+    def covered(self) -> Window:
+        # Nothing published after the crawl started can be in its results.
+        return self.window_start, min(self.window_end, self.fetched_at)
+
+
+@dataclass
+class ReuseSlice:
+    """Part of one (platform, keyword) window served from stored posts:
+    `window` minus `gap` (the part still going to the vendor)."""
+
+    platform: str
+    keyword: str
+    window: Window
+    gap: Window | None
+    entries: list[CoverageEntry] = field(default_factory=list)
+
+    def wants(self, posted_at: datetime) -> bool:
+        start, end = self.window
+        if not start <= posted_at <= end:
+            return False
+        return self.gap is None or not self.gap[0] <= posted_at <= self.gap[1]
+
+
+@dataclass
+class CrawlPlan:
+    vendor_configs: list[dict]
+    reuse: list[ReuseSlice]
+    # (platform, keyword) → window sent to the vendor; recorded as coverage
+    # once the crawl finishes.
+    vendor_windows: dict[tuple[str, str], Window]
+    providers: dict[str, str | None]
+    # platform → crawl_params of its provider
+    params: dict[str, str] = field(default_factory=dict)
+
+
+def _merge(intervals: Iterable[Window]) -> list[Window]:
+    merged: list[list[datetime]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(s, e) for s, e in merged]
+
+
+def uncovered_hull(window: Window, covered: Iterable[Window]) -> Window | None:
+    """Smallest window holding every part of `window` not in `covered`
+    (None → fully covered)."""
+    start, end = window
+    clipped = [(max(s, start), min(e, end)) for s, e in covered]
+    gaps: list[Window] = []
+    cursor = start
+    for s, e in _merge(c for c in clipped if c[0] <= c[1]):
+        if s > cursor:
+            gaps.append((cursor, s))
+        cursor = max(cursor, e)
+    if cursor < end:
+        gaps.append((cursor, end))
+    if not gaps:
+        return None
+    return gaps[0][0], gaps[-1][1]
+
+
+def plan_crawl(
+    config: dict,
+    entries: Iterable[CoverageEntry],
+    *,
+    provider_for: Callable[[str], str | None],
+) -> CrawlPlan:
+    """Split a keyword crawl into stored-post reuse and vendor gap windows.
+    `entries` must already be filtered to fresh ones."""
+    window = parse_time_range(config)
+    assert window is not None, "plan_crawl needs a bounded time_range"
+    keywords = [k for k in config.get("keywords") or [] if normalize_query(k)]
+
+    by_key: dict[tuple, list[CoverageEntry]] = defaultdict(list)
+    for e in entries:
+        by_key[(e.platform, e.query, e.provider, e.crawl_params)].append(e)
+
+    providers: dict[str, str | None] = {}
+    params: dict[str, str] = {}
+    reuse: list[ReuseSlice] = []
+    vendor_windows: dict[tuple[str, str], Window] = {}
+    # gap window → platform → keywords, in config order
+    vendor_groups: dict[Window, dict[str, list[str]]] = defaultdict(lambda: defaultdict(list))
+
+    for platform in config.get("platforms", []):
+        provider = providers[platform] = provider_for(platform)
+        platform_params = params[platform] = crawl_params(config, provider)
+        for kw in keywords:
+            covering = by_key.get(
+                (platform, normalize_query(kw), provider or "", platform_params), [],
+            )
+            gap = uncovered_hull(window, (e.covered() for e in covering)) if covering else window
+            if gap != window:
+                reuse.append(ReuseSlice(platform, kw, window, gap, covering))
+            if gap is not None:
+                vendor_windows[(platform, kw)] = gap
+                vendor_groups[gap][platform].append(kw)
+
+    vendor_configs: list[dict] = []
+    if not reuse:
+        vendor_configs.append(config)  # nothing covered - crawl exactly as configured
+    else:
+        for (start, end), platform_kws in vendor_groups.items():
+            # Platforms sharing a keyword list share one adapter call.
+            by_keywords: dict[tuple[str, ...], list[str]] = defaultdict(list)
+            for platform, kws in platform_kws.items():
+                by_keywords[tuple(kws)].append(platform)
+            for kws, platforms in by_keywords.items():
+                sub = dict(config)
+                sub["platforms"] = platforms
+                sub["keywords"] = list(kws)
+                sub["time_range"] = {"start": start.isoformat(), "end": end.isoformat()}
+                vendor_configs.append(sub)
+    return CrawlPlan(vendor_configs, reuse, vendor_windows, providers, params)
+
+
+def load_coverage(
+    bq, config: dict, now: datetime, max_age_hours: float,
+) -> list[CoverageEntry]:
+    """Fresh coverage rows overlapping the collection's window."""
+    start, end = parse_time_range(config)
+    rows = bq.query(
+        "SELECT platform, query, window_start, window_end, provider, crawl_params, "
+        "fetched_at, collection_id, sole_query "
+        "FROM social_listening.crawl_coverage "
+        "WHERE fetched_at >= TIMESTAMP(@since) "
+        "AND platform IN UNNEST(@platforms) AND query IN UNNEST(@queries) "
+        "AND window_start <= TIMESTAMP(@end) AND window_end >= TIMESTAMP(@start)",
+        {
+            "since": (now - timedelta(hours=max_age_hours)).isoformat(),
+            "platforms": list(config.get("platforms", [])),
+            "queries": sorted({normalize_query(k) for k in config.get("keywords") or []}),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+        },
+    )
+    return [
+        CoverageEntry(
+            platform=r["platform"], query=r["query"],
+            window_start=_utc(r["window_start"]), window_end=_utc(r["window_end"]),
+            provider=r["provider"], fetched_at=_utc(r["fetched_at"]),
+            collection_id=r["collection_id"], sole_query=bool(r.get("sole_query")),
+            crawl_params=r.get("crawl_params"),
+        )
+        for r in rows
+    ]
+
+
+def load_reused_batches(bq, plan: CrawlPlan, max_posts_per_keyword: int = 0) -> list[Batch]:
+    """Stored posts (+ their channels) for every reuse slice of `plan`.
+    Each post must sit inside the window of a coverage entry that vouches for
+    it, from that entry's collection, attributed to the slice's keyword."""
+    slices_by_platform: dict[str, list[ReuseSlice]] = defaultdict(list)
+    for s in plan.reuse:
+        slices_by_platform[s.platform].append(s)
+
+    posts: dict[str, Post] = {}
+    for platform, slices in slices_by_platform.items():
+        entries = [e for s in slices for e in s.entries]
+        rows = bq.query(
+            "SELECT post_id, collection_id, platform, channel_handle, channel_id, title, "
+            "content, post_url, posted_at, post_type, parent_post_id, media_refs, "
+            "platform_metadata, crawl_provider, search_keyword "
+            "FROM social_listening.posts "
+            "WHERE collection_id IN UNNEST(@collection_ids) AND platform = @platform "
+            "AND posted_at BETWEEN TIMESTAMP(@start) AND TIMESTAMP(@end) "
+            "AND collected_at >= TIMESTAMP(@since) "
+            "QUALIFY ROW_NUMBER() OVER (PARTITION BY post_id ORDER BY collected_at DESC) = 1",
+            {
+                "collection_ids": sorted({e.collection_id for e in entries}),
+                "platform": platform,
+                "start": min(s.window[0] for s in slices).isoformat(),
+                "end": max(s.window[1] for s in slices).isoformat(),
+                # Posts are written after their crawl starts.
+                "since": min(e.fetched_at for e in entries).isoformat(),
+            },
+        )
+        for s in slices:
+            query = normalize_query(s.keyword)
+            picked = [r for r in rows if _vouched(r, s, query)]
+            picked.sort(key=lambda r: _utc(r["posted_at"]), reverse=True)
+            if max_posts_per_keyword > 0:
+                picked = picked[:max_posts_per_keyword]
+            for r in picked:
+                posts.setdefault(r["post_id"], _row_to_post(r))
+
+    ordered = list(posts.values())
+    channels = _load_channels(bq, ordered)
+    batches: list[Batch] = []
+    for i in range(0, len(ordered), _BATCH_SIZE):
+        chunk = ordered[i:i + _BATCH_SIZE]
+        chunk_channel_ids = {p.channel_id for p in chunk if p.channel_id}
+        batches.append(Batch(
+            posts=chunk,
+            channels=[c for c in channels if c.channel_id in chunk_channel_ids],
+        ))
+    return batches
+
+
+def _vouched(row: dict, slice_: ReuseSlice, query: str) -> bool:
+    posted_at = row.get("posted_at")
+    if posted_at is None or not slice_.wants(_utc(posted_at)):
+        return False
+    tagged = row.get("search_keyword")
+    if tagged and normalize_query(tagged) != query:
+        return False
+    posted_at = _utc(posted_at)
+    for e in slice_.entries:
+        start, end = e.covered()
+        if (
+            e.collection_id == row["collection_id"]
+            and start <= posted_at <= end
+            and (tagged or e.sole_query)
+        ):
+            return True
+    return False
+
+
+def _row_to_post(r: dict) -> Post:
+    refs = _json(r.get("media_refs")) or []
+    return Post(
+        post_id=r["post_id"],
+        platform=r.get("platform", "") or "",
+        channel_handle=r.get("channel_handle", "") or "",
+        post_url=r.get("post_url", "") or "",
+        posted_at=_utc(r["posted_at"]),
+        post_type=r.get("post_type", "") or "",
+        channel_id=r.get("channel_id"),
+        title=r.get("title"),
+        content=r.get("content"),
+        parent_post_id=r.get("parent_post_id"),
+        media_urls=[ref["original_url"] for ref in refs if isinstance(ref, dict) and ref.get("original_url")],
+        media_refs=[ref for ref in refs if isinstance(ref, dict)],
+        platform_metadata=_json(r.get("platform_metadata")),
+        crawl_provider=r.get("crawl_provider"),
+        search_keyword=r.get("search_keyword"),
+    )
+
+
+def _load_channels(bq, posts: Iterable[Post]) -> list[Channel]:
+    channel_ids = sorted({p.channel_id for p in posts if p.channel_id})
+    if not channel_ids:
+        return []
+    rows = bq.query(
+        "SELECT channel_id, platform, channel_handle, subscribers, total_posts, "
+        "channel_url, description, created_date, channel_metadata "
+        "FROM social_listening.channels WHERE channel_id IN UNNEST(@channel_ids) "
+        "QUALIFY ROW_NUMBER() OVER (PARTITION BY channel_id ORDER BY observed_at DESC) = 1",
+        {"channel_ids": channel_ids},
+    )
+    return [
+        Channel(
+            channel_id=r["channel_id"],
+            platform=r.get("platform", "") or "",
+            channel_handle=r.get("channel_handle", "") or "",
+            subscribers=r.get("subscribers"),
+            total_posts=r.get("total_posts"),
+            channel_url=r.get("channel_url"),
+            description=r.get("description"),
+            created_date=r.get("created_date"),
+            channel_metadata=_json(r.get("channel_metadata")),
+        )
+        for r in rows
+    ]
+
+
+def coverage_rows(
+    plan: CrawlPlan,
+    keyword_counts: dict[str, Counter],
+    *,
+    errored_platforms: set[str],
+    max_posts_per_keyword: int,
+    fetched_at: datetime,
+    collection_id: str,
+    agent_id: str | None,
+) -> list[dict]:
+    """`crawl_coverage` rows for the vendor windows this crawl completed.
+
+    `keyword_counts[platform]` counts the vendor's posts by normalized
+    `search_keyword` (None for untagged posts)."""
+    kws_per_platform = Counter(platform for platform, _ in plan.vendor_windows)
+    rows = []
+    for (platform, kw), (start, end) in plan.vendor_windows.items():
+        provider = plan.providers.get(platform)
+        if provider is None or platform in errored_platforms:
+            continue
+        counts = keyword_counts.get(platform, Counter())
+        sole = kws_per_platform[platform] == 1
+        tagged = any(k is not None for k in counts)
+        if counts.get(None) and not tagged and not sole:
+            continue  # untagged posts from a multi-keyword crawl - can't attribute
+        found = sum(counts.values()) if sole and not tagged else counts.get(normalize_query(kw), 0)
+        if max_posts_per_keyword > 0 and found >= max_posts_per_keyword:
+            continue  # vendor stopped at the cap - window not exhausted
+        rows.append({
+            "platform": platform,
+            "query": normalize_query(kw),
+            "window_start": start.isoformat(),
+            "window_end": end.isoformat(),
+            "provider": provider,
+            "crawl_params": plan.params.get(platform, ""),
+            "fetched_at": fetched_at.isoformat(),
+            "collection_id": collection_id,
+            "agent_id": agent_id,
+            "sole_query": sole,
+            "posts_found": found,
+        })
+    return rows
+
+
+def _utc(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _json(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
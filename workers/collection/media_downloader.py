@@ -49,7 +49,15 @@ def _download_via_ytdlp(
     post_id: str,
     index: int,
 ) -> dict | None:
-    """Download a video via yt-dlp and upload to GCS. Returns media_ref dict or None."""
+    """Download a video via yt-dlp and upload to GCS. Returns media_ref dict or None.
+
+    Indexed by the post page URL, so a post already resolved by any collection
+    returns the stored video without running yt-dlp again."""
+    indexed = gcs_client.lookup_url(post_url)
+    if indexed is not None:
+        gcs_client.media_stats.add(url_index_hits=1, download_bytes_saved=indexed["size_bytes"])
+        return indexed
+
     try:
         import yt_dlp
     except ImportError:
@@ -84,23 +92,13 @@ def _download_via_ytdlp(
             ext = os.path.splitext(files[0])[1]
             content_type = "video/mp4" if ext == ".mp4" else f"video/{ext.lstrip('.')}"
 
-            with open(filepath, "rb") as f:
-                content_bytes = f.read()
-
-            gcs_uri = gcs_client.upload_media(
-                collection_id, post_id, index, content_bytes, content_type
-            )
+            ref = gcs_client.store_media_file(filepath, content_type, post_url)
+            gcs_client.media_stats.add(downloads=1, downloaded_bytes=ref["size_bytes"])
             logger.info(
                 "yt-dlp downloaded video for post %s (%d bytes) → %s",
-                post_id, len(content_bytes), gcs_uri,
+                post_id, ref["size_bytes"], ref["gcs_uri"],
             )
-            return {
-                "gcs_uri": gcs_uri,
-                "media_type": "video",
-                "content_type": content_type,
-                "size_bytes": len(content_bytes),
-                "original_url": post_url,
-            }
+            return ref
         except Exception as e:
             logger.warning("yt-dlp failed for %s: %s", post_url, e)
             return None
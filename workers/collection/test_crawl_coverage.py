@@ -0,0 +1,152 @@
+"""Unit tests for cross-agent crawl reuse planning."""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from workers.collection.crawl_coverage import (
+    CoverageEntry,
+    coverage_rows,
+    crawl_params,
+    is_reusable,
+    load_reused_batches,
+    plan_crawl,
+    uncovered_hull,
+)
+
+T0 = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _h(hours: float) -> datetime:
+    return T0 + timedelta(hours=hours)
+
+
+def _config(**kw):
+    config = {
+        "platforms": ["tiktok"],
+        "keywords": ["Glossier"],
+        "time_range": {"start": _h(0).isoformat(), "end": _h(48).isoformat()},
+    }
+    config.update(kw)
+    return config
+
+
+def _entry(start_h, end_h, fetched_h, *, query="glossier", provider="apify", cid="c-other", sole=True,
+           params=""):
+    return CoverageEntry("tiktok", query, _h(start_h), _h(end_h), provider, _h(fetched_h), cid, sole, params)
+
+
+def test_uncovered_hull():
+    window = (_h(0), _h(10))
+    assert uncovered_hull(window, []) == window
+    assert uncovered_hull(window, [(_h(-5), _h(20))]) is None
+    assert uncovered_hull(window, [(_h(0), _h(6))]) == (_h(6), _h(10))
+    # Two gaps around a covered middle merge into their hull.
+    assert uncovered_hull(window, [(_h(3), _h(5))]) == (_h(0), _h(10))
+    assert uncovered_hull(window, [(_h(0), _h(4)), (_h(3), _h(10))]) is None
+
+
+def test_plan_only_sends_uncovered_tail_to_vendor():
+    # Another agent crawled the same keyword over the window 2h ago; only
+    # the tail published since then still needs buying.
+    config = _config(keywords=["  GLOSSIER ", "rhode"])
+    plan = plan_crawl(config, [_entry(0, 48, 46)], provider_for=lambda p: "apify")
+
+    (slice_,) = plan.reuse
+    assert slice_.keyword == "  GLOSSIER " and slice_.gap == (_h(46), _h(48))
+    assert slice_.wants(_h(10)) and not slice_.wants(_h(47))
+
+    by_kw = {tuple(c["keywords"]): c for c in plan.vendor_configs}
+    assert by_kw[("  GLOSSIER ",)]["time_range"] == {"start": _h(46).isoformat(), "end": _h(48).isoformat()}
+    assert by_kw[("rhode",)]["time_range"] == config["time_range"]
+    assert plan.vendor_windows[("tiktok", "rhode")] == (_h(0), _h(48))
+
+
+def test_plan_ignores_other_providers_and_keeps_config_when_nothing_covered():
+    config = _config()
+    plan = plan_crawl(config, [_entry(0, 48, 47, provider="brightdata")], provider_for=lambda p: "apify")
+    assert plan.reuse == [] and plan.vendor_configs == [config]
+
+    covered = plan_crawl(config, [_entry(-24, 72, 60)], provider_for=lambda p: "apify")
+    assert covered.vendor_configs == [] and covered.vendor_windows == {}
+
+
+def test_crawl_params_key_covers_provider_specific_config():
+    assert crawl_params(_config(has_media="with", sort_order=" Recency"), "xapi") == (
+        '{"has_media": "with", "sort_order": "recency"}'
+    )
+    assert crawl_params(_config(max_calls=2, n_posts=500), "vetric") == '{"max_calls": 2}'
+    assert crawl_params(_config(max_calls=2, n_posts=500), "hikerapi") == '{"n_posts": 500}'
+    assert crawl_params(_config(has_media="with"), "apify") == ""
+
+
+def test_plan_only_reuses_coverage_with_matching_crawl_params():
+    capped = _config(max_calls=2)
+    entry = _entry(0, 48, 47, provider="vetric", params=crawl_params(capped, "vetric"))
+
+    # A two-page crawl doesn't cover a five-page one, and vice versa.
+    deeper = plan_crawl(_config(max_calls=5), [entry], provider_for=lambda p: "vetric")
+    assert deeper.reuse == []
+    assert deeper.params == {"tiktok": '{"max_calls": 5}'}
+
+    same = plan_crawl(capped, [entry], provider_for=lambda p: "vetric")
+    assert len(same.reuse) == 1
+
+    # Rows recorded before crawl_params existed never match.
+    legacy = _entry(0, 48, 47, params=None)
+    assert plan_crawl(_config(), [legacy], provider_for=lambda p: "apify").reuse == []
+
+
+def test_is_reusable_needs_plain_keyword_window():
+    assert is_reusable(_config())
+    assert not is_reusable(_config(time_range=None))
+    assert not is_reusable(_config(channel_urls=["https://tiktok.com/@x"]))
+
+
+def test_coverage_rows_skip_capped_errored_and_unattributable_windows():
+    plan = plan_crawl(_config(platforms=["tiktok", "youtube", "x"], keywords=["a", "b"]), [],
+                      provider_for=lambda p: {"tiktok": "apify", "youtube": "brightdata", "x": "xapi"}[p])
+    counts = {
+        "tiktok": Counter({None: 7}),  # untagged, two keywords → can't attribute
+        "youtube": Counter({"a": 3, "b": 5}),  # tagged; "b" hit the cap
+    }
+    rows = coverage_rows(plan, counts, errored_platforms={"x"}, max_posts_per_keyword=5,
+                         fetched_at=_h(48), collection_id="c1", agent_id="agent-1")
+    assert [(r["platform"], r["query"], r["posts_found"]) for r in rows] == [("youtube", "a", 3)]
+    assert rows[0]["provider"] == "brightdata" and rows[0]["sole_query"] is False
+
+    sole = plan_crawl(_config(), [], provider_for=lambda p: "apify")
+    (row,) = coverage_rows(sole, {"tiktok": Counter({None: 2})}, errored_platforms=set(),
+                           max_posts_per_keyword=0, fetched_at=_h(48), collection_id="c1", agent_id=None)
+    assert row["sole_query"] is True and row["posts_found"] == 2
+    assert row["crawl_params"] == ""
+
+    hiker = plan_crawl(_config(n_posts=300), [], provider_for=lambda p: "hikerapi")
+    (row,) = coverage_rows(hiker, {"tiktok": Counter({None: 2})}, errored_platforms=set(),
+                           max_posts_per_keyword=0, fetched_at=_h(48), collection_id="c1", agent_id=None)
+    assert row["crawl_params"] == '{"n_posts": 300}'
+
+
+def test_load_reused_batches_only_takes_vouched_posts():
+    plan = plan_crawl(_config(), [_entry(0, 48, 40, sole=False)], provider_for=lambda p: "apify")
+
+    def _row(post_id, posted_h, *, cid="c-other", keyword="Glossier"):
+        return {"post_id": post_id, "collection_id": cid, "platform": "tiktok", "posted_at": _h(posted_h),
+                "search_keyword": keyword, "media_refs": '[{"original_url": "u", "gcs_uri": "gs://b/x"}]',
+                "channel_id": "ch1"}
+
+    bq = MagicMock()
+    bq.query.side_effect = [
+        [
+            _row("ok", 10),
+            _row("in_gap", 41),  # after the covering crawl - vendor's job
+            _row("other_kw", 10, keyword="rhode"),
+            _row("untagged", 10, keyword=None),  # covering crawl wasn't sole_query
+            _row("other_collection", 10, cid="c-3"),
+        ],
+        [{"channel_id": "ch1", "platform": "tiktok", "channel_handle": "h"}],
+    ]
+    (batch,) = load_reused_batches(bq, plan)
+    assert [p.post_id for p in batch.posts] == ["ok"]
+    assert batch.posts[0].media_urls == ["u"] and batch.posts[0].media_refs[0]["gcs_uri"] == "gs://b/x"
+    assert [c.channel_id for c in batch.channels] == ["ch1"]
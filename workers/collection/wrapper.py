@@ -169,10 +169,12 @@ class DataProviderWrapper:
                 return provider
         raise ValueError(f"No adapter supports platform: {platform}")
 
-    def _resolve_adapter_platforms(self) -> dict[int, tuple[DataProviderAdapter, list[str]]]:
+    def _resolve_adapter_platforms(
+        self, config: dict | None = None,
+    ) -> dict[int, tuple[DataProviderAdapter, list[str]]]:
         """Group requested platforms by the adapter that handles them."""
         adapter_platforms: dict[int, tuple[DataProviderAdapter, list[str]]] = {}
-        for platform in self.config.get("platforms", []):
+        for platform in (config or self.config).get("platforms", []):
             try:
                 adapter = self._get_adapter(platform)
             except ValueError as e:
@@ -184,39 +186,48 @@ class DataProviderWrapper:
             adapter_platforms[key][1].append(platform)
         return adapter_platforms
 
-    def collect_all(self) -> Iterator[Batch]:
+    def _collect_units(self, configs: list[dict] | None) -> list[tuple[DataProviderAdapter, dict]]:
+        """(adapter, sub_config) pairs - one per adapter per config. `configs`
+        narrows the crawl (e.g. the uncovered windows of a crawl-reuse plan);
+        None crawls `self.config`."""
+        units: list[tuple[DataProviderAdapter, dict]] = []
+        for config in (self.config,) if configs is None else configs:
+            for adapter, platforms in self._resolve_adapter_platforms(config).values():
+                sub_config = dict(config)
+                sub_config["platforms"] = platforms
+                units.append((adapter, sub_config))
+        return units
+
+    def collect_all(self, configs: list[dict] | None = None) -> Iterator[Batch]:
         """Collect from all platforms, yielding batches as they arrive from each adapter."""
-        adapter_platforms = self._resolve_adapter_platforms()
-
         # Call collect() once per adapter with only its assigned platforms
-        for adapter, platforms in adapter_platforms.values():
-            sub_config = dict(self.config)
-            sub_config["platforms"] = platforms
-            logger.info("Collecting via %s for platforms: %s", type(adapter).__name__, platforms)
+        for adapter, sub_config in self._collect_units(configs):
+            logger.info(
+                "Collecting via %s for platforms: %s",
+                type(adapter).__name__, sub_config["platforms"],
+            )
             yield from adapter.collect(sub_config)
 
-    def collect_all_parallel(self) -> Iterator[Batch]:
+    def collect_all_parallel(self, configs: list[dict] | None = None) -> Iterator[Batch]:
         """Fan adapters across threads; yield batches in whatever order they arrive.
 
         Cuts multi-provider crawl wall-time from sum(adapter_times) to
         max(adapter_times). Snapshot budgets are per-adapter, so fan-out
         introduces no cross-adapter contention.
         """
-        adapter_platforms = self._resolve_adapter_platforms()
-        if len(adapter_platforms) <= 1:
+        units = self._collect_units(configs)
+        if len(units) <= 1:
             # Nothing to parallelize - avoid the queue overhead.
-            yield from self.collect_all()
+            yield from self.collect_all(configs)
             return
 
         batch_queue: queue.Queue[Batch | object] = queue.Queue(maxsize=64)
         SENTINEL = object()
 
-        def _run_adapter(adapter: DataProviderAdapter, platforms: list[str]) -> None:
-            sub_config = dict(self.config)
-            sub_config["platforms"] = platforms
+        def _run_adapter(adapter: DataProviderAdapter, sub_config: dict) -> None:
             logger.info(
                 "Collecting (parallel) via %s for platforms: %s",
-                type(adapter).__name__, platforms,
+                type(adapter).__name__, sub_config["platforms"],
             )
             try:
                 for batch in adapter.collect(sub_config):
@@ -229,9 +240,9 @@ class DataProviderWrapper:
                 batch_queue.put(SENTINEL)
 
         threads: list[threading.Thread] = []
-        for adapter, platforms in adapter_platforms.values():
+        for adapter, sub_config in units:
             t = threading.Thread(
-                target=_run_adapter, args=(adapter, platforms),
+                target=_run_adapter, args=(adapter, sub_config),
                 daemon=True, name=f"adapter-{type(adapter).__name__}",
             )
             t.start()
@@ -248,6 +259,14 @@ class DataProviderWrapper:
         for t in threads:
             t.join(timeout=5)
 
+    def crawl_vendor(self, platform: str) -> str | None:
+        """Vendor name that `collect_all` would crawl `platform` with, or None
+        if no adapter serves it. Keys the crawl-coverage index."""
+        try:
+            return self._vendor_name(self._get_adapter(platform))
+        except ValueError:
+            return None
+
     def get_collection_errors(self) -> list[dict]:
         """Return any errors encountered during the last collect_all() call."""
         errors: list[dict] = []
@@ -302,6 +321,24 @@ class DataProviderWrapper:
         still refresh via Apify by their canonical /p/{code}/ URLs - while every
         other platform keeps today's resolution.
         """
+        return self._engagement_adapter(platform).fetch_engagements(post_urls)
+
+    def engagement_vendor(self, platform: str) -> str | None:
+        """Vendor name (`_VENDOR_CLASS_MAP` key) that `fetch_engagements`
+        would call for `platform`, or None if no adapter can serve it. Used to
+        charge refreshes against per-vendor budgets before fetching."""
+        try:
+            return self._vendor_name(self._engagement_adapter(platform))
+        except ValueError:
+            return None
+
+    def _vendor_name(self, adapter: DataProviderAdapter) -> str:
+        for name, cls in self._VENDOR_CLASS_MAP.items():
+            if isinstance(adapter, cls):
+                return name
+        return type(adapter).__name__
+
+    def _engagement_adapter(self, platform: str) -> DataProviderAdapter:
         preferred = self._resolve_preferred_vendor(platform)
         if preferred:
             target_class = self._VENDOR_CLASS_MAP.get(preferred)
@@ -311,10 +348,10 @@ class DataProviderWrapper:
                         isinstance(provider, target_class)
                         and platform in provider.supported_url_platforms()
                     ):
-                        return provider.fetch_engagements(post_urls)
+                        return provider
         for provider in self._providers:
             if platform in provider.supported_url_platforms():
-                return provider.fetch_engagements(post_urls)
+                return provider
         raise ValueError(f"No adapter supports URL fetch for platform: {platform}")
 
     def fetch_comments(self, platform: str, post: dict) -> CommentBatch:
@@ -1,7 +1,12 @@
 """Unit tests for the comment-enrichment worker: the enriched_comments writer
-and the comment+parent-context reader. BQ is faked (capture SQL / return rows)."""
+and the comment+parent-context reader. BQ is faked (capture SQL / bulk-written
+rows, return rows)."""
 
+from types import SimpleNamespace
+
+from workers.comments_enrichment import worker as worker_mod
 from workers.comments_enrichment.worker import (
+    _enrich_and_write,
     _read_comments_from_bq,
     _write_comment_results_to_bq,
 )
@@ -11,12 +16,19 @@ from workers.enrichment.schema import EnrichmentResult
 class _FakeBQ:
     def __init__(self, rows=None):
         self.queries: list[str] = []
+        self.written: list = []
+        self.write_ids: list = []
         self._rows = rows or []
 
     def query(self, sql, params=None):
         self.queries.append(sql)
         return self._rows
 
+    def write_rows_bulk(self, rows, *, write_id=None):
+        self.written.append(rows)
+        self.write_ids.append(write_id)
+        return len(rows)
+
 
 def _result(**over) -> EnrichmentResult:
     base = dict(
@@ -37,22 +49,40 @@ def test_write_targets_enriched_comments_with_identity_columns():
     _write_comment_results_to_bq(
         bq, results, meta, collection_id="col1", agent_id="ag1", agent_version=3,
     )
-    assert len(bq.queries) == 1
-    sql = bq.queries[0]
-    assert "INSERT INTO social_listening.enriched_comments" in sql
-    # identity columns + values present
-    assert "AS comment_id" in sql and "'cmt1'" in sql
-    assert "AS post_id" in sql and "'post1'" in sql
-    assert "AS root_comment_id" in sql and "'root1'" in sql
+    assert bq.queries == []
+    assert len(bq.written) == 1
+    (row,) = bq.written[0]
+    assert row.TABLE == "enriched_comments"
+    # identity columns carried through
+    assert (row.comment_id, row.post_id, row.root_comment_id) == ("cmt1", "post1", "root1")
+    assert (row.collection_id, row.agent_id, row.agent_version) == ("col1", "ag1", 3)
     # enrichment payload carried through
-    assert "PARSE_JSON(" in sql  # custom_fields
-    assert "AS is_related_to_task" in sql and "TRUE AS is_related_to_task" in sql
+    assert row.custom_fields == {"hotel_mentions": [{"hotel_name": "Leonardo Club", "stance": "discourage"}]}
+    assert row.is_related_to_task is True
+    assert row.entities == ["leonardo club"]
 
 
 def test_write_noop_on_empty():
     bq = _FakeBQ()
     _write_comment_results_to_bq(bq, [], {})
-    assert bq.queries == []
+    assert bq.queries == [] and bq.written == []
+
+
+def test_re_enriching_the_same_comments_is_a_new_bulk_write(monkeypatch):
+    monkeypatch.setattr(
+        worker_mod, "enrich_posts",
+        lambda batch, **kw: [(p.post_id, _result()) for p in batch],
+    )
+    bq = _FakeBQ()
+    posts = [SimpleNamespace(post_id="cmt1")]
+    for _ in range(2):
+        _enrich_and_write(
+            bq, posts, {"cmt1": ("post1", "root1")},
+            custom_fields=None, enrichment_context=None, content_types=None,
+            collection_id="col1", agent_id="ag1", agent_version=3,
+        )
+    first, second = bq.write_ids
+    assert first and second and first != second
 
 
 def test_read_maps_comment_to_postdata_with_parent_context():
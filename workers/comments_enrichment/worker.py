@@ -3,8 +3,8 @@ parent post, writing to `enriched_comments` (the comment-grain analogue of
 `enriched_posts`).
 
 Standalone mode only (reads comments from BQ). Mirrors
-workers/enrichment/worker.py; the SQL writer column order tracks
-bigquery/schemas/enriched_comments.sql. Reuses the post enricher engine via
+workers/enrichment/worker.py; the writer's row type (bq_rows.EnrichedCommentRow)
+tracks bigquery/schemas/enriched_comments.sql. Reuses the post enricher engine via
 `enrich_posts(..., comment_mode=True)` - each comment is a PostData carrying its
 parent's ai_summary/context as `parent_context`.
 
@@ -17,6 +17,8 @@ import json
 import logging
 import sys
 import time
+import uuid
+from datetime import datetime, timezone
 
 from config.settings import get_settings
 from workers.enrichment.enricher import enrich_posts
@@ -29,20 +31,20 @@ from workers.enrichment.schema import (
 )
 # Reuse the post worker's helpers - do NOT duplicate.
 from workers.enrichment.worker import (
-    _esc,
+    _enrichment_columns,
     _load_content_types,
     _load_custom_fields,
     _load_enrichment_context,
-    _string_array_sql,
 )
 from workers.shared.bq_client import BQClient
+from workers.shared.bq_rows import EnrichedCommentRow
 from workers.shared.firestore_client import FirestoreClient
 
 logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# BQ write: INSERT enrichment results into enriched_comments (append-only)
+# BQ write: append enrichment results to enriched_comments (append-only)
 # ---------------------------------------------------------------------------
 
 def _write_comment_results_to_bq(
@@ -54,69 +56,37 @@ def _write_comment_results_to_bq(
     agent_id: str | None = None,
     agent_version: int | None = None,
     source: str | None = None,
+    write_id: str | None = None,
 ) -> None:
     """Append enrichment results to enriched_comments. INSERT-only - readers
     dedupe to the latest (comment_id, agent_id, agent_version) via
     scope_comments(). `meta` maps comment_id -> (parent post_id, root_comment_id).
 
-    Column order MUST match bigquery/schemas/enriched_comments.sql (positional
-    UNION ALL), which after the identity block mirrors enriched_posts.
+    `write_id` is the batch key for write_rows_bulk, as for enriched_posts:
+    it must differ between writes that can repeat a comment's key, e.g.
+    re-enriching comments under the same agent_version.
+
+    Rows are EnrichedCommentRow (bq_rows), whose columns track
+    bigquery/schemas/enriched_comments.sql.
     """
     if not results:
         return
-
-    cid_sql = f"'{_esc(collection_id)}'" if collection_id else "CAST(NULL AS STRING)"
-    aid_sql = f"'{_esc(agent_id)}'" if agent_id else "CAST(NULL AS STRING)"
-    av_sql = str(int(agent_version)) if agent_version is not None else "CAST(NULL AS INT64)"
-    src_sql = f"'{_esc(source)}'" if source else "CAST(NULL AS STRING)"
-
-    selects = []
+    enriched_at = datetime.now(timezone.utc)
+    rows = []
     for comment_id, r in results:
         post_id, root_comment_id = meta.get(comment_id, (None, None))
-        pid_sql = f"'{_esc(post_id)}'" if post_id else "CAST(NULL AS STRING)"
-        rcid_sql = f"'{_esc(root_comment_id)}'" if root_comment_id else "CAST(NULL AS STRING)"
-        entities_sql = _string_array_sql(r.entities)
-        themes_sql = _string_array_sql(r.themes)
-        brands_sql = _string_array_sql(r.detected_brands)
-
-        custom_json = json.dumps(r.custom_fields) if r.custom_fields else None
-        custom_sql = f"PARSE_JSON('{_esc(custom_json)}')" if custom_json else "CAST(NULL AS JSON)"
-
-        selects.append(
-            f"SELECT '{_esc(comment_id)}' AS comment_id, "
-            f"{pid_sql} AS post_id, "
-            f"{rcid_sql} AS root_comment_id, "
-            f"{cid_sql} AS collection_id, "
-            f"{aid_sql} AS agent_id, "
-            f"{av_sql} AS agent_version, "
-            f"'{_esc(r.context)}' AS context, "
-            f"'{_esc(r.sentiment)}' AS sentiment, "
-            f"'{_esc(r.emotion)}' AS emotion, "
-            f"{entities_sql} AS entities, "
-            f"{themes_sql} AS themes, "
-            f"'{_esc(r.ai_summary)}' AS ai_summary, "
-            f"'{_esc(r.language)}' AS language, "
-            f"'{_esc(r.content_type)}' AS content_type, "
-            f"'{_esc(r.relevance_reason)}' AS relevance_reason, "
-            f"{'TRUE' if r.is_related_to_task else 'FALSE'} AS is_related_to_task, "
-            f"{brands_sql} AS detected_brands, "
-            f"'{_esc(r.channel_type)}' AS channel_type, "
-            f"{custom_sql} AS custom_fields, "
-            f"{src_sql} AS source, "
-            f"CURRENT_TIMESTAMP() AS enriched_at"
-        )
-
-    source_sql = " UNION ALL\n".join(selects)
-    insert_sql = f"""\
-INSERT INTO social_listening.enriched_comments (
-    comment_id, post_id, root_comment_id, collection_id, agent_id, agent_version,
-    context, sentiment, emotion, entities, themes, ai_summary,
-    language, content_type, relevance_reason, is_related_to_task, detected_brands,
-    channel_type, custom_fields, source, enriched_at
-)
-{source_sql};"""
-
-    bq.query(insert_sql)
+        rows.append(EnrichedCommentRow(
+            comment_id=comment_id,
+            post_id=post_id or None,
+            root_comment_id=root_comment_id or None,
+            collection_id=collection_id,
+            agent_id=agent_id,
+            agent_version=int(agent_version) if agent_version is not None else None,
+            source=source,
+            enriched_at=enriched_at,
+            **_enrichment_columns(r),
+        ))
+    bq.write_rows_bulk(rows, write_id=write_id)
     logger.info("Wrote %d comment enrichment results (agent=%s v=%s)", len(results), agent_id, agent_version)
 
 
@@ -255,6 +225,7 @@ def _enrich_and_write(
             collection_id=collection_id,
             agent_id=agent_id,
             agent_version=agent_version,
+            write_id=f"comments-{uuid.uuid4().hex}",
         )
         total_ok += len(results)
         logger.info(
@@ -0,0 +1,118 @@
+"""Unit tests for the adaptive engagement refresh planner."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from workers.engagement.planner import (
+    PostRefreshState,
+    RefreshPolicy,
+    metrics_changed,
+    parse_vendor_budgets,
+    plan_refresh,
+    refresh_interval_hours,
+    velocity,
+)
+
+NOW = datetime(2026, 6, 1, 12, tzinfo=timezone.utc)
+POLICY = RefreshPolicy(min_hours=1.0, max_hours=168.0, age_doubling_hours=48.0, velocity_scale=100.0)
+
+
+def _state(post_id, *, age_h, checked_h_ago=None, views=(0, 0), platform="tiktok"):
+    """views = (prev, last) snapshot views, 12h apart, the last one checked_h_ago."""
+    s = PostRefreshState(
+        post_id=post_id, platform=platform, post_url=f"https://x/{post_id}",
+        posted_at=NOW - timedelta(hours=age_h),
+    )
+    if checked_h_ago is not None:
+        s.last_fetched_at = NOW - timedelta(hours=checked_h_ago)
+        s.last_metrics = {"views": views[1]}
+        s.prev_fetched_at = s.last_fetched_at - timedelta(hours=12)
+        s.prev_metrics = {"views": views[0]}
+    return s
+
+
+def _all_vendors(platform):
+    return "apify"
+
+
+def _unlimited(vendor):
+    return 10**9
+
+
+def test_interval_grows_with_age_and_shrinks_with_velocity():
+    young = _state("a", age_h=2, checked_h_ago=1)
+    old = _state("b", age_h=24 * 20, checked_h_ago=1)
+    assert refresh_interval_hours(young, NOW, POLICY) < refresh_interval_hours(old, NOW, POLICY)
+    assert refresh_interval_hours(old, NOW, POLICY) == POLICY.max_hours
+
+    still = _state("c", age_h=96, checked_h_ago=1, views=(1000, 1000))
+    trending = _state("d", age_h=96, checked_h_ago=1, views=(1000, 50_000))
+    assert refresh_interval_hours(trending, NOW, POLICY) < refresh_interval_hours(still, NOW, POLICY)
+
+
+def test_unchanged_check_decays_velocity():
+    s = _state("a", age_h=48, checked_h_ago=1, views=(0, 1300))  # 1300 over 12h
+    before = velocity(s)
+    s.last_checked_at = NOW  # checked again since, nothing moved
+    assert velocity(s) < before
+
+
+def test_plan_picks_due_posts_most_overdue_first():
+    never = _state("never", age_h=1)
+    hot = _state("hot", age_h=10, checked_h_ago=6, views=(0, 10_000))
+    cold = _state("cold", age_h=24 * 20, checked_h_ago=6)  # interval = max_hours
+    picked = plan_refresh([cold, hot, never], NOW, vendor_for=_all_vendors,
+                          budgets=_unlimited, policy=POLICY)
+    assert [s.post_id for s in picked] == ["never", "hot"]
+
+
+def test_plan_respects_vendor_budgets_and_limit():
+    states = [_state(f"t{i}", age_h=1, platform="tiktok") for i in range(5)]
+    states += [_state(f"y{i}", age_h=1, platform="youtube") for i in range(5)]
+    vendors = {"tiktok": "apify", "youtube": "brightdata", "x": None}
+    budgets = parse_vendor_budgets("apify=2", default=3)
+
+    picked = plan_refresh(states + [_state("x0", age_h=1, platform="x")], NOW,
+                          vendor_for=vendors.get, budgets=budgets, policy=POLICY)
+    assert sum(s.platform == "tiktok" for s in picked) == 2
+    assert sum(s.platform == "youtube" for s in picked) == 3
+    assert all(s.platform != "x" for s in picked)  # no adapter → skipped
+
+    assert len(plan_refresh(states, NOW, vendor_for=vendors.get, budgets=_unlimited,
+                            policy=POLICY, limit=4)) == 4
+
+
+def test_metrics_changed_ignores_missing_metrics():
+    old = {"likes": 5, "views": 100, "shares": None}
+    assert not metrics_changed(old, {"likes": 5, "views": 100})
+    assert metrics_changed(old, {"likes": 6, "views": 100})
+    assert metrics_changed(None, {"likes": 0})
+
+
+def test_refresh_skips_unchanged_snapshots():
+    from workers.engagement import worker
+
+    bq = MagicMock()
+    fetched = NOW - timedelta(hours=3)
+    bq.query.return_value = [
+        {"post_id": "p1", "platform": "tiktok", "post_url": "u1", "posted_at": NOW,
+         "likes": 5, "views": 100, "last_fetched_at": fetched},
+        {"post_id": "p2", "platform": "tiktok", "post_url": "u2", "posted_at": NOW,
+         "likes": 5, "views": 100, "last_fetched_at": fetched},
+    ]
+    wrapper = MagicMock()
+    wrapper.engagement_vendor.return_value = "apify"
+    wrapper.fetch_engagements.return_value = [
+        {"post_url": "u1", "likes": 5, "views": 100},  # unchanged
+        {"post_url": "u2", "likes": 9, "views": 180},
+    ]
+    with patch.object(worker, "BQClient", return_value=bq), \
+            patch.object(worker, "DataProviderWrapper", return_value=wrapper):
+        summary = worker.refresh_engagements({"input_type": "post_ids", "post_ids": ["p1", "p2"]})
+
+    assert summary == {"targeted": 2, "refreshed": 2, "snapshots": 1, "unchanged": 1}
+    inserts = {call.args[0]: call.args[1] for call in bq.insert_rows.call_args_list}
+    assert [r["post_id"] for r in inserts["post_engagements"]] == ["p2"]
+    assert {r["post_id"]: r["changed"] for r in inserts["engagement_refresh_checks"]} == {
+        "p1": False, "p2": True,
+    }
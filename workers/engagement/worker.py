@@ -1,87 +1,189 @@
-"""Engagement Worker - re-fetches metrics + comments and appends snapshots.
+"""Engagement Worker - re-fetches metrics and appends snapshots.
+
+Collection refreshes are planned adaptively (see planner.py): fast-moving,
+recent posts refresh often, stale ones rarely, under per-vendor budgets.
 
 Usage:
     python -m workers.engagement.worker '{"input_type": "collection_id", "collection_id": "..."}'
     python -m workers.engagement.worker '{"input_type": "post_ids", "post_ids": [...]}'
+    python -m workers.engagement.worker '{"input_type": "collection_id", "collection_id": "...", "refresh_all": true}'
 """
 
 import json
 import logging
 import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from itertools import groupby
-from operator import itemgetter
+from operator import attrgetter
 from uuid import uuid4
 
 from config.settings import get_settings
 from workers.collection.wrapper import DataProviderWrapper
+from workers.engagement.planner import (
+    METRICS,
+    PostRefreshState,
+    RefreshPolicy,
+    metrics_changed,
+    parse_vendor_budgets,
+    plan_refresh,
+)
 from workers.shared.bq_client import BQClient
 
 logger = logging.getLogger(__name__)
 
 
-def _resolve_posts(bq: BQClient, payload: dict) -> list[dict]:
-    """Resolve posts from payload into list of {post_id, platform, post_url}."""
+def _load_refresh_states(bq: BQClient, payload: dict) -> list[PostRefreshState]:
+    """Posts targeted by the payload, with their last two engagement snapshots
+    and last refresh check (for planning and the unchanged-snapshot skip)."""
     input_type = payload.get("input_type")
 
     if input_type == "collection_id":
-        return bq.query(
-            "SELECT post_id, platform, post_url FROM social_listening.posts "
-            "WHERE collection_id = @collection_id",
-            {"collection_id": payload["collection_id"]},
-        )
+        target_filter = "collection_id = @collection_id"
+        params: dict = {"collection_id": payload["collection_id"]}
     elif input_type == "post_ids":
-        # BQ doesn't support array params easily, so query in batches
-        post_ids = payload["post_ids"]
-        all_posts = []
-        for i in range(0, len(post_ids), 100):
-            batch_ids = post_ids[i : i + 100]
-            id_list = ", ".join(f"'{pid}'" for pid in batch_ids)
-            all_posts.extend(
-                bq.query(
-                    f"SELECT post_id, platform, post_url FROM social_listening.posts "
-                    f"WHERE post_id IN ({id_list})"
-                )
-            )
-        return all_posts
+        target_filter = "post_id IN UNNEST(@post_ids)"
+        params = {"post_ids": list(payload["post_ids"])}
     else:
         raise ValueError(f"Unknown input_type: {input_type}")
 
-
-def refresh_engagements(payload: dict) -> None:
+    metric_cols = ", ".join(f"s1.{m}, s2.{m} AS prev_{m}" for m in METRICS)
+    rows = bq.query(
+        f"""
+        WITH target AS (
+            SELECT * EXCEPT(_rn) FROM (
+                SELECT post_id, platform, post_url, posted_at,
+                       ROW_NUMBER() OVER (PARTITION BY post_id ORDER BY collected_at DESC) AS _rn
+                FROM social_listening.posts
+                WHERE {target_filter}
+            )
+            WHERE _rn = 1
+        ),
+        snaps AS (
+            SELECT e.post_id, {", ".join(f"e.{m}" for m in METRICS)}, e.fetched_at,
+                   ROW_NUMBER() OVER (PARTITION BY e.post_id ORDER BY e.fetched_at DESC) AS _rn
+            FROM social_listening.post_engagements e
+            JOIN target t ON t.post_id = e.post_id
+        ),
+        checks AS (
+            SELECT c.post_id, MAX(c.checked_at) AS last_checked_at
+            FROM social_listening.engagement_refresh_checks c
+            JOIN target t ON t.post_id = c.post_id
+            GROUP BY c.post_id
+        )
+        SELECT t.post_id, t.platform, t.post_url, t.posted_at,
+               {metric_cols},
+               s1.fetched_at AS last_fetched_at, s2.fetched_at AS prev_fetched_at,
+               c.last_checked_at
+        FROM target t
+        LEFT JOIN snaps s1 ON s1.post_id = t.post_id AND s1._rn = 1
+        LEFT JOIN snaps s2 ON s2.post_id = t.post_id AND s2._rn = 2
+        LEFT JOIN checks c ON c.post_id = t.post_id
+        """,
+        params,
+    )
+    return [_state_from_row(r) for r in rows]
+
+
+def _state_from_row(row: dict) -> PostRefreshState:
+    last = {m: row.get(m) for m in METRICS} if row.get("last_fetched_at") else None
+    prev = {m: row.get(f"prev_{m}") for m in METRICS} if row.get("prev_fetched_at") else None
+    return PostRefreshState(
+        post_id=row["post_id"],
+        platform=row["platform"],
+        post_url=row["post_url"],
+        posted_at=row.get("posted_at"),
+        last_metrics=last,
+        last_fetched_at=row.get("last_fetched_at"),
+        prev_metrics=prev,
+        prev_fetched_at=row.get("prev_fetched_at"),
+        last_checked_at=row.get("last_checked_at"),
+    )
+
+
+def refresh_engagements(payload: dict) -> dict:
+    """Re-fetch engagement metrics and append `post_engagements` snapshots.
+
+    A `collection_id` payload goes through the adaptive planner (planner.py):
+    only posts whose refresh interval has elapsed, most overdue first, within
+    each vendor's budget. Pass `"refresh_all": true` - or a `post_ids`
+    payload - to refresh every targeted post. Either way a snapshot whose
+    metrics match the post's last one is not written; the check itself is
+    logged to `engagement_refresh_checks` so the planner knows it happened.
+    """
     settings = get_settings()
     bq = BQClient(settings)
     wrapper = DataProviderWrapper(config={})
+    now = datetime.now(timezone.utc)
+
+    states = _load_refresh_states(bq, payload)
+    summary = {"targeted": len(states), "refreshed": 0, "snapshots": 0, "unchanged": 0}
+    adaptive = (
+        payload.get("input_type") == "collection_id"
+        and not payload.get("refresh_all")
+        and settings.engagement_adaptive_refresh_enabled
+    )
+    if adaptive:
+        states = plan_refresh(
+            states,
+            now,
+            vendor_for=wrapper.engagement_vendor,
+            budgets=parse_vendor_budgets(
+                settings.engagement_refresh_vendor_budgets,
+                settings.engagement_refresh_budget_per_vendor,
+            ),
+            policy=RefreshPolicy(
+                min_hours=settings.engagement_refresh_min_hours,
+                max_hours=settings.engagement_refresh_max_hours,
+                age_doubling_hours=settings.engagement_refresh_age_doubling_hours,
+                velocity_scale=settings.engagement_refresh_velocity_scale,
+            ),
+            limit=settings.engagement_refresh_max_posts,
+        )
+        logger.info("Refresh planner picked %d of %d posts", len(states), summary["targeted"])
 
-    posts = _resolve_posts(bq, payload)
-    if not posts:
+    if not states:
         logger.info("No posts to refresh")
-        return
+        return summary
 
-    logger.info("Refreshing engagements for %d posts", len(posts))
+    logger.info("Refreshing engagements for %d posts", len(states))
 
-    # Group by platform and process platforms in parallel
-    sorted_posts = sorted(posts, key=itemgetter("platform"))
+    # Group by platform (one fetch_engagements batch per adapter) and process
+    # platforms in parallel
+    sorted_states = sorted(states, key=attrgetter("platform"))
     platform_groups = {
         platform: list(group)
-        for platform, group in groupby(sorted_posts, key=itemgetter("platform"))
+        for platform, group in groupby(sorted_states, key=attrgetter("platform"))
     }
 
-    def _refresh_platform(platform: str, group_list: list[dict]) -> None:
-        post_urls = [p["post_url"] for p in group_list]
-        post_id_map = {p["post_url"]: p["post_id"] for p in group_list}
+    def _refresh_platform(platform: str, group_list: list[PostRefreshState]) -> tuple[int, int, int]:
+        by_url = {s.post_url: s for s in group_list}
+        vendor = wrapper.engagement_vendor(platform)
 
-        results = wrapper.fetch_engagements(platform, post_urls)
+        results = wrapper.fetch_engagements(platform, list(by_url))
 
+        fetched_at = datetime.now(timezone.utc).isoformat()
         rows = []
+        checks = []
+        seen: set[str] = set()
         for r in results:
-            post_id = post_id_map.get(r.get("post_url"))
-            if not post_id:
+            state = by_url.get(r.get("post_url"))
+            if state is None or state.post_id in seen:
+                continue
+            seen.add(state.post_id)
+            changed = metrics_changed(state.last_metrics, r)
+            checks.append({
+                "post_id": state.post_id,
+                "checked_at": fetched_at,
+                "vendor": vendor,
+                "changed": changed,
+            })
+            if not changed:
                 continue
             rows.append(
                 {
                     "engagement_id": str(uuid4()),
-                    "post_id": post_id,
+                    "post_id": state.post_id,
                     "likes": r.get("likes"),
                     "shares": r.get("shares"),
                     "comments_count": r.get("comments_count"),
@@ -93,12 +195,19 @@ def refresh_engagements(payload: dict) -> None:
                     "comments": None,
                     "platform_engagements": None,
                     "source": "refresh",
+                    "fetched_at": fetched_at,
                 }
             )
 
         if rows:
             bq.insert_rows("post_engagements", rows)
             logger.info("Inserted %d engagement snapshots for %s", len(rows), platform)
+        if checks:
+            bq.insert_rows("engagement_refresh_checks", checks)
+        unchanged = len(checks) - len(rows)
+        if unchanged:
+            logger.info("Skipped %d unchanged engagement snapshots for %s", unchanged, platform)
+        return len(checks), len(rows), unchanged
 
     with ThreadPoolExecutor(max_workers=min(len(platform_groups), 5)) as pool:
         futures = {
@@ -108,9 +217,16 @@ def refresh_engagements(payload: dict) -> None:
         for future in as_completed(futures):
             platform = futures[future]
             try:
-                future.result()
+                refreshed, snapshots, unchanged = future.result()
             except Exception:
                 logger.exception("Engagement refresh failed for %s", platform)
+                continue
+            summary["refreshed"] += refreshed
+            summary["snapshots"] += snapshots
+            summary["unchanged"] += unchanged
+
+    logger.info("Engagement refresh: %s", summary)
+    return summary
 
 
 if __name__ == "__main__":
@@ -0,0 +1,257 @@
+"""Gemini Batch API enrichment - for backfills where latency doesn't matter.
+
+Re-enrichment after an agent version bump and overnight recurring runs don't
+need per-post latency, so instead of one synchronous `generate_content` call
+per post (through the process-wide token buckets and semaphore) the whole set
+is submitted as one batch prediction job: a JSONL file of requests built from
+the same `_build_content_parts` / `_build_config` as the synchronous path.
+Batch jobs run on their own quota at the batch discount, and take minutes to
+hours to complete.
+
+Jobs outlive the request that submits them, so nothing here waits: the
+worker submits (`submit_enrichment_batch`) and records the job in Firestore,
+and a scheduled collector (`workers.enrichment.worker.collect_enrichment_batches`)
+checks each recorded job (`collect_enrichment_batch`) and writes its results
+once it has finished.
+
+The job backend is pluggable (`BatchBackend`) so tests can run a local fake;
+`VertexBatchBackend` stages the JSONL in GCS and drives `client.batches`.
+"""
+
+import json
+import logging
+from typing import Protocol
+
+from google import genai
+from google.cloud import storage
+from google.genai import types
+
+from config.settings import get_settings
+from workers.enrichment.enricher import (
+    _build_comment_content_parts,
+    _build_config,
+    _build_content_parts,
+    _render_comment_system_instruction,
+)
+from workers.enrichment.schema import CustomFieldDef, EnrichmentResult, PostData
+
+logger = logging.getLogger(__name__)
+
+_BATCH_PREFIX = "enrichment-batches"
+
+# Terminal job states (types.JobState values).
+_SUCCEEDED = {"JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"}
+_FAILED = {"JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+
+class BatchJobFailed(RuntimeError):
+    """A batch job reached a terminal state without results."""
+
+
+class BatchBackend(Protocol):
+    """Where batch jobs run. Each request line is `{"key": post_id, "request": {...}}`."""
+
+    def submit(self, model: str, requests: list[dict], display_name: str) -> str:
+        """Submit a job; returns its name."""
+        ...
+
+    def get_state(self, job_name: str) -> str:
+        """Current `types.JobState` value of the job, e.g. "JOB_STATE_RUNNING"."""
+        ...
+
+    def fetch_results(self, job_name: str) -> list[dict]:
+        """Output lines of a finished job: the input line plus `response` / `status`."""
+        ...
+
+
+class VertexBatchBackend:
+    """Vertex AI batch prediction, with JSONL input/output staged in GCS."""
+
+    def __init__(self, settings=None):
+        self._settings = settings or get_settings()
+        # Batch prediction is regional - it can't run on the "global" endpoint.
+        self._client = genai.Client(
+            vertexai=True,
+            project=self._settings.gcp_project_id,
+            location=self._settings.enrichment_batch_location,
+        )
+        self._storage = storage.Client(project=self._settings.gcp_project_id)
+        self._bucket = self._storage.bucket(self._settings.gcs_exports_bucket)
+
+    def submit(self, model: str, requests: list[dict], display_name: str) -> str:
+        prefix = f"{_BATCH_PREFIX}/{display_name}"
+        blob = self._bucket.blob(f"{prefix}/input.jsonl")
+        blob.upload_from_string(
+            "\n".join(json.dumps(r, default=str) for r in requests),
+            content_type="application/jsonl",
+        )
+        bucket = self._settings.gcs_exports_bucket
+        job = self._client.batches.create(
+            model=model,
+            src=f"gs://{bucket}/{prefix}/input.jsonl",
+            config=types.CreateBatchJobConfig(
+                display_name=display_name,
+                dest=f"gs://{bucket}/{prefix}/output",
+            ),
+        )
+        return job.name
+
+    def get_state(self, job_name: str) -> str:
+        job = self._client.batches.get(name=job_name)
+        return job.state.value if job.state else ""
+
+    def fetch_results(self, job_name: str) -> list[dict]:
+        job = self._client.batches.get(name=job_name)
+        dest = job.dest.gcs_uri if job.dest else None
+        if not dest:
+            return []
+        bucket_name, _, prefix = dest.removeprefix("gs://").partition("/")
+        lines: list[dict] = []
+        for blob in self._storage.list_blobs(bucket_name, prefix=prefix):
+            if not blob.name.endswith(".jsonl"):
+                continue
+            for line in blob.download_as_text().splitlines():
+                if line.strip():
+                    lines.append(json.loads(line))
+        return lines
+
+
+# ---------------------------------------------------------------------------
+# Request building / result parsing
+# ---------------------------------------------------------------------------
+
+def _dump(model) -> dict:
+    return model.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+
+def _config_to_request_fields(config: types.GenerateContentConfig) -> dict:
+    """Translate a GenerateContentConfig into REST GenerateContentRequest fields."""
+    generation: dict = {
+        "temperature": config.temperature,
+        "maxOutputTokens": config.max_output_tokens,
+        "responseMimeType": config.response_mime_type,
+    }
+    if config.response_schema is not None:
+        generation["responseJsonSchema"] = config.response_schema.model_json_schema()
+    if config.media_resolution is not None:
+        generation["mediaResolution"] = config.media_resolution.value
+    if config.thinking_config is not None:
+        generation["thinkingConfig"] = _dump(config.thinking_config)
+
+    fields: dict = {"generationConfig": {k: v for k, v in generation.items() if v is not None}}
+    if config.tools:
+        fields["tools"] = [_dump(t) for t in config.tools]
+    if config.system_instruction:
+        fields["systemInstruction"] = {"parts": [{"text": config.system_instruction}]}
+    return fields
+
+
+def build_batch_request(
+    post: PostData,
+    config: types.GenerateContentConfig,
+    custom_fields: list[CustomFieldDef] | None = None,
+    enrichment_context: str | None = None,
+    comment_mode: bool = False,
+) -> dict:
+    """One JSONL request line for a post, keyed by post_id."""
+    if comment_mode:
+        parts = _build_comment_content_parts(post)
+    else:
+        parts = _build_content_parts(post, custom_fields, enrichment_context=enrichment_context)
+    contents = types.Content(role="user", parts=parts)
+    return {
+        "key": post.post_id,
+        "request": {"contents": [_dump(contents)], **_config_to_request_fields(config)},
+    }
+
+
+def parse_batch_results(
+    lines: list[dict],
+    model: str,
+    platforms: dict[str, str] | None = None,
+) -> list[tuple[str, EnrichmentResult]]:
+    """Parse job output lines into (post_id, EnrichmentResult).
+
+    Lines with an error status, no response or unparseable JSON are logged and
+    skipped - same contract as the synchronous path. Each response's token
+    usage is logged to the cost meter like a synchronous call.
+    """
+    from api.services.cost_meter import log_gemini_response
+
+    platforms = platforms or {}
+    results: list[tuple[str, EnrichmentResult]] = []
+    for line in lines:
+        post_id = line.get("key")
+        raw = line.get("response")
+        if not post_id or line.get("status") or not raw:
+            logger.warning("Batch enrichment failed for post %s: %s", post_id, line.get("status"))
+            continue
+        try:
+            response = types.GenerateContentResponse.model_validate(raw)
+            log_gemini_response(
+                response, feature="enrich", model=model, platform=platforms.get(post_id),
+            )
+            results.append((post_id, EnrichmentResult.model_validate_json(response.text)))
+        except Exception as e:
+            logger.warning("Batch enrichment unparseable for post %s: %s", post_id, str(e)[:200])
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def submit_enrichment_batch(
+    posts: list[PostData],
+    custom_fields: list[CustomFieldDef] | None = None,
+    enrichment_context: str | None = None,
+    content_types: list[str] | None = None,
+    comment_mode: bool = False,
+    display_name: str = "enrichment",
+    backend: BatchBackend | None = None,
+) -> str:
+    """Submit one batch prediction job for `posts` and return its name.
+
+    Doesn't wait for the job - hand the name to `collect_enrichment_batch`.
+    """
+    settings = get_settings()
+    backend = backend or VertexBatchBackend(settings)
+    if comment_mode:
+        config = _build_config(
+            custom_fields, content_types,
+            system_instruction=_render_comment_system_instruction(enrichment_context, custom_fields),
+            enable_search=False,
+        )
+    else:
+        config = _build_config(custom_fields, content_types)
+
+    requests = [
+        build_batch_request(post, config, custom_fields, enrichment_context, comment_mode)
+        for post in posts
+    ]
+    job_name = backend.submit(settings.enrichment_model, requests, display_name)
+    logger.info("Submitted batch enrichment job %s (%d posts)", job_name, len(posts))
+    return job_name
+
+
+def collect_enrichment_batch(
+    job_name: str,
+    model: str,
+    platforms: dict[str, str] | None = None,
+    backend: BatchBackend | None = None,
+) -> list[tuple[str, EnrichmentResult]] | None:
+    """Results of a submitted job, or None while it is still pending/running.
+
+    `model` is the one the job ran on (for the cost meter); `platforms` maps
+    post_id -> platform for cost attribution. Raises BatchJobFailed if the job
+    failed, was cancelled or expired.
+    """
+    backend = backend or VertexBatchBackend()
+    state = backend.get_state(job_name)
+    if state in _FAILED:
+        raise BatchJobFailed(f"Batch enrichment job {job_name} ended in {state}")
+    if state not in _SUCCEEDED:
+        return None
+    results = parse_batch_results(backend.fetch_results(job_name), model, platforms)
+    logger.info("Batch enrichment job %s: %d results", job_name, len(results))
+    return results
@@ -0,0 +1,152 @@
+"""Gemini explicit context caching for the static enrichment prompt prefix.
+
+Every enrichment request repeats the same instructions - ENRICHMENT_INSTRUCTIONS
+(or the comment system instruction) plus the custom-fields section and, when
+search is on, the tool declaration. Only the post-specific tail changes, so on
+agents with many custom fields most input tokens are duplicates. This module
+creates one Gemini `cachedContents` resource per distinct prefix and hands out
+its name; requests then carry `cached_content=<name>` and send only the tail.
+
+A prefix is cached in the role it has when sent inline, so the model sees the
+same prompt either way: the comment instructions as the system instruction,
+the post instructions as the opening text of the user turn.
+Cached input tokens are billed at the cached rate - `log_gemini_response`
+records them separately from fresh tokens.
+
+Entries are keyed by (model, role, sha256(prefix), search on/off). The
+instruction text already covers the agent's custom_fields and
+enrichment_context, so two runs of the same agent version share an entry; a
+version bump that changes either gets a new one. content_types only shape the
+response schema, which lives in the per-request generation config and can't be
+cached.
+
+Caches expire after `enrichment_context_cache_ttl_sec`; an entry is re-created
+once it's within `_REFRESH_MARGIN_SEC` of expiry. Creation fails for prefixes
+below the model's minimum cacheable size (and for models without caching) -
+that's remembered for a TTL so callers fall back to inline instructions
+without retrying on every post.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from google import genai
+from google.genai import types
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Re-create a cache this long before it expires so in-flight requests never
+# reference an expired resource.
+_REFRESH_MARGIN_SEC = 120.0
+
+
+@dataclass
+class _Entry:
+    name: str | None  # None → creation failed, use inline instructions
+    expires_at: float  # time.monotonic()
+
+
+class PromptPrefixCache:
+    """Process-wide registry of cached prompt prefixes. Thread-safe."""
+
+    def __init__(self, ttl_sec: float):
+        self._ttl_sec = max(ttl_sec, _REFRESH_MARGIN_SEC * 2)
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, _Entry] = {}
+
+    def resolve(
+        self,
+        client: genai.Client,
+        model: str,
+        prefix: str,
+        tools: list[types.Tool] | None = None,
+        display_name: str = "enrichment-prefix",
+        role: str = "system",
+    ) -> str | None:
+        """Name of a live cachedContents resource holding this prefix, or None.
+
+        `role` "system" caches it as the system instruction, "user" as a user
+        turn that the request's own user content continues."""
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        key = (model, role, digest, bool(tools))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at - _REFRESH_MARGIN_SEC:
+                return entry.name
+            # Creation is a single small API call - holding the lock means
+            # concurrent workers wait for one create instead of racing N.
+            name = self._create(client, model, prefix, role, tools, display_name)
+            self._entries[key] = _Entry(name=name, expires_at=now + self._ttl_sec)
+            return name
+
+    def invalidate(self, cached_name: str) -> None:
+        """Drop an entry whose cache Gemini no longer recognizes (deleted or
+        expired early) so the next request re-creates it."""
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.name == cached_name:
+                    del self._entries[key]
+
+    def _create(
+        self,
+        client: genai.Client,
+        model: str,
+        prefix: str,
+        role: str,
+        tools: list[types.Tool] | None,
+        display_name: str,
+    ) -> str | None:
+        if role == "user":
+            placement = {"contents": [types.Content(role="user", parts=[types.Part.from_text(text=prefix)])]}
+        else:
+            placement = {"system_instruction": prefix}
+        try:
+            cached = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    **placement,
+                    tools=tools or None,
+                    ttl=f"{int(self._ttl_sec)}s",
+                    display_name=display_name[:128],
+                ),
+            )
+        except Exception as e:
+            logger.info(
+                "Context cache unavailable for %s (%s) - sending instructions inline",
+                display_name, str(e)[:160],
+            )
+            return None
+        logger.info("Created context cache %s for %s", cached.name, display_name)
+        return cached.name
+
+
+def with_cached_prefix(config: types.GenerateContentConfig, cached_name: str) -> types.GenerateContentConfig:
+    """Copy of `config` bound to a cached prefix.
+
+    system_instruction and tools live in the cache, and Gemini rejects
+    requests that set them alongside `cached_content`.
+    """
+    return config.model_copy(update={
+        "cached_content": cached_name,
+        "system_instruction": None,
+        "tools": None,
+    })
+
+
+_prefix_cache: PromptPrefixCache | None = None
+_init_lock = threading.Lock()
+
+
+def get_prefix_cache() -> PromptPrefixCache:
+    global _prefix_cache
+    if _prefix_cache is None:
+        with _init_lock:
+            if _prefix_cache is None:
+                _prefix_cache = PromptPrefixCache(get_settings().enrichment_context_cache_ttl_sec)
+    return _prefix_cache
@@ -20,6 +20,7 @@ from typing import Annotated, Literal
 from pydantic import AfterValidator, BaseModel, create_model
 
 from config.settings import get_settings
+from workers.enrichment.context_cache import get_prefix_cache, with_cached_prefix
 from workers.enrichment.normalize import normalize_labels
 from workers.enrichment.schema import (
     CustomFieldDef,
@@ -133,7 +134,13 @@ def _get_general_rate_limiter() -> _TokenBucketRateLimiter:
                 logger.info("General rate limiter initialized (%d/min)", limit)
     return _general_rate_limiter
 
-ENRICHMENT_PROMPT = """\
+# The post prompt is two halves: the static instructions (identical for every
+# post of a collection once enrichment_context is fixed) and the per-post tail.
+# Both are user-turn text. When a Gemini context cache is available the
+# instructions are cached as a user turn and only the tail is sent per post
+# (see workers/enrichment/context_cache.py); otherwise they're concatenated as
+# ENRICHMENT_PROMPT. Either way the model reads the same user text.
+ENRICHMENT_INSTRUCTIONS = """\
 Your job is to analyze the attached social media post to determine its primary content, context, intent, tone, and cultural relevance and narrative.
 
 Task under analysis: "{enrichment_context}"
@@ -156,8 +163,9 @@ Fields of the analysis:
 
 Grounding: base each field on signal you can actually observe in the post - its text, the media, and the channel context. When that signal is thin or ambiguous, prefer empty values (empty list, `neutral`, null) over filling the gap with a plausible guess. It's expected that some posts won't carry enough to extract entities, brands, or themes from - that's a valid outcome, not a failure. If you reference wording from the post in `ai_summary`, only use what was actually written or spoken; don't paraphrase a quote or reconstruct phrasing that wasn't there. When in doubt, lean toward under-calling rather than confidently guessing.
 
-IMPORTANT: All output fields MUST be in English, regardless of the post's original language.
+IMPORTANT: All output fields MUST be in English, regardless of the post's original language."""
 
+ENRICHMENT_POST_TEMPLATE = """\
 {referenced_post_block}
 Post:
   Platform: {platform}
@@ -168,6 +176,8 @@ Post:
 
 """
 
+ENRICHMENT_PROMPT = ENRICHMENT_INSTRUCTIONS + "\n\n" + ENRICHMENT_POST_TEMPLATE
+
 # Rendered into ENRICHMENT_PROMPT when the post is a quote/reply with a hydrated
 # source. Lets the model interpret the post in light of what it's responding to,
 # instead of inventing a coherent-sounding narrative for ambiguous one-liners.
@@ -365,40 +375,66 @@ def _build_response_schema(
     )
 
 
+def _render_post_instructions(
+    enrichment_context: str | None,
+    custom_fields: list[CustomFieldDef] | None,
+) -> str:
+    """Render the static half of the post prompt: task body + custom field
+    section. Identical for every post of a collection when enrichment_context
+    is set, which makes it the cacheable prefix."""
+    text = ENRICHMENT_INSTRUCTIONS.format(enrichment_context=enrichment_context or "N/A")
+    # Inject custom field instructions inline, before the IMPORTANT marker
+    if custom_fields:
+        custom_section = _build_custom_fields_prompt(custom_fields)
+        text = text.replace(
+            "\nIMPORTANT: All output fields",
+            f"{custom_section}\n\nIMPORTANT: All output fields",
+        )
+    return text
+
+
+def _post_instruction_prefix(
+    enrichment_context: str | None,
+    custom_fields: list[CustomFieldDef] | None,
+) -> str:
+    """The instructions exactly as they open the post's user text - inline,
+    or as the cached user turn the per-post tail continues."""
+    return _render_post_instructions(enrichment_context, custom_fields) + "\n\n"
+
+
 def _build_content_parts(
     post: PostData,
     custom_fields: list[CustomFieldDef] | None = None,
     skip_video: bool = False,
     enrichment_context: str | None = None,
+    instructions_cached: bool = False,
 ) -> list[types.Part]:
     """Build multimodal content parts for a single post.
 
     If skip_video is True, video parts (GCS and YouTube URL) are omitted.
     Used as fallback when video causes PERMISSION_DENIED.
+
+    If instructions_cached is True, the static instructions are already in a
+    cached prefix (see `_resolve_cached_config`) and only the per-post tail
+    is sent.
     """
     settings = get_settings()
     parts: list[types.Part] = []
 
     # Text prompt with post metadata
-    effective_context = enrichment_context or post.search_keyword or "N/A"
-    referenced_post_block = _render_referenced_post_block(post.referenced_post)
-    prompt_text = ENRICHMENT_PROMPT.format(
+    post_text = ENRICHMENT_POST_TEMPLATE.format(
         platform=post.platform,
         channel_handle=post.channel_handle or "unknown",
         posted_at=post.posted_at or "unknown",
         title=post.title or "",
         content=post.content or "",
-        enrichment_context=effective_context,
-        referenced_post_block=referenced_post_block,
+        referenced_post_block=_render_referenced_post_block(post.referenced_post),
     )
-
-    # Inject custom field instructions inline, before the IMPORTANT marker
-    if custom_fields:
-        custom_section = _build_custom_fields_prompt(custom_fields)
-        prompt_text = prompt_text.replace(
-            "\nIMPORTANT: All output fields",
-            f"{custom_section}\n\nIMPORTANT: All output fields",
-        )
+    if instructions_cached:
+        prompt_text = post_text
+    else:
+        effective_context = enrichment_context or post.search_keyword or "N/A"
+        prompt_text = _post_instruction_prefix(effective_context, custom_fields) + post_text
 
     parts.append(types.Part.from_text(text=prompt_text))
 
@@ -608,6 +644,44 @@ def _build_config(
     return config
 
 
+def _resolve_cached_config(
+    client: genai.Client,
+    model: str,
+    config: types.GenerateContentConfig,
+    custom_fields: list[CustomFieldDef] | None,
+    enrichment_context: str | None,
+    comment_mode: bool,
+) -> types.GenerateContentConfig | None:
+    """`config` bound to a cached instruction prefix, or None to send inline.
+
+    Posts only have a static prefix when the collection sets
+    enrichment_context - otherwise each post falls back to its own
+    search_keyword. Comments always do (their system_instruction).
+    """
+    settings = get_settings()
+    if not settings.enrichment_context_cache_enabled:
+        return None
+    if comment_mode:
+        instructions, role = config.system_instruction, "system"
+    elif enrichment_context:
+        instructions, role = _post_instruction_prefix(enrichment_context, custom_fields), "user"
+    else:
+        return None
+    if not isinstance(instructions, str) or not instructions:
+        return None
+
+    from api.services.cost_meter import get_collection_context
+
+    agent_id = get_collection_context().get("agent_id") or "adhoc"
+    name = get_prefix_cache().resolve(
+        client, model, instructions,
+        tools=config.tools,
+        display_name=f"enrich-{'comments' if comment_mode else 'posts'}-{agent_id}",
+        role=role,
+    )
+    return with_cached_prefix(config, name) if name else None
+
+
 def _post_has_video(post: PostData) -> bool:
     """Check if a post will include video content in its Gemini request."""
     # Video in GCS media refs
@@ -651,6 +725,9 @@ def _enrich_single_post(
 ) -> tuple[str, EnrichmentResult | None]:
     """Enrich a single post. Returns (post_id, result) or (post_id, None) on failure.
 
+    The static instruction prefix is served from a Gemini context cache when
+    one is available (`_resolve_cached_config`).
+
     Three layers of throttling before calling Gemini:
       1. General rate limiter (all posts) - prevents overall quota exhaustion
       2. Video rate limiter (video posts only) - tighter limit for video/* quota
@@ -662,11 +739,27 @@ def _enrich_single_post(
     no text-only fallback: a post without its video is not worth enriching.
     """
     settings = get_settings()
-    if comment_mode:
-        parts = _build_comment_content_parts(post)
-    else:
-        parts = _build_content_parts(post, custom_fields, enrichment_context=enrichment_context)
-    contents = types.Content(role="user", parts=parts)
+    # Resolved per post (a dict lookup once warm) so long runs pick up the
+    # re-created prefix when the previous cache nears its TTL.
+    cached_config = _resolve_cached_config(
+        client, model, config, custom_fields, enrichment_context, comment_mode,
+    )
+
+    def _contents(instructions_cached: bool) -> types.Content:
+        if comment_mode:
+            # The comment instructions ride in config.system_instruction.
+            parts = _build_comment_content_parts(post)
+        else:
+            parts = _build_content_parts(
+                post, custom_fields,
+                enrichment_context=enrichment_context,
+                instructions_cached=instructions_cached,
+            )
+        return types.Content(role="user", parts=parts)
+
+    inline_config = config
+    config = cached_config or inline_config
+    contents = _contents(instructions_cached=cached_config is not None)
     semaphore = _get_global_semaphore()
     general_limiter = _get_general_rate_limiter()
     has_video = _post_has_video(post)
@@ -725,6 +818,22 @@ def _enrich_single_post(
             err_str = str(e)
             err_lower = err_str.lower()
 
+            if config.cached_content and "cached" in err_lower:
+                # Gemini no longer knows the cache (deleted or expired early).
+                # Drop it and retry straight away with the instructions inline:
+                # the inline config has no cached_content and still carries
+                # system_instruction/tools, and the post parts get their
+                # instruction prefix back.
+                get_prefix_cache().invalidate(config.cached_content)
+                config = inline_config
+                contents = _contents(instructions_cached=False)
+                if attempt < max_attempts - 1:
+                    logger.warning(
+                        "Context cache rejected for post %s - retrying with inline instructions: %s",
+                        post.post_id, err_str[:120],
+                    )
+                    continue
+
             is_retryable = (
                 "429" in err_str
                 or "RESOURCE_EXHAUSTED" in err_str
@@ -0,0 +1,169 @@
+"""Content-hash enrichment result cache.
+
+Retweets, cross-posted reels and keyword overlaps between an agent's
+collections put the same text + media in front of Gemini many times. The
+`enriched_ids` idempotency set only dedupes by post_id within one run, so
+this cache dedupes by *content*: a sha256 over every prompt input (see
+`cache_key`) plus the agent version and model, stored in Firestore under
+`enrichment_cache/{key}`. A hit copies the cached EnrichmentResult onto the
+new post_id without a Gemini call.
+
+The key includes the (normalized) channel_handle: the prompt renders it and
+`channel_type` (official / ugc / ...) is classified from it, so a brand
+caption reposted by a fan account must not inherit the brand's result. Only
+repeats from the same channel - reposted or cross-collected posts - share an
+entry. posted_at is left out: it's rendered into the prompt but doesn't change
+what the post *is*, and would defeat that dedup. Media is keyed by the content digest recorded at
+download time (`MediaRef.sha256`) so the same reel downloaded into two
+collections matches; refs without a digest fall back to their URI.
+
+Entries expire via a Firestore TTL policy on `expires_at`. Hit/miss counts
+are reported to the cost meter as zero-cost rows, batched every
+`enrichment_cache_metrics_every` lookups and on `flush_metrics()`.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+
+from config.settings import get_settings
+from workers.enrichment.enricher import _is_video, _render_referenced_post_block
+from workers.enrichment.schema import CustomFieldDef, EnrichmentResult, MediaRef, PostData
+
+logger = logging.getLogger(__name__)
+
+CACHE_COLLECTION = "enrichment_cache"
+
+# Bump when the key recipe changes so old entries stop matching.
+_KEY_VERSION = 2
+
+_WS_RE = re.compile(r"\s+")
+
+
+def _normalize_text(text: str | None) -> str:
+    """Unicode- and whitespace-normalize free text for hashing."""
+    if not text:
+        return ""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def _normalize_handle(handle: str | None) -> str:
+    return _normalize_text(handle).lstrip("@").casefold()
+
+
+def _media_digest(ref: MediaRef) -> str:
+    return ref.sha256 or ref.gcs_uri or ref.original_url
+
+
+def cache_key(
+    post: PostData,
+    *,
+    model: str,
+    agent_version: int | None = None,
+    custom_fields: list[CustomFieldDef] | None = None,
+    content_types: list[str] | None = None,
+    enrichment_context: str | None = None,
+) -> str:
+    """Canonical sha256 of everything that shapes the enrichment prompt."""
+    max_media = get_settings().enrichment_max_media_per_post
+    ref_post = post.referenced_post
+    has_gcs_video = any(_is_video(r.media_type, r.content_type) and r.gcs_uri for r in post.media_refs)
+    payload = {
+        "v": _KEY_VERSION,
+        "model": model,
+        "agent_version": agent_version,
+        "platform": post.platform,
+        "channel": _normalize_handle(post.channel_handle),
+        "title": _normalize_text(post.title),
+        "content": _normalize_text(post.content),
+        "media": [_media_digest(r) for r in post.media_refs[:max_media]],
+        # YouTube posts without a downloaded video send the watch URL instead.
+        "youtube_url": post.post_url if post.platform == "youtube" and not has_gcs_video else None,
+        "referenced": _normalize_text(_render_referenced_post_block(ref_post)),
+        "referenced_media": [
+            _media_digest(r) for r in (ref_post.media_refs if ref_post else [])[:max_media]
+        ],
+        "custom_fields": [f.model_dump(mode="json") for f in custom_fields or []],
+        "content_types": sorted({t.strip().lower() for t in content_types or [] if t.strip()}),
+        "enrichment_context": _normalize_text(enrichment_context or post.search_keyword),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class EnrichmentResultCache:
+    """Firestore-backed content-hash → EnrichmentResult cache. Thread-safe.
+
+    Lookups and writes never raise - a cache outage degrades to a miss.
+    """
+
+    def __init__(self, db, settings=None):
+        settings = settings or get_settings()
+        self._col = db.collection(CACHE_COLLECTION)
+        self._ttl = timedelta(days=settings.enrichment_cache_ttl_days)
+        self._report_every = max(1, settings.enrichment_cache_metrics_every)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> EnrichmentResult | None:
+        result = None
+        try:
+            snap = self._col.document(key).get()
+            if snap.exists:
+                data = snap.to_dict() or {}
+                expires_at = data.get("expires_at")
+                # TTL deletion lags by up to a day - don't serve expired entries.
+                if expires_at is None or expires_at > datetime.now(timezone.utc):
+                    result = EnrichmentResult.model_validate(data["result"])
+        except Exception:
+            logger.warning("Enrichment cache read failed for %s", key[:12], exc_info=True)
+        self._record(hit=result is not None)
+        return result
+
+    def put(self, key: str, result: EnrichmentResult, post_id: str) -> None:
+        now = datetime.now(timezone.utc)
+        try:
+            self._col.document(key).set({
+                "result": result.model_dump(mode="json"),
+                "source_post_id": post_id,
+                "created_at": now,
+                "expires_at": now + self._ttl,
+            })
+        except Exception:
+            logger.warning("Enrichment cache write failed for %s", key[:12], exc_info=True)
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+            due = self._hits + self._misses >= self._report_every
+        if due:
+            self.flush_metrics()
+
+    def flush_metrics(self) -> None:
+        """Report accumulated hit/miss counts to the cost meter and reset them."""
+        with self._lock:
+            hits, misses = self._hits, self._misses
+            self._hits = self._misses = 0
+        if not hits and not misses:
+            return
+        from api.services.cost_meter import log_cost
+
+        for sub_kind, units in (("hit", hits), ("miss", misses)):
+            if units:
+                log_cost(
+                    provider="enrichment_cache",
+                    user_id="",
+                    feature="enrich",
+                    sub_kind=sub_kind,
+                    units=units,
+                    unit_kind="posts",
+                    cost_micros_override=0,
+                )
@@ -19,6 +19,7 @@ class MediaRef(BaseModel):
     original_url: str = ""     # CDN/original URL (may expire, used if no gcs_uri)
     media_type: str = "image"  # image, video, audio
     content_type: str = ""     # image/jpeg, video/mp4, etc.
+    sha256: str = ""           # content digest recorded at download (enrichment cache key)
 
 
 class ReferencedPost(BaseModel):
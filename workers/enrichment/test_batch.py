@@ -0,0 +1,248 @@
+"""Unit tests for Gemini Batch API enrichment, against a local fake backend.
+
+Worker-level tests swap BigQuery and Firestore for in-memory fakes to cover
+the submit-then-collect flow end to end.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from workers.enrichment import batch as batch_mod
+from workers.enrichment import worker as worker_mod
+from workers.enrichment.batch import (
+    BatchJobFailed,
+    build_batch_request,
+    collect_enrichment_batch,
+    submit_enrichment_batch,
+)
+from workers.enrichment.enricher import _build_config
+from workers.enrichment.schema import MediaRef, PostData
+
+
+def _post(post_id: str, **kw) -> PostData:
+    return PostData(post_id=post_id, platform="instagram", content=f"post {post_id}", **kw)
+
+
+def _result_json(sentiment: str) -> str:
+    return json.dumps({
+        "context": "ctx",
+        "sentiment": sentiment,
+        "emotion": "neutral",
+        "entities": [],
+        "themes": [],
+        "ai_summary": "summary",
+        "language": "en",
+        "content_type": "post",
+        "is_related_to_task": True,
+    })
+
+
+class FakeBatchBackend:
+    """Runs the "job" locally: answers each request line with a canned response."""
+
+    def __init__(self, answers: dict[str, str | None], states: list[str] | None = None):
+        self.answers = answers
+        self.states = states or ["JOB_STATE_RUNNING", "JOB_STATE_SUCCEEDED"]
+        self.submitted: list[dict] = []
+
+    def submit(self, model, requests, display_name):
+        # Round-trip through JSON like the real JSONL file does.
+        self.submitted = [json.loads(json.dumps(r)) for r in requests]
+        return f"jobs/{display_name}"
+
+    def get_state(self, job_name):
+        return self.states.pop(0) if len(self.states) > 1 else self.states[0]
+
+    def fetch_results(self, job_name):
+        lines = []
+        for line in self.submitted:
+            text = self.answers.get(line["key"])
+            if text is None:
+                lines.append({**line, "status": "INVALID_ARGUMENT"})
+                continue
+            lines.append({**line, "status": "", "response": {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}],
+                "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 5},
+            }})
+        return lines
+
+
+class FakeFirestore:
+    """collection_status docs plus the enrichment_batch_jobs collection."""
+
+    def __init__(self):
+        self.status: dict[str, dict] = {}
+        self.jobs: dict[str, dict] = {}
+
+    def get_collection_status(self, collection_id):
+        return self.status.get(collection_id)
+
+    def update_collection_status(self, collection_id, **fields):
+        self.status.setdefault(collection_id, {}).update(fields)
+
+    def save_enrichment_batch_job(self, collection_id, job_name, data):
+        self.jobs[job_name] = {**data, "collection_id": collection_id,
+                               "job_name": job_name, "status": "pending"}
+
+    def get_pending_enrichment_batch_jobs(self, collection_id=None):
+        return [dict(j) for j in self.jobs.values() if j["status"] == "pending"
+                and (collection_id is None or j["collection_id"] == collection_id)]
+
+    def update_enrichment_batch_job(self, job_name, **fields):
+        self.jobs[job_name].update(fields)
+
+
+class FakeBQ:
+    def __init__(self):
+        self.written: list[str] = []
+
+    def query(self, sql, params=None):
+        return [{"cnt": len(self.written)}]
+
+
+@pytest.fixture(autouse=True)
+def _no_cost_log():
+    with patch("api.services.cost_meter.log_gemini_response"):
+        yield
+
+
+@pytest.fixture
+def worker_env(monkeypatch):
+    """run_enrichment / collect_enrichment_batches against in-memory fakes."""
+    fs, bq = FakeFirestore(), FakeBQ()
+    fs.status["c1"] = {"status": "running", "agent_id": "a1", "agent_version": 2}
+    monkeypatch.setattr(worker_mod, "FirestoreClient", lambda *a: fs)
+    monkeypatch.setattr(worker_mod, "BQClient", lambda *a: bq)
+    for loader in ("_load_custom_fields", "_load_enrichment_context", "_load_content_types"):
+        monkeypatch.setattr(worker_mod, loader, lambda *a: None)
+    monkeypatch.setattr(
+        worker_mod, "_write_results_to_bq",
+        lambda _bq, results, **kw: bq.written.extend(pid for pid, _ in results),
+    )
+    return fs, bq
+
+
+def _use_backend(monkeypatch, backend) -> None:
+    monkeypatch.setattr(batch_mod, "VertexBatchBackend", lambda *a: backend)
+
+
+def test_build_batch_request_uses_shared_prompt_and_config():
+    post = _post("p1", media_refs=[MediaRef(gcs_uri="gs://b/x.jpg", media_type="image", content_type="image/jpeg")])
+    line = build_batch_request(post, _build_config(), enrichment_context="coffee brands")
+
+    assert line["key"] == "p1"
+    request = line["request"]
+    parts = request["contents"][0]["parts"]
+    assert "coffee brands" in parts[0]["text"]
+    assert parts[1]["fileData"] == {"fileUri": "gs://b/x.jpg", "mimeType": "image/jpeg"}
+    generation = request["generationConfig"]
+    assert generation["responseMimeType"] == "application/json"
+    assert "sentiment" in generation["responseJsonSchema"]["properties"]
+    json.dumps(line)  # must be JSONL-serializable
+
+
+def test_submit_returns_job_without_waiting():
+    backend = FakeBatchBackend({}, states=["JOB_STATE_RUNNING"])
+
+    job_name = submit_enrichment_batch([_post("p1"), _post("p2")], display_name="c-1", backend=backend)
+
+    assert job_name == "jobs/c-1"
+    assert [k["key"] for k in backend.submitted] == ["p1", "p2"]
+    assert collect_enrichment_batch(job_name, "flash", backend=backend) is None
+
+
+def test_collect_parses_results_of_finished_job():
+    backend = FakeBatchBackend({"p1": _result_json("positive"), "p2": "not json", "p3": None})
+    job_name = submit_enrichment_batch(
+        [_post("p1"), _post("p2"), _post("p3")], display_name="c-1", backend=backend,
+    )
+
+    assert collect_enrichment_batch(job_name, "flash", backend=backend) is None  # RUNNING
+    results = collect_enrichment_batch(job_name, "flash", backend=backend)
+
+    assert [(pid, r.sentiment) for pid, r in results] == [("p1", "positive")]
+
+
+def test_collect_raises_on_failed_job():
+    backend = FakeBatchBackend({}, states=["JOB_STATE_FAILED"])
+    with pytest.raises(BatchJobFailed, match="JOB_STATE_FAILED"):
+        collect_enrichment_batch("jobs/x", "flash", backend=backend)
+
+
+def test_run_enrichment_batch_submits_and_returns(worker_env, monkeypatch):
+    fs, bq = worker_env
+    backend = FakeBatchBackend({"p1": _result_json("positive"), "p2": _result_json("negative")})
+    _use_backend(monkeypatch, backend)
+    monkeypatch.setattr(worker_mod, "_read_posts_from_bq", lambda *a, **kw: [_post("p1"), _post("p2")])
+
+    worker_mod.run_enrichment("c1", mode="batch")
+
+    (job,) = fs.jobs.values()
+    assert job["status"] == "pending" and job["collection_id"] == "c1"
+    assert job["agent_id"] == "a1" and job["agent_version"] == 2
+    assert job["post_platforms"] == {"p1": "instagram", "p2": "instagram"}
+    assert fs.status["c1"]["status"] == "running"
+    assert fs.status["c1"]["run_log"]["enrichment"]["jobs"] == 1
+    assert bq.written == []
+
+    # First collector pass: job still running, nothing written.
+    assert worker_mod.collect_enrichment_batches(backend=backend) == {job["job_name"]: "pending"}
+    assert fs.status["c1"]["status"] == "running"
+
+    assert worker_mod.collect_enrichment_batches(backend=backend) == {job["job_name"]: "collected"}
+    assert sorted(bq.written) == ["p1", "p2"]
+    assert fs.jobs[job["job_name"]]["status"] == "collected"
+    status = fs.status["c1"]
+    assert status["status"] == "success"
+    assert status["posts_enriched"] == 2
+    assert status["run_log"]["enrichment"]["enriched"] == 2
+    assert "completed_at" in status["run_log"]["enrichment"]
+
+    # Nothing left to collect.
+    assert worker_mod.collect_enrichment_batches(backend=backend) == {}
+
+
+def test_collector_waits_for_every_job_and_fails_when_all_fail(worker_env, monkeypatch):
+    fs, bq = worker_env
+    backend = FakeBatchBackend({}, states=["JOB_STATE_FAILED"])
+    _use_backend(monkeypatch, backend)
+    monkeypatch.setattr(worker_mod, "_read_posts_from_bq", lambda *a, **kw: [_post("p1"), _post("p2")])
+    monkeypatch.setattr(worker_mod.get_settings(), "enrichment_batch_max_requests", 1)
+
+    worker_mod.run_enrichment("c1", mode="batch")
+    assert len(fs.jobs) == 2
+
+    first = next(iter(fs.jobs))
+    fs.jobs[first]["status"] = "failed"  # as if an earlier pass saw it fail
+    fs.status["c1"]["run_log"]["enrichment"]["jobs_done"] = 1
+    fs.status["c1"]["run_log"]["enrichment"]["failed"] = 1
+
+    outcomes = worker_mod.collect_enrichment_batches(backend=backend)
+
+    assert list(outcomes.values()) == ["failed"]
+    status = fs.status["c1"]
+    assert status["status"] == "failed"
+    assert status["run_log"]["enrichment"]["failed"] == 2
+    assert status["run_log"]["enrichment"]["jobs_done"] == 2
+
+
+def test_collector_retries_jobs_whose_state_cannot_be_read(worker_env):
+    fs, _ = worker_env
+    fs.save_enrichment_batch_job("c1", "jobs/x", {"model": "flash", "post_count": 1})
+
+    class _Down:
+        def get_state(self, job_name):
+            raise ConnectionError("vertex unavailable")
+
+    assert worker_mod.collect_enrichment_batches(backend=_Down()) == {"jobs/x": "error"}
+    assert fs.jobs["jobs/x"]["status"] == "pending"
+
+
+def test_run_enrichment_rejects_unknown_mode(worker_env, monkeypatch):
+    read = []
+    monkeypatch.setattr(worker_mod, "_read_posts_from_bq", lambda *a, **kw: read.append(1) or [])
+    with pytest.raises(ValueError, match="bacth"):
+        worker_mod.run_enrichment("c1", mode="bacth")
+    assert read == []
@@ -0,0 +1,200 @@
+"""Unit tests for Gemini context caching of the static enrichment prefix."""
+
+from unittest.mock import MagicMock, patch
+
+from google.genai import types
+
+from workers.enrichment import context_cache
+from workers.enrichment.context_cache import PromptPrefixCache, with_cached_prefix
+from workers.enrichment.enricher import (
+    _build_config,
+    _build_content_parts,
+    _enrich_single_post,
+    _post_instruction_prefix,
+    _render_post_instructions,
+    _resolve_cached_config,
+)
+from workers.enrichment.schema import CustomFieldDef, PostData
+
+
+def _client(*names: str) -> MagicMock:
+    created = []
+    for n in names:
+        cached = MagicMock()
+        cached.name = n
+        created.append(cached)
+    client = MagicMock()
+    client.caches.create.side_effect = created
+    return client
+
+
+# ---------------------------------------------------------------------------
+# PromptPrefixCache
+# ---------------------------------------------------------------------------
+
+def test_prefix_is_created_once_and_reused():
+    cache = PromptPrefixCache(ttl_sec=3600)
+    client = _client("cachedContents/1")
+
+    assert cache.resolve(client, "m", "instructions") == "cachedContents/1"
+    assert cache.resolve(client, "m", "instructions") == "cachedContents/1"
+
+    client.caches.create.assert_called_once()
+    config = client.caches.create.call_args.kwargs["config"]
+    assert config.system_instruction == "instructions"
+    assert config.ttl == "3600s"
+
+
+def test_prefix_is_recreated_near_ttl_expiry():
+    cache = PromptPrefixCache(ttl_sec=600)
+    client = _client("cachedContents/1", "cachedContents/2")
+    with patch.object(context_cache.time, "monotonic", return_value=1000.0):
+        assert cache.resolve(client, "m", "instructions") == "cachedContents/1"
+    with patch.object(context_cache.time, "monotonic", return_value=1000.0 + 600 - 60):
+        assert cache.resolve(client, "m", "instructions") == "cachedContents/2"
+
+
+def test_failed_creation_is_remembered_and_distinct_prefixes_get_own_cache():
+    cache = PromptPrefixCache(ttl_sec=3600)
+    client = MagicMock()
+    client.caches.create.side_effect = RuntimeError("400 too few tokens to cache")
+
+    assert cache.resolve(client, "m", "short") is None
+    assert cache.resolve(client, "m", "short") is None
+    assert client.caches.create.call_count == 1
+
+    client.caches.create.side_effect = None
+    client.caches.create.return_value.name = "cachedContents/other"
+    assert cache.resolve(client, "m", "different agent") == "cachedContents/other"
+
+
+def test_with_cached_prefix_strips_cached_fields():
+    config = _build_config(system_instruction="static body")
+    bound = with_cached_prefix(config, "cachedContents/1")
+    assert bound.cached_content == "cachedContents/1"
+    assert bound.system_instruction is None and bound.tools is None
+    assert bound.response_schema is config.response_schema
+    assert config.system_instruction == "static body"  # original untouched
+
+
+# ---------------------------------------------------------------------------
+# Enricher integration
+# ---------------------------------------------------------------------------
+
+def _post() -> PostData:
+    return PostData(post_id="p1", platform="x", content="new roast drops today")
+
+
+def test_content_parts_send_only_tail_when_instructions_cached():
+    fields = [CustomFieldDef(name="price", description="Price mentioned")]
+    inline = _build_content_parts(_post(), fields, enrichment_context="coffee")[0].text
+    tail = _build_content_parts(_post(), fields, enrichment_context="coffee", instructions_cached=True)[0].text
+
+    instructions = _render_post_instructions("coffee", fields)
+    assert inline == instructions + "\n\n" + tail
+    assert "price" not in tail and "new roast drops today" in tail
+
+
+def test_resolve_cached_config_needs_a_static_post_prefix():
+    config = _build_config()
+    client = _client("cachedContents/1")
+    with patch.object(context_cache, "_prefix_cache", PromptPrefixCache(3600)):
+        # No enrichment_context → each post uses its own search_keyword.
+        assert _resolve_cached_config(client, "m", config, None, None, comment_mode=False) is None
+        bound = _resolve_cached_config(client, "m", config, None, "coffee", comment_mode=False)
+
+    assert bound.cached_content == "cachedContents/1"
+    cached = client.caches.create.call_args.kwargs["config"]
+    assert cached.system_instruction is None
+    assert [c.role for c in cached.contents] == ["user"]
+    assert cached.contents[0].parts[0].text == _post_instruction_prefix("coffee", None)
+    assert isinstance(bound, types.GenerateContentConfig)
+
+
+def test_cached_and_inline_post_requests_are_the_same_prompt():
+    """Cached or not, the instructions are user text directly followed by the
+    post tail, and there's no system instruction - only where the prefix is
+    stored differs."""
+    fields = [CustomFieldDef(name="price", description="Price mentioned")]
+    inline_client, cached_client = _client(), _client("cachedContents/1")
+    for client in (inline_client, cached_client):
+        ok = MagicMock()
+        ok.text = _RESULT_JSON
+        client.models.generate_content.return_value = ok
+    inline_client.caches.create.side_effect = RuntimeError("caching unavailable")
+
+    for client in (inline_client, cached_client):
+        with patch.object(context_cache, "_prefix_cache", PromptPrefixCache(3600)), \
+                patch("api.services.cost_meter.log_gemini_response"):
+            _enrich_single_post(client, "m", _build_config(fields), _post(), fields, enrichment_context="coffee")
+
+    inline_call = inline_client.models.generate_content.call_args.kwargs
+    cached_call = cached_client.models.generate_content.call_args.kwargs
+    prefix = cached_client.caches.create.call_args.kwargs["config"].contents
+
+    assert inline_call["config"].system_instruction is None
+    assert cached_call["config"].system_instruction is None
+    assert inline_call["config"].cached_content is None
+    assert cached_call["config"].cached_content == "cachedContents/1"
+    assert inline_call["contents"].role == cached_call["contents"].role == prefix[0].role == "user"
+    assert prefix[0].parts[0].text + cached_call["contents"].parts[0].text == inline_call["contents"].parts[0].text
+
+
+_RESULT_JSON = (
+    '{"context": "c", "ai_summary": "s", "language": "en", "sentiment": "neutral",'
+    ' "emotion": "neutral", "entities": [], "themes": [], "content_type": "review",'
+    ' "is_related_to_task": true}'
+)
+
+
+def _stale_cache_client() -> MagicMock:
+    """Client whose first generate_content rejects the cached prefix."""
+    client = _client("cachedContents/stale")
+    ok = MagicMock()
+    ok.text = _RESULT_JSON
+    client.models.generate_content.side_effect = [
+        RuntimeError("404 NOT_FOUND. CachedContent not found (or permission denied)"),
+        ok,
+    ]
+    return client
+
+
+def _requests(client: MagicMock) -> list[tuple[types.GenerateContentConfig, str]]:
+    return [
+        (call.kwargs["config"], "".join(p.text or "" for p in call.kwargs["contents"].parts))
+        for call in client.models.generate_content.call_args_list
+    ]
+
+
+def test_stale_cache_retry_sends_instructions_inline():
+    client = _stale_cache_client()
+    prefix_cache = PromptPrefixCache(3600)
+    with patch.object(context_cache, "_prefix_cache", prefix_cache), \
+            patch("api.services.cost_meter.log_gemini_response"):
+        post_id, result = _enrich_single_post(
+            client, "m", _build_config(), _post(), enrichment_context="coffee",
+        )
+
+    assert post_id == "p1" and result is not None
+    (first_config, first_text), (retry_config, retry_text) = _requests(client)
+    instructions = _render_post_instructions("coffee", None)
+    assert first_config.cached_content == "cachedContents/stale"
+    assert instructions not in first_text
+    assert retry_config.cached_content is None
+    assert retry_text.startswith(instructions)
+    assert prefix_cache._entries == {}  # invalidated → the next post re-creates it
+
+
+def test_stale_cache_retry_restores_comment_system_instruction():
+    client = _stale_cache_client()
+    config = _build_config(system_instruction="comment task body", enable_search=False)
+    comment = PostData(post_id="p1", platform="x", content="great video", parent_context={"parent_ai_summary": "parent"})
+    with patch.object(context_cache, "_prefix_cache", PromptPrefixCache(3600)), \
+            patch("api.services.cost_meter.log_gemini_response"):
+        _, result = _enrich_single_post(client, "m", config, comment, comment_mode=True)
+
+    assert result is not None
+    (first_config, _), (retry_config, _) = _requests(client)
+    assert first_config.system_instruction is None
+    assert retry_config.cached_content is None
+    assert retry_config.system_instruction == "comment task body"
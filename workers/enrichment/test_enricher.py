@@ -307,7 +307,7 @@ def test_prompt_renders_element_subschema_as_indented_bullets():
 # ---------------------------------------------------------------------------
 
 from workers.enrichment.schema import EnrichmentResult
-from workers.enrichment.worker import _write_results_via_values
+from workers.enrichment.worker import _write_results_to_bq
 
 
 def _minimal_result(**overrides) -> EnrichmentResult:
@@ -374,18 +374,20 @@ def test_prompt_brand_instruction_forbids_inferred_brands():
 
 class _FakeBQ:
     def __init__(self):
-        self.sql = None
+        self.rows = None
 
-    def query(self, sql, *args, **kwargs):
-        self.sql = sql
-        return []
+    def write_rows_bulk(self, rows, *, write_id=None):
+        self.rows = rows
+        return len(rows)
 
 
 def test_write_path_persists_relevance_reason_column():
     bq = _FakeBQ()
     r = _minimal_result(relevance_reason="post explicitly reviews the acme shoe")
-    _write_results_via_values(
+    _write_results_to_bq(
         bq, [("p1", r)], collection_id="c1", agent_id="a1", agent_version=2,
     )
-    assert "relevance_reason" in bq.sql
-    assert "post explicitly reviews the acme shoe" in bq.sql
+    (row,) = bq.rows
+    assert row.TABLE == "enriched_posts"
+    assert row.relevance_reason == "post explicitly reviews the acme shoe"
+    assert row.to_json_row()["relevance_reason"] == "post explicitly reviews the acme shoe"
@@ -0,0 +1,162 @@
+"""Unit tests for the content-hash enrichment result cache."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from workers.enrichment.result_cache import EnrichmentResultCache, cache_key
+from workers.enrichment.schema import CustomFieldDef, EnrichmentResult, MediaRef, PostData
+from workers.pipeline.steps import enrich_process_one
+
+_MODEL = "gemini-test"
+
+
+def _post(post_id: str = "p1", **kw) -> PostData:
+    fields = {"platform": "x", "content": "Launch day!  New   roast drops", "channel_handle": "brand"}
+    fields.update(kw)
+    return PostData(post_id=post_id, **fields)
+
+
+def _result() -> EnrichmentResult:
+    return EnrichmentResult(
+        context="ctx", ai_summary="summary", language="en", sentiment="positive",
+        emotion="joy", entities=[], themes=["launch"], content_type="announcement",
+        is_related_to_task=True,
+    )
+
+
+# ---------------------------------------------------------------------------
+# cache_key
+# ---------------------------------------------------------------------------
+
+def test_cache_key_ignores_post_identity_and_whitespace():
+    a = cache_key(_post("p1"), model=_MODEL, agent_version=2)
+    b = cache_key(
+        _post("p2", content="Launch day! New roast drops ", channel_handle=" @Brand",
+              posted_at="2026-05-02"),
+        model=_MODEL, agent_version=2,
+    )
+    assert a == b
+
+
+def test_cache_key_differs_by_channel():
+    # channel_type is classified from the channel: a fan's repost of the
+    # brand's caption is a different question.
+    brand = cache_key(_post("p1", channel_handle="brand"), model=_MODEL, agent_version=2)
+    fan = cache_key(_post("p2", channel_handle="coffee_fan_88"), model=_MODEL, agent_version=2)
+    assert brand != fan
+
+
+def test_cache_key_changes_with_prompt_inputs_and_agent_version():
+    base = cache_key(_post(), model=_MODEL, agent_version=2)
+    assert cache_key(_post(), model=_MODEL, agent_version=3) != base
+    assert cache_key(_post(), model=_MODEL, agent_version=2, enrichment_context="coffee") != base
+    assert cache_key(_post(), model=_MODEL, agent_version=2, content_types=["review"]) != base
+    assert cache_key(
+        _post(), model=_MODEL, agent_version=2,
+        custom_fields=[CustomFieldDef(name="price", description="Price mentioned")],
+    ) != base
+
+
+def test_cache_key_prefers_media_digest_over_uri():
+    one = _post(media_refs=[MediaRef(gcs_uri="gs://m/c1/p1_0.mp4", media_type="video", sha256="abc")])
+    two = _post(media_refs=[MediaRef(gcs_uri="gs://m/c2/p9_0.mp4", media_type="video", sha256="abc")])
+    other = _post(media_refs=[MediaRef(gcs_uri="gs://m/c2/p9_0.mp4", media_type="video", sha256="def")])
+    assert cache_key(one, model=_MODEL) == cache_key(two, model=_MODEL)
+    assert cache_key(one, model=_MODEL) != cache_key(other, model=_MODEL)
+
+
+# ---------------------------------------------------------------------------
+# EnrichmentResultCache
+# ---------------------------------------------------------------------------
+
+class _FakeDocs:
+    def __init__(self):
+        self.store: dict[str, dict] = {}
+
+    def document(self, key):
+        doc = MagicMock()
+        doc.set.side_effect = lambda data: self.store.__setitem__(key, data)
+        snap = MagicMock()
+        snap.exists = key in self.store
+        snap.to_dict.return_value = self.store.get(key)
+        doc.get.return_value = snap
+        return doc
+
+
+def _cache(metrics_every: int = 100) -> tuple[EnrichmentResultCache, _FakeDocs]:
+    docs = _FakeDocs()
+    db = MagicMock()
+    db.collection.return_value = docs
+    settings = SimpleNamespace(enrichment_cache_ttl_days=30, enrichment_cache_metrics_every=metrics_every)
+    return EnrichmentResultCache(db, settings), docs
+
+
+def test_cache_round_trip_and_expiry():
+    cache, docs = _cache()
+    assert cache.get("k") is None
+
+    cache.put("k", _result(), "p1")
+    assert cache.get("k").themes == ["launch"]
+
+    docs.store["k"]["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+    assert cache.get("k") is None
+
+
+def test_cache_reports_hits_and_misses_to_cost_meter():
+    cache, _ = _cache(metrics_every=3)
+    cache.put("k", _result(), "p1")
+    with patch("api.services.cost_meter.log_cost") as log_cost:
+        cache.get("k")
+        cache.get("k")
+        cache.get("missing")
+
+    rows = {c.kwargs["sub_kind"]: c.kwargs for c in log_cost.call_args_list}
+    assert rows["hit"]["units"] == 2 and rows["miss"]["units"] == 1
+    assert all(r["cost_micros_override"] == 0 for r in rows.values())
+
+
+# ---------------------------------------------------------------------------
+# enrich_process_one integration
+# ---------------------------------------------------------------------------
+
+def _step_ctx(cache) -> MagicMock:
+    ctx = MagicMock()
+    ctx.enriched_ids = set()
+    ctx.enrichment_cache = cache
+    ctx.custom_fields = None
+    ctx.content_types = None
+    ctx.enrichment_context = "coffee"
+    ctx.agent_version = 1
+    ctx.settings.enrichment_model = _MODEL
+    ctx.settings.enrichment_max_media_per_post = 3
+    ctx.bq.query.return_value = [{"platform": "x", "content": "same text", "platform_metadata_json": None}]
+    return ctx
+
+
+def test_enrich_process_one_copies_cached_result_without_gemini():
+    cache, _ = _cache()
+    ctx = _step_ctx(cache)
+
+    with patch("workers.enrichment.enricher._enrich_single_post", return_value=("p1", _result())) as call:
+        assert enrich_process_one({"post_id": "p1"}, ctx)[0] == "ok"
+        outcome, extra = enrich_process_one({"post_id": "p2"}, ctx)
+
+    assert call.call_count == 1
+    assert outcome == "ok" and extra["enrichment_result"].themes == ["launch"]
+    assert ctx.enriched_ids == {"p1", "p2"}
+
+
+def test_enrich_process_one_does_not_share_results_across_channels():
+    cache, _ = _cache()
+    ctx = _step_ctx(cache)
+    ctx.bq.query.side_effect = [
+        [{"platform": "x", "content": "same text", "channel_handle": handle, "platform_metadata_json": None}]
+        for handle in ("brand", "coffee_fan_88")
+    ]
+
+    with patch("workers.enrichment.enricher._enrich_single_post", return_value=("p", _result())) as call:
+        enrich_process_one({"post_id": "p1"}, ctx)
+        enrich_process_one({"post_id": "p2"}, ctx)
+
+    assert call.call_count == 2
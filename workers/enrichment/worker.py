@@ -4,28 +4,40 @@ Two modes:
   - Inline: receives PostData directly from collection pipeline (no BQ read)
   - Standalone: reads posts from BQ, for manual/re-enrichment via agent tool
 
+Standalone runs in "batch" mode submit Gemini batch prediction jobs and
+return; `collect_enrichment_batches` (scheduled) writes their results once
+the jobs finish.
+
 Usage:
-    python -m workers.enrichment.worker <collection_id>
+    python -m workers.enrichment.worker <collection_id> [--batch]
     python -m workers.enrichment.worker --post-ids id1,id2,id3
+    python -m workers.enrichment.worker --collect-batches
 """
 
 import json
 import logging
 import sys
 import time
+import uuid
 from datetime import datetime, timezone
 
 from config.settings import get_settings
+from workers.enrichment.batch import (
+    BatchJobFailed,
+    collect_enrichment_batch,
+    submit_enrichment_batch,
+)
 from workers.enrichment.enricher import enrich_posts
 from workers.enrichment.schema import CustomFieldDef, EnrichmentResult, MediaRef, PostData
 from workers.shared.bq_client import BQClient
+from workers.shared.bq_rows import EnrichedPostRow
 from workers.shared.firestore_client import FirestoreClient
 
 logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# BQ write: INSERT enrichment results into enriched_posts (append-only)
+# BQ write: append enrichment results to enriched_posts (append-only)
 # ---------------------------------------------------------------------------
 
 def _write_results_to_bq(
@@ -36,6 +48,7 @@ def _write_results_to_bq(
     agent_id: str | None = None,
     agent_version: int | None = None,
     source: str | None = None,
+    write_id: str | None = None,
 ) -> None:
     """Append enrichment results to enriched_posts. INSERT-only: each call
     writes new rows, even when the (post_id, agent_id, agent_version) triple
@@ -43,97 +56,53 @@ def _write_results_to_bq(
 
     `source` is a free-form tag - currently 'user_override' for manual
     corrections, NULL for auto enrichment. User-override rows win the dedup.
-    """
-    if not results:
-        return
-    _write_results_via_values(
-        bq, results,
-        collection_id=collection_id,
-        agent_id=agent_id,
-        agent_version=agent_version,
-        source=source,
-    )
 
+    `write_id` is the batch key for write_rows_bulk: retries of one write
+    share it, and it must differ between writes that can repeat a
+    (post_id, agent_id, agent_version, source) - e.g. re-enriching posts the
+    reader doesn't skip. Leave it None when already-enriched posts are
+    skipped upstream.
 
-def _write_results_via_values(
-    bq: BQClient,
-    results: list[tuple[str, EnrichmentResult]],
-    *,
-    collection_id: str | None,
-    agent_id: str | None,
-    agent_version: int | None,
-    source: str | None = None,
-) -> None:
-    """Write results using INSERT ... SELECT UNION ALL (works around BQ
-    parameter limits when batches contain JSON / nested arrays).
+    Goes through BQClient.write_rows_bulk: one atomic append per call, no DML
+    statement (so no statement-size ceiling and no table-mutation quota).
     """
     if not results:
         return
-
-    cid_sql = f"'{_esc(collection_id)}'" if collection_id else "CAST(NULL AS STRING)"
-    aid_sql = f"'{_esc(agent_id)}'" if agent_id else "CAST(NULL AS STRING)"
-    av_sql = str(int(agent_version)) if agent_version is not None else "CAST(NULL AS INT64)"
-    src_sql = f"'{_esc(source)}'" if source else "CAST(NULL AS STRING)"
-
-    # Build a UNION ALL of SELECT statements for each row
-    selects = []
-    for post_id, r in results:
-        entities_sql = _string_array_sql(r.entities)
-        themes_sql = _string_array_sql(r.themes)
-        brands_sql = _string_array_sql(r.detected_brands)
-
-        custom_json = json.dumps(r.custom_fields) if r.custom_fields else None
-        custom_sql = f"PARSE_JSON('{_esc(custom_json)}')" if custom_json else "CAST(NULL AS JSON)"
-
-        selects.append(
-            f"SELECT '{_esc(post_id)}' AS post_id, "
-            f"{cid_sql} AS collection_id, "
-            f"{aid_sql} AS agent_id, "
-            f"{av_sql} AS agent_version, "
-            f"'{_esc(r.context)}' AS context, "
-            f"'{_esc(r.sentiment)}' AS sentiment, "
-            f"'{_esc(r.emotion)}' AS emotion, "
-            f"{entities_sql} AS entities, "
-            f"{themes_sql} AS themes, "
-            f"'{_esc(r.ai_summary)}' AS ai_summary, "
-            f"'{_esc(r.language)}' AS language, "
-            f"'{_esc(r.content_type)}' AS content_type, "
-            f"'{_esc(r.relevance_reason)}' AS relevance_reason, "
-            f"{'TRUE' if r.is_related_to_task else 'FALSE'} AS is_related_to_task, "
-            f"{brands_sql} AS detected_brands, "
-            f"'{_esc(r.channel_type)}' AS channel_type, "
-            f"{custom_sql} AS custom_fields, "
-            f"{src_sql} AS source, "
-            f"CURRENT_TIMESTAMP() AS enriched_at"
+    enriched_at = datetime.now(timezone.utc)
+    rows = [
+        EnrichedPostRow(
+            post_id=post_id,
+            collection_id=collection_id,
+            agent_id=agent_id,
+            agent_version=int(agent_version) if agent_version is not None else None,
+            source=source,
+            enriched_at=enriched_at,
+            **_enrichment_columns(r),
         )
-
-    source_sql = " UNION ALL\n".join(selects)
-
-    insert_sql = f"""\
-INSERT INTO social_listening.enriched_posts (
-    post_id, collection_id, agent_id, agent_version,
-    context, sentiment, emotion, entities, themes, ai_summary,
-    language, content_type, relevance_reason, is_related_to_task, detected_brands,
-    channel_type, custom_fields, source, enriched_at
-)
-{source_sql};"""
-
-    bq.query(insert_sql)
+        for post_id, r in results
+    ]
+    bq.write_rows_bulk(rows, write_id=write_id)
     logger.info("Wrote %d enrichment results to BQ (agent=%s v=%s src=%s)", len(results), agent_id, agent_version, source)
 
 
-def _esc(s: str) -> str:
-    """Escape single quotes for BQ SQL string literals."""
-    return s.replace("\\", "\\\\").replace("'", "\\'")
-
-
-def _string_array_sql(values: list[str]) -> str:
-    # Bare `[]` is inferred as ARRAY<INT64> by BQ; type the literal so empty
-    # arrays insert cleanly into ARRAY<STRING> columns.
-    if not values:
-        return "CAST([] AS ARRAY<STRING>)"
-    inner = ", ".join(f"'{_esc(v)}'" for v in values)
-    return f"[{inner}]"
+def _enrichment_columns(r: EnrichmentResult) -> dict:
+    """EnrichmentResult → the payload columns shared by enriched_posts and
+    enriched_comments (see bq_rows._EnrichmentColumns)."""
+    return {
+        "context": r.context,
+        "sentiment": r.sentiment,
+        "emotion": r.emotion,
+        "entities": list(r.entities),
+        "themes": list(r.themes),
+        "ai_summary": r.ai_summary,
+        "language": r.language,
+        "content_type": r.content_type,
+        "relevance_reason": r.relevance_reason,
+        "is_related_to_task": bool(r.is_related_to_task),
+        "detected_brands": list(r.detected_brands),
+        "channel_type": r.channel_type,
+        "custom_fields": r.custom_fields or None,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -305,11 +274,34 @@ def _load_content_types(fs: FirestoreClient, collection_id: str) -> list[str] |
     return [str(t).strip() for t in raw if str(t).strip()]
 
 
-def run_enrichment(collection_id: str, min_likes: int = 0, batch_size: int = 50) -> None:
+ENRICHMENT_MODES = ("sync", "batch")
+
+
+def _load_enrichment_mode(fs: FirestoreClient, collection_id: str) -> str | None:
+    """Load the per-collection enrichment mode ("sync" / "batch") from config."""
+    status = fs.get_collection_status(collection_id)
+    if not status:
+        return None
+    config = status.get("config") or {}
+    return config.get("enrichment_mode")
+
+
+def run_enrichment(
+    collection_id: str,
+    min_likes: int = 0,
+    batch_size: int = 50,
+    mode: str | None = None,
+) -> None:
     """Enrich all qualifying posts in a collection. Reads from BQ (standalone mode).
 
     Processes posts in batches of `batch_size`, writing results after each batch
     so progress is preserved if the process is interrupted.
+
+    `mode` is "sync" (one Gemini call per post) or "batch" (one Gemini batch
+    prediction job per `enrichment_batch_max_requests` posts). When None it
+    comes from the collection config, then `settings.enrichment_mode`; any
+    other value raises ValueError. Batch mode only submits the jobs - their
+    results are written later by `collect_enrichment_batches`.
     """
     settings = get_settings()
     bq = BQClient(settings)
@@ -319,6 +311,12 @@ def run_enrichment(collection_id: str, min_likes: int = 0, batch_size: int = 50)
     custom_fields = _load_custom_fields(fs, collection_id)
     enrichment_context = _load_enrichment_context(fs, collection_id)
     content_types = _load_content_types(fs, collection_id)
+    mode = mode or _load_enrichment_mode(fs, collection_id) or settings.enrichment_mode
+    if mode not in ENRICHMENT_MODES:
+        raise ValueError(
+            f"Unknown enrichment_mode {mode!r} for collection {collection_id} "
+            f"(expected one of {', '.join(ENRICHMENT_MODES)})"
+        )
 
     # Re-enrichment scope is keyed by (agent_id, agent_version) - read both
     # off collection_status (frozen at dispatch time).
@@ -331,7 +329,22 @@ def run_enrichment(collection_id: str, min_likes: int = 0, batch_size: int = 50)
             bq, collection_id, min_likes,
             agent_id=agent_id, agent_version=agent_version,
         )
-        logger.info("Standalone enrichment: %d posts for collection %s", len(posts), collection_id)
+        logger.info(
+            "Standalone enrichment: %d posts for collection %s (mode=%s)",
+            len(posts), collection_id, mode,
+        )
+
+        if mode == "batch" and posts:
+            _submit_batch_jobs(
+                fs, collection_id, posts,
+                custom_fields=custom_fields,
+                enrichment_context=enrichment_context,
+                content_types=content_types,
+                agent_id=agent_id,
+                agent_version=agent_version,
+                min_likes=min_likes,
+            )
+            return
 
         start = time.monotonic()
         all_results = []
@@ -360,20 +373,14 @@ def run_enrichment(collection_id: str, min_likes: int = 0, batch_size: int = 50)
         results = all_results
         duration = round(time.monotonic() - start, 1)
 
-        # Count total enriched posts for this collection
-        count_result = bq.query(
-            "SELECT COUNT(*) AS cnt FROM social_listening.enriched_posts ep "
-            "JOIN social_listening.posts p ON p.post_id = ep.post_id "
-            "WHERE p.collection_id = @collection_id",
-            {"collection_id": collection_id},
-        )
-        enriched_count = count_result[0]["cnt"] if count_result else 0
+        enriched_count = _count_enriched(bq, collection_id)
 
         now_iso = datetime.now(timezone.utc).isoformat()
         existing_status = fs.get_collection_status(collection_id)
         run_log = (existing_status or {}).get("run_log") or {}
         run_log["enrichment"] = {
             "min_likes_threshold": min_likes,
+            "mode": mode,
             "total_posts": len(posts),
             "enriched": len(results),
             "failed": len(posts) - len(results),
@@ -397,6 +404,161 @@ def run_enrichment(collection_id: str, min_likes: int = 0, batch_size: int = 50)
         raise
 
 
+def _count_enriched(bq: BQClient, collection_id: str) -> int:
+    """Total enriched posts for a collection."""
+    result = bq.query(
+        "SELECT COUNT(*) AS cnt FROM social_listening.enriched_posts ep "
+        "JOIN social_listening.posts p ON p.post_id = ep.post_id "
+        "WHERE p.collection_id = @collection_id",
+        {"collection_id": collection_id},
+    )
+    return result[0]["cnt"] if result else 0
+
+
+def _submit_batch_jobs(
+    fs: FirestoreClient,
+    collection_id: str,
+    posts: list[PostData],
+    *,
+    custom_fields: list[CustomFieldDef] | None,
+    enrichment_context: str | None,
+    content_types: list[str] | None,
+    agent_id: str | None,
+    agent_version: int | None,
+    min_likes: int,
+) -> list[str]:
+    """Submit one batch job per `enrichment_batch_max_requests` posts and
+    record each in Firestore for `collect_enrichment_batches`. Returns the
+    job names."""
+    settings = get_settings()
+    chunk = settings.enrichment_batch_max_requests
+    stamp = int(time.time())
+    job_names: list[str] = []
+    for i in range(0, len(posts), chunk):
+        batch = posts[i : i + chunk]
+        job_name = submit_enrichment_batch(
+            batch,
+            custom_fields=custom_fields,
+            enrichment_context=enrichment_context,
+            content_types=content_types,
+            display_name=f"{collection_id}-{stamp}-{i // chunk}",
+        )
+        fs.save_enrichment_batch_job(collection_id, job_name, {
+            "model": settings.enrichment_model,
+            "agent_id": agent_id,
+            "agent_version": agent_version,
+            "post_count": len(batch),
+            # post_id -> platform, for cost attribution when results land.
+            "post_platforms": {p.post_id: p.platform for p in batch},
+        })
+        job_names.append(job_name)
+
+    existing_status = fs.get_collection_status(collection_id)
+    run_log = (existing_status or {}).get("run_log") or {}
+    run_log["enrichment"] = {
+        "min_likes_threshold": min_likes,
+        "mode": "batch",
+        "total_posts": len(posts),
+        "enriched": 0,
+        "failed": 0,
+        "jobs": len(job_names),
+        "jobs_done": 0,
+        "submitted_at": datetime.now(timezone.utc).isoformat(),
+    }
+    fs.update_collection_status(collection_id, run_log=run_log)
+    logger.info(
+        "Submitted %d batch enrichment job(s) for %d posts in collection %s",
+        len(job_names), len(posts), collection_id,
+    )
+    return job_names
+
+
+def collect_enrichment_batches(backend=None) -> dict[str, str]:
+    """Write the results of every finished batch enrichment job.
+
+    Runs on a schedule (/internal/enrichment-batches/collect in production,
+    OngoingScheduler in dev). Jobs still running are left for the next call,
+    as are jobs whose state couldn't be read. Once a collection has no
+    pending jobs left its run_log and status are finalized like a sync run.
+    Returns {job_name: "collected" | "failed" | "pending" | "error"}.
+    """
+    settings = get_settings()
+    bq = BQClient(settings)
+    fs = FirestoreClient(settings)
+
+    outcomes: dict[str, str] = {}
+    for job in fs.get_pending_enrichment_batch_jobs():
+        job_name = job["job_name"]
+        collection_id = job["collection_id"]
+        platforms = job.get("post_platforms") or {}
+        try:
+            results = collect_enrichment_batch(
+                job_name, job.get("model") or settings.enrichment_model, platforms, backend,
+            )
+        except BatchJobFailed as e:
+            logger.warning("%s", e)
+            fs.update_enrichment_batch_job(job_name, status="failed", error_message=str(e)[:500])
+            _record_batch_job_done(bq, fs, collection_id, 0, job.get("post_count") or len(platforms))
+            outcomes[job_name] = "failed"
+            continue
+        except Exception:
+            logger.exception("Could not check batch enrichment job %s - retrying next run", job_name)
+            outcomes[job_name] = "error"
+            continue
+        if results is None:
+            outcomes[job_name] = "pending"
+            continue
+
+        _write_results_to_bq(
+            bq, results,
+            collection_id=collection_id,
+            agent_id=job.get("agent_id"),
+            agent_version=job.get("agent_version"),
+            # A re-collected job (e.g. the status update below failed) maps
+            # to the same load job instead of appending twice.
+            write_id=job_name,
+        )
+        fs.update_enrichment_batch_job(job_name, status="collected", enriched=len(results))
+        total = job.get("post_count") or len(platforms)
+        _record_batch_job_done(bq, fs, collection_id, len(results), total - len(results))
+        outcomes[job_name] = "collected"
+    return outcomes
+
+
+def _record_batch_job_done(
+    bq: BQClient, fs: FirestoreClient, collection_id: str, enriched: int, failed: int,
+) -> None:
+    """Fold one finished job into the collection's run_log; finalize the
+    collection once its last pending job is done."""
+    existing_status = fs.get_collection_status(collection_id) or {}
+    run_log = existing_status.get("run_log") or {}
+    entry = run_log.get("enrichment") or {"mode": "batch"}
+    entry["enriched"] = (entry.get("enriched") or 0) + enriched
+    entry["failed"] = (entry.get("failed") or 0) + failed
+    entry["jobs_done"] = (entry.get("jobs_done") or 0) + 1
+    run_log["enrichment"] = entry
+
+    if fs.get_pending_enrichment_batch_jobs(collection_id):
+        fs.update_collection_status(collection_id, run_log=run_log)
+        return
+
+    now = datetime.now(timezone.utc)
+    entry["completed_at"] = now.isoformat()
+    submitted_at = entry.get("submitted_at")
+    if submitted_at:
+        entry["duration_sec"] = round((now - datetime.fromisoformat(submitted_at)).total_seconds(), 1)
+    fields: dict = {"posts_enriched": _count_enriched(bq, collection_id), "run_log": run_log}
+    if entry["enriched"] == 0 and entry["failed"] > 0:
+        fields.update(status="failed", error_message="Enrichment error: every batch job failed")
+    else:
+        fields["status"] = "success"
+    fs.update_collection_status(collection_id, **fields)
+    logger.info(
+        "Batch enrichment done for %s: %d enriched, %d failed",
+        collection_id, entry["enriched"], entry["failed"],
+    )
+
+
 def run_enrichment_for_posts(
     post_ids: list[str],
     min_likes: int = 0,
@@ -438,6 +600,9 @@ def run_enrichment_for_posts(
         collection_id=collection_id or None,
         agent_id=agent_id,
         agent_version=agent_version,
+        # Explicit ids are re-enriched even if already enriched - a fresh
+        # batch key keeps this write distinct from earlier ones.
+        write_id=f"posts-{uuid.uuid4().hex}",
     )
     logger.info("Enriched %d/%d posts by ID", len(results), len(posts))
 
@@ -448,13 +613,7 @@ def update_enrichment_counts(collection_id: str) -> None:
     bq = BQClient(settings)
     fs = FirestoreClient(settings)
 
-    result = bq.query(
-        "SELECT COUNT(*) AS cnt FROM social_listening.enriched_posts ep "
-        "JOIN social_listening.posts p ON p.post_id = ep.post_id "
-        "WHERE p.collection_id = @collection_id",
-        {"collection_id": collection_id},
-    )
-    enriched_count = result[0]["cnt"] if result else 0
+    enriched_count = _count_enriched(bq, collection_id)
     fs.update_collection_status(collection_id, posts_enriched=enriched_count)
     logger.info("Updated enrichment count for %s: %d posts", collection_id, enriched_count)
 
@@ -467,12 +626,15 @@ if __name__ == "__main__":
 
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  python -m workers.enrichment.worker <collection_id>")
+        print("  python -m workers.enrichment.worker <collection_id> [--batch]")
         print("  python -m workers.enrichment.worker --post-ids id1,id2,id3")
+        print("  python -m workers.enrichment.worker --collect-batches")
         sys.exit(1)
 
     if sys.argv[1] == "--post-ids":
         ids = sys.argv[2].split(",")
         run_enrichment_for_posts(ids)
+    elif sys.argv[1] == "--collect-batches":
+        print(collect_enrichment_batches())
     else:
-        run_enrichment(sys.argv[1])
+        run_enrichment(sys.argv[1], mode="batch" if "--batch" in sys.argv[2:] else None)
@@ -7,16 +7,20 @@ Replaces the monolithic run_pipeline() + run_collection() with:
 4. Final status (scheduling for ongoing collections)
 """
 
+import itertools
 import json
 import logging
 import threading
 import time as _time
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from uuid import uuid4
 
 
 from config.settings import get_settings
+from workers.alerts.stream import get_alert_stream
+from workers.collection import crawl_coverage
 from workers.collection.media_downloader import download_media_batch
 from workers.collection.models import Post
 from workers.collection.normalizer import (
@@ -25,6 +29,7 @@ from workers.collection.normalizer import (
     post_to_engagement_row,
 )
 from workers.collection.wrapper import DataProviderWrapper
+from workers.enrichment.result_cache import EnrichmentResultCache
 from workers.pipeline.post_state import FAILURE_STATES, TERMINAL_STATES, PostState
 from workers.pipeline.run_logger import collection_run_log
 from workers.pipeline.state_manager import StateManager
@@ -301,6 +306,7 @@ class PipelineRunner:
                 total_posts_in_dag=0,
                 crawlers={},
             )
+            self.state_manager.reset_counters()
 
         # Resolve owning agent + frozen version up front. The enrichment skip
         # cache keys on (agent_id, agent_version); the embedding skip cache
@@ -342,6 +348,14 @@ class PipelineRunner:
             agent_id=agent_id,
             agent_version=agent_version,
             agent_collection_ids=agent_collection_ids,
+            enrichment_cache=(
+                EnrichmentResultCache(self.fs._db, self.settings)
+                if self.settings.enrichment_cache_enabled else None
+            ),
+            alert_stream=(
+                get_alert_stream(agent_id, self.fs, self.settings)
+                if agent_id and self.settings.alerts_streaming_enabled else None
+            ),
         )
 
         crawl_thread: threading.Thread | None = None
@@ -380,8 +394,9 @@ class PipelineRunner:
                     self.collection_id, exc_info=True,
                 )
             # Recover posts orphaned in transient (DOWNLOADING/ENRICHING) states
-            # by a crashed prior run. Reverts them to their claim entry-point so
-            # the new streaming runners pick them up.
+            # by a crashed prior run - leased posts once their lease expires,
+            # pre-lease docs by the updated_at cooldown. Reverts them to their
+            # claim entry-point so the new streaming runners pick them up.
             try:
                 recovered = self.state_manager.recover_stale_transient(
                     cooldown_sec=int(self.settings.pipeline_stall_threshold_minutes) * 60,
@@ -824,20 +839,63 @@ class PipelineRunner:
         funnel_bq_insert_failures = 0
         funnel_posts_in_range = 0
         funnel_posts_out_of_range = 0
-        collection_started_at = datetime.now(timezone.utc).isoformat()
+        funnel_reused_posts = 0
+        funnel_vendor_posts = 0
+        crawl_started = datetime.now(timezone.utc)
+        collection_started_at = crawl_started.isoformat()
         collection_start = _time.monotonic()
 
+        # Cross-agent crawl reuse: serve the part of each keyword window that
+        # a recent crawl (any agent's) already covered from stored posts, and
+        # only send the uncovered gap to the vendors.
+        plan = self._plan_crawl_reuse(wrapper, crawl_started)
+        vendor_configs = plan.vendor_configs if plan else None
+        # Normalized search_keyword counts of vendor posts, per platform - the
+        # coverage record needs them to tell a complete window from a capped one.
+        vendor_keyword_counts: dict[str, Counter] = {}
+
         # When parallel_adapters is on, fan BrightData/Vetric across threads
         # so the slower adapter doesn't serialize the faster one. Off by
         # default - canary one agent first.
         if self.settings.parallel_adapters:
-            batches = wrapper.collect_all_parallel()
+            batches = wrapper.collect_all_parallel(vendor_configs)
         else:
-            batches = wrapper.collect_all()
+            batches = wrapper.collect_all(vendor_configs)
+
+        reused_batch_ids: set[int] = set()
+        if plan and plan.reuse:
+            try:
+                reused_batches = crawl_coverage.load_reused_batches(
+                    self.bq, plan, int(self._config.get("max_posts_per_keyword") or 0),
+                )
+                reused_batch_ids = {id(b) for b in reused_batches}
+                batches = itertools.chain(reused_batches, batches)
+            except Exception:
+                # The covered windows were already cut from the vendor plan, so
+                # fall back to buying the full window rather than losing it.
+                logger.warning(
+                    "Crawl reuse load failed for %s - crawling the full window",
+                    self.collection_id, exc_info=True,
+                )
+                plan = None
+                batches = (
+                    wrapper.collect_all_parallel() if self.settings.parallel_adapters
+                    else wrapper.collect_all()
+                )
 
         batch_index = 0
         for batch in batches:
             batch_index += 1
+            # Stored posts of another crawl: already in GCS/post_engagements and
+            # already paid for - no download, no engagement row, no cost event.
+            reused = id(batch) in reused_batch_ids
+            if reused:
+                funnel_reused_posts += len(batch.posts)
+            else:
+                funnel_vendor_posts += len(batch.posts)
+                for p in batch.posts:
+                    counts = vendor_keyword_counts.setdefault(p.platform, Counter())
+                    counts[crawl_coverage.normalize_query(p.search_keyword) or None] += 1
 
             # Check for cancellation
             status = self.fs.get_collection_status(self.collection_id)
@@ -880,7 +938,11 @@ class PipelineRunner:
                 )
                 existing_ids = set()
 
-            if existing_ids:
+            if existing_ids and reused:
+                # Nothing fresh to snapshot - the stored row is the source.
+                new_posts = [p for p in new_posts if p.post_id not in existing_ids]
+                funnel_bq_dedup += len(existing_ids)
+            elif existing_ids:
                 dupe_posts = [p for p in new_posts if p.post_id in existing_ids]
                 new_posts = [p for p in new_posts if p.post_id not in existing_ids]
                 funnel_bq_dedup += len(existing_ids)
@@ -925,10 +987,11 @@ class PipelineRunner:
             # buffer (up to ~90 min) and gave up after ~65s, so most posts stayed
             # on signed CDN links that 403 once they expire. Downloading first
             # makes BQ media_refs correct at insert time (mutates p.media_refs).
-            download_media_batch(
-                self.gcs, new_posts, self.collection_id,
-                executor=self._media_executor,
-            )
+            if not reused:
+                download_media_batch(
+                    self.gcs, new_posts, self.collection_id,
+                    executor=self._media_executor,
+                )
 
             # Write posts to BQ (always - no dedup, timestamps differentiate)
             post_rows = [post_to_bq_row(p, self.collection_id) for p in new_posts]
@@ -936,7 +999,7 @@ class PipelineRunner:
             funnel_bq_insert_failures += failed_posts
 
             # Engagements + channels
-            engagement_rows = [post_to_engagement_row(p) for p in new_posts]
+            engagement_rows = [] if reused else [post_to_engagement_row(p) for p in new_posts]
             if engagement_rows:
                 self.bq.insert_rows("post_engagements", engagement_rows)
             channel_rows = [channel_to_bq_row(c, self.collection_id) for c in new_channels]
@@ -971,7 +1034,7 @@ class PipelineRunner:
             # per-bucket counts (Apify charges IG vs FB vs TikTok at different
             # rates, so a provider-only aggregate hides the variance).
             actual_stored = len(new_posts) - failed_posts
-            if owner_user_id and actual_stored > 0:
+            if owner_user_id and actual_stored > 0 and not reused:
                 from api.services.usage_service import track_posts_collected
 
                 # `new_posts` here is the still-failed-included slice; we only
@@ -1092,6 +1155,14 @@ class PipelineRunner:
         if not stats:
             self.state_manager.set_crawler_status("all", "success", posts=total_posts)
 
+        if plan is not None:
+            self._record_crawl_coverage(
+                plan, vendor_keyword_counts,
+                errored_platforms={p for p, s in stats.items() if s.get("errors", 0) > 0}
+                | {e.get("platform") for e in errors},
+                fetched_at=crawl_started,
+            )
+
         # Store run_log
         total_dupes_skipped = funnel_worker_dedup + funnel_bq_dedup
         run_log = {
@@ -1110,6 +1181,8 @@ class PipelineRunner:
                 "worker_posts_stored": total_posts,
                 "posts_in_range": funnel_posts_in_range,
                 "posts_out_of_range": funnel_posts_out_of_range,
+                "crawl_reused_posts": funnel_reused_posts,
+                "crawl_vendor_posts": funnel_vendor_posts,
             },
         }
         if errors:
@@ -1125,7 +1198,7 @@ class PipelineRunner:
         # A clean run with no matches is a valid empty result - the rest of
         # the pipeline will short-circuit to status=success via
         # _set_final_status.
-        attempted = bool(stats)
+        attempted = bool(stats) or bool(plan and plan.reuse)
         all_errored = bool(errors) and total_posts == 0
         run_failed = total_posts == 0 and (not attempted or all_errored)
 
@@ -1170,6 +1243,59 @@ class PipelineRunner:
             self.collection_id, total_posts, duration,
         )
 
+    def _plan_crawl_reuse(
+        self, wrapper: DataProviderWrapper, now: datetime,
+    ) -> "crawl_coverage.CrawlPlan | None":
+        """Coverage-aware crawl plan, or None to crawl the config as-is
+        (reuse disabled, not a plain keyword window, or the lookup failed)."""
+        if not self.settings.crawl_reuse_enabled or not crawl_coverage.is_reusable(self._config):
+            return None
+        try:
+            entries = crawl_coverage.load_coverage(
+                self.bq, self._config, now, self.settings.crawl_reuse_max_age_hours,
+            )
+            plan = crawl_coverage.plan_crawl(
+                self._config, entries, provider_for=wrapper.crawl_vendor,
+            )
+        except Exception:
+            logger.warning(
+                "Crawl coverage lookup failed for %s - crawling the full window",
+                self.collection_id, exc_info=True,
+            )
+            return None
+        if plan.reuse:
+            logger.info(
+                "Crawl reuse for %s: %d keyword window(s) partly/fully covered, "
+                "%d vendor sub-crawl(s)",
+                self.collection_id, len(plan.reuse), len(plan.vendor_configs),
+            )
+        return plan
+
+    def _record_crawl_coverage(
+        self,
+        plan: "crawl_coverage.CrawlPlan",
+        keyword_counts: dict[str, Counter],
+        *,
+        errored_platforms: set[str],
+        fetched_at: datetime,
+    ) -> None:
+        rows = crawl_coverage.coverage_rows(
+            plan, keyword_counts,
+            errored_platforms=errored_platforms,
+            max_posts_per_keyword=int(self._config.get("max_posts_per_keyword") or 0),
+            fetched_at=fetched_at,
+            collection_id=self.collection_id,
+            agent_id=self._status_doc.get("agent_id"),
+        )
+        if not rows:
+            return
+        try:
+            self.bq.insert_rows("crawl_coverage", rows)
+        except Exception:
+            logger.warning(
+                "Failed to record crawl coverage for %s", self.collection_id, exc_info=True,
+            )
+
     # ------------------------------------------------------------------
     # Processing loop
     # ------------------------------------------------------------------
@@ -1237,7 +1363,8 @@ class PipelineRunner:
         return True
 
     def _heartbeat_worker(self, stop_event: threading.Event) -> None:
-        """Touch collection_status.updated_at only when post-state counts change.
+        """Flush buffered transitions and touch collection_status.updated_at
+        only when post-state counts change.
 
         A blind heartbeat would mask the run-3 failure mode (a wedged step
         worker holding a hung Gemini call while the process stays alive) -
@@ -1248,21 +1375,40 @@ class PipelineRunner:
 
         First tick always writes (establishes the baseline). After that, we
         only write when the state-counts snapshot differs from last seen.
+
+        The loop ticks at the write-behind flush interval so buffered
+        transitions reach Firestore on time even when no step hits the size
+        threshold; the heartbeat itself still only fires every
+        `pipeline_heartbeat_seconds`.
         """
         interval = float(self.settings.pipeline_heartbeat_seconds)
+        tick = interval
+        if self.settings.pipeline_write_behind_enabled:
+            tick = min(interval, max(0.1, self.settings.pipeline_write_behind_max_age_sec))
         last_counts: dict | None = None
+        last_beat: float | None = None
         while not stop_event.is_set():
             try:
-                current_counts = self.state_manager.get_counts()
-                if last_counts is None or current_counts != last_counts:
-                    self.fs.update_collection_status(self.collection_id)
-                    last_counts = current_counts
+                self.state_manager.flush_pending(only_if_due=True)
             except Exception:
                 logger.warning(
-                    "Heartbeat update failed for %s",
+                    "Write-behind flush failed for %s - retrying next tick",
                     self.collection_id, exc_info=True,
                 )
-            stop_event.wait(interval)
+            now = _time.monotonic()
+            if last_beat is None or now - last_beat >= interval:
+                last_beat = now
+                try:
+                    current_counts = self.state_manager.get_counts()
+                    if last_counts is None or current_counts != last_counts:
+                        self.fs.update_collection_status(self.collection_id)
+                        last_counts = current_counts
+                except Exception:
+                    logger.warning(
+                        "Heartbeat update failed for %s",
+                        self.collection_id, exc_info=True,
+                    )
+            stop_event.wait(tick)
 
     def _log_progress(self) -> None:
         """Periodic progress log - called once per loop iter, not per step."""
@@ -1331,6 +1477,17 @@ class PipelineRunner:
         loop_start = _time.monotonic()
         last_progress_log = 0.0
 
+        # Write-behind: step transitions and claim counter deltas are buffered
+        # and flushed as one batch (one `counts.*` shard write) per size/time
+        # threshold, instead of one counter write per step flush.
+        # The heartbeat thread drives the time-based flushes; the finally
+        # below flushes on every exit path.
+        if self.settings.pipeline_write_behind_enabled:
+            self.state_manager.start_write_behind(
+                max_posts=self.settings.pipeline_write_behind_max_posts,
+                max_age_sec=self.settings.pipeline_write_behind_max_age_sec,
+            )
+
         stop_event = threading.Event()
         heartbeat_thread = threading.Thread(
             target=self._heartbeat_worker,
@@ -1352,6 +1509,12 @@ class PipelineRunner:
         )
         from workers.pipeline.streaming import StreamingStepRunner
 
+        # Leased batch claims: one Firestore transaction per `claim_batch`
+        # posts instead of one per post - the per-post claim round-trip, not
+        # Gemini, was the enrich throughput ceiling on large collections.
+        claim_batch = self.settings.pipeline_claim_batch_size
+        lease_sec = self.settings.pipeline_claim_lease_sec
+
         download_runner = StreamingStepRunner(
             name="download",
             ctx=ctx,
@@ -1365,6 +1528,11 @@ class PipelineRunner:
             flush_size=10,
             flush_interval_sec=2.0,
             record_step_timing=self._record_step_timing,
+            claim_fn=lambda n: ctx.state_manager.claim_many(
+                PostState.COLLECTED_WITH_MEDIA, PostState.DOWNLOADING, n,
+                lease_sec=lease_sec,
+            ),
+            claim_batch_size=claim_batch,
         )
         enrich_runner = StreamingStepRunner(
             name="enrich",
@@ -1381,7 +1549,10 @@ class PipelineRunner:
             record_step_timing=self._record_step_timing,
             # Dep-gated claim: parents quoting/replying to another in-range
             # post wait for the dep to clear download before they enrich.
-            claim_fn=ctx.state_manager.claim_one_for_enrichment,
+            claim_fn=lambda n: ctx.state_manager.claim_many_for_enrichment(
+                n, lease_sec=lease_sec,
+            ),
+            claim_batch_size=claim_batch,
         )
 
         # Enrichment runs Gemini calls; without context propagation those
@@ -1442,7 +1613,9 @@ class PipelineRunner:
 
                 # Cancellation check (resilient to transient Firestore errors)
                 try:
-                    status = self.fs.get_collection_status(self.collection_id)
+                    status = self.fs.get_collection_status(
+                        self.collection_id, include_counter_shards=False,
+                    )
                 except Exception:
                     logger.warning(
                         "Transient error reading status for %s, continuing",
@@ -1487,9 +1660,27 @@ class PipelineRunner:
                         t.name, self.collection_id,
                     )
             heartbeat_thread.join(timeout=5)
+            self._stop_write_behind()
+            if ctx.enrichment_cache is not None:
+                ctx.enrichment_cache.flush_metrics()
+            if ctx.alert_stream is not None:
+                try:
+                    ctx.alert_stream.flush(force=True)
+                except Exception:
+                    logger.exception("Final streaming alert flush failed for %s", self.collection_id)
 
         logger.info("── Processing loop complete for %s", self.collection_id)
 
+    def _stop_write_behind(self) -> None:
+        """Flush buffered transitions and return to write-through. Idempotent."""
+        try:
+            self.state_manager.stop_write_behind()
+        except Exception:
+            logger.exception(
+                "Final write-behind flush failed for %s - counters may drift until recount",
+                self.collection_id,
+            )
+
     # ------------------------------------------------------------------
     # BQ media_refs update
     # ------------------------------------------------------------------
@@ -1627,19 +1818,27 @@ class PipelineRunner:
             stats["posts_fail"] += fail
 
     def _persist_stage_timings(self) -> None:
-        """Merge in-memory stage timings into run_log.stage_timings.
+        """Merge in-memory stage timings into run_log.stage_timings, and this
+        run's media storage stats (bytes downloaded / saved by the URL index and
+        content dedup, peak RSS) into run_log.media.
 
-        Additive merge so continuation runs accumulate with prior runs.
-        Run_log is wholesale-replaced by Firestore update semantics, so
-        we read-then-merge-then-write.
+        Additive merge so continuation runs accumulate with prior runs (peak
+        RSS takes the max). Run_log is wholesale-replaced by Firestore update
+        semantics, so we read-then-merge-then-write.
         """
         with self._stage_timings_lock:
             snapshot = dict(self._stage_timings)
-        if not snapshot:
+        media = self.gcs.media_stats.snapshot()
+        if not snapshot and not media["downloads"] and not media["url_index_hits"]:
             return
         try:
             existing = self.fs.get_collection_status(self.collection_id) or {}
             run_log = existing.get("run_log") or {}
+            prev_media = run_log.get("media") or {}
+            run_log["media"] = {
+                key: (max if key == "peak_rss_mb" else sum)((prev_media.get(key, 0), value))
+                for key, value in media.items()
+            }
             existing_timings = run_log.get("stage_timings") or {}
             for step_name, stats in snapshot.items():
                 active_window = 0.0
@@ -1778,6 +1977,10 @@ class PipelineRunner:
         # Preserve any stage timings accumulated before the crash.
         self._persist_stage_timings()
 
+        # Land any buffered transitions before recounting (no-op if the
+        # processing loop already flushed on its way out).
+        self._stop_write_behind()
+
         try:
             # Reconcile counters so the UI shows accurate numbers
             self.state_manager.recount()
@@ -1,11 +1,18 @@
 """Firestore-backed per-post pipeline state management.
 
 State lives in a subcollection: collection_status/{collection_id}/post_states/{post_id}
-Aggregate counters live on the parent collection_status doc via Increment.
+Aggregate counters are Incremented on sharded docs under the parent
+collection_status doc (workers/shared/counter_shards.py) and read as
+parent + sum(shards).
+While a run's processing loop is active, transitions go through a
+write-behind buffer (workers/pipeline/write_behind.py) so counters take
+one shard write per flush.
 """
 
 import logging
+import threading
 from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 
 from google.cloud import firestore
 from google.cloud.firestore_v1 import transforms
@@ -20,6 +27,14 @@ from workers.pipeline.post_state import (
     TRANSIENT_STATES,
     PostState,
 )
+from workers.pipeline.write_behind import PendingTransition, TransitionBuffer
+from workers.shared.counter_shards import (
+    SHARDS_SUBCOLLECTION,
+    fold_shards,
+    random_shard_ref,
+    read_shards,
+    shard_increment,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +43,12 @@ logger = logging.getLogger(__name__)
 RETRY_COOLDOWN_SEC = 300
 MAX_RETRY_ATTEMPTS = 3
 
+# Default claim lease. Must outlive the slowest post (enrichment's per-post
+# timeout) plus the time a claimed post can sit in the runner's local
+# prefetch queue - an expired lease makes the post reclaimable by
+# recover_stale_transient.
+DEFAULT_LEASE_SEC = 600
+
 
 class StateManager:
     """Manages per-post pipeline state and aggregate counters in Firestore."""
@@ -38,6 +59,14 @@ class StateManager:
         self._collection_id = collection_id
         self._status_ref = self._db.collection("collection_status").document(collection_id)
         self._posts_ref = self._status_ref.collection("post_states")
+        # Stamped on every post this process claims. Lets recovery and debugging
+        # tell which runner holds a lease; one owner per StateManager instance
+        # (= per pipeline run).
+        self.lease_owner = uuid4().hex
+        # Write-behind buffer - None means write-through (see start_write_behind).
+        self._write_behind: TransitionBuffer | None = None
+        self._flush_lock = threading.Lock()
+        self._num_shards = self._settings.pipeline_counter_shards
 
     # ------------------------------------------------------------------
     # Initial classification
@@ -131,7 +160,12 @@ class StateManager:
         """Write state transitions and update counters atomically.
 
         Uses Firestore WriteBatch. Chunks at 200 to stay under 500-op limit
-        (each post = 1 set op, plus counter updates on the parent doc).
+        (each post = 1 set op, plus one counter shard update).
+
+        While write-behind is active (see start_write_behind) non-initial
+        transitions are buffered and coalesced instead, and written by the
+        next flush. Initial transitions always write through - they seed
+        posts the claim queries must see immediately.
 
         Args:
             transitions: list of (post_id, new_state)
@@ -145,32 +179,55 @@ class StateManager:
         media_refs = media_refs or {}
         post_meta = post_meta or {}
         now = datetime.now(timezone.utc)
-        chunk_size = 200
-
-        for i in range(0, len(transitions), chunk_size):
-            chunk = transitions[i : i + chunk_size]
-            self._write_chunk(chunk, media_refs, post_meta, now, is_initial)
+        entries = [
+            (post_id, _pending_transition(post_id, new_state, now, media_refs, post_meta))
+            for post_id, new_state in transitions
+        ]
+
+        buffer = self._write_behind
+        if buffer is not None and not is_initial:
+            full = False
+            for post_id, entry in entries:
+                full = buffer.add(post_id, entry) or full
+            if full:
+                self.flush_pending()
+            return
 
+        self._write_entries(entries, is_initial)
         logger.debug(
             "Transitioned %d posts for %s", len(transitions), self._collection_id
         )
 
+    def _write_entries(
+        self,
+        entries: list[tuple[str, PendingTransition]],
+        is_initial: bool,
+        counter_deltas: dict[str, int] | None = None,
+    ) -> None:
+        """Write entries in 200-post chunks; extra counter deltas ride on the first."""
+        chunk_size = 200
+        extra = counter_deltas or {}
+        if not entries and extra:
+            self._write_chunk([], is_initial, extra)
+            return
+        for i in range(0, len(entries), chunk_size):
+            self._write_chunk(entries[i : i + chunk_size], is_initial, extra if i == 0 else None)
+
     def _write_chunk(
         self,
-        chunk: list[tuple[str, PostState]],
-        media_refs: dict[str, list[dict]],
-        post_meta: dict[str, dict],
-        now: datetime,
+        chunk: list[tuple[str, PendingTransition]],
         is_initial: bool,
+        counter_deltas: dict[str, int] | None = None,
     ) -> None:
         """Write a chunk of transitions as a single Firestore batch."""
         batch = self._db.batch()
+        now = datetime.now(timezone.utc)
 
         # Count transitions per state for counter updates
-        state_deltas: dict[str, int] = {}
+        state_deltas: dict[str, int] = dict(counter_deltas or {})
         old_states: dict[str, str] = {}
 
-        if not is_initial:
+        if not is_initial and chunk:
             # Batch-read current states in a single RPC (via BatchGet) instead of
             # N sequential .get()s - this was the dominant per-batch latency cost.
             doc_refs = [self._posts_ref.document(post_id) for post_id, _ in chunk]
@@ -178,42 +235,93 @@ class StateManager:
                 if snapshot.exists:
                     old_states[snapshot.id] = snapshot.to_dict().get("status", "")
 
-        for post_id, new_state in chunk:
+        for post_id, entry in chunk:
             doc_ref = self._posts_ref.document(post_id)
             doc_data: dict = {
-                "status": new_state.value,
-                "updated_at": now,
+                "status": entry.state.value,
+                "updated_at": entry.updated_at,
             }
             # Bump per-step attempt counter + stamp last_failure_at on
             # transitions into a failure state. Used by continuation runs to
             # decide which posts are eligible for retry (see get_retry_candidates).
-            if new_state in FAILURE_TO_STEP:
-                step_name = FAILURE_TO_STEP[new_state]
-                doc_data[f"attempts.{step_name}"] = transforms.Increment(1)
-                doc_data["last_failure_at"] = now
-            if post_id in media_refs:
-                doc_data["media_refs"] = media_refs[post_id]
-            if post_id in post_meta:
-                doc_data.update(post_meta[post_id])
+            for step_name, n in entry.attempts.items():
+                doc_data[f"attempts.{step_name}"] = transforms.Increment(n)
+            if entry.last_failure_at is not None:
+                doc_data["last_failure_at"] = entry.last_failure_at
+            if entry.media_refs is not None:
+                doc_data["media_refs"] = entry.media_refs
+            doc_data.update(entry.meta)
             batch.set(doc_ref, doc_data, merge=True)
 
             # Track deltas
-            state_deltas[new_state.value] = state_deltas.get(new_state.value, 0) + 1
+            new = entry.state.value
+            state_deltas[new] = state_deltas.get(new, 0) + 1
             if not is_initial and post_id in old_states and old_states[post_id]:
                 old = old_states[post_id]
                 state_deltas[old] = state_deltas.get(old, 0) - 1
 
-        # Update counters on parent doc
-        counter_updates: dict = {"updated_at": now}
-        for state_val, delta in state_deltas.items():
-            if delta != 0:
-                counter_updates[f"counts.{state_val}"] = transforms.Increment(delta)
+        # Update counters on a random shard - never the parent doc, which every
+        # step and the crawl thread would otherwise contend on.
+        batch.set(
+            random_shard_ref(self._status_ref, self._num_shards),
+            shard_increment(
+                state_deltas, now,
+                total_delta=len(chunk) if is_initial else 0,
+            ),
+            merge=True,
+        )
+        batch.commit()
 
-        if is_initial:
-            counter_updates["total_posts_in_dag"] = transforms.Increment(len(chunk))
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
 
-        batch.update(self._status_ref, counter_updates)
-        batch.commit()
+    def start_write_behind(self, max_posts: int, max_age_sec: float) -> None:
+        """Start buffering non-initial transitions and claim counter deltas.
+
+        The owner must call flush_pending() on a cadence (the runner's
+        heartbeat does) and stop_write_behind() on every exit path so the
+        counters stay exact.
+        """
+        with self._flush_lock:
+            if self._write_behind is None:
+                self._write_behind = TransitionBuffer(max_posts, max_age_sec)
+
+    def stop_write_behind(self) -> None:
+        """Flush everything pending and go back to write-through."""
+        self.flush_pending()
+        with self._flush_lock:
+            buffer, self._write_behind = self._write_behind, None
+        if buffer is not None and len(buffer):
+            # Something raced in after the final flush - write it through.
+            pending, deltas = buffer.drain()
+            self._write_entries(list(pending.items()), False, deltas)
+
+    def flush_pending(self, only_if_due: bool = False) -> int:
+        """Write buffered transitions + counter deltas as one batch.
+
+        Flushes are serialized: two concurrent flushes of the same post could
+        each read its pre-flush state and double-count the delta. On failure
+        the drained set goes back into the buffer for the next flush.
+
+        Returns the number of posts written.
+        """
+        buffer = self._write_behind
+        if buffer is None or (only_if_due and not buffer.is_due()):
+            return 0
+        with self._flush_lock:
+            pending, deltas = buffer.drain()
+            if not pending and not any(deltas.values()):
+                return 0
+            try:
+                self._write_entries(list(pending.items()), False, deltas)
+            except Exception:
+                buffer.restore(pending, deltas)
+                raise
+        logger.debug(
+            "Flushed %d buffered transitions for %s", len(pending), self._collection_id
+        )
+        return len(pending)
 
     # ------------------------------------------------------------------
     # Queries
@@ -228,53 +336,99 @@ class StateManager:
         """
         state_values = [s.value for s in states]
         query = self._posts_ref.where("status", "in", state_values).limit(limit)
+        buffer = self._write_behind
         results = []
         for doc in query.stream():
+            # A buffered transition out of the queried state hasn't reached
+            # Firestore yet - don't hand the post to a step a second time.
+            if buffer is not None:
+                pending = buffer.pending_state(doc.id)
+                if pending is not None and pending not in states:
+                    continue
             data = doc.to_dict()
             data["post_id"] = doc.id
             results.append(data)
         return results
 
-    def claim_one(
+    def claim_many(
         self,
         claim_state: PostState,
         in_flight_state: PostState,
-    ) -> dict | None:
-        """Atomically claim one post for processing.
+        n: int,
+        lease_sec: int = DEFAULT_LEASE_SEC,
+    ) -> list[dict]:
+        """Atomically claim up to `n` posts for processing under a lease.
+
+        Reads up to `n` posts in `claim_state`, transitions them to
+        `in_flight_state` and stamps `lease_owner` / `lease_expires_at`, all in
+        one transaction - one round-trip and one counter write per refill
+        instead of one per post. The streaming runner keeps the claimed posts
+        in a local prefetch queue and feeds its executor from there.
 
-        Reads a single post in `claim_state`, transitions it to `in_flight_state`,
-        and returns the post's data. Used by the streaming runner to keep its
-        executor saturated without batch drain. The transaction prevents two
-        producers from claiming the same post.
+        The counter deltas go to one random counter shard inside the
+        transaction, or - with write-behind active - join the buffer, so no
+        counter doc enters the transaction's contention set at all.
 
-        Returns None if no posts are available in `claim_state`.
+        Returns the claimed posts' data (possibly empty).
         """
+        if n <= 0:
+            return []
+        buffer = self._write_behind
         transaction = self._db.transaction()
-        return _claim_one_txn(
+        claimed = _claim_many_txn(
             transaction,
             self._posts_ref,
-            self._status_ref,
+            self._claim_shard_ref() if buffer is None else None,
             claim_state,
             in_flight_state,
+            n,
+            lease_sec,
+            self.lease_owner,
         )
-
-    def claim_one_for_enrichment(self) -> dict | None:
-        """Claim one post for enrichment, gated on its dependency being past download.
+        if buffer is not None and claimed:
+            buffer.add_counter_deltas({
+                claim_state.value: -len(claimed),
+                in_flight_state.value: len(claimed),
+            })
+        return claimed
+
+    def claim_many_for_enrichment(
+        self,
+        n: int,
+        lease_sec: int = DEFAULT_LEASE_SEC,
+    ) -> list[dict]:
+        """Claim up to `n` posts for enrichment, gated on their deps being past download.
 
         Posts with `awaits_dep_post_id` set wait until the dep reaches a state
         where its content + media_refs are stable (any state past download -
         success or failure). Eliminates the race where a parent enriches before
-        its quoted source's media has uploaded to GCS.
+        its quoted source's media has uploaded to GCS. Blocked candidates are
+        skipped, not claimed, so one waiting parent doesn't stall the batch.
 
-        Returns None if no eligible post is available - producer backs off and
-        retries.
+        Returns an empty list if no eligible post is available - producer
+        backs off and retries.
         """
+        if n <= 0:
+            return []
+        buffer = self._write_behind
         transaction = self._db.transaction()
-        return _claim_one_for_enrichment_txn(
+        claimed = _claim_many_for_enrichment_txn(
             transaction,
             self._posts_ref,
-            self._status_ref,
+            self._claim_shard_ref() if buffer is None else None,
+            n,
+            lease_sec,
+            self.lease_owner,
         )
+        if buffer is not None and claimed:
+            buffer.add_counter_deltas({
+                PostState.READY_FOR_ENRICHMENT.value: -len(claimed),
+                PostState.ENRICHING.value: len(claimed),
+            })
+        return claimed
+
+    def _claim_shard_ref(self):
+        return random_shard_ref(self._status_ref, self._num_shards)
 
     def get_post_state(self, post_id: str) -> dict | None:
         """Read the raw post_state doc for a single post, or None if missing.
@@ -296,14 +450,18 @@ class StateManager:
     ) -> int:
         """Revert posts stuck in transient (DOWNLOADING / ENRICHING) states.
 
-        Posts whose `updated_at` is older than `cooldown_sec` are assumed to
-        belong to a crashed prior run; revert them to their claim_state so the
-        new pipeline picks them up. Bumps the per-step attempt counter so a
-        permanently-failing post eventually gets dropped via max_retries.
+        A post whose claim lease (`lease_expires_at`) has expired belongs to a
+        runner that crashed or exited without releasing it; revert it to its
+        claim_state so the new pipeline picks it up. Posts claimed before
+        leases existed carry no `lease_expires_at` and fall back to the old
+        heuristic: `updated_at` older than `cooldown_sec`. Bumps the per-step
+        attempt counter so a permanently-failing post eventually gets dropped
+        via max_retries.
 
         Returns the number of posts recovered.
         """
-        cutoff = datetime.now(timezone.utc) - timedelta(seconds=cooldown_sec)
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=cooldown_sec)
         transitions: list[tuple[str, PostState]] = []
         attempts_step: dict[str, str] = {}
         for transient, revert_to in TRANSIENT_REVERT.items():
@@ -317,10 +475,8 @@ class StateManager:
                 step_name = "download" if transient == PostState.DOWNLOADING else "enrich"
                 for doc in docs:
                     data = doc.to_dict() or {}
-                    updated_at = data.get("updated_at")
-                    if updated_at and hasattr(updated_at, "replace"):
-                        if updated_at.replace(tzinfo=timezone.utc) > cutoff:
-                            continue
+                    if not _is_reclaimable(data, now, cutoff):
+                        continue
                     transitions.append((doc.id, revert_to))
                     attempts_step[doc.id] = step_name
             except Exception:
@@ -345,20 +501,26 @@ class StateManager:
         )
         return len(transitions)
 
-    def get_counts(self) -> dict[str, int]:
-        """Read aggregate counters from collection_status doc."""
+    def _read_counters(self) -> dict | None:
+        """Read the status doc with its counter shards folded in, or None if missing."""
         doc = self._status_ref.get()
         if not doc.exists:
+            return None
+        return fold_shards(doc.to_dict() or {}, read_shards(self._status_ref))
+
+    def get_counts(self) -> dict[str, int]:
+        """Read aggregate counters (status doc + counter shards)."""
+        data = self._read_counters()
+        if data is None:
             return {}
-        data = doc.to_dict()
         return data.get("counts", {})
 
     def get_total_posts(self) -> int:
-        """Read total posts in DAG from collection_status doc."""
-        doc = self._status_ref.get()
-        if not doc.exists:
+        """Read total posts in DAG (status doc + counter shards)."""
+        data = self._read_counters()
+        if data is None:
             return 0
-        return doc.to_dict().get("total_posts_in_dag", 0)
+        return data.get("total_posts_in_dag", 0)
 
     def get_retry_candidates(
         self,
@@ -401,14 +563,13 @@ class StateManager:
     def all_posts_terminal(self) -> bool:
         """Check if all posts are in terminal states.
 
-        Reads the status doc once to pull both counts and total_posts_in_dag
+        Reads the counters once to pull both counts and total_posts_in_dag
         - this check fires every processing-loop iteration, so a single read
-        matters.
+        (status doc + one shard query) matters.
         """
-        doc = self._status_ref.get()
-        if not doc.exists:
+        data = self._read_counters()
+        if data is None:
             return False
-        data = doc.to_dict()
         total = data.get("total_posts_in_dag", 0)
         if total == 0:
             return False
@@ -457,7 +618,9 @@ class StateManager:
     def recount(self) -> dict[str, int]:
         """Recompute counters from actual post_state docs and overwrite.
 
-        Fixes any drift from incremental Increment operations.
+        Fixes any drift from incremental Increment operations. The exact
+        counts land on the status doc and the counter shards are cleared in
+        the same batch, so readers (status + shards) see the recount alone.
         Returns the recomputed counts dict.
         """
         counts: dict[str, int] = {}
@@ -473,13 +636,27 @@ class StateManager:
             "total_posts_in_dag": total,
             "updated_at": datetime.now(timezone.utc),
         }
-        self._status_ref.update(update)
+        batch = self._db.batch()
+        batch.update(self._status_ref, update)
+        for shard in self._status_ref.collection(SHARDS_SUBCOLLECTION).stream():
+            batch.delete(shard.reference)
+        batch.commit()
         logger.info(
             "Recounted %s: %d posts, counts=%s",
             self._collection_id, total, counts,
         )
         return counts
 
+    def reset_counters(self) -> None:
+        """Delete the counter shards (fresh runs zero the status doc fields separately)."""
+        batch = self._db.batch()
+        deleted = 0
+        for shard in self._status_ref.collection(SHARDS_SUBCOLLECTION).stream():
+            batch.delete(shard.reference)
+            deleted += 1
+        if deleted:
+            batch.commit()
+
     # ------------------------------------------------------------------
     # Cleanup
     # ------------------------------------------------------------------
@@ -503,51 +680,127 @@ class StateManager:
             logger.debug("Deleted %d post_state docs for %s", deleted, self._collection_id)
 
 
+def _pending_transition(
+    post_id: str,
+    new_state: PostState,
+    now: datetime,
+    media_refs: dict[str, list[dict]],
+    post_meta: dict[str, dict],
+) -> PendingTransition:
+    """Build the write payload for one transition (direct or buffered)."""
+    entry = PendingTransition(
+        state=new_state,
+        updated_at=now,
+        media_refs=media_refs.get(post_id),
+        meta=dict(post_meta.get(post_id) or {}),
+    )
+    if new_state in FAILURE_TO_STEP:
+        entry.attempts[FAILURE_TO_STEP[new_state]] = 1
+        entry.last_failure_at = now
+    return entry
+
+
 # ---------------------------------------------------------------------------
-# Module-level transaction helper for atomic single-post claims.
+# Module-level transaction helpers for atomic leased claims.
 #
-# Lives at module level (not inside StateManager) because @firestore.transactional
+# Live at module level (not inside StateManager) because @firestore.transactional
 # wraps a free function whose first arg is the transaction. The PostsRef +
-# status_ref are passed in by claim_one().
+# counter shard ref are passed in by claim_many() / claim_many_for_enrichment().
 # ---------------------------------------------------------------------------
 
 
-@firestore.transactional
-def _claim_one_txn(
+def _as_utc(value):
+    """Normalize a Firestore timestamp (tz-aware or naive) to aware UTC."""
+    if value is None or not hasattr(value, "replace"):
+        return None
+    if getattr(value, "tzinfo", None) is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _is_reclaimable(data: dict, now: datetime, cutoff: datetime) -> bool:
+    """True if a transient post_state doc is no longer held by a live claim.
+
+    Leased docs are reclaimable once `lease_expires_at` passes. Legacy docs
+    (no lease) use the `updated_at` cooldown heuristic; a doc with neither
+    timestamp is treated as orphaned.
+    """
+    lease_expires_at = _as_utc(data.get("lease_expires_at"))
+    if lease_expires_at is not None:
+        return lease_expires_at <= now
+    updated_at = _as_utc(data.get("updated_at"))
+    if updated_at is not None:
+        return updated_at <= cutoff
+    return True
+
+
+def _claim_docs(
     transaction,
-    posts_ref,
-    status_ref,
+    shard_ref,
+    docs: list,
     claim_state: PostState,
     in_flight_state: PostState,
-) -> dict | None:
-    """Read the first post in `claim_state` and atomically transition it.
+    lease_sec: int,
+    lease_owner: str,
+) -> list[dict]:
+    """Stage the writes that move `docs` to `in_flight_state` under a lease.
+
+    One update per post plus a single counter update on one counter shard for
+    the whole batch (skipped when `shard_ref` is None - the caller buffers
+    the deltas). Must be called after every transactional read.
+    """
+    if not docs:
+        return []
+    now = datetime.now(timezone.utc)
+    lease_expires_at = now + timedelta(seconds=lease_sec)
+    claimed: list[dict] = []
+    for doc in docs:
+        data = doc.to_dict() or {}
+        transaction.update(doc.reference, {
+            "status": in_flight_state.value,
+            "updated_at": now,
+            "lease_owner": lease_owner,
+            "lease_expires_at": lease_expires_at,
+        })
+        data["post_id"] = doc.id
+        data["status"] = in_flight_state.value
+        data["lease_owner"] = lease_owner
+        data["lease_expires_at"] = lease_expires_at
+        claimed.append(data)
+    if shard_ref is not None:
+        transaction.set(shard_ref, shard_increment({
+            claim_state.value: -len(docs),
+            in_flight_state.value: len(docs),
+        }, now), merge=True)
+    return claimed
 
-    Returns the post's data (with `post_id` populated) or None if no work.
 
-    Firestore transactions retry on contention, so multiple producer threads
-    targeting the same query won't double-claim - but in our current design
-    there's a single producer per step, so contention is essentially zero.
+@firestore.transactional
+def _claim_many_txn(
+    transaction,
+    posts_ref,
+    shard_ref,
+    claim_state: PostState,
+    in_flight_state: PostState,
+    n: int,
+    lease_sec: int,
+    lease_owner: str,
+) -> list[dict]:
+    """Read up to `n` posts in `claim_state` and atomically lease them.
+
+    Returns the claimed posts' data (with `post_id` populated), possibly empty.
+
+    Firestore transactions retry on contention, so concurrent producers
+    targeting the same query won't double-claim - and because each refill
+    claims a whole batch, the number of contending transactions drops by the
+    batch size.
     """
-    query = posts_ref.where("status", "==", claim_state.value).limit(1)
+    query = posts_ref.where("status", "==", claim_state.value).limit(n)
     docs = list(query.stream(transaction=transaction))
-    if not docs:
-        return None
-    doc = docs[0]
-    data = doc.to_dict() or {}
-
-    now = datetime.now(timezone.utc)
-    transaction.update(doc.reference, {
-        "status": in_flight_state.value,
-        "updated_at": now,
-    })
-    transaction.update(status_ref, {
-        f"counts.{claim_state.value}": transforms.Increment(-1),
-        f"counts.{in_flight_state.value}": transforms.Increment(1),
-        "updated_at": now,
-    })
-    data["post_id"] = doc.id
-    data["status"] = in_flight_state.value
-    return data
+    return _claim_docs(
+        transaction, shard_ref, docs,
+        claim_state, in_flight_state, lease_sec, lease_owner,
+    )
 
 
 # Dep states that mean "media_refs are stable, parent can enrich now."
@@ -568,55 +821,50 @@ _DEP_MEDIA_READY_STATES = frozenset({
 
 
 @firestore.transactional
-def _claim_one_for_enrichment_txn(
+def _claim_many_for_enrichment_txn(
     transaction,
     posts_ref,
-    status_ref,
-) -> dict | None:
-    """Claim one post in READY_FOR_ENRICHMENT, gated on its dep's status.
-
-    Reads a candidate (the first post in READY_FOR_ENRICHMENT). If the
-    candidate has `awaits_dep_post_id`, also reads the dep's post_state
-    transactionally - only claims if the dep is past download. Otherwise
-    returns None so the producer can back off and retry; the dep will
-    eventually advance and the parent will become claimable.
-
-    NOTE: this scans only the head of the queue. If the head is blocked
-    on its dep, we don't auto-skip to the next candidate - we wait. In
-    practice the dep advances within seconds (download is the only step
-    we wait on) and idle backoff is forgiving. If this becomes a
-    throughput bottleneck we can paginate the candidate query.
+    shard_ref,
+    n: int,
+    lease_sec: int,
+    lease_owner: str,
+) -> list[dict]:
+    """Claim up to `n` posts in READY_FOR_ENRICHMENT, gated on their deps' status.
+
+    Reads `n` candidates, then batch-reads (one BatchGet, inside the
+    transaction) the post_states of any deps they await. Candidates whose dep
+    is still in download are left unclaimed - the dep will advance and a
+    later refill picks them up. Dep missing from post_states means it never
+    entered the DAG (already enriched in a prior run, or out-of-range); the
+    parent then enriches with the defensive cache, no waiting.
     """
     query = posts_ref.where(
         "status", "==", PostState.READY_FOR_ENRICHMENT.value,
-    ).limit(1)
+    ).limit(n)
     docs = list(query.stream(transaction=transaction))
     if not docs:
-        return None
-    doc = docs[0]
-    data = doc.to_dict() or {}
-
-    awaits = data.get("awaits_dep_post_id")
-    if awaits:
-        dep_doc = posts_ref.document(awaits).get(transaction=transaction)
-        # Dep missing from post_states means it never entered the DAG (already
-        # enriched in a prior run, or out-of-range). Either way, no waiting -
-        # parent uses the defensive cache. Same for dep already-ready states.
-        if dep_doc.exists:
-            dep_status = (dep_doc.to_dict() or {}).get("status", "")
-            if dep_status not in _DEP_MEDIA_READY_STATES:
-                return None  # dep still in download; backoff and retry
-
-    now = datetime.now(timezone.utc)
-    transaction.update(doc.reference, {
-        "status": PostState.ENRICHING.value,
-        "updated_at": now,
-    })
-    transaction.update(status_ref, {
-        f"counts.{PostState.READY_FOR_ENRICHMENT.value}": transforms.Increment(-1),
-        f"counts.{PostState.ENRICHING.value}": transforms.Increment(1),
-        "updated_at": now,
-    })
-    data["post_id"] = doc.id
-    data["status"] = PostState.ENRICHING.value
-    return data
+        return []
+
+    awaits_by_doc = {
+        doc.id: (doc.to_dict() or {}).get("awaits_dep_post_id")
+        for doc in docs
+    }
+    dep_ids = sorted({dep for dep in awaits_by_doc.values() if dep})
+    dep_status: dict[str, str] = {}
+    if dep_ids:
+        dep_refs = [posts_ref.document(dep_id) for dep_id in dep_ids]
+        for snapshot in transaction.get_all(dep_refs):
+            if snapshot.exists:
+                dep_status[snapshot.id] = (snapshot.to_dict() or {}).get("status", "")
+
+    eligible = [
+        doc for doc in docs
+        if not awaits_by_doc[doc.id]
+        or awaits_by_doc[doc.id] not in dep_status
+        or dep_status[awaits_by_doc[doc.id]] in _DEP_MEDIA_READY_STATES
+    ]
+    return _claim_docs(
+        transaction, shard_ref, eligible,
+        PostState.READY_FOR_ENRICHMENT, PostState.ENRICHING,
+        lease_sec, lease_owner,
+    )
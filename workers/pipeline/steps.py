@@ -41,6 +41,12 @@ class StepContext:
     agent_id: str | None = None
     agent_version: int | None = None
     agent_collection_ids: list[str] = field(default_factory=list)
+    # Content-hash enrichment cache (EnrichmentResultCache), owned by
+    # PipelineRunner. None → every post goes to Gemini.
+    enrichment_cache: Any = None
+    # Streaming alert evaluator (StreamingAlertEvaluator) fed by enrich_flush.
+    # None → alerts only fire at agent-run completion.
+    alert_stream: Any = None
 
     def next_batch_index(self, step_name: str) -> int:
         idx = self.batch_counters.get(step_name, 0)
@@ -307,6 +313,25 @@ def enrich_process_one(post: dict, ctx: StepContext) -> tuple[str, dict | None]:
         config = _build_config(ctx.custom_fields, ctx.content_types)
         ctx._enrich_config = config  # type: ignore[attr-defined]
 
+    # Content-level dedup: an identical prompt (retweet, cross-post, keyword
+    # overlap) was already enriched for this agent version - copy its result.
+    cache_key = None
+    if ctx.enrichment_cache is not None:
+        from workers.enrichment.result_cache import cache_key as _cache_key
+
+        cache_key = _cache_key(
+            pd,
+            model=ctx.settings.enrichment_model,
+            agent_version=ctx.agent_version,
+            custom_fields=ctx.custom_fields,
+            content_types=ctx.content_types,
+            enrichment_context=ctx.enrichment_context,
+        )
+        cached = ctx.enrichment_cache.get(cache_key)
+        if cached is not None:
+            ctx.enriched_ids.add(post_id)
+            return "ok", {"enrichment_result": cached, "post_row": _alert_row(row, post)}
+
     _, result = _enrich_single_post(
         client,
         ctx.settings.enrichment_model,
@@ -317,9 +342,24 @@ def enrich_process_one(post: dict, ctx: StepContext) -> tuple[str, dict | None]:
     )
     if result is None:
         return "fail", None
+    if cache_key is not None:
+        ctx.enrichment_cache.put(cache_key, result, post_id)
     # Cache hit so a re-claim (e.g. retry path) skips the call.
     ctx.enriched_ids.add(post_id)
-    return "ok", {"enrichment_result": result}
+    return "ok", {"enrichment_result": result, "post_row": _alert_row(row, post)}
+
+
+def _alert_row(row: dict, post: dict) -> dict:
+    """Post fields the streaming alert evaluator needs alongside the result."""
+    return {
+        "platform": row.get("platform"),
+        "channel_handle": row.get("channel_handle"),
+        "posted_at": row.get("posted_at"),
+        "title": row.get("title"),
+        "content": row.get("content"),
+        "post_url": row.get("post_url"),
+        "media_refs": post.get("media_refs"),
+    }
 
 
 def _parse_media_refs(raw_refs) -> list:
@@ -336,6 +376,7 @@ def _parse_media_refs(raw_refs) -> list:
                 original_url=ref.get("original_url", ""),
                 media_type=ref.get("media_type", "image"),
                 content_type=ref.get("content_type", ""),
+                sha256=ref.get("sha256", ""),
             ))
     return out
 
@@ -411,7 +452,8 @@ def _resolve_referenced_post(post: dict, row: dict, ctx: StepContext):
 def enrich_flush(
     results: list[tuple[str, str, dict | None]], ctx: StepContext,
 ) -> None:
-    """Batch-write successful enrichment results to BQ via INSERT (append-only)."""
+    """Batch-write successful enrichment results to BQ - one atomic append-only
+    bulk write per flush."""
     from workers.enrichment.worker import _write_results_to_bq
 
     rows = []
@@ -437,3 +479,25 @@ def enrich_flush(
             len(rows), ctx.collection_id,
         )
         raise
+
+    if ctx.alert_stream is not None:
+        _stream_alerts(results, ctx)
+
+
+def _stream_alerts(results: list[tuple[str, str, dict | None]], ctx: StepContext) -> None:
+    """Feed the flushed, in-scope (is_related_to_task) posts to the streaming
+    alert evaluator. Best-effort - the run-completion sweep reconciles."""
+    from workers.alerts.stream import post_from_enrichment
+
+    posts = [
+        post_from_enrichment(post_id, extra["enrichment_result"], extra.get("post_row"), ctx.collection_id)
+        for post_id, outcome, extra in results
+        if outcome == "ok" and extra and extra.get("enrichment_result") is not None
+        and extra["enrichment_result"].is_related_to_task
+    ]
+    if not posts:
+        return
+    try:
+        ctx.alert_stream.observe(posts)
+    except Exception:
+        logger.exception("Streaming alert evaluation failed for %s", ctx.collection_id)
@@ -2,8 +2,9 @@
 posts individually with a persistent executor.
 
 Replaces the batched `_step_worker` model for download and enrich:
-- Producer thread atomically claims one post at a time (claim_state →
-  in_flight_state) and submits to a persistent ThreadPoolExecutor.
+- Producer thread leases posts in batches (claim_state → in_flight_state, one
+  Firestore transaction per refill) into a local prefetch queue and submits
+  them one at a time to a persistent ThreadPoolExecutor.
 - Consumer thread drains completed futures and periodically flushes batched
   side-effects (BQ MERGE for enrich) and state transitions.
 
@@ -14,6 +15,7 @@ next post is claimed. Pool stays saturated until the queue runs dry.
 import logging
 import threading
 import time
+from collections import deque
 from concurrent.futures import Future
 from typing import Callable
 
@@ -34,11 +36,12 @@ ProcessFn = Callable[[dict, StepContext], tuple[str, dict | None]]
 # transition states.
 FlushFn = Callable[[list[tuple[str, str, dict | None]], StepContext], None] | None
 
-# Claim function: returns one claimed post (already transitioned to in-flight)
-# or None if no work. The default uses the standard `claim_state → in_flight_state`
-# transition; the enrichment runner overrides this with a dep-gated variant that
-# also waits for any quoted/replied source's media to finish downloading.
-ClaimFn = Callable[[], dict | None]
+# Claim function: takes a batch size N, returns up to N claimed posts (already
+# leased and transitioned to in-flight) or [] if no work. The default uses the
+# standard `claim_state → in_flight_state` transition; the enrichment runner
+# overrides this with a dep-gated variant that also waits for any
+# quoted/replied source's media to finish downloading.
+ClaimFn = Callable[[int], list[dict]]
 
 
 class StreamingStepRunner:
@@ -60,6 +63,7 @@ class StreamingStepRunner:
         flush_interval_sec: float = 1.0,
         record_step_timing: Callable | None = None,
         claim_fn: ClaimFn | None = None,
+        claim_batch_size: int = 1,
     ) -> None:
         self._name = name
         self._ctx = ctx
@@ -74,10 +78,14 @@ class StreamingStepRunner:
         self._flush_interval_sec = max(0.1, flush_interval_sec)
         self._record_step_timing = record_step_timing
         # Default claim: standard claim_state → in_flight_state. Enrichment
-        # runner injects a dep-gated claim via state_manager.claim_one_for_enrichment.
+        # runner injects a dep-gated claim via state_manager.claim_many_for_enrichment.
         self._claim_fn: ClaimFn = claim_fn or (
-            lambda: ctx.state_manager.claim_one(claim_state, in_flight_state)
+            lambda n: ctx.state_manager.claim_many(claim_state, in_flight_state, n)
         )
+        self._claim_batch_size = max(1, claim_batch_size)
+        # Leased-but-not-yet-submitted posts. Only the producer thread touches
+        # it; leftovers are released back to claim_state on shutdown.
+        self._prefetch: deque[dict] = deque()
 
         # Cap how many posts are in-flight at once. The executor's queue is
         # unbounded, so without this we'd over-claim.
@@ -124,33 +132,59 @@ class StreamingStepRunner:
 
     def _produce_loop(self, stop_event: threading.Event) -> None:
         idle_backoff = 0.05
-        while not stop_event.is_set():
-            # Block waiting for an in-flight slot. Bounded so we re-check
-            # stop_event regularly.
-            if not self._in_flight_sem.acquire(timeout=0.2):
-                continue
-            try:
-                post = self._claim_fn()
-            except Exception:
-                logger.warning(
-                    "claim_one failed for step '%s' in %s - backing off",
-                    self._name, self._ctx.collection_id, exc_info=True,
+        try:
+            while not stop_event.is_set():
+                # Block waiting for an in-flight slot. Bounded so we re-check
+                # stop_event regularly.
+                if not self._in_flight_sem.acquire(timeout=0.2):
+                    continue
+                if not self._prefetch:
+                    try:
+                        self._prefetch.extend(self._claim_fn(self._claim_batch_size))
+                    except Exception:
+                        logger.warning(
+                            "claim failed for step '%s' in %s - backing off",
+                            self._name, self._ctx.collection_id, exc_info=True,
+                        )
+                        self._in_flight_sem.release()
+                        stop_event.wait(timeout=1.0)
+                        continue
+
+                if not self._prefetch:
+                    # No work right now. Release the slot, back off, retry.
+                    self._in_flight_sem.release()
+                    stop_event.wait(timeout=idle_backoff)
+                    idle_backoff = min(0.5, idle_backoff * 1.5)
+                    continue
+                idle_backoff = 0.05
+
+                post = self._prefetch.popleft()
+                future = self._executor.submit(self._wrapped_process, post)
+                future.add_done_callback(
+                    lambda f, p=post: self._on_complete(p, f),
                 )
-                self._in_flight_sem.release()
-                stop_event.wait(timeout=1.0)
-                continue
-
-            if post is None:
-                # No work right now. Release the slot, back off, retry.
-                self._in_flight_sem.release()
-                stop_event.wait(timeout=idle_backoff)
-                idle_backoff = min(0.5, idle_backoff * 1.5)
-                continue
-            idle_backoff = 0.05
-
-            future = self._executor.submit(self._wrapped_process, post)
-            future.add_done_callback(
-                lambda f, p=post: self._on_complete(p, f),
+        finally:
+            self._release_prefetch()
+
+    def _release_prefetch(self) -> None:
+        """Hand leased-but-unstarted posts back to claim_state.
+
+        Without this they'd sit in the in-flight state until their lease
+        expires and a continuation's recovery reverts them.
+        """
+        if not self._prefetch:
+            return
+        post_ids = [p["post_id"] for p in self._prefetch]
+        self._prefetch.clear()
+        try:
+            self._ctx.state_manager.transition_batch(
+                [(pid, self._claim_state) for pid in post_ids],
+            )
+        except Exception:
+            logger.warning(
+                "Failed to release %d prefetched post(s) for step '%s' in %s - "
+                "they will be reclaimed when their lease expires",
+                len(post_ids), self._name, self._ctx.collection_id, exc_info=True,
             )
 
     def _wrapped_process(self, post: dict) -> tuple[str, dict | None]:
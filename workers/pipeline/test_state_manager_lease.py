@@ -0,0 +1,233 @@
+"""Unit tests for leased batch claims - StateManager.claim_many* transaction
+helpers, lease-based stale recovery, and the StreamingStepRunner prefetch
+queue that consumes them.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from google.cloud.firestore_v1 import transforms
+
+from workers.pipeline import state_manager as sm
+from workers.pipeline.post_state import PostState
+from workers.pipeline.state_manager import StateManager
+from workers.pipeline.streaming import StreamingStepRunner
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class _Snap:
+    def __init__(self, doc_id: str, data: dict | None, exists: bool = True):
+        self.id = doc_id
+        self._data = data
+        self.exists = exists
+        self.reference = MagicMock(name=f"ref-{doc_id}")
+
+    def to_dict(self):
+        return dict(self._data or {})
+
+
+def _posts_ref(candidates: list[_Snap]):
+    posts_ref = MagicMock()
+    posts_ref.where.return_value.limit.return_value.stream.return_value = candidates
+    posts_ref.document.side_effect = lambda doc_id: doc_id
+    return posts_ref
+
+
+def _counter_update(transaction, shard_ref) -> dict:
+    for call in transaction.set.call_args_list:
+        if call.args[0] is shard_ref:
+            assert call.kwargs == {"merge": True}
+            return call.args[1]["counts"]
+    raise AssertionError("no counter update on the shard")
+
+
+# ---------------------------------------------------------------------------
+# claim_many
+# ---------------------------------------------------------------------------
+
+def test_claim_many_leases_batch_with_single_counter_update():
+    docs = [_Snap("a", {"media_refs": []}), _Snap("b", {})]
+    posts_ref = _posts_ref(docs)
+    shard_ref = MagicMock()
+    txn = MagicMock()
+
+    claimed = sm._claim_many_txn.to_wrap(
+        txn, posts_ref, shard_ref,
+        PostState.COLLECTED_WITH_MEDIA, PostState.DOWNLOADING,
+        5, 120, "owner-1",
+    )
+
+    posts_ref.where.return_value.limit.assert_called_once_with(5)
+    assert [c["post_id"] for c in claimed] == ["a", "b"]
+    assert all(c["status"] == PostState.DOWNLOADING.value for c in claimed)
+    assert all(c["lease_owner"] == "owner-1" for c in claimed)
+    lease = claimed[0]["lease_expires_at"]
+    assert timedelta(seconds=110) < lease - datetime.now(timezone.utc) <= timedelta(seconds=120)
+
+    # 2 post updates + exactly 1 counter update for the whole batch.
+    assert txn.update.call_count == 2
+    assert txn.set.call_count == 1
+    counters = _counter_update(txn, shard_ref)
+    assert counters[PostState.COLLECTED_WITH_MEDIA.value] == transforms.Increment(-2)
+    assert counters[PostState.DOWNLOADING.value] == transforms.Increment(2)
+
+
+def test_claim_many_no_work_writes_nothing():
+    txn = MagicMock()
+    claimed = sm._claim_many_txn.to_wrap(
+        txn, _posts_ref([]), MagicMock(),
+        PostState.COLLECTED_WITH_MEDIA, PostState.DOWNLOADING,
+        5, 120, "owner-1",
+    )
+    assert claimed == []
+    txn.update.assert_not_called()
+    txn.set.assert_not_called()
+
+
+def test_claim_many_for_enrichment_skips_blocked_parents_only():
+    docs = [
+        _Snap("parent-blocked", {"awaits_dep_post_id": "dep-downloading"}),
+        _Snap("standalone", {}),
+        _Snap("parent-ready", {"awaits_dep_post_id": "dep-ready"}),
+        _Snap("parent-orphan", {"awaits_dep_post_id": "dep-missing"}),
+    ]
+    txn = MagicMock()
+    txn.get_all.return_value = [
+        _Snap("dep-downloading", {"status": PostState.DOWNLOADING.value}),
+        _Snap("dep-ready", {"status": PostState.DONE.value}),
+        _Snap("dep-missing", None, exists=False),
+    ]
+    shard_ref = MagicMock()
+
+    claimed = sm._claim_many_for_enrichment_txn.to_wrap(
+        txn, _posts_ref(docs), shard_ref, 4, 120, "owner-1",
+    )
+
+    # Deps fetched in one BatchGet, not one read per parent.
+    txn.get_all.assert_called_once()
+    assert [c["post_id"] for c in claimed] == ["standalone", "parent-ready", "parent-orphan"]
+    counters = _counter_update(txn, shard_ref)
+    assert counters[PostState.READY_FOR_ENRICHMENT.value] == transforms.Increment(-3)
+    assert counters[PostState.ENRICHING.value] == transforms.Increment(3)
+
+
+# ---------------------------------------------------------------------------
+# Lease-based recovery
+# ---------------------------------------------------------------------------
+
+def test_is_reclaimable_prefers_lease_over_updated_at():
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=300)
+    fresh_update = now - timedelta(seconds=5)
+
+    expired = {"lease_expires_at": now - timedelta(seconds=1), "updated_at": fresh_update}
+    live = {"lease_expires_at": now + timedelta(seconds=60), "updated_at": now - timedelta(hours=1)}
+    assert sm._is_reclaimable(expired, now, cutoff)
+    assert not sm._is_reclaimable(live, now, cutoff)
+
+    # Pre-lease docs keep the updated_at heuristic.
+    assert sm._is_reclaimable({"updated_at": now - timedelta(hours=1)}, now, cutoff)
+    assert not sm._is_reclaimable({"updated_at": fresh_update}, now, cutoff)
+    # Naive timestamps are treated as UTC.
+    naive = (now - timedelta(seconds=1)).replace(tzinfo=None)
+    assert sm._is_reclaimable({"lease_expires_at": naive}, now, cutoff)
+
+
+def test_recover_stale_transient_reverts_expired_leases():
+    with patch("workers.pipeline.state_manager.firestore.Client", return_value=MagicMock()), \
+         patch("workers.pipeline.state_manager.get_settings"):
+        mgr = StateManager(collection_id="c-1")
+    now = datetime.now(timezone.utc)
+    by_state = {
+        PostState.DOWNLOADING.value: [],
+        PostState.ENRICHING.value: [
+            _Snap("expired", {"lease_expires_at": now - timedelta(seconds=1)}),
+            _Snap("live", {"lease_expires_at": now + timedelta(seconds=60)}),
+        ],
+    }
+
+    def _where(_field, _op, value):
+        q = MagicMock()
+        q.limit.return_value.stream.return_value = by_state[value]
+        return q
+
+    mgr._posts_ref = MagicMock()
+    mgr._posts_ref.where.side_effect = _where
+    captured = {}
+    mgr.transition_batch = lambda transitions, **_: captured.setdefault("t", transitions)
+
+    assert mgr.recover_stale_transient(cooldown_sec=300) == 1
+    assert captured["t"] == [("expired", PostState.READY_FOR_ENRICHMENT)]
+
+
+# ---------------------------------------------------------------------------
+# StreamingStepRunner prefetch queue
+# ---------------------------------------------------------------------------
+
+def _runner(claim_fn, state_manager, process_fn=None) -> StreamingStepRunner:
+    ctx = MagicMock()
+    ctx.collection_id = "c-1"
+    ctx.state_manager = state_manager
+    return StreamingStepRunner(
+        name="enrich",
+        ctx=ctx,
+        claim_state=PostState.READY_FOR_ENRICHMENT,
+        in_flight_state=PostState.ENRICHING,
+        success_state=PostState.ENRICHED,
+        failure_state=PostState.ENRICHMENT_FAILED,
+        concurrency=2,
+        process_fn=process_fn or (lambda post, ctx: ("ok", None)),
+        claim_fn=claim_fn,
+        claim_batch_size=5,
+    )
+
+
+def test_runner_refills_prefetch_in_bulk():
+    batches = [[{"post_id": f"p{i}"} for i in range(5)]]
+    sizes: list[int] = []
+
+    def _claim(n):
+        sizes.append(n)
+        return batches.pop(0) if batches else []
+
+    state_manager = MagicMock()
+    stop = threading.Event()
+    done: list[str] = []
+    done_lock = threading.Lock()
+
+    def _process(post, ctx):
+        with done_lock:
+            done.append(post["post_id"])
+            if len(done) == 5:
+                stop.set()
+        return "ok", None
+
+    _runner(_claim, state_manager, _process).run(stop)
+
+    assert sizes[0] == 5
+    assert sorted(done) == [f"p{i}" for i in range(5)]
+    transitioned = [
+        pid
+        for call in state_manager.transition_batch.call_args_list
+        for pid, state in call.args[0]
+        if state == PostState.ENRICHED
+    ]
+    assert sorted(transitioned) == sorted(done)
+
+
+def test_runner_releases_unstarted_prefetch_on_stop():
+    state_manager = MagicMock()
+    runner = _runner(lambda n: [], state_manager)
+    runner._prefetch.extend([{"post_id": "left-1"}, {"post_id": "left-2"}])
+
+    runner._release_prefetch()
+
+    state_manager.transition_batch.assert_called_once_with([
+        ("left-1", PostState.READY_FOR_ENRICHMENT),
+        ("left-2", PostState.READY_FOR_ENRICHMENT),
+    ])
+    assert not runner._prefetch
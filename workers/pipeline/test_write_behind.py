@@ -0,0 +1,161 @@
+"""Unit tests for the post_state write-behind buffer and StateManager's
+buffered transition / flush path.
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.cloud.firestore_v1 import transforms
+
+from workers.pipeline.post_state import PostState
+from workers.pipeline.state_manager import StateManager
+from workers.pipeline.write_behind import PendingTransition, TransitionBuffer
+
+_NOW = datetime(2026, 5, 1, tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# TransitionBuffer
+# ---------------------------------------------------------------------------
+
+def test_buffer_coalesces_transitions_of_same_post():
+    buf = TransitionBuffer(max_posts=10, max_age_sec=60)
+    buf.add("p1", PendingTransition(state=PostState.READY_FOR_ENRICHMENT, updated_at=_NOW,
+                                    media_refs=[{"gcs_uri": "gs://a"}]))
+    buf.add("p1", PendingTransition(state=PostState.ENRICHMENT_FAILED, updated_at=_NOW,
+                                    attempts={"enrich": 1}, last_failure_at=_NOW))
+    buf.add("p1", PendingTransition(state=PostState.ENRICHMENT_FAILED, updated_at=_NOW,
+                                    attempts={"enrich": 1}, last_failure_at=_NOW))
+
+    assert len(buf) == 1
+    pending, _ = buf.drain()
+    entry = pending["p1"]
+    assert entry.state == PostState.ENRICHMENT_FAILED
+    assert entry.attempts == {"enrich": 2}
+    # Earlier media_refs survive a later transition that carries none.
+    assert entry.media_refs == [{"gcs_uri": "gs://a"}]
+    assert len(buf) == 0 and not buf.is_due()
+
+
+def test_buffer_size_threshold_and_counter_deltas():
+    buf = TransitionBuffer(max_posts=2, max_age_sec=60)
+    assert buf.add("p1", PendingTransition(state=PostState.DONE, updated_at=_NOW)) is False
+    buf.add_counter_deltas({"ready_for_enrichment": -3, "enriching": 3})
+    buf.add_counter_deltas({"ready_for_enrichment": -1, "enriching": 1})
+    assert buf.add("p2", PendingTransition(state=PostState.DONE, updated_at=_NOW)) is True
+    assert buf.is_due()
+
+    _, deltas = buf.drain()
+    assert deltas == {"ready_for_enrichment": -4, "enriching": 4}
+
+
+def test_buffer_restore_keeps_newer_state():
+    buf = TransitionBuffer(max_posts=10, max_age_sec=60)
+    buf.add("p1", PendingTransition(state=PostState.ENRICHED, updated_at=_NOW))
+    pending, deltas = buf.drain()
+    # A newer transition arrives while the failed flush was in flight.
+    buf.add("p1", PendingTransition(state=PostState.DONE, updated_at=_NOW))
+
+    buf.restore(pending, deltas)
+
+    assert buf.pending_state("p1") == PostState.DONE
+
+
+# ---------------------------------------------------------------------------
+# StateManager buffered path
+# ---------------------------------------------------------------------------
+
+class _Snap:
+    def __init__(self, doc_id: str, status: str):
+        self.id = doc_id
+        self.exists = True
+        self._status = status
+
+    def to_dict(self):
+        return {"status": self._status}
+
+
+def _make_manager(old_states: dict[str, str]) -> StateManager:
+    db = MagicMock()
+    with patch("workers.pipeline.state_manager.firestore.Client", return_value=db), \
+         patch("workers.pipeline.state_manager.get_settings"):
+        mgr = StateManager(collection_id="c-1")
+    mgr._num_shards = 4
+    mgr._posts_ref = MagicMock()
+    mgr._posts_ref.document.side_effect = lambda pid: pid
+    db.get_all.side_effect = lambda refs: [_Snap(pid, old_states[pid]) for pid in refs]
+    return mgr
+
+
+def _counter_updates(mgr: StateManager) -> list[dict]:
+    """`counts` payloads merge-set onto counter shards (post docs carry `status`)."""
+    batch = mgr._db.batch.return_value
+    return [
+        c.args[1]["counts"] for c in batch.set.call_args_list
+        if "counts" in c.args[1]
+    ]
+
+
+def test_buffered_transitions_flush_with_one_counter_write():
+    mgr = _make_manager({
+        "d1": PostState.DOWNLOADING.value,
+        "e1": PostState.ENRICHING.value,
+        "e2": PostState.ENRICHING.value,
+    })
+    mgr.start_write_behind(max_posts=100, max_age_sec=60)
+
+    # Download and enrich steps flush independently...
+    mgr.transition_batch([("d1", PostState.READY_FOR_ENRICHMENT)], media_refs={"d1": [{"gcs_uri": "gs://x"}]})
+    mgr.transition_batch([("e1", PostState.ENRICHED), ("e2", PostState.ENRICHMENT_FAILED)])
+    mgr._db.batch.return_value.commit.assert_not_called()
+
+    assert mgr.flush_pending() == 3
+
+    # ...but the counters take a single merged update.
+    updates = _counter_updates(mgr)
+    assert len(updates) == 1
+    counts = updates[0]
+    assert counts["downloading"] == transforms.Increment(-1)
+    assert counts["ready_for_enrichment"] == transforms.Increment(1)
+    assert counts["enriching"] == transforms.Increment(-2)
+    assert counts["enriched"] == transforms.Increment(1)
+    assert counts["enrichment_failed"] == transforms.Increment(1)
+    mgr._db.batch.return_value.commit.assert_called_once()
+
+
+def test_initial_transitions_write_through_while_buffering():
+    mgr = _make_manager({})
+    mgr.start_write_behind(max_posts=100, max_age_sec=60)
+
+    mgr.transition_batch([("new", PostState.READY_FOR_ENRICHMENT)], is_initial=True)
+
+    mgr._db.batch.return_value.commit.assert_called_once()
+    assert mgr.flush_pending() == 0
+
+
+def test_failed_flush_is_retried_and_stop_flushes():
+    mgr = _make_manager({"e1": PostState.ENRICHING.value})
+    mgr.start_write_behind(max_posts=100, max_age_sec=60)
+    mgr.transition_batch([("e1", PostState.ENRICHED)])
+    commit = mgr._db.batch.return_value.commit
+    commit.side_effect = [RuntimeError("contention"), None]
+
+    with pytest.raises(RuntimeError):
+        mgr.flush_pending()
+    mgr.stop_write_behind()
+
+    assert commit.call_count == 2
+    assert mgr._write_behind is None
+
+
+def test_get_posts_by_state_hides_posts_with_pending_exit():
+    mgr = _make_manager({"e1": PostState.ENRICHING.value})
+    docs = [_Snap("e1", PostState.ENRICHED.value), _Snap("e2", PostState.ENRICHED.value)]
+    mgr._posts_ref.where.return_value.limit.return_value.stream.return_value = docs
+    mgr.start_write_behind(max_posts=100, max_age_sec=60)
+    mgr.transition_batch([("e1", PostState.DONE)])
+
+    ready = mgr.get_posts_by_state([PostState.ENRICHED])
+
+    assert [p["post_id"] for p in ready] == ["e2"]
@@ -0,0 +1,129 @@
+"""In-memory write-behind buffer for post_state transitions.
+
+Pure bookkeeping - no IO. StateManager owns one while a pipeline run's
+processing loop is active and flushes it as a single Firestore batch per
+size/time threshold, so the download, enrich and embed steps share one
+`counts.*` counter write per flush instead of one per step flush (and one
+per claim transaction).
+
+Coalescing rules:
+- Later transitions of the same post replace its pending state; the old
+  state is read from Firestore at flush time, so the counter delta covers
+  the whole pending chain (old → latest).
+- Failure attempts accumulate per step; media_refs / post_meta take the
+  latest value.
+- Counter deltas that don't come from a pending post write (claims) are
+  summed per state and ride along with the next flush.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from workers.pipeline.post_state import PostState
+
+
+@dataclass
+class PendingTransition:
+    """One post's not-yet-written transition (possibly several coalesced)."""
+
+    state: PostState
+    updated_at: datetime
+    attempts: dict[str, int] = field(default_factory=dict)
+    last_failure_at: datetime | None = None
+    media_refs: list[dict] | None = None
+    meta: dict = field(default_factory=dict)
+
+    def merge(self, newer: "PendingTransition") -> None:
+        """Fold a later transition of the same post into this one."""
+        self.state = newer.state
+        self.updated_at = newer.updated_at
+        for step, n in newer.attempts.items():
+            self.attempts[step] = self.attempts.get(step, 0) + n
+        if newer.last_failure_at is not None:
+            self.last_failure_at = newer.last_failure_at
+        if newer.media_refs is not None:
+            self.media_refs = newer.media_refs
+        self.meta.update(newer.meta)
+
+
+class TransitionBuffer:
+    """Thread-safe coalescing buffer of pending transitions + counter deltas."""
+
+    def __init__(self, max_posts: int, max_age_sec: float):
+        self.max_posts = max(1, max_posts)
+        self.max_age_sec = max(0.0, max_age_sec)
+        self._lock = threading.Lock()
+        self._pending: dict[str, PendingTransition] = {}
+        self._counter_deltas: dict[str, int] = {}
+        self._oldest: float | None = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def add(self, post_id: str, entry: PendingTransition) -> bool:
+        """Buffer one transition. Returns True once the size threshold is hit."""
+        with self._lock:
+            existing = self._pending.get(post_id)
+            if existing is None:
+                self._pending[post_id] = entry
+            else:
+                existing.merge(entry)
+            self._touch()
+            return len(self._pending) >= self.max_posts
+
+    def add_counter_deltas(self, deltas: dict[str, int]) -> None:
+        """Merge standalone `counts.*` deltas (e.g. from a claim transaction)."""
+        with self._lock:
+            for state, delta in deltas.items():
+                self._counter_deltas[state] = self._counter_deltas.get(state, 0) + delta
+            self._touch()
+
+    def pending_state(self, post_id: str) -> PostState | None:
+        """The state a post will have after the next flush, if buffered."""
+        with self._lock:
+            entry = self._pending.get(post_id)
+            return entry.state if entry else None
+
+    def is_due(self) -> bool:
+        """True if the buffer holds anything older than `max_age_sec`, or is full."""
+        with self._lock:
+            if self._oldest is None:
+                return False
+            return (
+                len(self._pending) >= self.max_posts
+                or time.monotonic() - self._oldest >= self.max_age_sec
+            )
+
+    def drain(self) -> tuple[dict[str, PendingTransition], dict[str, int]]:
+        """Take everything pending, leaving the buffer empty."""
+        with self._lock:
+            pending, deltas = self._pending, self._counter_deltas
+            self._pending, self._counter_deltas = {}, {}
+            self._oldest = None
+            return pending, deltas
+
+    def restore(
+        self,
+        pending: dict[str, PendingTransition],
+        deltas: dict[str, int],
+    ) -> None:
+        """Put back a drained set whose flush failed.
+
+        Anything buffered since the drain is newer, so it's merged on top.
+        """
+        with self._lock:
+            for post_id, entry in pending.items():
+                newer = self._pending.get(post_id)
+                if newer is not None:
+                    entry.merge(newer)
+                self._pending[post_id] = entry
+            for state, delta in deltas.items():
+                self._counter_deltas[state] = self._counter_deltas.get(state, 0) + delta
+            self._touch()
+
+    def _touch(self) -> None:
+        if self._oldest is None:
+            self._oldest = time.monotonic()
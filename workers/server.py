@@ -130,7 +130,7 @@ async def run_enrichment_handler(request: Request):
         else:
             from workers.enrichment.worker import run_enrichment
 
-            run_enrichment(collection_id, min_likes=min_likes)
+            run_enrichment(collection_id, min_likes=min_likes, mode=body.get("mode"))
 
         logger.info("Enrichment worker completed")
         return {"status": "ok"}
@@ -154,9 +154,9 @@ async def run_engagement_handler(request: Request):
     try:
         from workers.engagement.worker import refresh_engagements
 
-        refresh_engagements(body)
+        summary = refresh_engagements(body)
         logger.info("Engagement worker completed")
-        return {"status": "ok"}
+        return {"status": "ok", **summary}
     except Exception as e:
         logger.exception("Engagement worker failed")
         with sentry_sdk.new_scope() as scope:
@@ -1,13 +1,19 @@
+import hashlib
 import json
 import logging
+import re
 import ssl
+import threading
 import time
+from collections.abc import Callable, Iterator
 from pathlib import Path
 
 from google.api_core import exceptions as gcp_exceptions
 from google.cloud import bigquery
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
 
 from config.settings import Settings, get_settings
+from workers.shared.bq_rows import BQRow
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +34,22 @@ _MAX_RETRIES = 3
 _BACKOFF_BASE = 2.0  # seconds: 2, 4, 8
 _BACKOFF_MAX = 30.0
 
+# Storage Write API AppendRows requests are capped at 10MB - leave headroom
+# for the request envelope and the writer schema on the first request.
+_APPEND_MAX_BYTES = 8 * 1024 * 1024
+
+_PROTO_TYPES = {
+    "STRING": descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+    "INT64": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
+    "FLOAT64": descriptor_pb2.FieldDescriptorProto.TYPE_DOUBLE,
+    "BOOL": descriptor_pb2.FieldDescriptorProto.TYPE_BOOL,
+    "TIMESTAMP": descriptor_pb2.FieldDescriptorProto.TYPE_INT64,  # epoch micros
+    "JSON": descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+}
+
+_row_messages: dict[type, tuple] = {}
+_row_messages_lock = threading.Lock()
+
 
 def _normalize_rows(rows: list[dict], json_cols: set[str]) -> list[dict]:
     """Normalize raw downloaded rows to query()'s public contract, in place.
@@ -52,6 +74,59 @@ def _normalize_rows(rows: list[dict], json_cols: set[str]) -> list[dict]:
     return rows
 
 
+def _row_message(row_type: type[BQRow]) -> tuple:
+    """(DescriptorProto, message class) for a BQRow type, built once per type.
+
+    The Storage Write API takes rows as serialized protos plus the descriptor
+    of their message; both are derived from the row dataclass so there's no
+    .proto file to keep in sync with bigquery/schemas/.
+    """
+    with _row_messages_lock:
+        cached = _row_messages.get(row_type)
+        if cached is not None:
+            return cached
+        label = descriptor_pb2.FieldDescriptorProto
+        descriptor = descriptor_pb2.DescriptorProto(name=row_type.__name__)
+        for number, col in enumerate(row_type.columns(), start=1):
+            descriptor.field.add(
+                name=col.name,
+                number=number,
+                type=_PROTO_TYPES[col.bq_type],
+                label=label.LABEL_REPEATED if col.repeated else label.LABEL_OPTIONAL,
+            )
+        file_proto = descriptor_pb2.FileDescriptorProto(
+            name=f"bq_rows/{row_type.TABLE}.proto", package="bq_rows", syntax="proto2",
+        )
+        file_proto.message_type.add().CopyFrom(descriptor)
+        pool = descriptor_pool.DescriptorPool()
+        pool.Add(file_proto)
+        message_cls = message_factory.GetMessageClass(
+            pool.FindMessageTypeByName(f"bq_rows.{row_type.__name__}")
+        )
+        _row_messages[row_type] = (descriptor, message_cls)
+        return descriptor, message_cls
+
+
+def _bulk_write_id(rows: list[BQRow], batch_key: str | None = None) -> str:
+    """Deterministic id for one logical write: a digest of each row's
+    KEY_FIELDS plus the caller's batch key.
+
+    Per-call values (enriched_at, clustered_at) stay out of it, so a retried
+    write whose rows were rebuilt with fresh timestamps maps to the same id.
+    """
+    digest = hashlib.sha256()
+    digest.update((batch_key or "").encode("utf-8"))
+    digest.update(b"\n")
+    keys = sorted(
+        json.dumps([getattr(row, name) for name in row.KEY_FIELDS], default=str)
+        for row in rows
+    )
+    for key in keys:
+        digest.update(key.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()[:32]
+
+
 def _is_transient(exc: Exception) -> bool:
     """Check if an exception is transient and worth retrying."""
     if isinstance(exc, _TRANSIENT_EXCEPTIONS):
@@ -96,6 +171,9 @@ class BQClient:
         # tried and unavailable (fall back to REST), else a live client reused
         # across queries. See docs/bugs/api-dashboard-slow-row-download.md.
         self._bqstorage: object | None = None
+        # Lazily-created Storage Write API client for write_rows_bulk, same
+        # None / False / client convention as _bqstorage.
+        self._bqwrite: object | None = None
 
     @property
     def dataset(self) -> str:
@@ -126,7 +204,248 @@ class BQClient:
         logger.info("Inserted %d rows into %s", len(rows), table_ref)
         return 0
 
+    def write_rows_bulk(self, rows: list[BQRow], *, write_id: str | None = None) -> int:
+        """Append typed rows to their table in one atomic write. Returns rows written.
+
+        All rows must be the same BQRow type (one table per call). Prefers the
+        Storage Write API: rows are appended to a PENDING stream and become
+        visible together at commit, so a failure before the commit writes
+        nothing. Without a Storage Write client - or when the stream can't be
+        opened or appended to - falls back to an NDJSON load job whose job id
+        is a digest of the rows' KEY_FIELDS and ``write_id`` (the caller's
+        batch key), so a retried call for the same batch waits on the
+        existing job instead of appending the rows twice. Callers that may
+        legitimately write the same keys again later (re-enrichment, user
+        overrides) must pass a batch key that differs per logical write.
+
+        If the commit or load job lands but the call then raises (timeout,
+        transport error), the stream / job state is checked before
+        re-raising, so a call that actually wrote its rows returns normally.
+
+        Unlike insert_rows there's no partial success: this raises if the
+        write fails and then nothing from the call was written.
+        """
+        if not rows:
+            return 0
+        row_type = type(rows[0])
+        if any(type(r) is not row_type for r in rows):
+            raise ValueError("write_rows_bulk: all rows must share one row type")
+        table_ref = self.table_ref(row_type.TABLE)
+
+        writer = None
+        if self._settings.bq_bulk_write_method == "storage":
+            writer = self._bqstorage_write_client()
+        if writer is not None:
+            try:
+                stream_name = self._append_to_pending_stream(writer, row_type, rows)
+            except Exception:  # noqa: BLE001 - uncommitted stream -> nothing written
+                logger.warning(
+                    "Storage Write API append failed for %s; falling back to a load job",
+                    table_ref, exc_info=True,
+                )
+            else:
+                # Past this point the commit may have landed even if it raises,
+                # so don't fall back to a load job (that could double-write).
+                try:
+                    self._commit_pending_stream(writer, row_type, stream_name)
+                except Exception:
+                    if not self._stream_committed(writer, stream_name):
+                        raise
+                    logger.warning(
+                        "Commit of %s raised but the stream is committed", stream_name,
+                        exc_info=True,
+                    )
+                logger.info("Committed %d rows into %s (Storage Write API)", len(rows), table_ref)
+                return len(rows)
+
+        self._load_rows_json(row_type, rows, _bulk_write_id(rows, write_id))
+        logger.info("Loaded %d rows into %s (load job)", len(rows), table_ref)
+        return len(rows)
+
+    def _append_to_pending_stream(self, writer, row_type: type[BQRow], rows: list[BQRow]) -> str:
+        """Append rows to a new PENDING stream and finalize it. Returns the stream name."""
+        from google.cloud.bigquery_storage_v1 import types as bqs_types
+
+        parent = writer.table_path(
+            self._settings.gcp_project_id, self._settings.bq_dataset, row_type.TABLE,
+        )
+        stream = _retry(
+            writer.create_write_stream,
+            parent=parent,
+            write_stream=bqs_types.WriteStream(type_=bqs_types.WriteStream.Type.PENDING),
+        )
+        descriptor, message_cls = _row_message(row_type)
+
+        requests: list = []
+        chunk: list[bytes] = []
+        chunk_bytes = 0
+        offset = 0
+
+        def _emit():
+            request = bqs_types.AppendRowsRequest(
+                write_stream=stream.name,
+                offset=offset,
+                proto_rows=bqs_types.AppendRowsRequest.ProtoData(
+                    rows=bqs_types.ProtoRows(serialized_rows=chunk),
+                ),
+            )
+            if not requests:
+                request.proto_rows.writer_schema = bqs_types.ProtoSchema(
+                    proto_descriptor=descriptor,
+                )
+            requests.append(request)
+
+        for row in rows:
+            serialized = message_cls(**row.to_proto_values()).SerializeToString()
+            if chunk and chunk_bytes + len(serialized) > _APPEND_MAX_BYTES:
+                _emit()
+                offset += len(chunk)
+                chunk, chunk_bytes = [], 0
+            chunk.append(serialized)
+            chunk_bytes += len(serialized)
+        _emit()
+
+        # Explicit offsets make the appends exactly-once within the stream:
+        # a re-sent request at an already-written offset is rejected.
+        for response in writer.append_rows(iter(requests)):
+            if response.error.code:
+                raise RuntimeError(f"AppendRows failed: {response.error.message}")
+        _retry(writer.finalize_write_stream, name=stream.name)
+        return stream.name
+
+    def _commit_pending_stream(self, writer, row_type: type[BQRow], stream_name: str) -> None:
+        from google.cloud.bigquery_storage_v1 import types as bqs_types
+
+        parent = writer.table_path(
+            self._settings.gcp_project_id, self._settings.bq_dataset, row_type.TABLE,
+        )
+        response = _retry(
+            writer.batch_commit_write_streams,
+            bqs_types.BatchCommitWriteStreamsRequest(parent=parent, write_streams=[stream_name]),
+        )
+        if response.stream_errors:
+            raise RuntimeError(f"BigQuery stream commit failed: {list(response.stream_errors)}")
+
+    @staticmethod
+    def _stream_committed(writer, stream_name: str) -> bool:
+        """Whether a PENDING stream has been committed. An unreadable state
+        counts as not committed (the original error is re-raised)."""
+        try:
+            stream = writer.get_write_stream(name=stream_name)
+        except Exception:  # noqa: BLE001
+            logger.warning("Could not read state of %s", stream_name, exc_info=True)
+            return False
+        return bool(stream.commit_time)
+
+    def _load_job_succeeded(self, job_id: str) -> bool:
+        """Whether load job `job_id` exists and finished without error."""
+        try:
+            job = self._client.get_job(job_id)
+        except Exception:  # noqa: BLE001 - NotFound or unreadable
+            return False
+        return job.state == "DONE" and not job.error_result
+
+    def _load_rows_json(self, row_type: type[BQRow], rows: list[BQRow], write_id: str) -> None:
+        job_id = "bulk_{}_{}".format(row_type.TABLE, re.sub(r"[^A-Za-z0-9_-]", "_", write_id))
+        job_config = bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            # Append against the table's own schema - skips the client's
+            # get_table() probe and never lets autodetect widen it.
+            autodetect=False,
+        )
+        try:
+            job = _retry(
+                self._client.load_table_from_json,
+                [r.to_json_row() for r in rows],
+                self.table_ref(row_type.TABLE),
+                job_id=job_id,
+                job_config=job_config,
+            )
+        except gcp_exceptions.Conflict:
+            # These rows were already submitted (a retried flush, or a retry
+            # after a lost response) - wait on that job rather than re-append.
+            logger.info("Load job %s already exists; waiting on it", job_id)
+            job = _retry(self._client.get_job, job_id)
+        except Exception:
+            # The insert may have reached BigQuery before the error.
+            if not self._load_job_succeeded(job_id):
+                raise
+            logger.warning("Load job %s raised on submit but completed", job_id, exc_info=True)
+            return
+        try:
+            _retry(job.result)
+        except Exception:
+            if not self._load_job_succeeded(job_id):
+                raise
+            logger.warning("Load job %s raised while waiting but completed", job_id, exc_info=True)
+
     def query(self, sql: str, params: dict | None = None) -> list[dict]:
+        sql, job_config = self._prepare_query(sql, params)
+        query_job = _retry(self._client.query, sql, job_config=job_config)
+        results = _retry(query_job.result)
+
+        # JSON-typed columns come back parsed (dict/list) over REST but as raw
+        # JSON strings over the Storage API. Track them from the schema so we
+        # can normalize the Storage path back to REST's shape - keeping query()
+        # output byte-identical regardless of which download path is used.
+        json_cols = {f.name for f in results.schema if f.field_type == "JSON"}
+
+        rows = self._download_rows(results, query_job)
+        return _normalize_rows(rows, json_cols)
+
+    def iter_query(
+        self,
+        sql: str,
+        params: dict | None = None,
+        page_rows: int = 10_000,
+        on_schema: Callable[[list[bigquery.SchemaField]], None] | None = None,
+    ) -> Iterator[list[dict]]:
+        """Run `sql` and yield its rows page by page, in query()'s row shape.
+
+        For results too large to hold at once (file exports): only one page -
+        an Arrow record batch from the Storage Read API, or a REST page of
+        about `page_rows` rows - is in memory at a time. A Storage failure
+        before the first page falls back to REST like `_download_rows`; one
+        mid-stream propagates, since the pages already yielded can't be
+        taken back.
+
+        `on_schema` gets the result's schema once the query has run, before
+        the first page - also when the result is empty and no page follows.
+        """
+        sql, job_config = self._prepare_query(sql, params)
+        query_job = _retry(self._client.query, sql, job_config=job_config)
+        results = _retry(query_job.result, page_size=page_rows)
+        if on_schema is not None:
+            on_schema(list(results.schema))
+        json_cols = {f.name for f in results.schema if f.field_type == "JSON"}
+
+        bqs = self._bqstorage_read_client()
+        if bqs is not None:
+            try:
+                batches = results.to_arrow_iterable(bqstorage_client=bqs)
+                first = next(batches, None)
+            except Exception:  # noqa: BLE001 - any Storage failure -> REST
+                logger.warning(
+                    "Storage API stream failed; disabling Storage and "
+                    "falling back to REST pages",
+                    exc_info=True,
+                )
+                self._bqstorage = False
+                results = self._client.list_rows(query_job.destination, page_size=page_rows)
+            else:
+                if first is not None:
+                    yield _normalize_rows(first.to_pylist(), json_cols)
+                    for batch in batches:
+                        yield _normalize_rows(batch.to_pylist(), json_cols)
+                return
+
+        for page in results.pages:
+            yield _normalize_rows([dict(r) for r in page], json_cols)
+
+    def _prepare_query(
+        self, sql: str, params: dict | None,
+    ) -> tuple[str, bigquery.QueryJobConfig]:
+        """Qualify table references and bind `params` by Python type."""
         job_config = bigquery.QueryJobConfig()
         if params:
             query_params = []
@@ -186,17 +505,18 @@ class BQClient:
         for i, ref in enumerate(models):
             sql = sql.replace(f"{model_placeholder}{i}", ref)
 
-        query_job = _retry(self._client.query, sql, job_config=job_config)
-        results = _retry(query_job.result)
+        return sql, job_config
 
-        # JSON-typed columns come back parsed (dict/list) over REST but as raw
-        # JSON strings over the Storage API. Track them from the schema so we
-        # can normalize the Storage path back to REST's shape - keeping query()
-        # output byte-identical regardless of which download path is used.
-        json_cols = {f.name for f in results.schema if f.field_type == "JSON"}
-
-        rows = self._download_rows(results, query_job)
-        return _normalize_rows(rows, json_cols)
+    def dry_run_bytes(self, sql: str) -> int | None:
+        """Bytes BigQuery would process for `sql`, via a (free) dry run that
+        bypasses its result cache. None when the dry run fails."""
+        job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        try:
+            job = self._client.query(sql, job_config=job_config)
+        except Exception:
+            logger.debug("BQ dry run failed", exc_info=True)
+            return None
+        return int(job.total_bytes_processed or 0)
 
     def _download_rows(self, results, query_job) -> list[dict]:
         """Download a query's rows as plain dicts.
@@ -250,6 +570,21 @@ class BQClient:
                 self._bqstorage = False
         return self._bqstorage or None
 
+    def _bqstorage_write_client(self):
+        """Return a reused BigQueryWriteClient, or None if unavailable."""
+        if self._bqwrite is None:
+            try:
+                from google.cloud import bigquery_storage_v1
+
+                self._bqwrite = bigquery_storage_v1.BigQueryWriteClient()
+            except Exception:  # noqa: BLE001 - missing dep/perms -> load jobs
+                logger.warning(
+                    "BigQuery Storage Write client unavailable; bulk writes use load jobs",
+                    exc_info=True,
+                )
+                self._bqwrite = False
+        return self._bqwrite or None
+
     def query_from_file(
         self, sql_file: str, params: dict | None = None
     ) -> list[dict]:
@@ -258,3 +593,15 @@ class BQClient:
             raise FileNotFoundError(f"SQL file not found: {sql_path}")
         sql = sql_path.read_text()
         return self.query(sql, params)
+
+    def iter_query_from_file(
+        self,
+        sql_file: str,
+        params: dict | None = None,
+        page_rows: int = 10_000,
+        on_schema: Callable[[list[bigquery.SchemaField]], None] | None = None,
+    ) -> Iterator[list[dict]]:
+        sql_path = SQL_BASE_DIR / sql_file
+        if not sql_path.exists():
+            raise FileNotFoundError(f"SQL file not found: {sql_path}")
+        return self.iter_query(sql_path.read_text(), params, page_rows, on_schema)
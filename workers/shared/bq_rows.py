@@ -0,0 +1,199 @@
+"""Typed rows for BQClient.write_rows_bulk.
+
+Each row class names its table and mirrors the column list in
+bigquery/schemas/<table>.sql. The field annotations double as the write
+schema: `write_rows_bulk` derives the Storage Write API proto descriptor and
+the load-job schema from them, so a column added to the .sql file must be
+added here too (as an optional field, so older writers keep working).
+
+Annotation → BigQuery type:
+    str → STRING, int → INT64, float → FLOAT64, bool → BOOL,
+    datetime → TIMESTAMP, list[str] → ARRAY<STRING>, dict → JSON.
+NOT NULL columns are annotated as plain `X` so the dataclass requires them.
+TIMESTAMP fields also accept ISO-8601 strings (the topic writers build them so).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import types as _types
+import typing
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, ClassVar
+
+_BQ_TYPES: dict[type, str] = {
+    str: "STRING",
+    int: "INT64",
+    float: "FLOAT64",
+    bool: "BOOL",
+    datetime: "TIMESTAMP",
+    dict: "JSON",
+}
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    bq_type: str
+    repeated: bool
+
+
+class BQRow:
+    """Base for typed bulk-write rows. Subclasses are dataclasses with TABLE."""
+
+    TABLE: ClassVar[str]
+    # Columns that identify a row within one logical write. The default bulk
+    # write id hashes these (plus the caller's batch key), never per-call
+    # values like enriched_at, so a retried write maps to the same load job.
+    KEY_FIELDS: ClassVar[tuple[str, ...]]
+
+    @classmethod
+    def columns(cls) -> list[ColumnSpec]:
+        cached = cls.__dict__.get("_columns")
+        if cached is None:
+            hints = typing.get_type_hints(cls)
+            cached = [_column_spec(f.name, hints[f.name]) for f in dataclasses.fields(cls)]
+            cls._columns = cached  # type: ignore[attr-defined]
+        return cached
+
+    def to_json_row(self) -> dict[str, Any]:
+        """NDJSON-ready dict (load jobs): timestamps as ISO strings, JSON as objects."""
+        out: dict[str, Any] = {}
+        for col in self.columns():
+            value = getattr(self, col.name)
+            if col.bq_type == "TIMESTAMP" and isinstance(value, datetime):
+                value = value.isoformat()
+            out[col.name] = value
+        return out
+
+    def to_proto_values(self) -> dict[str, Any]:
+        """Storage Write API values: TIMESTAMP as epoch micros, JSON as text.
+
+        NULLs are omitted (unset proto3 optional fields write NULL).
+        """
+        out: dict[str, Any] = {}
+        for col in self.columns():
+            value = getattr(self, col.name)
+            if value is None:
+                continue
+            if col.bq_type == "TIMESTAMP":
+                value = _epoch_micros(value)
+            elif col.bq_type == "JSON":
+                value = json.dumps(value, default=str)
+            out[col.name] = value
+        return out
+
+
+def _column_spec(name: str, annotation: Any) -> ColumnSpec:
+    args = typing.get_args(annotation)
+    if typing.get_origin(annotation) in (typing.Union, _types.UnionType) and type(None) in args:
+        (annotation,) = [a for a in args if a is not type(None)]
+    repeated = typing.get_origin(annotation) is list
+    base = typing.get_args(annotation)[0] if repeated else annotation
+    base = typing.get_origin(base) or base
+    if base not in _BQ_TYPES:
+        raise TypeError(f"Unsupported column type for {name}: {annotation!r}")
+    return ColumnSpec(name=name, bq_type=_BQ_TYPES[base], repeated=repeated)
+
+
+def _epoch_micros(value: datetime | str) -> int:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1_000_000)
+
+
+# ---------------------------------------------------------------------------
+# enriched_posts / enriched_comments
+# ---------------------------------------------------------------------------
+
+@dataclass(kw_only=True)
+class _EnrichmentColumns:
+    """Enrichment payload shared by enriched_posts and enriched_comments
+    (same column order after each table's identity block)."""
+
+    context: str | None = None
+    sentiment: str | None = None
+    emotion: str | None = None
+    entities: list[str] = field(default_factory=list)
+    themes: list[str] = field(default_factory=list)
+    ai_summary: str | None = None
+    language: str | None = None
+    content_type: str | None = None
+    relevance_reason: str | None = None
+    is_related_to_task: bool | None = None
+    detected_brands: list[str] = field(default_factory=list)
+    channel_type: str | None = None
+    custom_fields: dict | None = None
+    source: str | None = None
+    enriched_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+@dataclass(kw_only=True)
+class EnrichedPostRow(BQRow, _EnrichmentColumns):
+    TABLE: ClassVar[str] = "enriched_posts"
+    KEY_FIELDS: ClassVar[tuple[str, ...]] = ("post_id", "collection_id", "agent_id", "agent_version", "source")
+
+    post_id: str
+    collection_id: str | None = None
+    agent_id: str | None = None
+    agent_version: int | None = None
+
+
+@dataclass(kw_only=True)
+class EnrichedCommentRow(BQRow, _EnrichmentColumns):
+    TABLE: ClassVar[str] = "enriched_comments"
+    KEY_FIELDS: ClassVar[tuple[str, ...]] = ("comment_id", "collection_id", "agent_id", "agent_version", "source")
+
+    comment_id: str
+    post_id: str | None = None
+    root_comment_id: str | None = None
+    collection_id: str | None = None
+    agent_id: str | None = None
+    agent_version: int | None = None
+
+
+# ---------------------------------------------------------------------------
+# topic_clusters
+# ---------------------------------------------------------------------------
+
+@dataclass(kw_only=True)
+class TopicClusterRow(BQRow):
+    TABLE: ClassVar[str] = "topic_clusters"
+    KEY_FIELDS: ClassVar[tuple[str, ...]] = ("agent_id", "cluster_id")
+
+    agent_id: str
+    cluster_id: str
+    clustered_at: datetime
+    algorithm_version: str | None = None
+    header: str | None = None
+    subheader: str | None = None
+    beat_type: str | None = None
+    keywords: list[str] = field(default_factory=list)
+    anchor_entities: list[str] = field(default_factory=list)
+    anchor_themes: list[str] = field(default_factory=list)
+    anchor_brands: list[str] = field(default_factory=list)
+    anchor_content_types: list[str] = field(default_factory=list)
+    member_post_ids: list[str] = field(default_factory=list)
+    representative_post_ids: list[str] = field(default_factory=list)
+    post_count: int | None = None
+    total_views: int | None = None
+    total_likes: int | None = None
+    total_comments: int | None = None
+    total_shares: int | None = None
+    positive_count: int | None = None
+    negative_count: int | None = None
+    neutral_count: int | None = None
+    mixed_count: int | None = None
+    earliest_post: datetime | None = None
+    median_post_time: datetime | None = None
+    latest_post: datetime | None = None
+    estimated_post_count: int | None = None
+    estimated_views: int | None = None
+    estimated_likes: int | None = None
+    estimated_comments: int | None = None
+    estimated_shares: int | None = None
+    recency_score: float | None = None
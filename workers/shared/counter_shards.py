@@ -0,0 +1,102 @@
+"""Sharded pipeline counters for collection_status docs.
+
+The per-state `counts.*` and `total_posts_in_dag` counters used to live on the
+collection_status/{collection_id} doc itself, so every step flush, claim and
+crawl batch Incremented the same document - Firestore sustains roughly one
+write/sec per document, which capped how many streaming steps and collections
+could run per agent at once.
+
+Writers now pick a random shard doc under
+collection_status/{collection_id}/counter_shards/{n} and Increment there.
+Readers add the shards on top of the parent doc's fields: the parent keeps
+whatever a recount (or a pre-shard run) wrote, shards hold the increments
+since. Shard docs also carry `updated_at`, so the dashboard freshness stamp
+still moves with every counter write.
+"""
+
+import random
+from collections.abc import Iterable
+from datetime import datetime
+
+from google.cloud.firestore_v1 import transforms
+
+SHARDS_SUBCOLLECTION = "counter_shards"
+
+
+def read_shards(status_ref) -> list[dict]:
+    """Every existing shard of one status doc, as dicts.
+
+    Lists the subcollection rather than addressing shards 0..num_shards-1:
+    shards written under a larger `pipeline_counter_shards` setting must still
+    be counted after it shrinks.
+    """
+    return [
+        shard.to_dict()
+        for shard in status_ref.collection(SHARDS_SUBCOLLECTION).stream()
+    ]
+
+
+def random_shard_ref(status_ref, num_shards: int):
+    """Pick the shard a writer should Increment."""
+    shard = random.randrange(max(1, num_shards))
+    return status_ref.collection(SHARDS_SUBCOLLECTION).document(str(shard))
+
+
+def shard_increment(
+    state_deltas: dict[str, int],
+    now: datetime,
+    total_delta: int = 0,
+) -> dict:
+    """Build a `set(..., merge=True)` payload applying deltas to one shard.
+
+    Merge-set (not update) so the first write to a shard creates it.
+    """
+    payload: dict = {"updated_at": now}
+    counts = {
+        state: transforms.Increment(delta)
+        for state, delta in state_deltas.items()
+        if delta != 0
+    }
+    if counts:
+        payload["counts"] = counts
+    if total_delta:
+        payload["total_posts_in_dag"] = transforms.Increment(total_delta)
+    return payload
+
+
+def fold_shards(status: dict, shards: Iterable[dict | None]) -> dict:
+    """Add shard counters onto a raw collection_status dict, in place.
+
+    `counts` and `total_posts_in_dag` become parent + sum(shards);
+    `updated_at` becomes the latest of the parent's and any shard's. With no
+    shards (never sharded, or cleared by a recount) `status` is untouched.
+    Returns `status` for chaining.
+    """
+    shards = [shard for shard in shards if shard]
+    if not shards:
+        return status
+    counts: dict[str, int] = dict(status.get("counts") or {})
+    total = status.get("total_posts_in_dag") or 0
+    updated_at = status.get("updated_at")
+    for shard in shards:
+        for state, n in (shard.get("counts") or {}).items():
+            counts[state] = counts.get(state, 0) + (n or 0)
+        total += shard.get("total_posts_in_dag") or 0
+        shard_ts = shard.get("updated_at")
+        if shard_ts is not None and (updated_at is None or _later(shard_ts, updated_at)):
+            updated_at = shard_ts
+    status["counts"] = counts
+    status["total_posts_in_dag"] = total
+    if updated_at is not None:
+        status["updated_at"] = updated_at
+    return status
+
+
+def _later(a, b) -> bool:
+    """Compare two Firestore timestamps (datetimes or ISO strings)."""
+    try:
+        return a > b
+    except TypeError:
+        a_iso = a.isoformat() if hasattr(a, "isoformat") else str(a)
+        b_iso = b.isoformat() if hasattr(b, "isoformat") else str(b)
+        return a_iso > b_iso
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 from google.cloud import firestore
 
 from config.settings import Settings, get_settings
+from workers.shared.counter_shards import fold_shards, read_shards
 
 logger = logging.getLogger(__name__)
 
@@ -67,12 +68,23 @@ class FirestoreClient:
                 data[key] = data[key].isoformat()
         return data
 
-    def get_collection_status(self, collection_id: str) -> dict | None:
+    def get_collection_status(
+        self, collection_id: str, include_counter_shards: bool = True,
+    ) -> dict | None:
         doc_ref = self._db.collection("collection_status").document(collection_id)
         doc = doc_ref.get()
         if not doc.exists:
             return None
-        return self._normalize_status(doc.to_dict())
+        data = doc.to_dict()
+        # A running pipeline Increments counter shards, not the status doc
+        # (see workers/shared/counter_shards.py). The final recount folds them
+        # back and clears them, but cancelled and failed runs can end without
+        # one - so fold whatever shards exist, whatever the status. Callers
+        # that only need `status` (the pipeline's per-tick cancellation check)
+        # skip the shard read.
+        if include_counter_shards:
+            fold_shards(data, read_shards(doc_ref))
+        return self._normalize_status(data)
 
     def get_collection_statuses(
         self, collection_ids: list[str]
@@ -84,17 +96,31 @@ class FirestoreClient:
         id (missing docs map to ``None``). The dashboard freshness stamp fired one
         read per collection (36+ on a large share, all before the response-cache
         check); this collapses them into a single batched read.
+
+        Counter shards are folded in exactly as ``get_collection_status`` does
+        (every existing shard, listed per collection), so ``counts`` and the
+        ``updated_at`` freshness stamp move with every counter write and the
+        two reads agree even after ``pipeline_counter_shards`` changes. Every
+        status is folded, not just running ones: a cancelled or failed run can
+        leave shards behind.
         """
         if not collection_ids:
             return {}
         col = self._db.collection("collection_status")
         # Dedupe refs but keep a result entry for every requested id.
         unique_ids = list(dict.fromkeys(collection_ids))
-        refs = [col.document(cid) for cid in unique_ids]
-        out: dict[str, dict | None] = {cid: None for cid in collection_ids}
-        for doc in self._db.get_all(refs):
+        refs = {cid: col.document(cid) for cid in unique_ids}
+        raw: dict[str, dict] = {}
+        for doc in self._db.get_all(list(refs.values())):
             if doc.exists:
-                out[doc.id] = self._normalize_status(doc.to_dict())
+                raw[doc.id] = doc.to_dict()
+
+        for cid, data in raw.items():
+            fold_shards(data, read_shards(refs[cid]))
+
+        out: dict[str, dict | None] = {cid: None for cid in collection_ids}
+        for cid, data in raw.items():
+            out[cid] = self._normalize_status(data)
         return out
 
     # --- Statistical Signature methods ---
@@ -268,6 +294,36 @@ class FirestoreClient:
             logger.warning("Failed to query snapshots for collection %s", collection_id, exc_info=True)
             return []
 
+    # --- Gemini batch enrichment jobs ---
+
+    @staticmethod
+    def _batch_job_doc_id(job_name: str) -> str:
+        # Job names are resource paths (".../batchPredictionJobs/123").
+        return job_name.rstrip("/").rsplit("/", 1)[-1]
+
+    def save_enrichment_batch_job(self, collection_id: str, job_name: str, data: dict) -> None:
+        """Record a submitted batch enrichment job so the collector can pick
+        up its results after the submitting request has returned."""
+        self._db.collection("enrichment_batch_jobs").document(self._batch_job_doc_id(job_name)).set({
+            **data,
+            "collection_id": collection_id,
+            "job_name": job_name,
+            "status": "pending",
+            "created_at": datetime.now(timezone.utc),
+        })
+
+    def get_pending_enrichment_batch_jobs(self, collection_id: str | None = None) -> list[dict]:
+        """Submitted batch enrichment jobs whose results haven't been collected."""
+        query = self._db.collection("enrichment_batch_jobs").where("status", "==", "pending")
+        if collection_id:
+            query = query.where("collection_id", "==", collection_id)
+        return [doc.to_dict() for doc in query.stream()]
+
+    def update_enrichment_batch_job(self, job_name: str, **fields) -> None:
+        """Update a batch enrichment job record (status, counts, error)."""
+        fields["updated_at"] = datetime.now(timezone.utc)
+        self._db.collection("enrichment_batch_jobs").document(self._batch_job_doc_id(job_name)).update(fields)
+
     def get_agent_snapshot_count(self, agent_id: str) -> int:
         """Sum snapshot_count across all collections linked to an agent."""
         agent_doc = self._db.collection("agents").document(agent_id).get()
@@ -621,6 +677,28 @@ class FirestoreClient:
             results.append(entry)
         return results
 
+    def get_topic_candidates(self, agent_id: str, keys: list[str]) -> dict[str, dict]:
+        """Batch-read pass-1 candidate cache entries from
+        agents/{agent_id}/topic_candidates. Returns `key -> entry` for the keys
+        that exist; one `get_all` round-trip per 300 keys."""
+        sub = self._db.collection("agents").document(agent_id).collection("topic_candidates")
+        out: dict[str, dict] = {}
+        for chunk in self._chunk(iter(dict.fromkeys(keys)), 300):
+            for snap in self._db.get_all([sub.document(k) for k in chunk]):
+                if snap.exists:
+                    out[snap.id] = snap.to_dict() or {}
+        return out
+
+    def put_topic_candidates(self, agent_id: str, entries: dict[str, dict]) -> None:
+        """Write pass-1 candidate cache entries (`key -> entry`), overwriting.
+        Firestore TTL on `expires_at` reaps entries no run has refreshed."""
+        sub = self._db.collection("agents").document(agent_id).collection("topic_candidates")
+        for chunk in self._chunk(iter(entries.items()), 400):
+            batch = self._db.batch()
+            for key, entry in chunk:
+                batch.set(sub.document(key), entry)
+            batch.commit()
+
     def get_due_recurring_agents(self) -> list[dict]:
         """Return recurring agents that are due for their next scheduled run.
 
@@ -1818,6 +1896,27 @@ class FirestoreClient:
         self._db.collection("artifacts").document(artifact_id).delete()
         logger.info("Deleted artifact %s", artifact_id)
 
+    # --- Data export methods ---
+
+    def create_data_export(self, export_id: str, data: dict) -> None:
+        """Store a file-backed export's status document (doc ID == export_id)."""
+        self._db.collection("data_exports").document(export_id).set(data)
+
+    def get_data_export(self, export_id: str) -> dict | None:
+        doc = self._db.collection("data_exports").document(export_id).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        data["export_id"] = doc.id
+        for key in ("created_at", "updated_at", "completed_at"):
+            if key in data and hasattr(data[key], "isoformat"):
+                data[key] = data[key].isoformat()
+        return data
+
+    def update_data_export(self, export_id: str, fields: dict) -> None:
+        merged = {**fields, "updated_at": datetime.now(timezone.utc)}
+        self._db.collection("data_exports").document(export_id).update(merged)
+
     # --- Feed link methods ---
 
     def create_feed_link(self, token: str, data: dict) -> None:
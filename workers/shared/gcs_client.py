@@ -1,14 +1,21 @@
+import hashlib
 import logging
 import mimetypes
+import resource
+import threading
+from collections import OrderedDict
 from io import BytesIO
 from urllib.parse import urlparse
+from uuid import uuid4
 
 import requests
+from google.api_core.exceptions import PreconditionFailed
 from google.cloud import storage
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from config.settings import Settings, get_settings
+from workers.shared import media_renditions
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +35,16 @@ _TIMEOUT_VIDEO = (10, 120)    # videos need longer read timeout
 
 _VIDEO_EXTENSIONS = frozenset({".mp4", ".webm", ".mov", ".avi", ".mkv"})
 
+# Content-addressed media layout (see GCSClient.download_from_url):
+#   media/sha256/<h[:2]>/<h><ext>   the bytes, one object per distinct content
+#   media/by-url/<sha256(url)>      empty marker; metadata → the stored ref
+#   media/staging/<uuid>            large bodies mid-upload, before the hash is known
+_CONTENT_PREFIX = "media/sha256"
+_URL_INDEX_PREFIX = "media/by-url"
+_STAGING_PREFIX = "media/staging"
+_READ_CHUNK = 256 * 1024
+_URL_INDEX_CACHE_SIZE = 10_000
+
 
 def _is_video_url(url: str) -> bool:
     """Check URL path extension or MIME hint to select appropriate timeout."""
@@ -57,28 +74,208 @@ def _build_download_session() -> requests.Session:
     return session
 
 
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def _content_path(digest: str, content_type: str) -> str:
+    ext = mimetypes.guess_extension(content_type.split(";")[0].strip()) or ".bin"
+    return f"{_CONTENT_PREFIX}/{digest[:2]}/{digest}{ext}"
+
+
+class MediaStats:
+    """Per-client media storage counters (thread-safe). One GCSClient per
+    pipeline run, so these are per-run numbers."""
+
+    _FIELDS = (
+        "downloads", "downloaded_bytes", "uploaded_bytes",
+        "url_index_hits", "download_bytes_saved",
+        "content_dedup_hits", "storage_bytes_saved", "renditions",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self._FIELDS, 0)
+
+    def add(self, **deltas: int) -> None:
+        with self._lock:
+            for key, value in deltas.items():
+                self._counts[key] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = dict(self._counts)
+        # ru_maxrss is KiB on Linux - the process high-water mark, which is
+        # what a Cloud Run memory limit trips on.
+        out["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        return out
+
+
 class GCSClient:
     def __init__(self, settings: Settings | None = None):
         self._settings = settings or get_settings()
         self._client = storage.Client(project=self._settings.gcp_project_id)
         self._bucket = self._client.bucket(self._settings.gcs_media_bucket)
         self._download_session = _build_download_session()
+        # Bodies up to this size are hashed in memory and uploaded in one
+        # request; larger ones stream through a resumable upload in chunks of
+        # this size, so a download never holds more than this in memory.
+        self._buffer_bytes = max(1, self._settings.media_stream_buffer_mb) * 1024 * 1024
+        self._url_index: OrderedDict[str, dict] = OrderedDict()
+        self._url_index_lock = threading.Lock()
+        self.media_stats = MediaStats()
 
-    def upload_media(
-        self,
-        collection_id: str,
-        post_id: str,
-        index: int,
-        content_bytes: bytes,
-        content_type: str,
-    ) -> str:
-        ext = mimetypes.guess_extension(content_type) or ".bin"
-        blob_path = f"{collection_id}/{post_id}_{index}{ext}"
-        blob = self._bucket.blob(blob_path)
-        blob.upload_from_file(BytesIO(content_bytes), content_type=content_type)
-        gcs_uri = f"gs://{self._settings.gcs_media_bucket}/{blob_path}"
-        logger.debug("Uploaded media to %s", gcs_uri)
-        return gcs_uri
+    def _gcs_uri(self, blob_path: str) -> str:
+        return f"gs://{self._settings.gcs_media_bucket}/{blob_path}"
+
+    # ------------------------------------------------------------------
+    # URL → stored media index
+    # ------------------------------------------------------------------
+
+    def lookup_url(self, url: str) -> dict | None:
+        """Stored media ref for `url` from an earlier download (any
+        collection), or None. In-process LRU first, then the GCS marker."""
+        key = _url_key(url)
+        with self._url_index_lock:
+            cached = self._url_index.get(key)
+            if cached is not None:
+                self._url_index.move_to_end(key)
+        if cached is None:
+            try:
+                marker = self._bucket.get_blob(f"{_URL_INDEX_PREFIX}/{key}")
+            except Exception:
+                logger.debug("Media URL index lookup failed for %s", url[:100], exc_info=True)
+                return None
+            meta = (marker.metadata or {}) if marker is not None else {}
+            if not meta.get("gcs_uri"):
+                return None
+            cached = {
+                "gcs_uri": meta["gcs_uri"],
+                "content_type": meta.get("content_type", "application/octet-stream"),
+                "size_bytes": int(meta.get("size_bytes") or 0),
+                "sha256": meta.get("sha256"),
+            }
+            self._remember_url(key, cached)
+        ref = dict(cached)
+        ref["media_type"] = ref["content_type"].split("/")[0]
+        ref["original_url"] = url
+        return ref
+
+    def _remember_url(self, key: str, entry: dict) -> None:
+        with self._url_index_lock:
+            self._url_index[key] = entry
+            self._url_index.move_to_end(key)
+            while len(self._url_index) > _URL_INDEX_CACHE_SIZE:
+                self._url_index.popitem(last=False)
+
+    def _index_url(self, url: str, ref: dict) -> None:
+        key = _url_key(url)
+        entry = {k: ref[k] for k in ("gcs_uri", "content_type", "size_bytes", "sha256")}
+        self._remember_url(key, entry)
+        try:
+            marker = self._bucket.blob(f"{_URL_INDEX_PREFIX}/{key}")
+            marker.metadata = {k: str(v) for k, v in entry.items()}
+            marker.upload_from_string(b"", content_type="application/octet-stream")
+        except Exception:
+            # The media is stored either way; only the cross-run skip is lost.
+            logger.debug("Failed to write media URL index for %s", url[:100], exc_info=True)
+
+    # ------------------------------------------------------------------
+    # Content-addressed storage
+    # ------------------------------------------------------------------
+
+    def _store_small(self, data: bytes, content_type: str) -> tuple[str, str, bool]:
+        """Upload an in-memory body under its hash. Returns (gcs_uri, sha256, deduped)."""
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._bucket.blob(_content_path(digest, content_type))
+        if blob.exists():
+            return self._gcs_uri(blob.name), digest, True
+        try:
+            blob.upload_from_file(BytesIO(data), content_type=content_type, if_generation_match=0)
+        except PreconditionFailed:
+            return self._gcs_uri(blob.name), digest, True  # raced another writer
+        self.media_stats.add(uploaded_bytes=len(data))
+        if content_type.startswith("image/"):
+            # Bytes are already in memory - cheaper than the API's lazy path.
+            self._store_renditions(blob.name, lambda: media_renditions.renditions_for_image(data))
+        return self._gcs_uri(blob.name), digest, False
+
+    def _store_renditions(self, blob_path: str, render) -> None:
+        if not self._settings.media_renditions_at_download:
+            return
+        try:
+            renditions = render()
+            if renditions:
+                media_renditions.upload_renditions(self._bucket, blob_path, renditions)
+                self.media_stats.add(renditions=1)
+        except Exception:
+            # The /media proxy generates missing renditions on first request.
+            logger.debug("Rendition generation failed for %s", blob_path, exc_info=True)
+
+    def _store_stream(
+        self, head: bytes, rest, content_type: str,
+    ) -> tuple[str, str, int, bool]:
+        """Stream `head` + the `rest` chunks into a resumable staging upload
+        while hashing, then rewrite it (server-side) to its content path.
+        Returns (gcs_uri, sha256, size, deduped)."""
+        hasher = hashlib.sha256(head)
+        size = len(head)
+        staging = self._bucket.blob(f"{_STAGING_PREFIX}/{uuid4().hex}")
+        try:
+            with staging.open("wb", chunk_size=self._buffer_bytes, content_type=content_type) as out:
+                out.write(head)
+                for chunk in rest:
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            self.media_stats.add(uploaded_bytes=size)
+            digest = hasher.hexdigest()
+            dest = self._bucket.blob(_content_path(digest, content_type))
+            deduped = False
+            try:
+                token, _, _ = dest.rewrite(staging, if_generation_match=0)
+                while token is not None:
+                    token, _, _ = dest.rewrite(staging, token=token, if_generation_match=0)
+            except PreconditionFailed:
+                deduped = True
+            return self._gcs_uri(dest.name), digest, size, deduped
+        finally:
+            try:
+                staging.delete()
+            except Exception:
+                logger.debug("Failed to delete staging blob %s", staging.name, exc_info=True)
+
+    def store_media_file(self, path: str, content_type: str, original_url: str) -> dict:
+        """Store a local file (e.g. a yt-dlp download) content-addressed and
+        index it under `original_url`. Reads in chunks, never the whole file."""
+
+        def _chunks(f):
+            while chunk := f.read(_READ_CHUNK):
+                yield chunk
+
+        with open(path, "rb") as f:
+            head = f.read(self._buffer_bytes)
+            if len(head) < self._buffer_bytes:
+                gcs_uri, digest, deduped = self._store_small(head, content_type)
+                size = len(head)
+            else:
+                gcs_uri, digest, size, deduped = self._store_stream(head, _chunks(f), content_type)
+        if deduped:
+            self.media_stats.add(content_dedup_hits=1, storage_bytes_saved=size)
+        elif media_renditions.is_video(path, content_type):
+            self._store_renditions(
+                gcs_uri.split("/", 3)[3], lambda: media_renditions.renditions_for_video(path),
+            )
+        ref = {
+            "gcs_uri": gcs_uri,
+            "media_type": content_type.split("/")[0],
+            "content_type": content_type,
+            "size_bytes": size,
+            "original_url": original_url,
+            "sha256": digest,
+        }
+        self._index_url(original_url, ref)
+        return ref
 
     def upload_alert_render(self, alert_id: str, key: str, png_bytes: bytes) -> str:
         """Upload a rendered alert-widget PNG; return its blob path.
@@ -100,27 +297,58 @@ class GCSClient:
         post_id: str,
         index: int,
     ) -> dict:
+        """Download `url` into content-addressed storage and return its media ref.
+
+        A URL already in the index returns the stored ref without any
+        download. Otherwise the body is streamed: up to `media_stream_buffer_mb`
+        is hashed in memory and uploaded in one request (skipped when that
+        content is already stored); anything larger goes through a resumable
+        staging upload. `collection_id` / `post_id` / `index` only label logs -
+        the object is shared by every post that references the same bytes.
+        """
+        indexed = self.lookup_url(url)
+        if indexed is not None:
+            self.media_stats.add(url_index_hits=1, download_bytes_saved=indexed["size_bytes"])
+            logger.debug("Media URL index hit for post %s: %s", post_id, indexed["gcs_uri"])
+            return indexed
         try:
             timeout = _TIMEOUT_VIDEO if _is_video_url(url) else _TIMEOUT_DEFAULT
-            resp = self._download_session.get(url, timeout=timeout)
-            resp.raise_for_status()
-            content_type = resp.headers.get("content-type", "application/octet-stream")
-            content_bytes = resp.content
+            with self._download_session.get(url, timeout=timeout, stream=True) as resp:
+                resp.raise_for_status()
+                content_type = resp.headers.get("content-type", "application/octet-stream")
+                chunks = resp.iter_content(chunk_size=_READ_CHUNK)
+                head = bytearray()
+                for chunk in chunks:
+                    head += chunk
+                    if len(head) >= self._buffer_bytes:
+                        break
+                else:
+                    chunks = None  # body fit in the buffer
+                if chunks is None:
+                    gcs_uri, digest, deduped = self._store_small(bytes(head), content_type)
+                    size = len(head)
+                else:
+                    gcs_uri, digest, size, deduped = self._store_stream(
+                        bytes(head), chunks, content_type,
+                    )
+            self.media_stats.add(downloads=1, downloaded_bytes=size)
+            if deduped:
+                self.media_stats.add(content_dedup_hits=1, storage_bytes_saved=size)
             logger.debug(
-                "Downloaded media: %s (%s, %d bytes)",
-                url[:100], content_type, len(content_bytes),
-            )
-
-            gcs_uri = self.upload_media(
-                collection_id, post_id, index, content_bytes, content_type
+                "Downloaded media for post %s/%s_%d: %s (%s, %d bytes%s)",
+                collection_id, post_id, index, url[:100], content_type, size,
+                ", already stored" if deduped else "",
             )
-            return {
+            ref = {
                 "gcs_uri": gcs_uri,
                 "media_type": content_type.split("/")[0],
                 "content_type": content_type,
-                "size_bytes": len(content_bytes),
+                "size_bytes": size,
                 "original_url": url,
+                "sha256": digest,
             }
+            self._index_url(url, ref)
+            return ref
         except Exception as e:
             logger.warning("Failed to download media from %s: %s", url, e)
             return {
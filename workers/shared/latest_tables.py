@@ -0,0 +1,77 @@
+"""Incremental refresh of the current-state tables behind the scope TVFs.
+
+`posts_latest`, `enriched_posts_latest` and `post_engagements_latest` hold one
+row per key - the row the scope_* TVFs used to pick with ROW_NUMBER() over the
+full history on every call. Each refresh MERGEs base rows written since
+(newest row already in the latest table - `latest_tables_lookback_hours`)
+using bigquery/batch_queries/refresh_<table>.sql; the timestamp filter prunes
+the base tables' daily partitions, so a refresh reads hours, not history.
+
+Readers never depend on refresh timing: functions/latest.sql overlays the
+last 2 days of base rows on each latest table. A refresh therefore only has
+to land within that window - it runs from the scheduler tick
+(/internal/latest-tables/refresh in production, OngoingScheduler in dev).
+
+Usage (first deploy / after an outage longer than 2 days):
+    python -m workers.shared.latest_tables --full
+"""
+
+import logging
+import sys
+from datetime import datetime, timedelta
+
+from config.settings import get_settings
+from workers.shared.bq_client import BQClient
+
+logger = logging.getLogger(__name__)
+
+# (latest table, base-table timestamp column, refresh MERGE)
+LATEST_TABLES: tuple[tuple[str, str, str], ...] = (
+    ("posts_latest", "collected_at", "batch_queries/refresh_posts_latest.sql"),
+    ("enriched_posts_latest", "enriched_at", "batch_queries/refresh_enriched_posts_latest.sql"),
+    ("post_engagements_latest", "fetched_at", "batch_queries/refresh_post_engagements_latest.sql"),
+)
+
+# `since` for a full rebuild - every dated base row.
+_FULL_SINCE = "1970-01-01T00:00:00+00:00"
+
+
+def _refresh_since(bq: BQClient, table: str, ts_col: str, lookback: timedelta) -> str:
+    """ISO lower bound for the next MERGE: newest stored row minus the lookback."""
+    rows = bq.query(f"SELECT MAX({ts_col}) AS ts FROM social_listening.{table}")
+    newest = rows[0].get("ts") if rows else None
+    if not newest:
+        return _FULL_SINCE
+    if isinstance(newest, str):
+        newest = datetime.fromisoformat(newest)
+    return (newest - lookback).isoformat()
+
+
+def refresh_latest_tables(bq: BQClient | None = None, *, full: bool = False) -> dict[str, str]:
+    """MERGE new base rows into every latest table.
+
+    Returns {table: since} for the tables refreshed. A failure on one table is
+    logged and doesn't stop the others - the next tick retries it from the
+    same watermark.
+    """
+    settings = get_settings()
+    bq = bq or BQClient(settings)
+    lookback = timedelta(hours=settings.latest_tables_lookback_hours)
+    refreshed: dict[str, str] = {}
+    for table, ts_col, sql_file in LATEST_TABLES:
+        try:
+            since = _FULL_SINCE if full else _refresh_since(bq, table, ts_col, lookback)
+            bq.query_from_file(sql_file, {"since": since})
+        except Exception:
+            logger.exception("Latest-table refresh failed for %s", table)
+            continue
+        refreshed[table] = since
+        logger.info("Refreshed %s (since %s)", table, since)
+    return refreshed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    result = refresh_latest_tables(full="--full" in sys.argv[1:])
+    print(result)
+    sys.exit(0 if len(result) == len(LATEST_TABLES) else 1)
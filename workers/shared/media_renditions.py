@@ -0,0 +1,195 @@
+"""Sized WebP renditions of stored media, for cards, feeds and emails.
+
+The `/media` proxy used to stream the original object for every dashboard
+card and email image - full-resolution photos and multi-MB videos where a
+320px still would do. Renditions are small WebP images stored next to the
+media under a deterministic path, so any holder of a media path can ask for
+one (`GET /media/{path}?variant=thumb`) without a schema change:
+
+    renditions/<variant>/<original path>.webp
+
+- `thumb` / `card` - the image downscaled to 320 / 640px wide (never upscaled).
+- `poster` - a frame ~1s into a video, at card width (a video's `card` and
+  `thumb` are the same frame). Needs an `ffmpeg` binary on PATH; without
+  one, video renditions are simply unavailable.
+
+Renditions are generated eagerly by the worker when a small image is stored
+(`GCSClient`, the bytes are already in memory) or when yt-dlp leaves a video
+on disk, and lazily by the API on first request for everything else
+(`ensure_rendition`). The originals are content-addressed, so a rendition is
+never stale.
+
+The lazy path runs on an unauthenticated request, so it only renders stored
+media (`is_source_path`: known prefixes - never a rendition, the URL index or
+a staging upload) with a known image or video extension, and only image
+sources small enough to decode on the request path; anything else is served
+as the original.
+"""
+
+import io
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+RENDITION_PREFIX = "renditions"
+RENDITION_CONTENT_TYPE = "image/webp"
+
+# variant → max width in px
+IMAGE_VARIANTS = {"thumb": 320, "card": 640}
+VIDEO_VARIANTS = {"poster": 640}
+VARIANTS = {**IMAGE_VARIANTS, **VIDEO_VARIANTS}
+
+# Lazy generation reads the whole source: an image into API memory (then
+# decodes it), a video onto local disk for ffmpeg.
+MAX_IMAGE_SOURCE_BYTES = 20 * 1024 * 1024
+MAX_VIDEO_SOURCE_BYTES = 200 * 1024 * 1024
+# Decoded size guard - a small, highly compressed file can still be huge.
+MAX_SOURCE_PIXELS = 40_000_000
+_WEBP_QUALITY = 80
+_POSTER_SEEK_SEC = "1"
+_FFMPEG_TIMEOUT_SEC = 30
+
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+_VIDEO_EXTENSIONS = (".mp4", ".mov", ".webm", ".mkv", ".avi", ".m4v")
+
+# Where originals live: content-addressed media (GCSClient), dashboard
+# uploads and alert renders. The pre-content-addressing layout,
+# <collection_id>/<post_id>_<index><ext>, sits at the bucket root.
+_SOURCE_PREFIXES = ("media/sha256/", "dashboard-media/", "alert-renders/")
+_NON_SOURCE_ROOTS = frozenset({RENDITION_PREFIX, "media", "dashboard-media", "alert-renders"})
+
+
+def rendition_path(path: str, variant: str) -> str:
+    return f"{RENDITION_PREFIX}/{variant}/{path}.webp"
+
+
+def is_source_path(path: str) -> bool:
+    """Whether `path` is where stored media lives - the only objects that
+    renditions are asked for."""
+    parts = path.split("/")
+    if any(part in ("", ".", "..") for part in parts):
+        return False
+    if path.startswith(_SOURCE_PREFIXES):
+        return True
+    return len(parts) == 2 and parts[0] not in _NON_SOURCE_ROOTS
+
+
+def _renderable(path: str) -> bool:
+    return path.lower().endswith(_IMAGE_EXTENSIONS + _VIDEO_EXTENSIONS)
+
+
+def is_video(path: str, content_type: str | None) -> bool:
+    if content_type and content_type.startswith("video/"):
+        return True
+    return path.lower().endswith(_VIDEO_EXTENSIONS)
+
+
+def render_image(data: bytes, width: int) -> bytes:
+    """Downscale an image to at most `width` px wide and encode as WebP."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as img:
+        if img.width * img.height > MAX_SOURCE_PIXELS:
+            raise ValueError(f"image too large to render ({img.width}x{img.height})")
+        if img.width > width:
+            # JPEG: decode at the smallest scale that keeps both sides >= the
+            # target width, so an EXIF rotation can't leave it too narrow.
+            img.draft("RGB", (width, width))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+        if img.width > width:
+            img = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, "WEBP", quality=_WEBP_QUALITY, method=4)
+        return out.getvalue()
+
+
+def posters_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def extract_poster(video_path: str) -> bytes | None:
+    """PNG of a frame ~1s into the video (the first frame for shorter clips),
+    or None when ffmpeg is unavailable or fails."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    for seek in (_POSTER_SEEK_SEC, "0"):
+        try:
+            proc = subprocess.run(
+                [ffmpeg, "-v", "error", "-ss", seek, "-i", video_path,
+                 "-frames:v", "1", "-f", "image2pipe", "-vcodec", "png", "-"],
+                capture_output=True, timeout=_FFMPEG_TIMEOUT_SEC, check=False,
+            )
+        except (OSError, subprocess.SubprocessError):
+            logger.warning("ffmpeg poster extraction failed for %s", video_path, exc_info=True)
+            return None
+        if proc.returncode == 0 and proc.stdout:
+            return proc.stdout
+    return None
+
+
+def renditions_for_image(data: bytes) -> dict[str, bytes]:
+    return {variant: render_image(data, width) for variant, width in IMAGE_VARIANTS.items()}
+
+
+def renditions_for_video(video_path: str) -> dict[str, bytes]:
+    frame = extract_poster(video_path)
+    if frame is None:
+        return {}
+    poster = render_image(frame, VIDEO_VARIANTS["poster"])
+    return {"poster": poster, "card": poster, "thumb": render_image(frame, IMAGE_VARIANTS["thumb"])}
+
+
+def upload_renditions(bucket, path: str, renditions: dict[str, bytes]) -> None:
+    for variant, data in renditions.items():
+        blob = bucket.blob(rendition_path(path, variant))
+        blob.cache_control = "public, max-age=604800, immutable"
+        blob.upload_from_string(data, content_type=RENDITION_CONTENT_TYPE)
+
+
+def ensure_rendition(bucket, path: str, variant: str) -> str | None:
+    """Blob path of `variant` for the object at `path`, generating (and
+    storing) it from the original when missing. None when `path` isn't a
+    source (`is_source_path`) with a media extension, or the original is
+    missing, too large, or can't produce this variant (e.g. a poster without
+    ffmpeg, an image variant of an undecodable file).
+
+    Blocking - call off the event loop."""
+    if not (is_source_path(path) and _renderable(path)):
+        return None
+    target = rendition_path(path, variant)
+    if bucket.blob(target).exists():
+        return target
+
+    source = bucket.get_blob(path)
+    if source is None:
+        return None
+    video = is_video(path, source.content_type)
+    limit = MAX_VIDEO_SOURCE_BYTES if video else MAX_IMAGE_SOURCE_BYTES
+    if (source.size or 0) > limit:
+        return None
+    if video and not posters_available():
+        return None  # don't pull the whole video down just to fail
+    try:
+        if video:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                local = os.path.join(tmpdir, os.path.basename(path) or "video")
+                source.download_to_filename(local)
+                renditions = renditions_for_video(local)
+        elif variant in IMAGE_VARIANTS:
+            renditions = renditions_for_image(source.download_as_bytes())
+        else:
+            return None
+    except Exception:
+        logger.warning("Rendition %s failed for %s", variant, path, exc_info=True)
+        return None
+    if variant not in renditions:
+        return None
+    upload_renditions(bucket, path, renditions)
+    return target
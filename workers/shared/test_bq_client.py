@@ -1,4 +1,4 @@
-"""Tests for BQClient row normalization.
+"""Tests for BQClient row normalization and bulk writes.
 
 The query() download path may use either the REST API (JSON columns arrive
 already parsed) or the Storage Read API (JSON columns arrive as raw strings).
@@ -7,8 +7,13 @@ objects + isoformat datetime strings.
 """
 
 from datetime import date, datetime, timezone
+from types import SimpleNamespace
 
-from workers.shared.bq_client import BQClient, _normalize_rows
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from workers.shared.bq_client import BQClient, _normalize_rows, _row_message
+from workers.shared.bq_rows import EnrichedPostRow, TopicClusterRow
 
 
 class _PoisonedIterator:
@@ -111,6 +116,67 @@ def test_download_rows_uses_rest_directly_when_no_storage_client():
     assert fake.list_rows_calls == 0
 
 
+class _PagedResult:
+    """RowIterator stand-in: REST pages and a Storage stream that fails."""
+
+    def __init__(self, pages):
+        self.schema = [SimpleNamespace(name="refs", field_type="JSON")]
+        self.pages = iter(pages)
+
+    def to_arrow_iterable(self, bqstorage_client=None):
+        raise RuntimeError("read session denied")
+
+
+class _QueryClient(_FakeClient):
+    def __init__(self, result):
+        super().__init__([])
+        self._result = result
+        self.page_size = None
+
+    def query(self, sql, job_config=None):
+        client = self
+
+        class _Job:
+            destination = "project.dataset._anon_results"
+
+            def result(self, page_size=None):
+                client.page_size = page_size
+                return client._result
+
+        return _Job()
+
+    def list_rows(self, table, page_size=None):
+        self.list_rows_calls += 1
+        return self._result
+
+
+def test_iter_query_yields_normalized_pages():
+    """iter_query streams page by page in query()'s row shape; a Storage
+    failure before the first page falls back to REST pages."""
+    result = _PagedResult([[{"id": 1, "refs": '["a"]'}], [{"id": 2, "refs": None}]])
+    fake = _QueryClient(result)
+    bq = _make_client(fake, object())  # Storage attempted, then fails
+    bq._settings = _FakeSettings()
+
+    pages = list(bq.iter_query("SELECT * FROM social_listening.posts", page_rows=500))
+
+    assert pages == [[{"id": 1, "refs": ["a"]}], [{"id": 2, "refs": None}]]
+    assert fake.page_size == 500 and fake.list_rows_calls == 1
+    assert bq._bqstorage is False
+
+
+def test_iter_query_reports_schema_of_an_empty_result():
+    fake = _QueryClient(_PagedResult([]))
+    bq = _make_client(fake, False)  # REST pages
+    bq._settings = _FakeSettings()
+    schemas = []
+
+    pages = list(bq.iter_query("SELECT * FROM social_listening.posts", on_schema=schemas.append))
+
+    assert pages == []
+    assert [[f.name for f in schema] for schema in schemas] == [["refs"]]
+
+
 def test_parses_json_string_columns():
     """Storage-API path: JSON columns come back as strings -> parse them."""
     rows = [{"media_refs": '[{"u": "x"}]', "custom_fields": '{"a": 1}'}]
@@ -156,3 +222,220 @@ def test_none_values_preserved():
     out = _normalize_rows(rows, {"media_refs"})
     assert out[0]["media_refs"] is None
     assert out[0]["posted_at"] is None
+
+
+# ---------------------------------------------------------------------------
+# write_rows_bulk
+# ---------------------------------------------------------------------------
+
+class _FakeSettings:
+    gcp_project_id = "proj"
+    bq_dataset = "ds"
+    bq_full_dataset = "proj.ds"
+    bq_bulk_write_method = "storage"
+
+
+class _FakeLoadJob:
+    def __init__(self, result_error=None, state="DONE", error_result=None):
+        self.result_calls = 0
+        self.result_error = result_error
+        self.state = state
+        self.error_result = error_result
+
+    def result(self):
+        self.result_calls += 1
+        if self.result_error:
+            raise self.result_error
+
+
+class _FakeLoadClient:
+    def __init__(self, conflict=False, job=None):
+        self.loads: list[dict] = []
+        self.conflict = conflict
+        self.existing_job = job or _FakeLoadJob()
+
+    def load_table_from_json(self, rows, table_ref, job_id=None, job_config=None):
+        self.loads.append({"rows": rows, "table": table_ref, "job_id": job_id})
+        if self.conflict:
+            raise gcp_exceptions.Conflict("Already Exists: Job proj:US." + job_id)
+        return self.existing_job
+
+    def get_job(self, job_id):
+        return self.existing_job
+
+
+class _Response:
+    class error:  # noqa: N801 - mimics the proto field
+        code = 0
+        message = ""
+
+
+class _FakeWriter:
+    def __init__(self, fail_append=False, commit_error=None):
+        self.fail_append = fail_append
+        self.commit_error = commit_error
+        self.appended: list = []
+        self.committed: list = []
+
+    def table_path(self, project, dataset, table):
+        return f"projects/{project}/datasets/{dataset}/tables/{table}"
+
+    def create_write_stream(self, parent, write_stream):
+        class _Stream:
+            name = parent + "/streams/s1"
+        return _Stream()
+
+    def append_rows(self, requests):
+        if self.fail_append:
+            raise RuntimeError("stream broke")
+        self.appended.extend(requests)
+        return [_Response() for _ in self.appended]
+
+    def finalize_write_stream(self, name):
+        pass
+
+    def batch_commit_write_streams(self, request):
+        self.committed.append(request)
+        if self.commit_error:
+            raise self.commit_error
+
+        class _Commit:
+            stream_errors = []
+        return _Commit()
+
+    def get_write_stream(self, name):
+        class _Stream:
+            commit_time = "2026-05-01T00:00:00Z" if self.committed else None
+        return _Stream()
+
+
+def _bulk_client(fake_client, writer=False):
+    bq = object.__new__(BQClient)
+    bq._settings = _FakeSettings()
+    bq._client = fake_client
+    bq._bqwrite = writer
+    return bq
+
+
+def _post_row(post_id="p1", **kw):
+    return EnrichedPostRow(
+        post_id=post_id, agent_id="a1", agent_version=2,
+        enriched_at=datetime(2026, 5, 1, tzinfo=timezone.utc), **kw,
+    )
+
+
+def test_bulk_write_uses_load_job_without_storage_writer():
+    fake = _FakeLoadClient()
+    bq = _bulk_client(fake)
+    n = bq.write_rows_bulk([_post_row(custom_fields={"k": 1}), _post_row("p2")])
+    assert n == 2
+    (load,) = fake.loads
+    assert load["table"] == "proj.ds.enriched_posts"
+    assert load["rows"][0]["custom_fields"] == {"k": 1}
+    assert load["rows"][0]["enriched_at"] == "2026-05-01T00:00:00+00:00"
+    assert load["job_id"].startswith("bulk_enriched_posts_")
+
+
+def test_bulk_write_job_id_is_deterministic_per_row_set():
+    fake = _FakeLoadClient()
+    bq = _bulk_client(fake)
+    bq.write_rows_bulk([_post_row()])
+    bq.write_rows_bulk([_post_row()])
+    bq.write_rows_bulk([_post_row("p2")])
+    ids = [load["job_id"] for load in fake.loads]
+    assert ids[0] == ids[1] != ids[2]
+
+
+def test_bulk_write_job_id_ignores_per_call_values():
+    # A retry rebuilds its rows with a fresh enriched_at and possibly another
+    # result - the job id only follows the row keys and the batch key.
+    fake = _FakeLoadClient()
+    bq = _bulk_client(fake)
+    retry = EnrichedPostRow(post_id="p1", agent_id="a1", agent_version=2, sentiment="negative")
+    bq.write_rows_bulk([_post_row(), _post_row("p2")], write_id="job-1")
+    bq.write_rows_bulk([_post_row("p2"), retry], write_id="job-1")
+    bq.write_rows_bulk([_post_row(), _post_row("p2")], write_id="job-2")
+    ids = [load["job_id"] for load in fake.loads]
+    assert ids[0] == ids[1] != ids[2]
+
+
+def test_bulk_write_conflict_waits_on_existing_job():
+    fake = _FakeLoadClient(conflict=True)
+    bq = _bulk_client(fake)
+    assert bq.write_rows_bulk([_post_row()], write_id="flush-7") == 1
+    assert fake.loads[0]["job_id"].startswith("bulk_enriched_posts_")
+    assert fake.existing_job.result_calls == 1
+
+
+def test_bulk_write_load_error_after_job_completed_returns():
+    job = _FakeLoadJob(result_error=gcp_exceptions.GatewayTimeout("deadline"))
+    bq = _bulk_client(_FakeLoadClient(job=job))
+    assert bq.write_rows_bulk([_post_row()]) == 1
+
+
+def test_bulk_write_load_error_reraised_when_job_failed():
+    job = _FakeLoadJob(
+        result_error=gcp_exceptions.BadRequest("bad row"),
+        error_result={"reason": "invalid"},
+    )
+    bq = _bulk_client(_FakeLoadClient(job=job))
+    with pytest.raises(gcp_exceptions.BadRequest):
+        bq.write_rows_bulk([_post_row()])
+
+
+def test_bulk_write_rejects_mixed_row_types():
+    bq = _bulk_client(_FakeLoadClient())
+    topic = TopicClusterRow(agent_id="a", cluster_id="c", clustered_at=datetime.now(timezone.utc))
+    with pytest.raises(ValueError):
+        bq.write_rows_bulk([_post_row(), topic])
+
+
+def test_bulk_write_empty_is_noop():
+    fake = _FakeLoadClient()
+    assert _bulk_client(fake).write_rows_bulk([]) == 0
+    assert fake.loads == []
+
+
+def test_bulk_write_commits_pending_stream_when_storage_available():
+    pytest.importorskip("google.cloud.bigquery_storage_v1.types")
+    fake, writer = _FakeLoadClient(), _FakeWriter()
+    bq = _bulk_client(fake, writer)
+    assert bq.write_rows_bulk([_post_row(), _post_row("p2")]) == 2
+    assert fake.loads == []
+    assert len(writer.committed) == 1
+
+
+def test_bulk_write_falls_back_to_load_job_when_append_fails():
+    pytest.importorskip("google.cloud.bigquery_storage_v1.types")
+    fake, writer = _FakeLoadClient(), _FakeWriter(fail_append=True)
+    bq = _bulk_client(fake, writer)
+    assert bq.write_rows_bulk([_post_row()]) == 1
+    assert writer.committed == []
+    assert len(fake.loads) == 1
+
+
+def test_bulk_write_commit_error_after_commit_landed_returns():
+    pytest.importorskip("google.cloud.bigquery_storage_v1.types")
+    fake = _FakeLoadClient()
+    writer = _FakeWriter(commit_error=gcp_exceptions.DeadlineExceeded("lost response"))
+    bq = _bulk_client(fake, writer)
+    assert bq.write_rows_bulk([_post_row()]) == 1
+    assert fake.loads == []
+
+
+def test_row_message_round_trips_through_proto():
+    _, message_cls = _row_message(EnrichedPostRow)
+    row = _post_row(entities=["acme"], custom_fields={"k": [1, 2]}, is_related_to_task=True)
+    msg = message_cls.FromString(message_cls(**row.to_proto_values()).SerializeToString())
+    assert msg.post_id == "p1"
+    assert list(msg.entities) == ["acme"]
+    assert msg.custom_fields == '{"k": [1, 2]}'
+    assert msg.enriched_at == int(datetime(2026, 5, 1, tzinfo=timezone.utc).timestamp() * 1_000_000)
+    assert not msg.HasField("sentiment")  # None → NULL
+
+
+def test_topic_cluster_row_accepts_iso_timestamps():
+    _, message_cls = _row_message(TopicClusterRow)
+    row = TopicClusterRow(agent_id="a", cluster_id="c", clustered_at="2026-05-01T00:00:00+00:00")
+    assert message_cls(**row.to_proto_values()).clustered_at == 1777593600000000
+    assert row.to_json_row()["clustered_at"] == "2026-05-01T00:00:00+00:00"
@@ -0,0 +1,44 @@
+"""Unit tests for the sharded collection_status counters."""
+
+from datetime import datetime, timezone
+
+from google.cloud.firestore_v1 import transforms
+
+from workers.shared.counter_shards import fold_shards, shard_increment
+
+_T0 = datetime(2026, 5, 1, tzinfo=timezone.utc)
+_T1 = datetime(2026, 5, 1, 0, 5, tzinfo=timezone.utc)
+
+
+def test_shard_increment_drops_zero_deltas():
+    payload = shard_increment({"enriching": 3, "done": 0}, _T0, total_delta=3)
+
+    assert payload == {
+        "updated_at": _T0,
+        "counts": {"enriching": transforms.Increment(3)},
+        "total_posts_in_dag": transforms.Increment(3),
+    }
+    assert shard_increment({}, _T0) == {"updated_at": _T0}
+
+
+def test_fold_shards_adds_counters_and_takes_latest_timestamp():
+    status = {"counts": {"done": 5}, "total_posts_in_dag": 10, "updated_at": _T0}
+    shards = [
+        {"counts": {"done": 2, "enriching": 1}, "total_posts_in_dag": 3, "updated_at": _T1},
+        None,
+        {"counts": {"enriching": -1}},
+    ]
+
+    fold_shards(status, shards)
+
+    assert status["counts"] == {"done": 7, "enriching": 0}
+    assert status["total_posts_in_dag"] == 13
+    assert status["updated_at"] == _T1
+
+
+def test_fold_shards_without_shards_leaves_status_untouched():
+    status = {"status": "success", "updated_at": _T0}
+
+    fold_shards(status, [None])
+
+    assert status == {"status": "success", "updated_at": _T0}
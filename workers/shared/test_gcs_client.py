@@ -0,0 +1,173 @@
+"""Tests for content-addressed media storage in GCSClient."""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import PreconditionFailed
+from PIL import Image
+
+from workers.shared.gcs_client import GCSClient, MediaStats
+
+
+class _Writer:
+    def __init__(self, blob):
+        self._blob, self._parts = blob, []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._blob._bucket.objects[self._blob.name] = b"".join(self._parts)
+
+
+class _Blob:
+    def __init__(self, bucket, name):
+        self._bucket, self.name = bucket, name
+        self.metadata = bucket.metadata.get(name)
+
+    def exists(self):
+        return self.name in self._bucket.objects
+
+    def upload_from_file(self, f, content_type=None, if_generation_match=None):
+        if if_generation_match == 0 and self.exists():
+            raise PreconditionFailed("exists")
+        self._bucket.objects[self.name] = f.read()
+
+    def upload_from_string(self, data, content_type=None):
+        self._bucket.objects[self.name] = data
+        self._bucket.metadata[self.name] = self.metadata
+
+    def open(self, mode, chunk_size=None, content_type=None):
+        assert mode == "wb"
+        return _Writer(self)
+
+    def rewrite(self, source, token=None, if_generation_match=None):
+        if if_generation_match == 0 and self.exists():
+            raise PreconditionFailed("exists")
+        self._bucket.objects[self.name] = self._bucket.objects[source.name]
+        return None, 0, 0
+
+    def delete(self):
+        self._bucket.objects.pop(self.name, None)
+
+
+class _Bucket:
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.metadata: dict[str, dict] = {}
+
+    def blob(self, name):
+        return _Blob(self, name)
+
+    def get_blob(self, name):
+        return _Blob(self, name) if name in self.objects else None
+
+
+def _client(bucket, responses, buffer_bytes=1024):
+    gcs = GCSClient.__new__(GCSClient)
+    gcs._settings = MagicMock(gcs_media_bucket="media-bkt")
+    gcs._bucket = bucket
+    gcs._buffer_bytes = buffer_bytes
+    gcs._url_index = OrderedDict()
+    gcs._url_index_lock = threading.Lock()
+    gcs.media_stats = MediaStats()
+    gcs._download_session = MagicMock()
+
+    def _get(url, timeout=None, stream=False):
+        resp = MagicMock()
+        resp.__enter__.return_value = resp
+        resp.headers = {"content-type": "image/jpeg"}
+        body = responses[url]
+        resp.iter_content.side_effect = lambda chunk_size: iter(
+            [body[i:i + 3] for i in range(0, len(body), 3)]
+        )
+        return resp
+
+    gcs._download_session.get.side_effect = _get
+    return gcs
+
+
+def _content_objects(bucket):
+    return {k: v for k, v in bucket.objects.items() if k.startswith("media/sha256/")}
+
+
+def test_repeated_url_skips_download_and_shares_object():
+    bucket = _Bucket()
+    gcs = _client(bucket, {"https://cdn/a.jpg": b"image-bytes"})
+
+    first = gcs.download_from_url("https://cdn/a.jpg", "c1", "p1", 0)
+    second = gcs.download_from_url("https://cdn/a.jpg", "c2", "p9", 0)
+
+    digest = hashlib.sha256(b"image-bytes").hexdigest()
+    assert first["gcs_uri"] == second["gcs_uri"] == f"gs://media-bkt/media/sha256/{digest[:2]}/{digest}.jpg"
+    assert first["sha256"] == second["sha256"] == digest
+    assert gcs._download_session.get.call_count == 1
+
+    stats = gcs.media_stats.snapshot()
+    assert stats["downloads"] == 1 and stats["url_index_hits"] == 1
+    assert stats["download_bytes_saved"] == len(b"image-bytes")
+
+    # A fresh client (another run) finds the URL through the GCS marker.
+    other = _client(bucket, {})
+    assert other.download_from_url("https://cdn/a.jpg", "c3", "p2", 0)["gcs_uri"] == first["gcs_uri"]
+    other._download_session.get.assert_not_called()
+
+
+def test_same_bytes_under_new_url_stored_once():
+    bucket = _Bucket()
+    gcs = _client(bucket, {"https://cdn/a.jpg?sig=1": b"same", "https://cdn/a.jpg?sig=2": b"same"})
+    a = gcs.download_from_url("https://cdn/a.jpg?sig=1", "c1", "p1", 0)
+    b = gcs.download_from_url("https://cdn/a.jpg?sig=2", "c2", "p2", 0)
+    assert a["gcs_uri"] == b["gcs_uri"]
+    assert len(_content_objects(bucket)) == 1
+    stats = gcs.media_stats.snapshot()
+    assert stats["content_dedup_hits"] == 1 and stats["storage_bytes_saved"] == 4
+    assert stats["uploaded_bytes"] == 4
+
+
+@pytest.mark.parametrize("existing", [False, True])
+def test_large_body_streams_through_staging(existing):
+    body = b"0123456789" * 5
+    bucket = _Bucket()
+    gcs = _client(bucket, {"https://cdn/v.mp4": body}, buffer_bytes=8)
+    if existing:
+        digest = hashlib.sha256(body).hexdigest()
+        bucket.objects[f"media/sha256/{digest[:2]}/{digest}.jpg"] = body
+
+    ref = gcs.download_from_url("https://cdn/v.mp4", "c1", "p1", 0)
+
+    assert ref["size_bytes"] == len(body) and ref["sha256"] == hashlib.sha256(body).hexdigest()
+    assert list(_content_objects(bucket).values()) == [body]
+    assert not any(k.startswith("media/staging/") for k in bucket.objects)
+    assert gcs.media_stats.snapshot()["content_dedup_hits"] == int(existing)
+
+
+def test_failed_download_returns_error_ref():
+    gcs = _client(_Bucket(), {})
+    gcs._download_session.get.side_effect = RuntimeError("403")
+    ref = gcs.download_from_url("https://cdn/x.jpg", "c1", "p1", 0)
+    assert ref["gcs_uri"] is None and "403" in ref["error"]
+
+
+def test_stored_image_gets_renditions_once():
+    out = io.BytesIO()
+    Image.new("RGB", (1000, 500), "blue").save(out, "JPEG")
+    bucket = _Bucket()
+    gcs = _client(bucket, {"https://cdn/a.jpg": out.getvalue(), "https://cdn/b.jpg": out.getvalue()},
+                  buffer_bytes=1 << 20)
+
+    ref = gcs.download_from_url("https://cdn/a.jpg", "c1", "p1", 0)
+    gcs.download_from_url("https://cdn/b.jpg", "c1", "p2", 0)  # same bytes → dedup, no re-render
+
+    path = ref["gcs_uri"].split("/", 3)[3]
+    thumb = bucket.objects[f"renditions/thumb/{path}.webp"]
+    assert Image.open(io.BytesIO(thumb)).size == (320, 160)
+    assert f"renditions/card/{path}.webp" in bucket.objects
+    assert gcs.media_stats.snapshot()["renditions"] == 1
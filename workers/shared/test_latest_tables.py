@@ -0,0 +1,99 @@
+"""Unit tests for the *_latest table refresh driver. BQ is faked."""
+
+import re
+
+from workers.shared.bq_client import SQL_BASE_DIR
+from workers.shared.latest_tables import LATEST_TABLES, refresh_latest_tables
+
+
+class _FakeBQ:
+    def __init__(self, newest=None, fail_on=()):
+        self._newest = newest or {}
+        self._fail_on = set(fail_on)
+        self.watermark_queries: list[str] = []
+        self.merges: list[tuple[str, dict]] = []
+
+    def query(self, sql, params=None):
+        self.watermark_queries.append(sql)
+        table = re.search(r"social_listening\.(\w+)", sql).group(1)
+        return [{"ts": self._newest.get(table)}]
+
+    def query_from_file(self, sql_file, params=None):
+        if any(t in sql_file for t in self._fail_on):
+            raise RuntimeError("merge failed")
+        self.merges.append((sql_file, params))
+        return []
+
+
+def test_refresh_reads_from_newest_row_minus_lookback():
+    bq = _FakeBQ(newest={"posts_latest": "2026-05-02T12:00:00+00:00"})
+    refreshed = refresh_latest_tables(bq)
+
+    assert refreshed["posts_latest"] == "2026-05-01T12:00:00+00:00"  # 24h lookback
+    assert len(bq.merges) == len(LATEST_TABLES)
+
+
+def test_empty_latest_table_rebuilds_from_scratch():
+    bq = _FakeBQ()
+    refreshed = refresh_latest_tables(bq)
+    assert set(refreshed.values()) == {"1970-01-01T00:00:00+00:00"}
+
+
+def test_full_refresh_skips_watermark_lookup():
+    bq = _FakeBQ(newest={"posts_latest": "2026-05-02T12:00:00+00:00"})
+    refreshed = refresh_latest_tables(bq, full=True)
+    assert bq.watermark_queries == []
+    assert refreshed["posts_latest"] == "1970-01-01T00:00:00+00:00"
+
+
+def test_one_failed_table_does_not_block_the_others():
+    bq = _FakeBQ(fail_on={"enriched_posts_latest"})
+    refreshed = refresh_latest_tables(bq)
+    assert set(refreshed) == {"posts_latest", "post_engagements_latest"}
+
+
+def test_refresh_sql_targets_its_table_and_filters_on_the_partition_column():
+    for table, ts_col, sql_file in LATEST_TABLES:
+        sql = (SQL_BASE_DIR / sql_file).read_text()
+        assert f"MERGE social_listening.{table} T" in sql
+        assert f"{ts_col} >= TIMESTAMP(@since)" in sql
+        assert (SQL_BASE_DIR / "schemas" / f"{table}.sql").exists()
+
+
+def _schema_columns(table: str) -> list[str]:
+    ddl = (SQL_BASE_DIR / "schemas" / f"{table}.sql").read_text()
+    ddl = ddl[ddl.index("CREATE TABLE"):]
+    body = ddl[ddl.index("(") + 1 : ddl.rindex(")")]
+    return re.findall(r"^\s*(\w+)\s+[A-Z]", body, flags=re.M)
+
+
+def _names(column_list: str) -> list[str]:
+    return [c.strip().removeprefix("S.") for c in column_list.split(",") if c.strip()]
+
+
+def test_refresh_merge_names_every_column():
+    """INSERT ROW / positional matching breaks on base tables whose physical
+    column order drifted (ALTER TABLE ADD COLUMN) - every column is named."""
+    for table, _, sql_file in LATEST_TABLES:
+        sql = (SQL_BASE_DIR / sql_file).read_text()
+        cols = _schema_columns(table)
+        assert "INSERT ROW" not in sql
+        insert = re.search(r"INSERT \((.*?)\) VALUES \((.*?)\);", sql, flags=re.S)
+        assert _names(insert.group(1)) == cols, table
+        assert _names(insert.group(2)) == cols, table
+        updated = re.findall(r"^\s*(\w+) = S\.(\w+)", sql, flags=re.M)
+        assert all(a == b for a, b in updated)
+        key_cols = {"post_id", "agent_id"}
+        assert {a for a, _ in updated} == set(cols) - key_cols, table
+
+
+def test_current_readers_name_every_column():
+    sql = (SQL_BASE_DIR / "functions" / "latest.sql").read_text()
+    sql = re.sub(r"^\s*--.*\n", "", sql, flags=re.M)
+    # Every read of a base or latest table lists its columns explicitly.
+    reads = re.findall(r"SELECT\n((?:[\w, ]+\n)+?)\s*FROM social_listening\.(\w+)", sql)
+    assert "SELECT *\n" not in re.sub(r"SELECT \*\n\s*FROM (delta|fresh|stored)", "", sql)
+    assert len(reads) == 6
+    for column_list, source in reads:
+        table = source if source.endswith("_latest") else f"{source}_latest"
+        assert _names(column_list) == _schema_columns(table), source
@@ -0,0 +1,52 @@
+"""Unit tests for media rendition generation."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from workers.shared import media_renditions
+
+
+def _png(width: int, height: int, mode: str = "RGB") -> bytes:
+    out = io.BytesIO()
+    Image.new(mode, (width, height)).save(out, "PNG")
+    return out.getvalue()
+
+
+def test_render_image_downscales_but_never_upscales():
+    big = Image.open(io.BytesIO(media_renditions.render_image(_png(1280, 720), 640)))
+    assert big.format == "WEBP" and big.size == (640, 360)
+
+    small = Image.open(io.BytesIO(media_renditions.render_image(_png(100, 50, "P"), 640)))
+    assert small.size == (100, 50)
+
+
+def test_rendition_path_and_video_detection():
+    assert media_renditions.rendition_path("media/sha256/ab/abc.jpg", "thumb") == (
+        "renditions/thumb/media/sha256/ab/abc.jpg.webp"
+    )
+    assert media_renditions.is_video("x/clip.MP4", None)
+    assert media_renditions.is_video("x/blob", "video/webm")
+    assert not media_renditions.is_video("x/photo.jpg", "image/jpeg")
+
+
+def test_video_renditions_need_ffmpeg(monkeypatch):
+    monkeypatch.setattr(media_renditions.shutil, "which", lambda _name: None)
+    assert media_renditions.renditions_for_video("/nonexistent.mp4") == {}
+
+
+def test_source_paths_are_stored_media_only():
+    assert media_renditions.is_source_path("media/sha256/ab/abc.jpg")
+    assert media_renditions.is_source_path("dashboard-media/u1/f.png")
+    assert media_renditions.is_source_path("c1/p1_0.jpg")  # pre content-addressing
+    assert not media_renditions.is_source_path("renditions/thumb/media/sha256/ab/abc.jpg.webp")
+    assert not media_renditions.is_source_path("renditions/x.jpg")
+    assert not media_renditions.is_source_path("media/staging/0123")
+    assert not media_renditions.is_source_path("c1/../renditions/x.jpg")
+
+
+def test_render_image_refuses_oversized_pixel_counts(monkeypatch):
+    monkeypatch.setattr(media_renditions, "MAX_SOURCE_PIXELS", 100 * 100)
+    with pytest.raises(ValueError):
+        media_renditions.render_image(_png(200, 100), 64)
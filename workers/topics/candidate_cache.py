@@ -0,0 +1,206 @@
+"""Per-agent cache of pass-1 candidates for the LLM taxonomy.
+
+Pass 1 is the bulk of a taxonomy run's Gemini cost, and consecutive runs over
+a rolling window mostly re-sample the same posts. Every post of a pass-1 batch
+that came back parseable is recorded under
+`agents/{agent_id}/topic_candidates`, keyed by (post_id, brief hash, prompt
+version), together with the candidates it sourced. A rerun reuses those
+candidates for sampled posts that are already cached and batches only the
+rest; pass 2/3 run on the union exactly as before.
+
+A key only matches while the rendered customer brief, the pass-1 template,
+the model and the thinking level are unchanged - any edit re-sends every
+post. Reused candidates keep only members that are in the current sample, so
+memberships never point outside what pass 3 and the writer see. Batches that
+failed or didn't parse are not recorded; their posts stay fresh next run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from workers.shared.firestore_client import FirestoreClient
+from workers.topics import prompts
+from workers.topics.schema import TopicCandidate
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def brief_hash(customer_brief: str | None) -> str:
+    """Hash of the brief as `render_pass1_prompt` injects it."""
+    return _digest((customer_brief or prompts.DEFAULT_CUSTOMER_BRIEF).strip())[:16]
+
+
+def pass1_prompt_version(model: str, thinking_level: str) -> str:
+    """Fingerprint of everything besides the brief and the batch that shapes
+    a pass-1 answer: template, few-shot examples, section revision, model and
+    thinking level."""
+    return _digest(
+        prompts.PASS1_PROMPT,
+        prompts.PASS1_GOOD_EXAMPLES,
+        prompts.PASS1_BAD_EXAMPLES,
+        str(prompts.PASS1_SECTION_REVISION),
+        model,
+        thinking_level,
+    )[:16]
+
+
+class Pass1CandidateCache:
+    """Read-through view of one agent's cached pass-1 candidates for one
+    (brief, prompt version). Lookups are memoized for the life of the object
+    (one run); new entries are buffered by `record` and written by `flush`.
+
+    Store errors never fail a run: a failed read is a miss, a failed write is
+    logged and dropped.
+    """
+
+    def __init__(
+        self,
+        agent_id: str,
+        *,
+        customer_brief: str | None,
+        model: str,
+        thinking_level: str,
+        ttl_days: int,
+        fs: FirestoreClient | None = None,
+    ):
+        self.agent_id = agent_id
+        self.brief_hash = brief_hash(customer_brief)
+        self.prompt_version = pass1_prompt_version(model, thinking_level)
+        self._ttl = timedelta(days=ttl_days)
+        self._fs = fs or FirestoreClient()
+        # post_id -> live entry, or None for a known miss.
+        self._entries: dict[str, dict | None] = {}
+        self._pending: dict[str, dict] = {}
+        self.stats: dict[str, int] = {
+            "reused_batches": 0,
+            "fresh_batches": 0,
+            "reused_posts": 0,
+            "fresh_posts": 0,
+            "reused_candidates": 0,
+        }
+
+    def key(self, post_id: str) -> str:
+        return _digest(post_id, self.brief_hash, self.prompt_version)[:40]
+
+    def _live(self, entry: dict, post_id: str, now: datetime) -> bool:
+        if (
+            entry.get("post_id") != post_id
+            or entry.get("brief_hash") != self.brief_hash
+            or entry.get("prompt_version") != self.prompt_version
+        ):
+            return False
+        # Firestore TTL deletion lags by up to a day - honour expiry here too.
+        expires_at = entry.get("expires_at")
+        return expires_at is None or expires_at > now
+
+    def _load(self, post_ids: list[str]) -> None:
+        missing = [pid for pid in dict.fromkeys(post_ids) if pid not in self._entries]
+        if not missing:
+            return
+        keys = {self.key(pid): pid for pid in missing}
+        try:
+            found = self._fs.get_topic_candidates(self.agent_id, list(keys))
+        except Exception:
+            logger.exception(
+                "Pass-1 cache read failed for agent %s - treating %d posts as fresh",
+                self.agent_id, len(keys),
+            )
+            found = {}
+        now = datetime.now(timezone.utc)
+        for key, pid in keys.items():
+            entry = found.get(key)
+            self._entries[pid] = entry if entry is not None and self._live(entry, pid, now) else None
+
+    def cached_post_ids(self, posts: list[dict]) -> set[str]:
+        """post_ids of `posts` that have a live cache entry."""
+        ids = [p["post_id"] for p in posts]
+        self._load(ids)
+        return {pid for pid in ids if self._entries.get(pid) is not None}
+
+    def split(self, posts: list[dict]) -> tuple[list[dict], list[dict]]:
+        """(cached, fresh) partition of `posts`, each in input order."""
+        cached_ids = self.cached_post_ids(posts)
+        cached = [p for p in posts if p["post_id"] in cached_ids]
+        fresh = [p for p in posts if p["post_id"] not in cached_ids]
+        return cached, fresh
+
+    def reuse(self, cached_posts: list[dict]) -> list[TopicCandidate]:
+        """Stored candidates for `cached_posts` (all must be cached).
+
+        A candidate sourced from several posts is stored under each of them
+        and comes back once; its `source_post_ids` are cut down to the posts
+        passed in.
+        """
+        in_sample = {p["post_id"] for p in cached_posts}
+        by_ref: dict[tuple[str, int], dict] = {}
+        batch_ids: set[str] = set()
+        for p in cached_posts:
+            entry = self._entries[p["post_id"]]
+            batch_ids.add(entry["batch_id"])
+            for c in entry.get("candidates") or []:
+                by_ref.setdefault((entry["batch_id"], c["index"]), c)
+
+        candidates: list[TopicCandidate] = []
+        for c in by_ref.values():
+            members = [pid for pid in c.get("source_post_ids") or [] if pid in in_sample]
+            fields = {k: v for k, v in c.items() if k != "index"}
+            candidates.append(TopicCandidate.model_validate({**fields, "source_post_ids": members}))
+
+        self.stats["reused_posts"] += len(cached_posts)
+        self.stats["reused_batches"] += len(batch_ids)
+        self.stats["reused_candidates"] += len(candidates)
+        return candidates
+
+    def record(self, batch_posts: list[dict], candidates: list[TopicCandidate]) -> None:
+        """Buffer entries for every post of a successfully parsed batch -
+        including posts that sourced no candidate, so they aren't re-sent."""
+        batch_id = uuid.uuid4().hex
+        now = datetime.now(timezone.utc)
+        per_post: dict[str, list[dict[str, Any]]] = {p["post_id"]: [] for p in batch_posts}
+        for i, c in enumerate(candidates):
+            dumped = {"index": i, **c.model_dump(exclude={"source_post_indices"})}
+            for pid in c.source_post_ids:
+                if pid in per_post:
+                    per_post[pid].append(dumped)
+        for pid, stored in per_post.items():
+            entry = {
+                "post_id": pid,
+                "brief_hash": self.brief_hash,
+                "prompt_version": self.prompt_version,
+                "batch_id": batch_id,
+                "candidates": stored,
+                "cached_at": now,
+                "expires_at": now + self._ttl,
+            }
+            self._pending[self.key(pid)] = entry
+            self._entries[pid] = entry
+
+    def flush(self) -> int:
+        """Write buffered entries. Returns how many were written."""
+        if not self._pending:
+            return 0
+        try:
+            self._fs.put_topic_candidates(self.agent_id, self._pending)
+        except Exception:
+            logger.exception(
+                "Pass-1 cache write failed for agent %s (%d entries dropped)",
+                self.agent_id, len(self._pending),
+            )
+            self._pending = {}
+            return 0
+        written = len(self._pending)
+        self._pending = {}
+        return written
@@ -1,6 +1,8 @@
 """Production entry point for the LLM-taxonomy v2 topic algorithm.
 
 Strings together fetch → sample → pass1 → pass2 → extrapolate → write.
+Pass 1 goes through the per-agent candidate cache (see `candidate_cache`), so
+a rerun only sends sample posts it hasn't seen under the same brief.
 Caller passes an `agent_id` and optional overrides; the function resolves
 defaults from the agent's `topics_config` (if any), then from global settings.
 
@@ -18,6 +20,7 @@ from typing import Any
 from config.settings import get_settings
 from workers.shared.bq_client import BQClient
 from workers.shared.firestore_client import FirestoreClient
+from workers.topics.candidate_cache import Pass1CandidateCache
 from workers.topics.extrapolator import extrapolate_topic_counts
 from workers.topics.fetcher import fetch_posts_for_taxonomy
 from workers.topics.prompts import render_customer_brief
@@ -52,6 +55,10 @@ def run_llm_topics(
         "estimated_pool_count": int,
         "estimated_pool_coverage_pct": float,
         "candidates_count": N,
+        "pass1_reused_batches": N,   # earlier runs' batches candidates came from
+        "pass1_fresh_batches": N,    # batches sent to Gemini this run
+        "pass1_reused_posts": N,
+        "pass1_fresh_posts": N,
         "wall_sec": float,
         "wrote": bool,
         "agent_id": str,
@@ -75,6 +82,18 @@ def run_llm_topics(
         constitution, title=agent_doc.get("title"),
     ) if constitution else None
 
+    # Pass-1 model/thinking resolved here so the cache key matches the calls.
+    pass1_model = settings.enrichment_model
+    pass1_thinking = settings.topics_pass1_thinking_level
+    cache = Pass1CandidateCache(
+        agent_id,
+        customer_brief=customer_brief,
+        model=pass1_model,
+        thinking_level=pass1_thinking,
+        ttl_days=settings.topics_candidate_cache_ttl_days,
+        fs=fs,
+    ) if settings.topics_candidate_cache_enabled else None
+
     t0 = time.time()
 
     # 1. Fetch
@@ -94,20 +113,38 @@ def run_llm_topics(
         }
 
     # 2. Sample
+    preferred = (
+        cache.cached_post_ids(posts)
+        if cache is not None and settings.topics_sample_prefer_cached
+        else None
+    )
     sampled, sample_stats = sample_for_taxonomy(
         posts,
         target_size=sample_size,
         per_signature=settings.topics_sample_per_signature,
         channel_cap=settings.topics_sample_channel_cap,
         time_buckets=settings.topics_sample_time_buckets,
+        preferred_post_ids=preferred,
     )
 
-    # 3. Pass 1
+    # 3. Pass 1 (cached posts reuse stored candidates; only new posts batched)
     candidates = run_pass1(
         sampled,
         batch_size=batch_size,
+        model=pass1_model,
+        thinking_level=pass1_thinking,
         customer_brief=customer_brief,
+        cache=cache,
     )
+    if cache is not None:
+        pass1_stats = cache.stats
+    else:
+        pass1_stats = {
+            "reused_batches": 0,
+            "fresh_batches": -(-len(sampled) // batch_size),
+            "reused_posts": 0,
+            "fresh_posts": len(sampled),
+        }
     if not candidates:
         logger.warning("Agent %s: pass-1 produced no candidates", agent_id)
         return {
@@ -115,6 +152,8 @@ def run_llm_topics(
             "topics_count": 0,
             "pool_size": len(posts),
             "sample_size": len(sampled),
+            "pass1_reused_batches": pass1_stats["reused_batches"],
+            "pass1_fresh_batches": pass1_stats["fresh_batches"],
             "error": "no candidates",
         }
 
@@ -172,6 +211,10 @@ def run_llm_topics(
         "agent_id": agent_id,
         "topics_count": len(topics),
         "candidates_count": len(candidates),
+        "pass1_reused_batches": pass1_stats["reused_batches"],
+        "pass1_fresh_batches": pass1_stats["fresh_batches"],
+        "pass1_reused_posts": pass1_stats["reused_posts"],
+        "pass1_fresh_posts": pass1_stats["fresh_posts"],
         "pool_size": len(posts),
         "sample_size": len(sampled),
         "effective_window_days": effective_window,
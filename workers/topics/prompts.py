@@ -382,6 +382,12 @@ def render_customer_brief(constitution: dict | None, title: str | None = None) -
 # Section builders (kept here so prompt format and serialization stay together)
 # ---------------------------------------------------------------------------
 
+# Part of the pass-1 candidate cache key (workers/topics/candidate_cache.py).
+# Edits to the PASS1 template text invalidate the cache on their own; bump
+# this when the batch section format or the candidate validation changes
+# what a cached candidate would have looked like.
+PASS1_SECTION_REVISION = 1
+
 
 def build_pass1_batch_section(posts: list[dict]) -> str:
     """Format a sampled post batch for pass-1 consumption.
@@ -20,6 +20,12 @@ Strategy:
      that expand the signature space (no signature picked up >=per_signature
      entries unless we ran out of new signatures).
 
+Optionally, `preferred_post_ids` (posts whose pass-1 candidates are already
+cached) rank ahead of the rest wherever the choice doesn't change signature
+coverage: within a signature and among fill candidates, preferred posts go
+first and engagement orders each group. Which signatures get picked is
+unaffected.
+
 Engagement weights chosen so that scarcer signals (saves, comments) carry
 more - matches the existing intuition elsewhere in the codebase.
 """
@@ -28,6 +34,7 @@ from __future__ import annotations
 
 import logging
 from collections import Counter, defaultdict
+from collections.abc import Collection
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -159,11 +166,14 @@ def sample_for_taxonomy(
     time_buckets: int = DEFAULT_TIME_BUCKETS,
     window_start: datetime | None = None,
     window_end: datetime | None = None,
+    preferred_post_ids: Collection[str] | None = None,
 ) -> tuple[list[dict], dict[str, Any]]:
     """Pick a diversity-preserving sample of `posts`.
 
     Returns (sampled_posts, stats). `stats` summarises signature coverage and
     is intended for logging / dashboards / the early checkpoint.
+    `preferred_post_ids` breaks coverage ties in favour of those posts (see
+    module docstring).
     """
     n = len(posts)
     if n <= target_size:
@@ -180,6 +190,12 @@ def sample_for_taxonomy(
         sig = compute_signature(p, window_start, window_end, time_buckets)
         enriched.append((sig, engagement_score(p), p))
 
+    # Rank key within equal coverage: preferred first, then engagement.
+    preferred = set(preferred_post_ids or ())
+
+    def _rank(eng: float, post: dict) -> tuple[bool, float]:
+        return (post.get("post_id") in preferred, eng)
+
     # Phase 1: group by signature, sort each group by engagement DESC,
     # take top-per_signature with per-channel cap. Per-(sig, channel) counters
     # persist across phases so the fill phase can't bypass the channel cap.
@@ -190,7 +206,7 @@ def sample_for_taxonomy(
     capped: list[tuple[tuple, float, dict]] = []
     per_sig_channel: dict[tuple, Counter] = defaultdict(Counter)
     for sig, group in by_sig.items():
-        group.sort(key=lambda x: x[0], reverse=True)
+        group.sort(key=lambda x: _rank(*x), reverse=True)
         added = 0
         for eng, post in group:
             if added >= per_signature:
@@ -204,8 +220,9 @@ def sample_for_taxonomy(
 
     # Phase 2: if over budget, drop from over-represented signatures' tails.
     if len(capped) > target_size:
-        # Build per-signature lists in capped order (which is engagement-sorted
-        # within each signature thanks to phase 1).
+        # Build per-signature lists in capped order (which is ranked - by
+        # engagement, preferred posts first - within each signature thanks to
+        # phase 1).
         per_sig_sorted: dict[tuple, list[tuple[float, dict]]] = defaultdict(list)
         for sig, eng, post in capped:
             per_sig_sorted[sig].append((eng, post))
@@ -249,7 +266,7 @@ def sample_for_taxonomy(
             for sig, eng, post in enriched
             if id(post) not in chosen_ids
         ]
-        leftovers.sort(key=lambda x: x[1], reverse=True)
+        leftovers.sort(key=lambda x: _rank(x[1], x[2]), reverse=True)
 
         # Two passes over leftovers: (a) only NEW signatures, (b) anything.
         for accept_predicate in (
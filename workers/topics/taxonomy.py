@@ -25,6 +25,7 @@ from google import genai
 from google.genai import types
 
 from config.settings import get_settings
+from workers.topics.candidate_cache import Pass1CandidateCache
 from workers.topics.prompts import (
     build_pass1_batch_section,
     build_pass2_candidates_section,
@@ -82,10 +83,13 @@ def _run_pass1_batch(
     model: str,
     thinking_level: str = "low",
     customer_brief: str | None = None,
-) -> list[TopicCandidate]:
+) -> list[TopicCandidate] | None:
     """Run one pass-1 batch. Returns candidates with `source_post_ids` already
     resolved from the LLM's 1-based `source_post_indices` against this batch.
     Bad indices (out-of-range, duplicates within a candidate) are dropped.
+
+    Returns None when the call fails or the response can't be parsed, so the
+    caller can tell a failed batch from one that yielded no candidates.
     """
     section = build_pass1_batch_section(batch_posts)
     prompt = render_pass1_prompt(section, customer_brief=customer_brief)
@@ -107,7 +111,7 @@ def _run_pass1_batch(
         )
     except Exception:
         logger.exception("Pass-1 Gemini call failed for batch %d", batch_index)
-        return []
+        return None
 
     from api.services.cost_meter import log_gemini_response
 
@@ -132,7 +136,7 @@ def _run_pass1_batch(
             "Pass-1 batch %d: empty response (finish_reason=%s)",
             batch_index, finish_reason,
         )
-        return []
+        return None
     try:
         parsed_raw = Pass1Response.model_validate_json(text)
         return _validate_pass1_candidates(parsed_raw.topics, batch_posts, batch_index)
@@ -141,7 +145,7 @@ def _run_pass1_batch(
             "Pass-1 batch %d: text parse failed (finish_reason=%s, len=%d, head=%r)",
             batch_index, finish_reason, len(text), text[:300],
         )
-        return []
+        return None
 
 
 def _validate_pass1_candidates(
@@ -220,6 +224,7 @@ def run_pass1(
     model: str | None = None,
     thinking_level: str | None = None,
     customer_brief: str | None = None,
+    cache: Pass1CandidateCache | None = None,
 ) -> list[TopicCandidate]:
     """Pass 1: parallel batched candidate generation.
 
@@ -227,6 +232,11 @@ def run_pass1(
     pass 2 deduplicates). `customer_brief` is injected verbatim into each
     batch's prompt so the same brief drives every batch's framing decisions
     consistently.
+
+    With a `cache`, sampled posts that already have stored candidates are not
+    re-sent: their candidates are reused, only the remaining posts are
+    batched, and every batch that parses is recorded for the next run. The
+    cache must be built for the same brief, model and thinking level.
     """
     settings = get_settings()
     batch_size = batch_size or settings.topics_batch_size
@@ -238,17 +248,29 @@ def run_pass1(
     if not sampled_posts:
         return []
 
+    candidates: list[TopicCandidate] = []
+    fresh_posts = sampled_posts
+    if cache is not None:
+        cached_posts, fresh_posts = cache.split(sampled_posts)
+        candidates.extend(cache.reuse(cached_posts))
+        logger.info(
+            "Pass 1 cache: reusing %d candidates for %d/%d sampled posts",
+            len(candidates), len(cached_posts), len(sampled_posts),
+        )
+
     batches: list[list[dict]] = [
-        sampled_posts[i : i + batch_size]
-        for i in range(0, len(sampled_posts), batch_size)
+        fresh_posts[i : i + batch_size]
+        for i in range(0, len(fresh_posts), batch_size)
     ]
+    if cache is not None:
+        cache.stats["fresh_posts"] += len(fresh_posts)
+        cache.stats["fresh_batches"] += len(batches)
     logger.info(
         "Pass 1: %d batches of <=%d posts, concurrency=%d, model=%s, thinking=%s, customer_brief=%s",
         len(batches), batch_size, concurrency, model, thinking_level,
         "custom" if customer_brief else "default",
     )
 
-    candidates: list[TopicCandidate] = []
     # Context-aware pool so each batch's topic_cluster Gemini cost inherits
     # the run's user_id/agent_id (bare pool dropped attribution → NULL rows).
     with ContextAwareThreadPoolExecutor(max_workers=concurrency) as ex:
@@ -266,9 +288,15 @@ def run_pass1(
             except Exception:
                 logger.exception("Pass-1 batch %d failed", idx)
                 continue
+            if batch_candidates is None:
+                continue
             logger.info("Pass-1 batch %d -> %d candidates", idx, len(batch_candidates))
             candidates.extend(batch_candidates)
+            if cache is not None:
+                cache.record(batches[idx], batch_candidates)
 
+    if cache is not None:
+        cache.flush()
     logger.info("Pass 1 complete: %d total candidates", len(candidates))
     return candidates
 
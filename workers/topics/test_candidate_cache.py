@@ -0,0 +1,151 @@
+"""Tests for the pass-1 candidate cache.
+
+The Gemini call (`_run_pass1_batch`) is replaced by a deterministic fake that
+emits one candidate per batch sourced from every post in it, and Firestore by
+an in-memory store with the two `FirestoreClient` methods the cache uses.
+Covers:
+  - a rerun reuses stored candidates and batches only the new posts
+  - reused candidates are restricted to members in the current sample
+  - a different brief (or prompt version) misses the cache
+  - failed batches are not cached; store errors don't fail the run
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from workers.topics import taxonomy
+from workers.topics.candidate_cache import Pass1CandidateCache
+from workers.topics.schema import TopicCandidate
+
+
+class _MemoryStore:
+    def __init__(self):
+        self.docs: dict[str, dict[str, dict]] = {}
+        self.reads = 0
+
+    def get_topic_candidates(self, agent_id: str, keys: list[str]) -> dict[str, dict]:
+        self.reads += 1
+        docs = self.docs.get(agent_id, {})
+        return {k: docs[k] for k in keys if k in docs}
+
+    def put_topic_candidates(self, agent_id: str, entries: dict[str, dict]) -> None:
+        self.docs.setdefault(agent_id, {}).update(entries)
+
+
+class _BrokenStore:
+    def get_topic_candidates(self, agent_id, keys):
+        raise RuntimeError("firestore down")
+
+    def put_topic_candidates(self, agent_id, entries):
+        raise RuntimeError("firestore down")
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Records each batch's post_ids; a batch containing 'bad' fails."""
+    batches: list[list[str]] = []
+
+    def fake_batch(batch_index, batch_posts, model, thinking_level="low", customer_brief=None):
+        ids = [p["post_id"] for p in batch_posts]
+        batches.append(ids)
+        if "bad" in ids:
+            return None
+        return [TopicCandidate(
+            header=f"beat {ids[0]}", subheader="s", anchor_entities=["e"],
+            source_post_indices=list(range(1, len(ids) + 1)), source_post_ids=ids,
+        )]
+
+    monkeypatch.setattr(taxonomy, "_run_pass1_batch", fake_batch)
+    return batches
+
+
+def _posts(*ids: str) -> list[dict]:
+    return [{"post_id": pid, "ai_summary": f"summary {pid}"} for pid in ids]
+
+
+def _cache(store, brief: str | None = None, model: str = "flash") -> Pass1CandidateCache:
+    return Pass1CandidateCache(
+        "agent-1", customer_brief=brief, model=model, thinking_level="minimal",
+        ttl_days=30, fs=store,
+    )
+
+
+def _run(posts, cache) -> list[TopicCandidate]:
+    return taxonomy.run_pass1(posts, batch_size=2, concurrency=2, model="flash",
+                              thinking_level="minimal", cache=cache)
+
+
+def test_rerun_only_batches_new_posts(sent):
+    store = _MemoryStore()
+    first = _cache(store)
+    _run(_posts("a", "b", "c", "d"), first)
+    assert sorted(map(sorted, sent)) == [["a", "b"], ["c", "d"]]
+    assert first.stats["fresh_batches"] == 2 and first.stats["reused_batches"] == 0
+    assert len(store.docs["agent-1"]) == 4
+
+    sent.clear()
+    second = _cache(store)
+    candidates = _run(_posts("a", "b", "c", "e"), second)
+    assert sent == [["e"]]
+    assert second.stats == {
+        "reused_batches": 2, "fresh_batches": 1,
+        "reused_posts": 3, "fresh_posts": 1, "reused_candidates": 2,
+    }
+    # Union of reused and fresh candidates; members cut to the current sample.
+    members = sorted(sorted(c.source_post_ids) for c in candidates)
+    assert members == [["a", "b"], ["c"], ["e"]]
+
+
+def test_brief_or_prompt_change_misses(sent):
+    store = _MemoryStore()
+    _run(_posts("a", "b"), _cache(store, brief="brief one"))
+    sent.clear()
+    _run(_posts("a", "b"), _cache(store, brief="brief two"))
+    assert sent == [["a", "b"]]
+    sent.clear()
+    _run(_posts("a", "b"), _cache(store, brief="brief one", model="pro"))
+    assert sent == [["a", "b"]]
+    sent.clear()
+    _run(_posts("a", "b"), _cache(store, brief="brief one"))
+    assert sent == []
+
+
+def test_failed_batches_are_not_cached(sent):
+    store = _MemoryStore()
+    _run(_posts("a", "b", "bad", "c"), _cache(store))
+    sent.clear()
+    cache = _cache(store)
+    _run(_posts("a", "b", "bad", "c"), cache)
+    assert sent == [["bad", "c"]]
+    assert cache.stats["reused_posts"] == 2
+
+
+def test_expired_entries_miss(sent):
+    store = _MemoryStore()
+    _run(_posts("a"), _cache(store))
+    for entry in store.docs["agent-1"].values():
+        entry["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+    sent.clear()
+    _run(_posts("a"), _cache(store))
+    assert sent == [["a"]]
+
+
+def test_store_errors_fall_back_to_fresh(sent):
+    candidates = _run(_posts("a", "b", "c"), _cache(_BrokenStore()))
+    assert len(sent) == 2
+    assert len(candidates) == 2
+
+
+def test_cached_post_ids_reads_once_per_run(sent):
+    store = _MemoryStore()
+    _run(_posts("a", "b"), _cache(store))
+    cache = _cache(store)
+    assert cache.cached_post_ids(_posts("a", "b", "z")) == {"a", "b"}
+    reads = store.reads
+    sent.clear()
+    _run(_posts("a", "b", "z"), cache)
+    assert store.reads == reads
+    assert sent == [["z"]]
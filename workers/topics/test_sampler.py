@@ -260,6 +260,24 @@ def test_engagement_orders_within_signature():
     assert sampled[0]["post_id"] == "high"
 
 
+def test_preferred_posts_win_within_signature_without_losing_coverage():
+    """Cached (preferred) posts take a signature's slot ahead of higher
+    engagement, but never at the cost of a signature."""
+    base = dict(platform="twitter", channel_type="creator", brands=["b"], content_type="review")
+    posts = [
+        make_post(post_id="t1_high", channel_id="ch_a", themes=["t1"], views=10_000, **base),
+        make_post(post_id="t1_cached", channel_id="ch_b", themes=["t1"], views=10, **base),
+        make_post(post_id="t2_only", channel_id="ch_c", themes=["t2"], views=5, **base),
+    ]
+    sampled, _ = sample_for_taxonomy(
+        posts, target_size=2, per_signature=1, preferred_post_ids={"t1_cached"},
+    )
+    assert {p["post_id"] for p in sampled} == {"t1_cached", "t2_only"}
+    # Without a preference the ranking is engagement-only, as before.
+    sampled, _ = sample_for_taxonomy(posts, target_size=2, per_signature=1)
+    assert {p["post_id"] for p in sampled} == {"t1_high", "t2_only"}
+
+
 def test_trim_phase_balances_when_overcapped():
     """When phase 1 overshoots the budget, phase 2 should trim from the
     largest signatures' tails, preserving smaller signatures."""
@@ -25,6 +25,7 @@ from datetime import datetime, timezone
 from typing import Any
 
 from workers.shared.bq_client import BQClient
+from workers.shared.bq_rows import TopicClusterRow
 from workers.shared.firestore_client import FirestoreClient
 from workers.topics.schema import Topic
 
@@ -73,9 +74,10 @@ def write_topic_results(
 
     cluster_rows_written = 0
     if cluster_rows:
-        for i in range(0, len(cluster_rows), 500):
-            bq.insert_rows("topic_clusters", cluster_rows[i : i + 500])
-        cluster_rows_written = len(cluster_rows)
+        # One atomic append - readers never see half of a clustering run.
+        cluster_rows_written = bq.write_rows_bulk(
+            [TopicClusterRow(**row) for row in cluster_rows]
+        )
         logger.info(
             "Wrote %d topic_clusters rows to BQ for agent %s",
             cluster_rows_written, agent_id,